@@ -0,0 +1,82 @@
+"""
+Synthetic data shared by the benchmarks.  Nothing is downloaded, so the benchmarks can be run
+offline, and every dataset is generated from a fixed seed, so timings are comparable between
+commits.
+"""
+from typing import Mapping, Optional, Tuple
+
+import numpy as np
+from scipy.ndimage import gaussian_filter
+
+from starfish import Codebook, ImageStack, IntensityTable
+
+N_ROUND = 4
+N_CH = 4
+N_CODES = 16
+
+SCALES: Mapping[str, Tuple[int, int, int]] = {
+    "small": (2, 64, 64),
+    "medium": (4, 256, 256),
+    "large": (8, 512, 512),
+}
+"""Maps the name of each scale to the (z, y, x) shape of the tiles of each round and channel."""
+
+SPOT_DENSITY = 1 / 2000
+"""Number of spots per voxel in the synthetic data."""
+
+
+def codebook() -> Codebook:
+    np.random.seed(0)
+    return Codebook.synthetic_one_hot_codebook(
+        n_round=N_ROUND, n_channel=N_CH, n_codes=N_CODES)
+
+
+def intensities(scale: str, codebook: Codebook, n_spots: Optional[int]=None) -> IntensityTable:
+    """Spots at random locations.  If n_spots is not provided, the number of spots is determined by
+    :py:data:`SPOT_DENSITY`."""
+    num_z, height, width = SCALES[scale]
+    if n_spots is None:
+        n_spots = max(int(num_z * height * width * SPOT_DENSITY), 10)
+    np.random.seed(0)
+    return IntensityTable.synthetic_intensities(
+        codebook, num_z=num_z, height=height, width=width, n_spots=n_spots)
+
+
+def spots_stack(scale: str) -> ImageStack:
+    """An ImageStack with gaussian spots that decode to the targets of :py:func:`codebook`.  The
+    background is subtracted and the spots are scaled to fill [0, 1]."""
+    num_z, height, width = SCALES[scale]
+    np.random.seed(0)
+    stack = ImageStack.synthetic_spots(
+        intensities(scale, codebook()), num_z=num_z, height=height, width=width)
+    data = stack.xarray.values
+    background = np.median(data)
+    data = np.clip((data - background) / (data.max() - background), 0, 1)
+    return ImageStack.from_numpy_array(data.astype(np.float32))
+
+
+def random_stack(scale: str) -> ImageStack:
+    """An ImageStack of uniform noise."""
+    num_z, height, width = SCALES[scale]
+    data = np.random.RandomState(0).rand(N_ROUND, N_CH, num_z, height, width)
+    return ImageStack.from_numpy_array(data.astype(np.float32))
+
+
+def nuclei_stack(scale: str) -> ImageStack:
+    """A single round and channel ImageStack of large, blurry nuclei, scaled to fill [0, 1]."""
+    num_z, height, width = SCALES[scale]
+    state = np.random.RandomState(0)
+    data = np.zeros((num_z, height, width), dtype=np.float32)
+    n_nuclei = max(height * width // 4096, 4)
+    data[:, state.randint(0, height, n_nuclei), state.randint(0, width, n_nuclei)] = 1
+    data = gaussian_filter(data, sigma=(0, 8, 8))
+    data /= data.max()
+    return ImageStack.from_numpy_array(data[np.newaxis, np.newaxis])
+
+
+def label_image(scale: str, cell_size: int=32) -> np.ndarray:
+    """A 2-d label image that tiles the field of view with square cells."""
+    _, height, width = SCALES[scale]
+    y, x = np.mgrid[0:height, 0:width]
+    cells_per_row = -(-width // cell_size)
+    return ((y // cell_size) * cells_per_row + (x // cell_size) + 1).astype(np.int32)
@@ -0,0 +1,33 @@
+import numpy as np
+import xarray as xr
+
+from starfish.image import Filter
+from ._synthetic import N_CH, random_stack, SCALES
+
+_PARAMETERS = {
+    # the testing parameters of these filters assume two channels
+    "LinearUnmixing": {"coeff_mat": np.eye(N_CH) - 0.25 * (1 - np.eye(N_CH))},
+    "ElementWiseMultiply": {
+        "mult_array": xr.DataArray(
+            np.linspace(1, 0.5, N_CH).reshape(1, N_CH, 1, 1, 1), dims=("r", "c", "z", "y", "x"))
+    },
+}
+
+
+class Filters:
+    """Each Filter algorithm, with its testing parameters, on stacks of uniform noise."""
+    params = [sorted(Filter._algorithm_to_class_map().keys()), list(SCALES.keys())]
+    param_names = ["algorithm", "scale"]
+    timeout = 600
+
+    def setup(self, algorithm, scale):
+        algorithm_cls = Filter._algorithm_to_class_map()[algorithm]
+        parameters = _PARAMETERS.get(algorithm, algorithm_cls._DEFAULT_TESTING_PARAMETERS)
+        self.filter = algorithm_cls(**parameters)
+        self.stack = random_stack(scale)
+
+    def time_run(self, algorithm, scale):
+        self.filter.run(self.stack)
+
+    def peakmem_run(self, algorithm, scale):
+        self.filter.run(self.stack)
@@ -0,0 +1,45 @@
+from starfish.image import ApplyTransform, LearnTransform, Segmentation
+from starfish.types import Axes
+from ._synthetic import nuclei_stack, SCALES, spots_stack
+
+
+class Registration:
+    """Learning the translation of each round to a reference image, and applying it."""
+    params = list(SCALES.keys())
+    param_names = ["scale"]
+
+    def setup(self, scale):
+        self.stack = spots_stack(scale)
+        self.projection = self.stack.max_proj(Axes.CH, Axes.ZPLANE)
+        reference = self.stack.max_proj(Axes.ROUND, Axes.CH, Axes.ZPLANE)
+        self.translation = LearnTransform.Translation(
+            reference_stack=reference, axes=Axes.ROUND, upsampling=100)
+        self.transforms_list = self.translation.run(self.projection)
+        self.warp = ApplyTransform.Warp()
+
+    def time_learn_translation(self, scale):
+        self.translation.run(self.projection)
+
+    def time_warp(self, scale):
+        self.warp.run(self.stack, self.transforms_list)
+
+    def peakmem_warp(self, scale):
+        self.warp.run(self.stack, self.transforms_list)
+
+
+class Watershed:
+    """Segmenting cells seeded by nuclei."""
+    params = list(SCALES.keys())
+    param_names = ["scale"]
+
+    def setup(self, scale):
+        self.stack = spots_stack(scale)
+        self.nuclei = nuclei_stack(scale)
+        self.watershed = Segmentation.Watershed(
+            nuclei_threshold=0.2, input_threshold=0.05, min_distance=8)
+
+    def time_run(self, scale):
+        self.watershed.run(self.stack, self.nuclei)
+
+    def peakmem_run(self, scale):
+        self.watershed.run(self.stack, self.nuclei)
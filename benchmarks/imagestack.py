@@ -0,0 +1,41 @@
+import os
+import shutil
+import tempfile
+
+from starfish import ImageStack
+from ._synthetic import N_CH, N_ROUND, random_stack, SCALES
+
+
+class ImageStackIO:
+    """Building, loading and exporting ImageStacks."""
+    params = list(SCALES.keys())
+    param_names = ["scale"]
+
+    def setup(self, scale):
+        self.stack = random_stack(scale)
+        self.array = self.stack.xarray.values.copy()
+        self.tempdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tempdir, "stack.json")
+        self.stack.export(self.path)
+
+    def teardown(self, scale):
+        shutil.rmtree(self.tempdir)
+
+    def time_synthetic_stack(self, scale):
+        num_z, height, width = SCALES[scale]
+        ImageStack.synthetic_stack(N_ROUND, N_CH, num_z, height, width)
+
+    def time_from_numpy_array(self, scale):
+        ImageStack.from_numpy_array(self.array)
+
+    def time_load(self, scale):
+        ImageStack.from_path_or_url(self.path)
+
+    def peakmem_load(self, scale):
+        ImageStack.from_path_or_url(self.path)
+
+    def time_export(self, scale):
+        self.stack.export(os.path.join(self.tempdir, "exported.json"))
+
+    def peakmem_export(self, scale):
+        self.stack.export(os.path.join(self.tempdir, "exported.json"))
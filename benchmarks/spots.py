@@ -0,0 +1,123 @@
+import numpy as np
+
+from starfish import IntensityTable
+from starfish.spots._detector.blob import BlobDetector
+from starfish.spots._detector.local_max_peak_finder import LocalMaxPeakFinder
+from starfish.spots._detector.local_search_blob_detector import (
+    LocalSearchBlobDetector as _LocalSearchBlobDetector
+)
+from starfish.spots._detector.trackpy_local_max_peak_finder import TrackpyLocalMaxPeakFinder
+from starfish.spots._pixel_decoder.combine_adjacent_features import CombineAdjacentFeatures
+from starfish.spots._target_assignment.label import Label
+from starfish.types import Axes
+from ._synthetic import codebook, intensities, label_image, SCALES, spots_stack
+
+_SPOT_FINDERS = {
+    "BlobDetector": lambda: BlobDetector(
+        min_sigma=1, max_sigma=4, num_sigma=5, threshold=0.1),
+    "LocalMaxPeakFinder": lambda: LocalMaxPeakFinder(
+        min_distance=4, stringency=0, min_obj_area=2, max_obj_area=200, threshold=0.1,
+        is_volume=True, verbose=False),
+    "TrackpyLocalMaxPeakFinder": lambda: TrackpyLocalMaxPeakFinder(
+        spot_diameter=3, min_mass=0.05, max_size=3, separation=4, is_volume=True),
+}
+
+
+class SpotFinders:
+    """Each SpotFinder, finding spots in a max projection over rounds and channels."""
+    params = [sorted(_SPOT_FINDERS.keys()), list(SCALES.keys())]
+    param_names = ["algorithm", "scale"]
+    timeout = 600
+
+    def setup(self, algorithm, scale):
+        self.spot_finder = _SPOT_FINDERS[algorithm]()
+        self.stack = spots_stack(scale)
+
+    def time_run(self, algorithm, scale):
+        self.spot_finder.run(self.stack, self.stack, (Axes.ROUND, Axes.CH))
+
+    def peakmem_run(self, algorithm, scale):
+        self.spot_finder.run(self.stack, self.stack, (Axes.ROUND, Axes.CH))
+
+
+class LocalSearchBlobDetector:
+    """Finding spots in each round, and matching them to the spots of the anchor round."""
+    params = list(SCALES.keys())
+    param_names = ["scale"]
+    timeout = 600
+
+    def setup(self, scale):
+        self.spot_finder = _LocalSearchBlobDetector(
+            min_sigma=1, max_sigma=4, num_sigma=5, threshold=0.1, anchor_round=0)
+        self.stack = spots_stack(scale)
+
+    def time_run(self, scale):
+        self.spot_finder.run(self.stack)
+
+    def peakmem_run(self, scale):
+        self.spot_finder.run(self.stack)
+
+
+class Decoding:
+    """Decoding spots against a one-hot codebook."""
+    params = [1000, 10000, 100000]
+    param_names = ["n_spots"]
+
+    def setup(self, n_spots):
+        self.codebook = codebook()
+        self.intensities = intensities("large", self.codebook, n_spots)
+
+    def time_metric_decode(self, n_spots):
+        self.codebook.metric_decode(
+            self.intensities, max_distance=1, min_intensity=0, norm_order=2)
+
+    def peakmem_metric_decode(self, n_spots):
+        self.codebook.metric_decode(
+            self.intensities, max_distance=1, min_intensity=0, norm_order=2)
+
+    def time_decode_per_round_max(self, n_spots):
+        self.codebook.decode_per_round_max(self.intensities)
+
+    def peakmem_decode_per_round_max(self, n_spots):
+        self.codebook.decode_per_round_max(self.intensities)
+
+
+class PixelDecoding:
+    """Decoding each pixel of an ImageStack, and combining adjacent pixels into spots."""
+    params = list(SCALES.keys())
+    param_names = ["scale"]
+    timeout = 600
+
+    def setup(self, scale):
+        self.codebook = codebook()
+        pixel_intensities = IntensityTable.from_image_stack(spots_stack(scale))
+        self.decoded = self.codebook.metric_decode(
+            pixel_intensities, max_distance=0.5, min_intensity=0.1, norm_order=2)
+        self.combine_adjacent_features = CombineAdjacentFeatures(min_area=2, max_area=np.inf)
+
+    def time_combine_adjacent_features(self, scale):
+        self.combine_adjacent_features.run(self.decoded)
+
+    def peakmem_combine_adjacent_features(self, scale):
+        self.combine_adjacent_features.run(self.decoded)
+
+
+class ExpressionMatrix:
+    """Assigning spots to cells, and counting the spots of each target in each cell."""
+    params = list(SCALES.keys())
+    param_names = ["scale"]
+
+    def setup(self, scale):
+        self.label_image = label_image(scale)
+        self.decoded = codebook().decode_per_round_max(intensities(scale, codebook()))
+        self.label = Label()
+        self.assigned = self.label.run(self.label_image, self.decoded)
+
+    def time_label(self, scale):
+        self.label.run(self.label_image, self.decoded)
+
+    def time_to_expression_matrix(self, scale):
+        self.assigned.to_expression_matrix()
+
+    def peakmem_to_expression_matrix(self, scale):
+        self.assigned.to_expression_matrix()
@@ -1,34 +1,79 @@
 # deal with numpy import warnings due to cython
 # See: https://stackoverflow.com/questions/40845304/
 #      runtimewarning-numpy-dtype-size-changed-may-indicate-binary-incompatibility)
+import importlib
+import sys
+import types
 import warnings
+from typing import Any, Mapping, Optional, Tuple, TYPE_CHECKING
 warnings.filterwarnings("ignore", message="numpy.dtype size changed")  # noqa
 warnings.filterwarnings("ignore", message="numpy.ufunc size changed")  # noqa
 
-import pkg_resources
-
-# image processing methods and objects
-from . import image
-# spot detection and manipulation
-from . import spots
-# display images and spots
-from ._display import display
-# generated version number and commit hash
-from ._version import get_versions
-# top-level objects
-from .codebook.codebook import Codebook
-from .experiment.experiment import Experiment, FieldOfView
-from .imagestack.imagestack import ImageStack
-from .intensity_table.intensity_table import IntensityTable
+# the command line interface loads its subcommands on demand, so it is cheap to import.
 from .starfish import starfish
 
+if TYPE_CHECKING:
+    # image processing methods and objects
+    from . import image
+    # spot detection and manipulation
+    from . import spots
+    # display images and spots
+    from ._display import display
+    # top-level objects
+    from .codebook.codebook import Codebook
+    from .experiment.experiment import Experiment, FieldOfView
+    from .imagestack.imagestack import ImageStack
+    from .intensity_table.intensity_table import IntensityTable
 
-# NOTE: if we move to python 3.7, we can produce this value at call time via __getattr__
-__version__ = get_versions()['version']
-__is_release_tag__ = None
-if "+" not in str(__version__):
-    __is_release_tag__ = f"Release: {__version__}"
-del get_versions
+    __version__: str
+    __is_release_tag__: Optional[str]
+
+
+_LAZY_ATTRIBUTES: Mapping[str, Tuple[str, Optional[str]]] = {
+    "image": (".image", None),
+    "spots": (".spots", None),
+    "display": ("._display", "display"),
+    "Codebook": (".codebook.codebook", "Codebook"),
+    "Experiment": (".experiment.experiment", "Experiment"),
+    "FieldOfView": (".experiment.experiment", "FieldOfView"),
+    "ImageStack": (".imagestack.imagestack", "ImageStack"),
+    "IntensityTable": (".intensity_table.intensity_table", "IntensityTable"),
+}
+"""Maps the top-level names of the library to the module, and the attribute within it, that they
+are loaded from.  These modules pull in most of starfish's dependencies, so they are only imported
+when the name is first used."""
+
+
+class _LazyModule(types.ModuleType):
+    """Loads the top-level names of the library on first access.
+
+    NOTE: if we move to python 3.7, this can be replaced by a module-level __getattr__ (PEP 562).
+    """
+
+    def __getattr__(self, name: str) -> Any:
+        if name in _LAZY_ATTRIBUTES:
+            module_name, attribute = _LAZY_ATTRIBUTES[name]
+            value = importlib.import_module(module_name, __name__)
+            if attribute is not None:
+                value = getattr(value, attribute)
+        elif name in ("__version__", "__is_release_tag__"):
+            # version number recorded when starfish was installed
+            from .util.versions import get_starfish_version
+            version = get_starfish_version()
+            self.__dict__["__version__"] = version
+            self.__dict__["__is_release_tag__"] = (
+                None if "+" in str(version) else f"Release: {version}")
+            value = self.__dict__[name]
+        else:
+            raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+        setattr(self, name, value)
+        return value
+
+    def __dir__(self):
+        return sorted(set(super().__dir__()).union(_LAZY_ATTRIBUTES.keys()))
+
+
+sys.modules[__name__].__class__ = _LazyModule
 
 if __name__ == "__main__":
     starfish()
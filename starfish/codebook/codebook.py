@@ -1,6 +1,6 @@
 import json
 import uuid
-from typing import Any, Dict, List, Optional, Sequence, Set, Tuple, Union
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple, TypeVar, Union
 
 import numpy as np
 import pandas as pd
@@ -17,10 +17,13 @@ from starfish.codebook._format import (
 )
 from starfish.config import StarfishConfig
 from starfish.intensity_table.intensity_table import IntensityTable
+from starfish.intensity_table.sparse import SparseIntensityTable
 from starfish.spacetx_format.util import SpaceTxValidator
 from starfish.spacetx_format.validate_sptx import _get_absolute_schema_path
 from starfish.types import Axes, Features, Number
 
+IntensitiesType = TypeVar("IntensitiesType", IntensityTable, SparseIntensityTable)
+
 
 class Codebook(xr.DataArray):
     """Codebook for an image-based transcriptomics experiment
@@ -524,9 +527,9 @@ class Codebook(xr.DataArray):
                 'Codebook and Intensities must have same number of channels and rounds')
 
     def metric_decode(
-            self, intensities: IntensityTable, max_distance: Number, min_intensity: Number,
+            self, intensities: IntensitiesType, max_distance: Number, min_intensity: Number,
             norm_order: int, metric: str='euclidean'
-    ) -> IntensityTable:
+    ) -> IntensitiesType:
         """Assign the closest target by euclidean distance to each feature in an intensity table
 
         Normalizes both the codes and the features to be unit vectors and finds the closest code
@@ -534,8 +537,8 @@ class Codebook(xr.DataArray):
 
         Parameters
         ----------
-        intensities : IntensityTable
-            features to be decoded
+        intensities : Union[IntensityTable, SparseIntensityTable]
+            features to be decoded.  SparseIntensityTables are decoded in dense blocks of features.
         max_distance : Number
             maximum distance between a feature and its closest code for which the coded target will
             be assigned.
@@ -553,11 +556,16 @@ class Codebook(xr.DataArray):
 
         Returns
         -------
-        IntensityTable :
+        Union[IntensityTable, SparseIntensityTable] :
             Intensity table containing normalized intensities, target assignments, distances to
             the nearest code, and the filtering status of each feature.
 
         """
+        if isinstance(intensities, SparseIntensityTable):
+            def decode(block: IntensityTable) -> IntensityTable:
+                return self.metric_decode(
+                    block, max_distance, min_intensity, norm_order, metric=metric)
+            return intensities.map_blocks(decode)
 
         self._validate_decode_intensity_input_matches_codebook_shape(intensities)
 
@@ -583,7 +591,7 @@ class Codebook(xr.DataArray):
         # norm_intensities is a DataArray, make it back into an IntensityTable
         return IntensityTable(norm_intensities)
 
-    def decode_per_round_max(self, intensities: IntensityTable) -> IntensityTable:
+    def decode_per_round_max(self, intensities: IntensitiesType) -> IntensitiesType:
         """decode each feature by selecting the per-imaging-round max-valued channel
 
         Notes
@@ -596,15 +604,17 @@ class Codebook(xr.DataArray):
 
         Parameters
         ----------
-        intensities : IntensityTable
-            features to be decoded
+        intensities : Union[IntensityTable, SparseIntensityTable]
+            features to be decoded.  SparseIntensityTables are decoded in dense blocks of features.
 
         Returns
         -------
-        IntensityTable :
+        Union[IntensityTable, SparseIntensityTable] :
             intensity table containing additional data variables for target assignments
 
         """
+        if isinstance(intensities, SparseIntensityTable):
+            return intensities.map_blocks(self.decode_per_round_max)
 
         def _view_row_as_element(array: np.ndarray) -> np.ndarray:
             """view an entire code as a single element
@@ -1,390 +1,558 @@
-import skimage
-from packaging import version
+"""
+Code vendored from scikit-image, under the following license:
+
+Unless otherwise specified by LICENSE.txt files in individual
+directories, all code is
+
+Copyright (C) 2011, the scikit-image team
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are
+met:
+
+1. Redistributions of source code must retain the above copyright
+    notice, this list of conditions and the following disclaimer.
+2. Redistributions in binary form must reproduce the above copyright
+    notice, this list of conditions and the following disclaimer in
+    the documentation and/or other materials provided with the
+    distribution.
+3. Neither the name of skimage nor the names of its contributors may be
+    used to endorse or promote products derived from this software without
+    specific prior written permission.
+
+THIS SOFTWARE IS PROVIDED BY THE AUTHOR ``AS IS'' AND ANY EXPRESS OR
+IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT,
+INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
+(INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
+STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
+IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+"""
+import math
+from collections import deque
+
+import numpy as np
+from scipy import spatial
+from scipy.ndimage import gaussian_filter, gaussian_laplace, maximum_filter
+from skimage import img_as_float
+
+# blob_dog and blob_log are vendored from scikit-image 0.15 (see the license above).  Rather than
+# stacking every scale into one cube and calling peak_local_max on it, they stream the scales
+# through _scale_space_peaks, which only keeps three adjacent scales in memory.  The blob pruning
+# helpers are private in scikit-image, so they are vendored along with them.
+
+
+def _scale_space_peaks(scale_images, threshold, exclude_border):
+    """Find the same local maxima as
+
+        peak_local_max(np.stack(scale_images, axis=-1), threshold_abs=threshold,
+                       footprint=np.ones((3,) * (ndim + 1)), threshold_rel=0.0,
+                       exclude_border=exclude_border)
+
+    without building the scale-space cube.  A 3x3(x3) maximum filter over the cube, padded with
+    zeros, is the maximum over each scale and its two neighbours of the spatial maximum filter of
+    that scale, so only a sliding window of three scales is needed.  Scales keep the dtype of
+    the image they are computed from (float32 for ImageStack data).
+
+    Returns
+    -------
+    np.ndarray :
+        (n, ndim + 1) array of peak coordinates, the last of which is the index of the scale, in
+        the same order as peak_local_max returns them.
+    """
+    if type(exclude_border) == bool:
+        exclude_border = 1 if exclude_border else 0
+
+    peak_coordinates = []
+    peak_values = []
+
+    def find_peaks(index, image, neighbour_maxima, is_first_or_last):
+        neighbourhood_max = neighbour_maxima[0]
+        for neighbour_max in neighbour_maxima[1:]:
+            neighbourhood_max = np.maximum(neighbourhood_max, neighbour_max)
+        if is_first_or_last:
+            # the cube is padded with zeros beyond the first and last scales
+            neighbourhood_max = np.maximum(neighbourhood_max, 0)
+
+        mask = image == neighbourhood_max
+        if exclude_border:
+            # like peak_local_max, exclude the first position and the last two along each axis
+            for axis in range(mask.ndim):
+                mask = mask.swapaxes(0, axis)
+                mask[:1] = mask[-2:] = False
+                mask = mask.swapaxes(0, axis)
+        if threshold is not None:
+            # the final threshold is at least threshold, so filter early to bound memory
+            mask &= image > threshold
+
+        coordinates = np.nonzero(mask)
+        peak_coordinates.append(
+            np.column_stack(coordinates + (np.full(len(coordinates[0]), index),)))
+        peak_values.append(image[coordinates])
+
+    # each entry is (scale image, spatial maximum filter of the scale image)
+    window = deque(maxlen=3)
+    n_scales = 0
+    constant = True
+    cube_min, cube_max = np.inf, -np.inf
+    for image in scale_images:
+        if n_scales == 0:
+            first_value = image.flat[0]
+        constant = constant and bool(np.all(image == first_value))
+        cube_min = min(cube_min, image.min())
+        cube_max = max(cube_max, image.max())
+
+        spatial_max = maximum_filter(
+            image, footprint=np.ones((3,) * image.ndim), mode='constant')
+        window.append((image, spatial_max))
+        n_scales += 1
+
+        # the previous scale now has both of its neighbours
+        if n_scales >= 2:
+            find_peaks(
+                n_scales - 2, window[-2][0], [entry[1] for entry in window], n_scales == 2)
+            if len(window) == 3:
+                window.popleft()
+    if n_scales > 0:
+        find_peaks(n_scales - 1, window[-1][0], [entry[1] for entry in window], True)
+
+    if n_scales == 0 or constant:
+        return np.empty((0, 2), np.intp)
+
+    coordinates = np.concatenate(peak_coordinates)
+    values = np.concatenate(peak_values)
+    thresholds = [cube_min if threshold is None else threshold, 0.0 * cube_max]
+    keep = values > max(thresholds)
+    if exclude_border:
+        scale_indices = coordinates[:, -1]
+        keep &= (scale_indices >= 1) & (scale_indices < n_scales - 2)
+    coordinates = coordinates[keep]
+
+    # peak_local_max returns the peaks in reverse row-major order of the cube
+    order = np.lexsort(coordinates.T[::-1])
+    return coordinates[order][::-1]
+
+
+def _compute_disk_overlap(d, r1, r2):
+    """
+    Compute fraction of surface overlap between two disks of radii
+    ``r1`` and ``r2``, with centers separated by a distance ``d``.
+
+    Parameters
+    ----------
+    d : float
+        Distance between centers.
+    r1 : float
+        Radius of the first disk.
+    r2 : float
+        Radius of the second disk.
+
+    Returns
+    -------
+    fraction: float
+        Fraction of area of the overlap between the two disks.
+    """
+
+    ratio1 = (d ** 2 + r1 ** 2 - r2 ** 2) / (2 * d * r1)
+    ratio1 = np.clip(ratio1, -1, 1)
+    acos1 = math.acos(ratio1)
 
-if version.parse(skimage.__version__) > version.parse("0.14.2"):
-    import skimage.transform
-    match_histograms = skimage.transform.match_histograms
-else:
+    ratio2 = (d ** 2 + r2 ** 2 - r1 ** 2) / (2 * d * r2)
+    ratio2 = np.clip(ratio2, -1, 1)
+    acos2 = math.acos(ratio2)
 
+    a = -d + r2 + r1
+    b = d - r2 + r1
+    c = d + r2 - r1
+    d = d + r2 + r1
+    area = (r1 ** 2 * acos1 + r2 ** 2 * acos2
+            - 0.5 * math.sqrt(abs(a * b * c * d)))
+    return area / (math.pi * (min(r1, r2) ** 2))
+
+
+def _compute_sphere_overlap(d, r1, r2):
+    """
+    Compute volume overlap fraction between two spheres of radii
+    ``r1`` and ``r2``, with centers separated by a distance ``d``.
+
+    Parameters
+    ----------
+    d : float
+        Distance between centers.
+    r1 : float
+        Radius of the first sphere.
+    r2 : float
+        Radius of the second sphere.
+
+    Returns
+    -------
+    fraction: float
+        Fraction of volume of the overlap between the two spheres.
+
+    Notes
+    -----
+    See for example http://mathworld.wolfram.com/Sphere-SphereIntersection.html
+    for more details.
+    """
+    vol = (math.pi / (12 * d) * (r1 + r2 - d)**2
+           * (d**2 + 2 * d * (r1 + r2) - 3 * (r1**2 + r2**2) + 6 * r1 * r2))
+    return vol / (4. / 3 * math.pi * min(r1, r2) ** 3)
+
+
+def _blob_overlap(blob1, blob2):
+    """Finds the overlapping area fraction between two blobs.
+
+    Returns a float representing fraction of overlapped area.
+
+    Parameters
+    ----------
+    blob1 : sequence of arrays
+        A sequence of ``(row, col, sigma)`` or ``(pln, row, col, sigma)``,
+        where ``row, col`` (or ``(pln, row, col)``) are coordinates
+        of blob and ``sigma`` is the standard deviation of the Gaussian kernel
+        which detected the blob.
+    blob2 : sequence of arrays
+        A sequence of ``(row, col, sigma)`` or ``(pln, row, col, sigma)``,
+        where ``row, col`` (or ``(pln, row, col)``) are coordinates
+        of blob and ``sigma`` is the standard deviation of the Gaussian kernel
+        which detected the blob.
+
+    Returns
+    -------
+    f : float
+        Fraction of overlapped area (or volume in 3D).
     """
-    Unless otherwise specified by LICENSE.txt files in individual
-    directories, all code is
-
-    Copyright (C) 2011, the scikit-image team
-    All rights reserved.
-
-    Redistribution and use in source and binary forms, with or without
-    modification, are permitted provided that the following conditions are
-    met:
-
-    1. Redistributions of source code must retain the above copyright
-        notice, this list of conditions and the following disclaimer.
-    2. Redistributions in binary form must reproduce the above copyright
-        notice, this list of conditions and the following disclaimer in
-        the documentation and/or other materials provided with the
-        distribution.
-    3. Neither the name of skimage nor the names of its contributors may be
-        used to endorse or promote products derived from this software without
-        specific prior written permission.
-
-    THIS SOFTWARE IS PROVIDED BY THE AUTHOR ``AS IS'' AND ANY EXPRESS OR
-    IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
-    WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
-    DISCLAIMED. IN NO EVENT SHALL THE AUTHOR BE LIABLE FOR ANY DIRECT,
-    INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES
-    (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
-    SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
-    HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT,
-    STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING
-    IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+    n_dim = len(blob1) - 1
+    root_ndim = math.sqrt(n_dim)
+
+    # extent of the blob is given by math.sqrt(2)*scale
+    r1 = blob1[-1] * root_ndim
+    r2 = blob2[-1] * root_ndim
+
+    d = math.sqrt(np.sum((blob1[:-1] - blob2[:-1])**2))
+    if d > r1 + r2:
+        return 0
+
+    # one blob is inside the other, the smaller blob must die
+    if d <= abs(r1 - r2):
+        return 1
+
+    if n_dim == 2:
+        return _compute_disk_overlap(d, r1, r2)
+
+    else:  # http://mathworld.wolfram.com/Sphere-SphereIntersection.html
+        return _compute_sphere_overlap(d, r1, r2)
+
+
+def _prune_blobs(blobs_array, overlap):
+    """Eliminated blobs with area overlap.
+
+    Parameters
+    ----------
+    blobs_array : ndarray
+        A 2d array with each row representing 3 (or 4) values,
+        ``(row, col, sigma)`` or ``(pln, row, col, sigma)`` in 3D,
+        where ``(row, col)`` (``(pln, row, col)``) are coordinates of the blob
+        and ``sigma`` is the standard deviation of the Gaussian kernel which
+        detected the blob.
+        This array must not have a dimension of size 0.
+    overlap : float
+        A value between 0 and 1. If the fraction of area overlapping for 2
+        blobs is greater than `overlap` the smaller blob is eliminated.
+
+    Returns
+    -------
+    A : ndarray
+        `array` with overlapping blobs removed.
     """
+    sigma = blobs_array[:, -1].max()
+    distance = 2 * sigma * math.sqrt(blobs_array.shape[1] - 1)
+    tree = spatial.cKDTree(blobs_array[:, :-1])
+    pairs = np.array(list(tree.query_pairs(distance)))
+    if len(pairs) == 0:
+        return blobs_array
+    else:
+        for (i, j) in pairs:
+            blob1, blob2 = blobs_array[i], blobs_array[j]
+            if _blob_overlap(blob1, blob2) > overlap:
+                if blob1[-1] > blob2[-1]:
+                    blob2[-1] = 0
+                else:
+                    blob1[-1] = 0
+
+    return np.array([b for b in blobs_array if b[-1] > 0])
+
+
+def blob_dog(image, min_sigma=1, max_sigma=50, sigma_ratio=1.6, threshold=2.0,
+             overlap=.5, *, exclude_border=False):
+    r"""Finds blobs in the given grayscale image.
+    Blobs are found using the Difference of Gaussian (DoG) method [1]_.
+    For each blob found, the method returns its coordinates and the standard
+    deviation of the Gaussian kernel that detected the blob.
+    Parameters
+    ----------
+    image : 2D or 3D ndarray
+        Input grayscale image, blobs are assumed to be light on dark
+        background (white on black).
+    min_sigma : scalar or sequence of scalars, optional
+        The minimum standard deviation for Gaussian kernel. Keep this low to
+        detect smaller blobs. The standard deviations of the Gaussian filter
+        are given for each axis as a sequence, or as a single number, in
+        which case it is equal for all axes.
+    max_sigma : scalar or sequence of scalars, optional
+        The maximum standard deviation for Gaussian kernel. Keep this high to
+        detect larger blobs. The standard deviations of the Gaussian filter
+        are given for each axis as a sequence, or as a single number, in
+        which case it is equal for all axes.
+    sigma_ratio : float, optional
+        The ratio between the standard deviation of Gaussian Kernels used for
+        computing the Difference of Gaussians
+    threshold : float, optional.
+        The absolute lower bound for scale space maxima. Local maxima smaller
+        than thresh are ignored. Reduce this to detect blobs with less
+        intensities.
+    overlap : float, optional
+        A value between 0 and 1. If the area of two blobs overlaps by a
+        fraction greater than `threshold`, the smaller blob is eliminated.
+    exclude_border : int or bool, optional
+        If nonzero int, `exclude_border` excludes blobs from
+        within `exclude_border`-pixels of the border of the image.
+    Returns
+    -------
+    A : (n, image.ndim + sigma) ndarray
+        A 2d array with each row representing 2 coordinate values for a 2D
+        image, and 3 coordinate values for a 3D image, plus the sigma(s) used.
+        When a single sigma is passed, outputs are:
+        ``(r, c, sigma)`` or ``(p, r, c, sigma)`` where ``(r, c)`` or
+        ``(p, r, c)`` are coordinates of the blob and ``sigma`` is the standard
+        deviation of the Gaussian kernel which detected the blob. When an
+        anisotropic gaussian is used (sigmas per dimension), the detected sigma
+        is returned for each dimension.
+    References
+    ----------
+    .. [1] https://en.wikipedia.org/wiki/Blob_detection#The_difference_of_Gaussians_approach
+    Examples
+    --------
+    >>> from skimage import data, feature
+    >>> feature.blob_dog(data.coins(), threshold=.5, max_sigma=40)
+    array([[ 267.      ,  359.      ,   16.777216],
+        [ 267.      ,  115.      ,   10.48576 ],
+        [ 263.      ,  302.      ,   16.777216],
+        [ 263.      ,  245.      ,   16.777216],
+        [ 261.      ,  173.      ,   16.777216],
+        [ 260.      ,   46.      ,   16.777216],
+        [ 198.      ,  155.      ,   10.48576 ],
+        [ 196.      ,   43.      ,   10.48576 ],
+        [ 195.      ,  102.      ,   16.777216],
+        [ 194.      ,  277.      ,   16.777216],
+        [ 193.      ,  213.      ,   16.777216],
+        [ 185.      ,  347.      ,   16.777216],
+        [ 128.      ,  154.      ,   10.48576 ],
+        [ 127.      ,  102.      ,   10.48576 ],
+        [ 125.      ,  208.      ,   10.48576 ],
+        [ 125.      ,   45.      ,   16.777216],
+        [ 124.      ,  337.      ,   10.48576 ],
+        [ 120.      ,  272.      ,   16.777216],
+        [  58.      ,  100.      ,   10.48576 ],
+        [  54.      ,  276.      ,   10.48576 ],
+        [  54.      ,   42.      ,   16.777216],
+        [  52.      ,  216.      ,   16.777216],
+        [  52.      ,  155.      ,   16.777216],
+        [  45.      ,  336.      ,   16.777216]])
+    Notes
+    -----
+    The radius of each blob is approximately :math:`\sqrt{2}\sigma` for
+    a 2-D image and :math:`\sqrt{3}\sigma` for a 3-D image.
+    """
+
+    image = img_as_float(image)
+
+    # if both min and max sigma are scalar, function returns only one sigma
+    scalar_sigma = np.isscalar(max_sigma) and np.isscalar(min_sigma)
+
+    # Gaussian filter requires that sequence-type sigmas have same
+    # dimensionality as image. This broadcasts scalar kernels
+    if np.isscalar(max_sigma):
+        max_sigma = np.full(image.ndim, max_sigma, dtype=float)
+    if np.isscalar(min_sigma):
+        min_sigma = np.full(image.ndim, min_sigma, dtype=float)
 
-    import numpy as np
-
-    def _match_cumulative_cdf(source, template):
-        """
-        Return modified source array so that the cumulative density function of
-        its values matches the cumulative density function of the template.
-        """
-        src_values, src_unique_indices, src_counts = np.unique(
-            source.ravel(), return_inverse=True, return_counts=True)
-        tmpl_values, tmpl_counts = np.unique(template.ravel(), return_counts=True)
-
-        # calculate normalized quantiles for each array
-        src_quantiles = np.cumsum(src_counts) / source.size
-        tmpl_quantiles = np.cumsum(tmpl_counts) / template.size
-
-        interp_a_values = np.interp(src_quantiles, tmpl_quantiles, tmpl_values)
-        return interp_a_values[src_unique_indices].reshape(source.shape)
-
-    def match_histograms(image, reference, multichannel=False):
-        """Adjust an image so that its cumulative histogram matches that of another.
-        The adjustment is applied separately for each channel.
-        Parameters
-        ----------
-        image : ndarray
-            Input image. Can be gray-scale or in color.
-        reference : ndarray
-            Image to match histogram of. Must have the same number of channels as
-            image.
-        multichannel : bool, optional
-            Apply the matching separately for each channel.
-        Returns
-        -------
-        matched : ndarray
-            Transformed input image.
-        Raises
-        ------
-        ValueError
-            Thrown when the number of channels in the input image and the reference
-            differ.
-        References
-        ----------
-        .. [1] http://paulbourke.net/miscellaneous/equalisation/
-        """
-        if image.ndim != reference.ndim:
-            raise ValueError('Image and reference must have the same number of channels.')
-
-        if multichannel:
-            if image.shape[-1] != reference.shape[-1]:
-                raise ValueError('Number of channels in the input image and reference '
-                                 'image must match!')
-
-            matched = np.empty(image.shape, dtype=image.dtype)
-            for channel in range(image.shape[-1]):
-                matched_channel = _match_cumulative_cdf(
-                    image[..., channel], reference[..., channel])
-                matched[..., channel] = matched_channel
-        else:
-            matched = _match_cumulative_cdf(image, reference)
-
-        return matched
-
-if version.parse(skimage.__version__) > version.parse("0.14.2"):
-    import skimage.feature
-    blob_log = skimage.feature.blob_log
-    blob_dog = skimage.feature.blob_dog
-else:
-    from skimage.feature.blob import _prune_blobs
-    import numpy as np
-    from scipy.ndimage import gaussian_filter, gaussian_laplace
-    from skimage import img_as_float
-    from skimage.feature import peak_local_max
-
-    def blob_dog(image, min_sigma=1, max_sigma=50, sigma_ratio=1.6, threshold=2.0,
-                 overlap=.5, *, exclude_border=False):
-        r"""Finds blobs in the given grayscale image.
-        Blobs are found using the Difference of Gaussian (DoG) method [1]_.
-        For each blob found, the method returns its coordinates and the standard
-        deviation of the Gaussian kernel that detected the blob.
-        Parameters
-        ----------
-        image : 2D or 3D ndarray
-            Input grayscale image, blobs are assumed to be light on dark
-            background (white on black).
-        min_sigma : scalar or sequence of scalars, optional
-            The minimum standard deviation for Gaussian kernel. Keep this low to
-            detect smaller blobs. The standard deviations of the Gaussian filter
-            are given for each axis as a sequence, or as a single number, in
-            which case it is equal for all axes.
-        max_sigma : scalar or sequence of scalars, optional
-            The maximum standard deviation for Gaussian kernel. Keep this high to
-            detect larger blobs. The standard deviations of the Gaussian filter
-            are given for each axis as a sequence, or as a single number, in
-            which case it is equal for all axes.
-        sigma_ratio : float, optional
-            The ratio between the standard deviation of Gaussian Kernels used for
-            computing the Difference of Gaussians
-        threshold : float, optional.
-            The absolute lower bound for scale space maxima. Local maxima smaller
-            than thresh are ignored. Reduce this to detect blobs with less
-            intensities.
-        overlap : float, optional
-            A value between 0 and 1. If the area of two blobs overlaps by a
-            fraction greater than `threshold`, the smaller blob is eliminated.
-        exclude_border : int or bool, optional
-            If nonzero int, `exclude_border` excludes blobs from
-            within `exclude_border`-pixels of the border of the image.
-        Returns
-        -------
-        A : (n, image.ndim + sigma) ndarray
-            A 2d array with each row representing 2 coordinate values for a 2D
-            image, and 3 coordinate values for a 3D image, plus the sigma(s) used.
-            When a single sigma is passed, outputs are:
-            ``(r, c, sigma)`` or ``(p, r, c, sigma)`` where ``(r, c)`` or
-            ``(p, r, c)`` are coordinates of the blob and ``sigma`` is the standard
-            deviation of the Gaussian kernel which detected the blob. When an
-            anisotropic gaussian is used (sigmas per dimension), the detected sigma
-            is returned for each dimension.
-        References
-        ----------
-        .. [1] https://en.wikipedia.org/wiki/Blob_detection#The_difference_of_Gaussians_approach
-        Examples
-        --------
-        >>> from skimage import data, feature
-        >>> feature.blob_dog(data.coins(), threshold=.5, max_sigma=40)
-        array([[ 267.      ,  359.      ,   16.777216],
-            [ 267.      ,  115.      ,   10.48576 ],
-            [ 263.      ,  302.      ,   16.777216],
-            [ 263.      ,  245.      ,   16.777216],
-            [ 261.      ,  173.      ,   16.777216],
-            [ 260.      ,   46.      ,   16.777216],
-            [ 198.      ,  155.      ,   10.48576 ],
-            [ 196.      ,   43.      ,   10.48576 ],
-            [ 195.      ,  102.      ,   16.777216],
-            [ 194.      ,  277.      ,   16.777216],
-            [ 193.      ,  213.      ,   16.777216],
-            [ 185.      ,  347.      ,   16.777216],
-            [ 128.      ,  154.      ,   10.48576 ],
-            [ 127.      ,  102.      ,   10.48576 ],
-            [ 125.      ,  208.      ,   10.48576 ],
-            [ 125.      ,   45.      ,   16.777216],
-            [ 124.      ,  337.      ,   10.48576 ],
-            [ 120.      ,  272.      ,   16.777216],
-            [  58.      ,  100.      ,   10.48576 ],
-            [  54.      ,  276.      ,   10.48576 ],
-            [  54.      ,   42.      ,   16.777216],
-            [  52.      ,  216.      ,   16.777216],
-            [  52.      ,  155.      ,   16.777216],
-            [  45.      ,  336.      ,   16.777216]])
-        Notes
-        -----
-        The radius of each blob is approximately :math:`\sqrt{2}\sigma` for
-        a 2-D image and :math:`\sqrt{3}\sigma` for a 3-D image.
-        """
-
-        image = img_as_float(image)
-
-        # if both min and max sigma are scalar, function returns only one sigma
-        scalar_sigma = np.isscalar(max_sigma) and np.isscalar(min_sigma)
-
-        # Gaussian filter requires that sequence-type sigmas have same
-        # dimensionality as image. This broadcasts scalar kernels
-        if np.isscalar(max_sigma):
-            max_sigma = np.full(image.ndim, max_sigma, dtype=float)
-        if np.isscalar(min_sigma):
-            min_sigma = np.full(image.ndim, min_sigma, dtype=float)
-
-        # Convert sequence types to array
-        min_sigma = np.asarray(min_sigma, dtype=float)
-        max_sigma = np.asarray(max_sigma, dtype=float)
-
-        # k such that min_sigma*(sigma_ratio**k) > max_sigma
-        k = int(np.mean(np.log(max_sigma / min_sigma) / np.log(sigma_ratio) + 1))
-
-        # a geometric progression of standard deviations for gaussian kernels
-        sigma_list = np.array([min_sigma * (sigma_ratio ** i)
-                              for i in range(k + 1)])
-
-        gaussian_images = [gaussian_filter(image, s) for s in sigma_list]
+    # Convert sequence types to array
+    min_sigma = np.asarray(min_sigma, dtype=float)
+    max_sigma = np.asarray(max_sigma, dtype=float)
 
+    # k such that min_sigma*(sigma_ratio**k) > max_sigma
+    k = int(np.mean(np.log(max_sigma / min_sigma) / np.log(sigma_ratio) + 1))
+
+    # a geometric progression of standard deviations for gaussian kernels
+    sigma_list = np.array([min_sigma * (sigma_ratio ** i)
+                          for i in range(k + 1)])
+
+    def dog_images():
         # computing difference between two successive Gaussian blurred images
         # multiplying with average standard deviation provides scale invariance
-        dog_images = [(gaussian_images[i] - gaussian_images[i + 1])
-                      * np.mean(sigma_list[i]) for i in range(k)]
-
-        image_cube = np.stack(dog_images, axis=-1)
-
-        # local_maxima = get_local_maxima(image_cube, threshold)
-        local_maxima = peak_local_max(image_cube, threshold_abs=threshold,
-                                      footprint=np.ones((3,) * (image.ndim + 1)),
-                                      threshold_rel=0.0,
-                                      exclude_border=exclude_border)
-        # Catch no peaks
-        if local_maxima.size == 0:
-            return np.empty((0, 3))
-
-        # Convert local_maxima to float64
-        lm = local_maxima.astype(np.float64)
-
-        # translate final column of lm, which contains the index of the
-        # sigma that produced the maximum intensity value, into the sigma
-        sigmas_of_peaks = sigma_list[local_maxima[:, -1]]
-
-        if scalar_sigma:
-            # select one sigma column, keeping dimension
-            sigmas_of_peaks = sigmas_of_peaks[:, 0:1]
-
-        # Remove sigma index and replace with sigmas
-        lm = np.hstack([lm[:, :-1], sigmas_of_peaks])
-
-        return _prune_blobs(lm, overlap)
-
-    def blob_log(image, min_sigma=1, max_sigma=50, num_sigma=10, threshold=.2,
-                 overlap=.5, log_scale=False, *, exclude_border=False):
-        r"""Finds blobs in the given grayscale image.
-        Blobs are found using the Laplacian of Gaussian (LoG) method [1]_.
-        For each blob found, the method returns its coordinates and the standard
-        deviation of the Gaussian kernel that detected the blob.
-        Parameters
-        ----------
-        image : 2D or 3D ndarray
-            Input grayscale image, blobs are assumed to be light on dark
-            background (white on black).
-        min_sigma : scalar or sequence of scalars, optional
-            the minimum standard deviation for Gaussian kernel. Keep this low to
-            detect smaller blobs. The standard deviations of the Gaussian filter
-            are given for each axis as a sequence, or as a single number, in
-            which case it is equal for all axes.
-        max_sigma : scalar or sequence of scalars, optional
-            The maximum standard deviation for Gaussian kernel. Keep this high to
-            detect larger blobs. The standard deviations of the Gaussian filter
-            are given for each axis as a sequence, or as a single number, in
-            which case it is equal for all axes.
-        num_sigma : int, optional
-            The number of intermediate values of standard deviations to consider
-            between `min_sigma` and `max_sigma`.
-        threshold : float, optional.
-            The absolute lower bound for scale space maxima. Local maxima smaller
-            than thresh are ignored. Reduce this to detect blobs with less
-            intensities.
-        overlap : float, optional
-            A value between 0 and 1. If the area of two blobs overlaps by a
-            fraction greater than `threshold`, the smaller blob is eliminated.
-        log_scale : bool, optional
-            If set intermediate values of standard deviations are interpolated
-            using a logarithmic scale to the base `10`. If not, linear
-            interpolation is used.
-        exclude_border : int or bool, optional
-            If nonzero int, `exclude_border` excludes blobs from
-            within `exclude_border`-pixels of the border of the image.
-        Returns
-        -------
-        A : (n, image.ndim + sigma) ndarray
-            A 2d array with each row representing 2 coordinate values for a 2D
-            image, and 3 coordinate values for a 3D image, plus the sigma(s) used.
-            When a single sigma is passed, outputs are:
-            ``(r, c, sigma)`` or ``(p, r, c, sigma)`` where ``(r, c)`` or
-            ``(p, r, c)`` are coordinates of the blob and ``sigma`` is the standard
-            deviation of the Gaussian kernel which detected the blob. When an
-            anisotropic gaussian is used (sigmas per dimension), the detected sigma
-            is returned for each dimension.
-        References
-        ----------
-        .. [1] https://en.wikipedia.org/wiki/Blob_detection#The_Laplacian_of_Gaussian
-        Examples
-        --------
-        >>> from skimage import data, feature, exposure
-        >>> img = data.coins()
-        >>> img = exposure.equalize_hist(img)  # improves detection
-        >>> feature.blob_log(img, threshold = .3)
-        array([[ 266.        ,  115.        ,   11.88888889],
-            [ 263.        ,  302.        ,   17.33333333],
-            [ 263.        ,  244.        ,   17.33333333],
-            [ 260.        ,  174.        ,   17.33333333],
-            [ 198.        ,  155.        ,   11.88888889],
-            [ 198.        ,  103.        ,   11.88888889],
-            [ 197.        ,   44.        ,   11.88888889],
-            [ 194.        ,  276.        ,   17.33333333],
-            [ 194.        ,  213.        ,   17.33333333],
-            [ 185.        ,  344.        ,   17.33333333],
-            [ 128.        ,  154.        ,   11.88888889],
-            [ 127.        ,  102.        ,   11.88888889],
-            [ 126.        ,  208.        ,   11.88888889],
-            [ 126.        ,   46.        ,   11.88888889],
-            [ 124.        ,  336.        ,   11.88888889],
-            [ 121.        ,  272.        ,   17.33333333],
-            [ 113.        ,  323.        ,    1.        ]])
-        Notes
-        -----
-        The radius of each blob is approximately :math:`\sqrt{2}\sigma` for
-        a 2-D image and :math:`\sqrt{3}\sigma` for a 3-D image.
-        """
-        image = img_as_float(image)
-
-        # if both min and max sigma are scalar, function returns only one sigma
-        scalar_sigma = (
-            True if np.isscalar(max_sigma) and np.isscalar(min_sigma) else False
-        )
-
-        # Gaussian filter requires that sequence-type sigmas have same
-        # dimensionality as image. This broadcasts scalar kernels
-        if np.isscalar(max_sigma):
-            max_sigma = np.full(image.ndim, max_sigma, dtype=float)
-        if np.isscalar(min_sigma):
-            min_sigma = np.full(image.ndim, min_sigma, dtype=float)
-
-        # Convert sequence types to array
-        min_sigma = np.asarray(min_sigma, dtype=float)
-        max_sigma = np.asarray(max_sigma, dtype=float)
-
-        if log_scale:
-            start, stop = np.log10(min_sigma)[:, None], np.log10(max_sigma)[:, None]
-            space = np.concatenate(
-                [start, stop, np.full_like(start, num_sigma)], axis=1)
-            sigma_list = np.stack([np.logspace(*s) for s in space], axis=1)
-        else:
-            scale = np.linspace(0, 1, num_sigma)[:, None]
-            sigma_list = scale * (max_sigma - min_sigma) + min_sigma
-
-        # computing gaussian laplace
-        # average s**2 provides scale invariance
-        gl_images = [-gaussian_laplace(image, s) * s ** 2
-                     for s in np.mean(sigma_list, axis=1)]
-
-        image_cube = np.stack(gl_images, axis=-1)
-
-        local_maxima = peak_local_max(image_cube, threshold_abs=threshold,
-                                      footprint=np.ones((3,) * (image.ndim + 1)),
-                                      threshold_rel=0.0,
-                                      exclude_border=exclude_border)
-
-        # Catch no peaks
-        if local_maxima.size == 0:
-            return np.empty((0, 3))
-
-        # Convert local_maxima to float64
-        lm = local_maxima.astype(np.float64)
-
-        # translate final column of lm, which contains the index of the
-        # sigma that produced the maximum intensity value, into the sigma
-        sigmas_of_peaks = sigma_list[local_maxima[:, -1]]
-
-        if scalar_sigma:
-            # select one sigma column, keeping dimension
-            sigmas_of_peaks = sigmas_of_peaks[:, 0:1]
-
-        # Remove sigma index and replace with sigmas
-        lm = np.hstack([lm[:, :-1], sigmas_of_peaks])
-
-        return _prune_blobs(lm, overlap)
+        previous = gaussian_filter(image, sigma_list[0])
+        for i in range(k):
+            current = gaussian_filter(image, sigma_list[i + 1])
+            yield (previous - current) * np.mean(sigma_list[i])
+            previous = current
+
+    local_maxima = _scale_space_peaks(dog_images(), threshold, exclude_border)
+    # Catch no peaks
+    if local_maxima.size == 0:
+        return np.empty((0, 3))
+
+    # Convert local_maxima to float64
+    lm = local_maxima.astype(np.float64)
+
+    # translate final column of lm, which contains the index of the
+    # sigma that produced the maximum intensity value, into the sigma
+    sigmas_of_peaks = sigma_list[local_maxima[:, -1]]
+
+    if scalar_sigma:
+        # select one sigma column, keeping dimension
+        sigmas_of_peaks = sigmas_of_peaks[:, 0:1]
+
+    # Remove sigma index and replace with sigmas
+    lm = np.hstack([lm[:, :-1], sigmas_of_peaks])
+
+    return _prune_blobs(lm, overlap)
+
+
+def blob_log(image, min_sigma=1, max_sigma=50, num_sigma=10, threshold=.2,
+             overlap=.5, log_scale=False, *, exclude_border=False):
+    r"""Finds blobs in the given grayscale image.
+    Blobs are found using the Laplacian of Gaussian (LoG) method [1]_.
+    For each blob found, the method returns its coordinates and the standard
+    deviation of the Gaussian kernel that detected the blob.
+    Parameters
+    ----------
+    image : 2D or 3D ndarray
+        Input grayscale image, blobs are assumed to be light on dark
+        background (white on black).
+    min_sigma : scalar or sequence of scalars, optional
+        the minimum standard deviation for Gaussian kernel. Keep this low to
+        detect smaller blobs. The standard deviations of the Gaussian filter
+        are given for each axis as a sequence, or as a single number, in
+        which case it is equal for all axes.
+    max_sigma : scalar or sequence of scalars, optional
+        The maximum standard deviation for Gaussian kernel. Keep this high to
+        detect larger blobs. The standard deviations of the Gaussian filter
+        are given for each axis as a sequence, or as a single number, in
+        which case it is equal for all axes.
+    num_sigma : int, optional
+        The number of intermediate values of standard deviations to consider
+        between `min_sigma` and `max_sigma`.
+    threshold : float, optional.
+        The absolute lower bound for scale space maxima. Local maxima smaller
+        than thresh are ignored. Reduce this to detect blobs with less
+        intensities.
+    overlap : float, optional
+        A value between 0 and 1. If the area of two blobs overlaps by a
+        fraction greater than `threshold`, the smaller blob is eliminated.
+    log_scale : bool, optional
+        If set intermediate values of standard deviations are interpolated
+        using a logarithmic scale to the base `10`. If not, linear
+        interpolation is used.
+    exclude_border : int or bool, optional
+        If nonzero int, `exclude_border` excludes blobs from
+        within `exclude_border`-pixels of the border of the image.
+    Returns
+    -------
+    A : (n, image.ndim + sigma) ndarray
+        A 2d array with each row representing 2 coordinate values for a 2D
+        image, and 3 coordinate values for a 3D image, plus the sigma(s) used.
+        When a single sigma is passed, outputs are:
+        ``(r, c, sigma)`` or ``(p, r, c, sigma)`` where ``(r, c)`` or
+        ``(p, r, c)`` are coordinates of the blob and ``sigma`` is the standard
+        deviation of the Gaussian kernel which detected the blob. When an
+        anisotropic gaussian is used (sigmas per dimension), the detected sigma
+        is returned for each dimension.
+    References
+    ----------
+    .. [1] https://en.wikipedia.org/wiki/Blob_detection#The_Laplacian_of_Gaussian
+    Examples
+    --------
+    >>> from skimage import data, feature, exposure
+    >>> img = data.coins()
+    >>> img = exposure.equalize_hist(img)  # improves detection
+    >>> feature.blob_log(img, threshold = .3)
+    array([[ 266.        ,  115.        ,   11.88888889],
+        [ 263.        ,  302.        ,   17.33333333],
+        [ 263.        ,  244.        ,   17.33333333],
+        [ 260.        ,  174.        ,   17.33333333],
+        [ 198.        ,  155.        ,   11.88888889],
+        [ 198.        ,  103.        ,   11.88888889],
+        [ 197.        ,   44.        ,   11.88888889],
+        [ 194.        ,  276.        ,   17.33333333],
+        [ 194.        ,  213.        ,   17.33333333],
+        [ 185.        ,  344.        ,   17.33333333],
+        [ 128.        ,  154.        ,   11.88888889],
+        [ 127.        ,  102.        ,   11.88888889],
+        [ 126.        ,  208.        ,   11.88888889],
+        [ 126.        ,   46.        ,   11.88888889],
+        [ 124.        ,  336.        ,   11.88888889],
+        [ 121.        ,  272.        ,   17.33333333],
+        [ 113.        ,  323.        ,    1.        ]])
+    Notes
+    -----
+    The radius of each blob is approximately :math:`\sqrt{2}\sigma` for
+    a 2-D image and :math:`\sqrt{3}\sigma` for a 3-D image.
+    """
+    image = img_as_float(image)
+
+    # if both min and max sigma are scalar, function returns only one sigma
+    scalar_sigma = (
+        True if np.isscalar(max_sigma) and np.isscalar(min_sigma) else False
+    )
+
+    # Gaussian filter requires that sequence-type sigmas have same
+    # dimensionality as image. This broadcasts scalar kernels
+    if np.isscalar(max_sigma):
+        max_sigma = np.full(image.ndim, max_sigma, dtype=float)
+    if np.isscalar(min_sigma):
+        min_sigma = np.full(image.ndim, min_sigma, dtype=float)
+
+    # Convert sequence types to array
+    min_sigma = np.asarray(min_sigma, dtype=float)
+    max_sigma = np.asarray(max_sigma, dtype=float)
+
+    if log_scale:
+        start, stop = np.log10(min_sigma)[:, None], np.log10(max_sigma)[:, None]
+        space = np.concatenate(
+            [start, stop, np.full_like(start, num_sigma)], axis=1)
+        sigma_list = np.stack([np.logspace(*s) for s in space], axis=1)
+    else:
+        scale = np.linspace(0, 1, num_sigma)[:, None]
+        sigma_list = scale * (max_sigma - min_sigma) + min_sigma
+
+    # computing gaussian laplace
+    # average s**2 provides scale invariance
+    gl_images = (-gaussian_laplace(image, s) * s ** 2
+                 for s in np.mean(sigma_list, axis=1))
+
+    local_maxima = _scale_space_peaks(gl_images, threshold, exclude_border)
+
+    # Catch no peaks
+    if local_maxima.size == 0:
+        return np.empty((0, 3))
+
+    # Convert local_maxima to float64
+    lm = local_maxima.astype(np.float64)
+
+    # translate final column of lm, which contains the index of the
+    # sigma that produced the maximum intensity value, into the sigma
+    sigmas_of_peaks = sigma_list[local_maxima[:, -1]]
+
+    if scalar_sigma:
+        # select one sigma column, keeping dimension
+        sigmas_of_peaks = sigmas_of_peaks[:, 0:1]
+
+    # Remove sigma index and replace with sigmas
+    lm = np.hstack([lm[:, :-1], sigmas_of_peaks])
+
+    return _prune_blobs(lm, overlap)
@@ -66,6 +66,19 @@ class StarfishConfig(object):
         Whether or not loaded json should be validated.
     verbose : bool
         Controls output like from tqdm
+    profile_tiles : bool
+        Whether the timing of each tile processed by an algorithm is stored in the log of the
+        objects it produces
+    memoization : dictionary
+        Whether the results of algorithm runs are cached on disk (see
+        :py:mod:`starfish.pipeline.memoization`), where, and the size limit of the cache in bytes.
+    tile_cache : dictionary
+        The size limit, in bytes, of the in-memory cache of decoded tiles, and the directory and
+        size limit of its optional on-disk counterpart (see
+        :py:mod:`starfish.imagestack.parser.tileset._cache`).
+    experiment_index : dictionary
+        Whether the indexes of parsed experiments used by indirect command line inputs are stored
+        on disk (see :py:mod:`starfish.experiment.index`), and where.
 
     Examples
     --------
@@ -86,6 +99,23 @@ class StarfishConfig(object):
         >>>             "size_limit": 5e9
         >>>         },
         >>>     },
+        >>>     "experiment_index": {
+        >>>         "directory": "~/.starfish/experiment_index",
+        >>>         "enabled": true
+        >>>     },
+        >>>     "memoization": {
+        >>>         "directory": "~/.starfish/memoization",
+        >>>         "enabled": false,
+        >>>         "size_limit": 5e9
+        >>>     },
+        >>>     "profiling": {
+        >>>         "tiles": false
+        >>>     },
+        >>>     "tile_cache": {
+        >>>         "directory": null,
+        >>>         "disk_size_limit": 5e9,
+        >>>         "size_limit": 0
+        >>>     },
         >>>     "validation": {
         >>>         "strict": false
         >>>     },
@@ -116,6 +146,15 @@ class StarfishConfig(object):
 
              - ["slicedimage"]["caching"]["directory"]   (default: ~/.starfish/cache)
              - ["slicedimage"]["caching"]["size_limit"]  (default: None; 0 disables caching)
+             - ["experiment_index"]["enabled"]           (default: True)
+             - ["experiment_index"]["directory"]         (default: ~/.starfish/experiment_index)
+             - ["memoization"]["enabled"]                (default: False)
+             - ["memoization"]["directory"]              (default: ~/.starfish/memoization)
+             - ["memoization"]["size_limit"]             (default: 5e9)
+             - ["profiling"]["tiles"]                    (default: False)
+             - ["tile_cache"]["size_limit"]              (default: 0; caching is disabled)
+             - ["tile_cache"]["directory"]               (default: None; no on-disk cache)
+             - ["tile_cache"]["disk_size_limit"]         (default: 5e9)
              - ["validation"]["strict"]                  (default: False)
              - ["verbose"]                               (default: True)
 
@@ -141,6 +180,47 @@ class StarfishConfig(object):
         self._verbose = self._config_obj.lookup(
             ("verbose",), self.flag("STARFISH_VERBOSE", "true"), remove=True)
 
+        self._memoization = {
+            "enabled": self._config_obj.lookup(
+                ("memoization", "enabled"),
+                self.flag("STARFISH_MEMOIZATION_ENABLED", "false"), remove=True),
+            "directory": os.path.expanduser(self._config_obj.lookup(
+                ("memoization", "directory"),
+                self.value("STARFISH_MEMOIZATION_DIRECTORY", "~/.starfish/memoization"),
+                remove=True)),
+            "size_limit": int(float(self._config_obj.lookup(
+                ("memoization", "size_limit"),
+                self.value("STARFISH_MEMOIZATION_SIZE_LIMIT", 5e9), remove=True))),
+        }
+
+        # looked up as a whole, so that a size limit of 0 in the config file disables the cache.
+        tile_cache = self._config_obj.lookup(("tile_cache",), {}, remove=True)
+        tile_cache_directory = self._section_value(
+            tile_cache, "directory", self.value("STARFISH_TILE_CACHE_DIRECTORY"))
+        self._tile_cache = {
+            "size_limit": int(float(self._section_value(
+                tile_cache, "size_limit", self.value("STARFISH_TILE_CACHE_SIZE_LIMIT", 0)))),
+            "directory": (
+                os.path.expanduser(tile_cache_directory) if tile_cache_directory else None),
+            "disk_size_limit": int(float(self._section_value(
+                tile_cache, "disk_size_limit",
+                self.value("STARFISH_TILE_CACHE_DISK_SIZE_LIMIT", 5e9)))),
+        }
+
+        experiment_index = self._config_obj.lookup(("experiment_index",), {}, remove=True)
+        self._experiment_index = {
+            "enabled": self._section_value(
+                experiment_index, "enabled",
+                self.flag("STARFISH_EXPERIMENT_INDEX_ENABLED", "true")),
+            "directory": os.path.expanduser(self._section_value(
+                experiment_index, "directory",
+                self.value(
+                    "STARFISH_EXPERIMENT_INDEX_DIRECTORY", "~/.starfish/experiment_index"))),
+        }
+
+        self._profile_tiles = self._config_obj.lookup(
+            ("profiling", "tiles"), self.flag("STARFISH_PROFILING_TILES", "false"), remove=True)
+
         if self._config_obj.data:
             warnings.warn(f"unknown configuration: {self._config_obj.data}")
         if self._env_keys:
@@ -183,6 +263,20 @@ class StarfishConfig(object):
             value = value.lower()
             return value in ("true", "1", "yes", "y", "on", "active", "enabled")
 
+    @staticmethod
+    def _section_value(section, key, env_value):
+        """Return the value of a key of a config section, which may be false, or if it is not set,
+        the value from the environment."""
+        value = section.get(key)
+        return env_value if value is None else value
+
+    def value(self, name, default_value=None):
+
+        if name in os.environ:
+            self._env_keys.remove(name)
+            return os.environ[name]
+        return default_value
+
     @property
     def slicedimage(self):
         return dict(self._slicedimage)
@@ -194,3 +288,19 @@ class StarfishConfig(object):
     @property
     def verbose(self):
         return self._verbose
+
+    @property
+    def memoization(self):
+        return dict(self._memoization)
+
+    @property
+    def tile_cache(self):
+        return dict(self._tile_cache)
+
+    @property
+    def experiment_index(self):
+        return dict(self._experiment_index)
+
+    @property
+    def profile_tiles(self):
+        return self._profile_tiles
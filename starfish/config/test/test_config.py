@@ -187,6 +187,36 @@ def test_starfish_config(tmpdir, monkeypatch):
                  STARFISH_VALIDATION_STRICT="false")
     assert not StarfishConfig().strict
 
+def test_starfish_tile_cache_config(tmpdir, monkeypatch):
+    setup_config({}, tmpdir, monkeypatch,
+                 STARFISH_TILE_CACHE_SIZE_LIMIT=None,
+                 STARFISH_TILE_CACHE_DIRECTORY=None,
+                 STARFISH_TILE_CACHE_DISK_SIZE_LIMIT=None)
+    assert StarfishConfig().tile_cache == {
+        "size_limit": 0, "directory": None, "disk_size_limit": int(5e9)}
+
+    config = {"tile_cache": {"size_limit": 1e9, "directory": "~/tiles"}}
+    setup_config(config, tmpdir, monkeypatch,
+                 STARFISH_TILE_CACHE_DISK_SIZE_LIMIT="2e6")
+    tile_cache = StarfishConfig().tile_cache
+    assert tile_cache["size_limit"] == int(1e9)
+    assert tile_cache["directory"] == os.path.expanduser("~/tiles")
+    assert tile_cache["disk_size_limit"] == int(2e6)
+
+def test_starfish_experiment_index_config(tmpdir, monkeypatch):
+    setup_config({}, tmpdir, monkeypatch,
+                 STARFISH_EXPERIMENT_INDEX_ENABLED=None,
+                 STARFISH_EXPERIMENT_INDEX_DIRECTORY=None)
+    assert StarfishConfig().experiment_index == {
+        "enabled": True,
+        "directory": os.path.expanduser("~/.starfish/experiment_index"),
+    }
+
+    config = {"experiment_index": {"enabled": False}}
+    setup_config(config, tmpdir, monkeypatch,
+                 STARFISH_EXPERIMENT_INDEX_DIRECTORY="/tmp/index")
+    assert StarfishConfig().experiment_index == {"enabled": False, "directory": "/tmp/index"}
+
 def test_starfish_warn(tmpdir, monkeypatch):
     config = {"unknown": True}
     setup_config(config, tmpdir, monkeypatch,
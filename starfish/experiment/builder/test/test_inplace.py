@@ -5,8 +5,9 @@ from pathlib import Path
 from typing import cast, Mapping, Tuple, Union
 
 import numpy as np
+import pytest
 from skimage.io import imread, imsave
-from slicedimage import ImageFormat
+from slicedimage import ImageFormat, Tile
 
 from starfish.experiment.builder import FetchedTile, TileFetcher, write_experiment_json
 from starfish.experiment.builder.inplace import (
@@ -19,6 +20,15 @@ from starfish.types import Axes, Coordinates, Number
 SHAPE = {Axes.Y: 500, Axes.X: 1390}
 
 
+@pytest.fixture(autouse=True)
+def restore_tile_sha256():
+    """enable_inplace_mode() replaces Tile.sha256 for the whole process.  Remove the replacement
+    after each test so that tiles written by other tests are checksummed again."""
+    yield
+    if "sha256" in Tile.__dict__:
+        del Tile.sha256
+
+
 class InplaceTile(InplaceFetchedTile):
     def __init__(self, file_path: Path):
         self.file_path = file_path
@@ -0,0 +1,328 @@
+"""
+Runs a per-FOV pipeline across the fields of view of an experiment concurrently.
+
+The pipeline is any callable that accepts a :py:class:`~starfish.experiment.experiment.FieldOfView`
+and returns the results for that field of view.  Fields of view are processed by a pool of threads
+or, for pipelines dominated by code that holds the GIL, a pool of processes.  Fields of view are
+only started when the estimated memory of the fields of view that are in flight fits within a
+memory budget, so the number of fields of view that are loaded at once is bounded regardless of
+the size of the experiment.
+
+Results are yielded as each field of view completes, so the images of a field of view can be
+released as soon as it is done.  :py:class:`ExperimentResults` merges the IntensityTables into one
+as they arrive, and keeps the label images, so the other results of a field of view are released
+too unless they are explicitly kept.
+
+Examples
+--------
+Decode every field of view of an experiment with 8 worker processes::
+
+    >>> def process_fov(fov):
+    ...     primary = fov.get_image(FieldOfView.PRIMARY_IMAGES)
+    ...     ...
+    ...     return decoded_intensities, label_image
+    >>> results = experiment.run_pipeline(process_fov, n_workers=8, processes=True)
+    >>> results.intensity_table()
+"""
+import os
+from concurrent.futures import (
+    Executor,
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    MutableMapping,
+    Optional,
+    Sequence,
+    Tuple,
+    TYPE_CHECKING,
+)
+
+import numpy as np
+
+from starfish.intensity_table.concatenate import IntensityTableBuilder
+from starfish.intensity_table.intensity_table import IntensityTable
+from starfish.types import Axes
+
+if TYPE_CHECKING:
+    from .experiment import Experiment, FieldOfView
+
+WORKING_SET_FACTOR = 4
+"""The default estimate of the peak memory of a pipeline, as a multiple of the size of the images
+of the field of view as float32 ImageStacks.  Pipelines typically hold a few filtered copies of the
+primary images at once."""
+
+
+def estimate_fov_memory(
+        fov: "FieldOfView",
+        working_set_factor: float=WORKING_SET_FACTOR,
+        image_types: Optional[Iterable[str]]=None,
+) -> int:
+    """Estimate the peak memory, in bytes, of running a pipeline on a field of view from the size
+    of its images.  If image_types is provided, only those images are counted."""
+    n_bytes = 0
+    if image_types is None:
+        image_types = fov.image_types
+    for image_type in image_types:
+        tileset = fov._images[image_type]
+        n_tiles = 1
+        for axis in (Axes.ROUND, Axes.CH, Axes.ZPLANE):
+            n_tiles *= tileset.shape.get(axis, 1)
+        height, width = tileset.default_tile_shape[Axes.Y], tileset.default_tile_shape[Axes.X]
+        n_bytes += n_tiles * height * width * np.dtype(np.float32).itemsize
+    return int(n_bytes * working_set_factor)
+
+
+# In worker processes, the experiment that fields of view are loaded from, keyed by its url.
+_worker_experiment: Optional[Tuple[str, "Experiment"]] = None
+
+
+def _run_in_worker_process(json_url: str, fov_name: str, pipeline: Callable) -> Any:
+    """Run the pipeline on a field of view in a worker process.  Fields of view cannot be pickled,
+    so each worker process loads the experiment once and looks up the field of view by name."""
+    global _worker_experiment
+    from .experiment import Experiment
+
+    experiment: Experiment
+    if _worker_experiment is not None and _worker_experiment[0] == json_url:
+        experiment = _worker_experiment[1]
+    else:
+        experiment = Experiment.from_json(json_url)
+        _worker_experiment = (json_url, experiment)
+    return pipeline(experiment[fov_name])
+
+
+class FovExecutor:
+    """
+    Runs a pipeline on many fields of view at once.
+
+    Parameters
+    ----------
+    n_workers : Optional[int]
+        Maximum number of fields of view processed at once.  If None, this is the number of CPUs.
+    processes : bool
+        If True, fields of view are processed in worker processes rather than threads.  The
+        pipeline must then be picklable (e.g., a module-level function), and the experiment must be
+        loaded with :py:meth:`~starfish.experiment.experiment.Experiment.from_json`, as each worker
+        process loads the experiment itself.
+    memory_budget : Optional[int]
+        Maximum estimated memory, in bytes, of the fields of view in flight.  A field of view is
+        always started if no other field of view is in flight, even if it exceeds the budget.  If
+        None, only n_workers bounds the number of fields of view in flight.
+    fov_memory : Optional[Callable[[FieldOfView], int]]
+        Estimates the peak memory, in bytes, of running the pipeline on a field of view.  Defaults
+        to :py:func:`estimate_fov_memory`.
+    """
+    def __init__(
+            self,
+            n_workers: Optional[int]=None,
+            processes: bool=False,
+            memory_budget: Optional[int]=None,
+            fov_memory: Optional[Callable[["FieldOfView"], int]]=None,
+    ) -> None:
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.processes = processes
+        self.memory_budget = memory_budget
+        self.fov_memory = fov_memory or estimate_fov_memory
+
+    def _executor(self) -> Executor:
+        if self.processes:
+            return ProcessPoolExecutor(max_workers=self.n_workers)
+        return ThreadPoolExecutor(max_workers=self.n_workers)
+
+    def imap(
+            self,
+            experiment: "Experiment",
+            pipeline: Callable[["FieldOfView"], Any],
+            fovs: Optional[Sequence["FieldOfView"]]=None,
+    ) -> Iterator[Tuple[str, Any]]:
+        """
+        Run a pipeline on the fields of view of an experiment, yielding (fov name, result) as each
+        field of view completes.  If the pipeline raises an exception for any field of view, no
+        more fields of view are started, and the exception is raised once the fields of view in
+        flight complete.
+
+        Parameters
+        ----------
+        experiment : Experiment
+            The experiment to process.
+        pipeline : Callable[[FieldOfView], Any]
+            Called with each field of view.
+        fovs : Optional[Sequence[FieldOfView]]
+            The fields of view to process.  If None, all the fields of view of the experiment are
+            processed.
+        """
+        if fovs is None:
+            fovs = experiment.fovs()
+        # the callable and arguments that process a field of view.
+        fov_task: Callable[["FieldOfView"], Tuple[Callable, Sequence[Any]]]
+        if self.processes:
+            json_url = experiment.json_url
+            if json_url is None:
+                raise ValueError(
+                    "experiments must be loaded with Experiment.from_json to be processed in "
+                    "worker processes")
+            fov_task = lambda fov: (_run_in_worker_process, (json_url, fov.name, pipeline))
+        else:
+            fov_task = lambda fov: (pipeline, (fov,))
+
+        pending = list(reversed(fovs))
+        in_flight: MutableMapping[Future, Tuple[str, int]] = dict()
+        in_flight_memory = 0
+        with self._executor() as executor:
+            try:
+                while pending or in_flight:
+                    # start as many fields of view as the worker count and memory budget allow.
+                    while pending and len(in_flight) < self.n_workers:
+                        memory = self.fov_memory(pending[-1])
+                        if (self.memory_budget is not None
+                                and len(in_flight) > 0
+                                and in_flight_memory + memory > self.memory_budget):
+                            break
+                        fov = pending.pop()
+                        func, args = fov_task(fov)
+                        future = executor.submit(func, *args)
+                        in_flight[future] = (fov.name, memory)
+                        in_flight_memory += memory
+
+                    done, _ = wait(in_flight.keys(), return_when=FIRST_COMPLETED)
+                    for future in done:
+                        fov_name, memory = in_flight.pop(future)
+                        in_flight_memory -= memory
+                        yield fov_name, future.result()
+            finally:
+                # do not start any more fields of view if a pipeline failed or the caller stopped
+                # iterating.
+                for future in in_flight:
+                    future.cancel()
+
+    def run(
+            self,
+            experiment: "Experiment",
+            pipeline: Callable[["FieldOfView"], Any],
+            fovs: Optional[Sequence["FieldOfView"]]=None,
+            keep_results: bool=False,
+            intensity_memory_limit: Optional[int]=None,
+    ) -> "ExperimentResults":
+        """Run a pipeline on the fields of view of an experiment, and merge the results (see
+        :py:meth:`imap` and :py:class:`ExperimentResults`)."""
+        if fovs is None:
+            fovs = experiment.fovs()
+        results = ExperimentResults(
+            fov_names=[fov.name for fov in fovs],
+            keep_results=keep_results,
+            intensity_memory_limit=intensity_memory_limit,
+        )
+        for fov_name, result in self.imap(experiment, pipeline, fovs):
+            results.add(fov_name, result)
+        return results
+
+
+class ExperimentResults:
+    """
+    Merges the results of running a pipeline on each field of view of an experiment.
+
+    The result of each field of view may be an IntensityTable, a label image (np.ndarray), any
+    other value, or a tuple of these.  IntensityTables are added to an
+    :py:class:`~starfish.intensity_table.concatenate.IntensityTableBuilder` as they arrive, so the
+    peak memory of merging them does not grow with the number of fields of view, and label images
+    are kept per field of view.  The whole results are only kept if keep_results is True.
+
+    Parameters
+    ----------
+    fov_names : Optional[Sequence[str]]
+        The names of the fields of view in the order that their IntensityTables are concatenated.
+        The tables of a field of view that completes before those preceding it are held until
+        they complete.  If None, tables are concatenated in the order they are added.
+    keep_results : bool
+        If True, the whole result of each field of view is kept in :py:attr:`results`.
+    intensity_memory_limit : Optional[int]
+        If the concatenated intensities exceed this many bytes, they are stored in a memory-mapped
+        file.  See :py:class:`~starfish.intensity_table.concatenate.IntensityTableBuilder`.
+
+    Attributes
+    ----------
+    results : Mapping[str, Any]
+        If keep_results is True, the result of each field of view, by fov name, in the order they
+        completed.  Otherwise, this is empty.
+    label_images : Mapping[str, np.ndarray]
+        The label images returned for each field of view, by fov name.
+    """
+    def __init__(
+            self,
+            fov_names: Optional[Sequence[str]]=None,
+            keep_results: bool=False,
+            intensity_memory_limit: Optional[int]=None,
+    ) -> None:
+        self.keep_results = keep_results
+        self.results: MutableMapping[str, Any] = dict()
+        self.label_images: MutableMapping[str, np.ndarray] = dict()
+        self._fov_names = list(fov_names) if fov_names is not None else None
+        self._n_fovs = 0
+        self._n_merged = 0
+        self._n_tables = 0
+        self._pending_tables: MutableMapping[str, Sequence[IntensityTable]] = dict()
+        self._builder = IntensityTableBuilder(memory_limit=intensity_memory_limit)
+
+    def add(self, fov_name: str, result: Any) -> None:
+        """Add the result of a field of view."""
+        values: Tuple[Any, ...]
+        if isinstance(result, tuple):
+            values = result
+        else:
+            values = (result,)
+        if self.keep_results:
+            self.results[fov_name] = result
+        self._n_fovs += 1
+        intensity_tables = []
+        for value in values:
+            if isinstance(value, IntensityTable):
+                intensity_tables.append(value)
+            elif isinstance(value, np.ndarray):
+                self.label_images[fov_name] = value
+
+        if self._fov_names is None:
+            self._merge(intensity_tables)
+            return
+        self._pending_tables[fov_name] = intensity_tables
+        while (self._n_merged < len(self._fov_names)
+               and self._fov_names[self._n_merged] in self._pending_tables):
+            self._merge(self._pending_tables.pop(self._fov_names[self._n_merged]))
+            self._n_merged += 1
+
+    def _merge(self, intensity_tables: Sequence[IntensityTable]) -> None:
+        for intensity_table in intensity_tables:
+            self._builder.add(intensity_table)
+            self._n_tables += 1
+
+    def intensity_table(self) -> IntensityTable:
+        """
+        Return the concatenation of the IntensityTables of all the fields of view, in the order of
+        fov_names.  The tables of fields of view that are not in fov_names, or that were held for a
+        field of view that never completed, follow in the order of fov_names, then as added.
+        """
+        if self._fov_names is not None:
+            positions = {fov_name: position for position, fov_name in enumerate(self._fov_names)}
+            for fov_name in sorted(
+                    self._pending_tables, key=lambda name: positions.get(name, len(positions))):
+                self._merge(self._pending_tables.pop(fov_name))
+        if self._n_tables == 0:
+            raise ValueError("no field of view returned an IntensityTable")
+        return self._builder.build()
+
+    def __getitem__(self, fov_name: str) -> Any:
+        return self.results[fov_name]
+
+    def __len__(self) -> int:
+        """Number of fields of view whose results were added."""
+        return self._n_fovs
+
+    def items(self) -> Iterable[Tuple[str, Any]]:
+        return self.results.items()
@@ -1,23 +1,26 @@
 import copy
 import json
 import pprint
+from concurrent.futures import Executor, Future
 from typing import (
+    Any,
     Callable,
-    Dict,
+    Iterable,
     Iterator,
     List,
+    Mapping,
     MutableMapping,
     MutableSequence,
-    MutableSet,
     Optional,
     Sequence,
     Set,
+    Tuple,
     Union
 )
 
 from semantic_version import Version
-from slicedimage import Collection, TileSet
-from slicedimage.io import Reader, resolve_path_or_url, resolve_url
+from slicedimage import TileSet
+from slicedimage.io import resolve_path_or_url, resolve_url
 from slicedimage.urlpath import pathjoin
 
 from starfish.codebook.codebook import Codebook
@@ -25,9 +28,33 @@ from starfish.config import StarfishConfig
 from starfish.imagestack.imagestack import ImageStack
 from starfish.imagestack.parser.crop import CropParameters
 from starfish.spacetx_format import validate_sptx
+from .executor import ExperimentResults, FovExecutor
+from .manifest import FovManifest, FovTileSets
+from .prefetch import prefetch_fovs
 from .version import MAX_SUPPORTED_VERSION, MIN_SUPPORTED_VERSION
 
 
+class _AlignedCoordinateGroups(Mapping[str, List[CropParameters]]):
+    """The aligned coordinate groups of the tilesets of a field of view, by image type, found the
+    first time they are requested."""
+    def __init__(self, image_tilesets: Mapping[str, TileSet]) -> None:
+        self._image_tilesets = image_tilesets
+        self._groups: MutableMapping[str, List[CropParameters]] = dict()
+
+    def __getitem__(self, image_type: str) -> List[CropParameters]:
+        groups = self._groups.get(image_type)
+        if groups is None:
+            groups = CropParameters.parse_coordinate_groups(self._image_tilesets[image_type])
+            self._groups[image_type] = groups
+        return groups
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._image_tilesets)
+
+    def __len__(self) -> int:
+        return len(self._image_tilesets)
+
+
 class FieldOfView:
     """
     This encapsulates a field of view.  It contains the primary image and auxiliary images that are
@@ -51,7 +78,7 @@ class FieldOfView:
 
     def __init__(
             self, name: str,
-            image_tilesets: MutableMapping[str, TileSet]
+            image_tilesets: Mapping[str, TileSet]
     ) -> None:
         """
         Fields of views can obtain their primary image from either an ImageStack or a TileSet (but
@@ -62,13 +89,18 @@ class FieldOfView:
         Note that if the source image is from a TileSet, the decoding of TileSet to ImageStack does
         not happen until the image is accessed.  Be prepared to handle errors when images are
         accessed.
+
+        The aligned coordinate groups of each tileset are found the first time they are needed, and
+        image_tilesets may itself parse the tilesets on first access (see
+        :py:mod:`starfish.experiment.manifest`), so constructing a field of view is cheap.
         """
-        self._images: MutableMapping[str, TileSet] = dict()
         self._name = name
-        self.aligned_coordinate_groups: Dict[str, List[CropParameters]] = dict()
-        for name, tileset in image_tilesets.items():
-            self.aligned_coordinate_groups[name] = CropParameters.parse_coordinate_groups(tileset)
-        self._images = image_tilesets
+        # images being loaded in the background, by image type and aligned group (see
+        # starfish.experiment.prefetch).
+        self._prefetched: MutableMapping[Tuple[str, int], Future] = dict()
+        self.aligned_coordinate_groups: Mapping[str, List[CropParameters]] = \
+            _AlignedCoordinateGroups(image_tilesets)
+        self._images: Mapping[str, TileSet] = image_tilesets
 
     def __repr__(self):
         images = '\n    '.join(
@@ -144,11 +176,41 @@ class FieldOfView:
         -------
         The instantiated ImageStack
         """
+        if x_slice is None and y_slice is None:
+            prefetched = self._prefetched.pop((item, aligned_group), None)
+            if prefetched is not None:
+                return prefetched.result()
+        return self._load_image(item, aligned_group, x_slice, y_slice)
+
+    def _load_image(
+            self,
+            item: str,
+            aligned_group: int = 0,
+            x_slice: Optional[Union[int, slice]] = None,
+            y_slice: Optional[Union[int, slice]] = None,
+    ) -> ImageStack:
         crop_params = copy.copy((self.aligned_coordinate_groups[item][aligned_group]))
         crop_params._x_slice = x_slice
         crop_params._y_slice = y_slice
         return ImageStack.from_tileset(self._images[item], crop_parameters=crop_params)
 
+    def _prefetch(self, executor: Executor, image_types: Optional[Iterable[str]]=None) -> None:
+        """Start loading every aligned group of the given image types (or of all the image types)
+        with an executor.  Each loaded image is returned by the next call to get_image for it."""
+        if image_types is None:
+            image_types = self.image_types
+        for image_type in image_types:
+            for aligned_group in range(len(self.aligned_coordinate_groups[image_type])):
+                if (image_type, aligned_group) not in self._prefetched:
+                    self._prefetched[image_type, aligned_group] = executor.submit(
+                        self._load_image, image_type, aligned_group)
+
+    def _discard_prefetched(self) -> None:
+        """Discard the images that were prefetched but not requested."""
+        for future in self._prefetched.values():
+            future.cancel()
+        self._prefetched.clear()
+
 
 class Experiment:
     """
@@ -169,6 +231,10 @@ class Experiment:
         passed the FOV.
     fovs_by_name()
         Given one or more FOV names, return the FOVs that match those names.
+    iterate_fovs()
+        Iterate over the FOVs, optionally loading the images of the next FOVs in the background.
+    run_pipeline()
+        Given a callable that accepts a FOV, run it on the FOVs concurrently and merge the results.
 
     Attributes
     ----------
@@ -176,6 +242,8 @@ class Experiment:
         Returns the codebook associated with this experiment.
     extras : Dict
         Returns the extras dictionary associated with this experiment.
+    json_url : Optional[str]
+        The url of the experiment.json document this experiment was loaded from, if any.
     """
     def __init__(
             self,
@@ -184,11 +252,14 @@ class Experiment:
             extras: dict,
             *,
             src_doc: dict=None,
+            json_url: Optional[str]=None,
     ) -> None:
         self._fovs = fovs
+        self._fovs_by_name: Mapping[str, FieldOfView] = {fov.name: fov for fov in fovs}
         self._codebook = codebook
         self._extras = extras
         self._src_doc = src_doc
+        self.json_url = json_url
 
     def __repr__(self):
 
@@ -238,55 +309,61 @@ class Experiment:
         with backend.read_contextmanager(name) as fh:
             experiment_document = json.load(fh)
 
-        version = cls.verify_version(experiment_document['version'])
+        cls.verify_version(experiment_document['version'])
 
-        _, codebook_name, codebook_baseurl = resolve_url(experiment_document['codebook'],
-                                                         baseurl, config.slicedimage)
-        codebook_absolute_url = pathjoin(codebook_baseurl, codebook_name)
-        codebook = Codebook.from_json(codebook_absolute_url)
+        codebook = Codebook.from_json(
+            cls._codebook_url(experiment_document, baseurl, config.slicedimage))
 
         extras = experiment_document['extras']
 
-        fovs: MutableSequence[FieldOfView] = list()
-        fov_tilesets: MutableMapping[str, TileSet]
+        # only the manifests are read here.  The tileset of each field of view is parsed the first
+        # time its images are requested.
+        manifests, fov_names = cls._fov_manifests(
+            experiment_document, baseurl, config.slicedimage)
+        fovs: MutableSequence[FieldOfView] = [
+            FieldOfView(
+                fov_name,
+                image_tilesets=FovTileSets.from_manifests(
+                    fov_name, manifests, config.slicedimage),
+            )
+            for fov_name in fov_names
+        ]
+
+        return Experiment(fovs, codebook, extras, src_doc=experiment_document, json_url=json_url)
+
+    @staticmethod
+    def _codebook_url(experiment_document: dict, baseurl: str, backend_config: dict) -> str:
+        """Return the absolute url of the codebook of an experiment.json document."""
+        _, codebook_name, codebook_baseurl = resolve_url(
+            experiment_document['codebook'], baseurl, backend_config)
+        return pathjoin(codebook_baseurl, codebook_name)
+
+    @classmethod
+    def _fov_manifests(
+            cls,
+            experiment_document: dict,
+            baseurl: str,
+            backend_config: dict,
+    ) -> Tuple[Mapping[str, FovManifest], Sequence[str]]:
+        """Read the manifest of each image type of an experiment.json document, and return them
+        with the names of the experiment's fields of view."""
+        version = cls.verify_version(experiment_document['version'])
+        manifests: MutableMapping[str, FovManifest] = dict()
         if version < Version("5.0.0"):
-            primary_image: Collection = Reader.parse_doc(experiment_document['primary_images'],
-                                                         baseurl, config.slicedimage)
-            auxiliary_images: MutableMapping[str, Collection] = dict()
+            manifests[FieldOfView.PRIMARY_IMAGES] = FovManifest(
+                experiment_document['primary_images'], baseurl, backend_config)
             for aux_image_type, aux_image_url in experiment_document['auxiliary_images'].items():
-                auxiliary_images[aux_image_type] = Reader.parse_doc(
-                    aux_image_url, baseurl, config.slicedimage)
-
-            for fov_name, primary_tileset in primary_image.all_tilesets():
-                fov_tilesets = dict()
-                fov_tilesets[FieldOfView.PRIMARY_IMAGES] = primary_tileset
-                for aux_image_type, aux_image_collection in auxiliary_images.items():
-                    aux_image_tileset = aux_image_collection.find_tileset(fov_name)
-                    if aux_image_tileset is not None:
-                        fov_tilesets[aux_image_type] = aux_image_tileset
-
-                fov = FieldOfView(fov_name, image_tilesets=fov_tilesets)
-                fovs.append(fov)
+                manifests[aux_image_type] = FovManifest(aux_image_url, baseurl, backend_config)
+            fov_names = list(manifests[FieldOfView.PRIMARY_IMAGES].fov_names())
         else:
-            images: MutableMapping[str, Collection] = dict()
-            all_fov_names: MutableSet[str] = set()
             for image_type, image_url in experiment_document['images'].items():
-                image = Reader.parse_doc(image_url, baseurl, config.slicedimage)
-                images[image_type] = image
-                for fov_name, _ in image.all_tilesets():
-                    all_fov_names.add(fov_name)
-
-            for fov_name in all_fov_names:
-                fov_tilesets = dict()
-                for image_type, image_collection in images.items():
-                    image_tileset = image_collection.find_tileset(fov_name)
-                    if image_tileset is not None:
-                        fov_tilesets[image_type] = image_tileset
-
-                fov = FieldOfView(fov_name, image_tilesets=fov_tilesets)
-                fovs.append(fov)
-
-        return Experiment(fovs, codebook, extras, src_doc=experiment_document)
+                manifests[image_type] = FovManifest(image_url, baseurl, backend_config)
+            fov_names = list(dict.fromkeys(
+                fov_name
+                for manifest in manifests.values()
+                for fov_name in manifest.fov_names()
+            ))
+        return manifests, fov_names
 
     @classmethod
     def verify_version(cls, semantic_version_str: str) -> Version:
@@ -334,6 +411,41 @@ class Experiment:
         results = sorted(results, key=key_fn)
         return results
 
+    def iterate_fovs(
+            self,
+            filter_fn: Callable[[FieldOfView], bool]=lambda _: True,
+            key_fn: Callable[[FieldOfView], str]=lambda fov: fov.name,
+            *,
+            prefetch: int=0,
+            image_types: Optional[Sequence[str]]=None,
+            memory_cap: Optional[int]=None,
+    ) -> Iterator[FieldOfView]:
+        """
+        Iterate over the FOVs returned by :py:meth:`fovs`.  If prefetch is greater than 0, the
+        images of the next prefetch FOVs are loaded in background threads while the current FOV is
+        processed, and are returned by :py:meth:`FieldOfView.get_image` without waiting for them
+        to be read.  See :py:mod:`starfish.experiment.prefetch` for details.
+
+        Parameters
+        ----------
+        filter_fn : Callable[[FieldOfView], bool]
+            Selects the FOVs to iterate over.
+        key_fn : Callable[[FieldOfView], str]
+            Determines the order of the FOVs.
+        prefetch : int
+            Number of FOVs ahead of the current one whose images are loaded in the background.
+        image_types : Optional[Sequence[str]]
+            The image types to prefetch.  If None, all the image types are prefetched.
+        memory_cap : Optional[int]
+            Maximum size, in bytes, of the prefetched images waiting to be used.
+        """
+        return prefetch_fovs(
+            self.fovs(filter_fn=filter_fn, key_fn=key_fn),
+            prefetch,
+            image_types=image_types,
+            memory_cap=memory_cap,
+        )
+
     def fovs_by_name(
         self,
         *names,
@@ -344,13 +456,68 @@ class Experiment:
         FOVs such that filter_fn(FOV) returns True.  The returned list is sorted based on the key_fn
         callable, which by default matches the order of fov.name.
         """
-        return self.fovs(filter_fn=lambda fov: fov.name in names)
+        return sorted(
+            (self._fovs_by_name[name] for name in set(names) if name in self._fovs_by_name),
+            key=key_fn)
+
+    def run_pipeline(
+            self,
+            pipeline: Callable[[FieldOfView], Any],
+            filter_fn: Callable[[FieldOfView], bool]=lambda _: True,
+            *,
+            n_workers: Optional[int]=None,
+            processes: bool=False,
+            memory_budget: Optional[int]=None,
+            keep_results: bool=False,
+            intensity_memory_limit: Optional[int]=None,
+    ) -> ExperimentResults:
+        """
+        Run a pipeline on every FOV such that filter_fn(FOV) returns True, processing up to
+        n_workers FOVs at once, and merge the IntensityTables and label images that it returns.
+        See :py:mod:`starfish.experiment.executor` for details.
+
+        Parameters
+        ----------
+        pipeline : Callable[[FieldOfView], Any]
+            Called with each FOV.  It may return an IntensityTable, a label image, or a tuple of
+            these and any other values.
+        filter_fn : Callable[[FieldOfView], bool]
+            Selects the FOVs to process.
+        n_workers : Optional[int]
+            Maximum number of FOVs processed at once.  If None, this is the number of CPUs.
+        processes : bool
+            If True, FOVs are processed in worker processes rather than threads.  The pipeline must
+            then be picklable, and this experiment must have been loaded with :py:meth:`from_json`.
+        memory_budget : Optional[int]
+            Maximum estimated memory, in bytes, of the FOVs being processed at once.
+        keep_results : bool
+            If True, the whole result of each FOV is kept.  Otherwise, only the merged
+            IntensityTable and the label images are.
+        intensity_memory_limit : Optional[int]
+            If the merged intensities exceed this many bytes, they are stored in a memory-mapped
+            file.
+
+        Returns
+        -------
+        ExperimentResults :
+            The merged IntensityTables and label images of the FOVs, and, if keep_results is True,
+            the results of each FOV.
+        """
+        executor = FovExecutor(
+            n_workers=n_workers, processes=processes, memory_budget=memory_budget)
+        return executor.run(
+            self,
+            pipeline,
+            self.fovs(filter_fn=filter_fn),
+            keep_results=keep_results,
+            intensity_memory_limit=intensity_memory_limit,
+        )
 
     def __getitem__(self, item):
-        fovs = self.fovs_by_name(item)
-        if len(fovs) == 0:
+        fov = self._fovs_by_name.get(item)
+        if fov is None:
             raise IndexError(f"No field of view with name \"{item}\"")
-        return fovs[0]
+        return fov
 
     def keys(self):
         return (fov.name for fov in self.fovs())
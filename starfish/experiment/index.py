@@ -0,0 +1,243 @@
+"""
+Persisted indexes of parsed experiments.
+
+Command line inputs such as ``@experiment.json[fov_001][primary]`` (see
+:py:mod:`starfish.util.indirectfile`) name a single field of view of an experiment, but loading it
+with :py:meth:`~starfish.experiment.experiment.Experiment.from_json` reads the manifest of every
+image type and parses the codebook.  A workflow that runs one task per field of view does this
+once per task.
+
+An :py:class:`ExperimentIndex` records what is needed to load any single field of view: the
+location of the tileset document of each field of view and image type, the codebook's array, and
+the experiment's extras.  It is stored as a JSON document in the directory configured by
+:py:class:`starfish.config.StarfishConfig` (["experiment_index"]), keyed by the url of the
+experiment.json document, and is rebuilt when it is no longer valid, i.e., when:
+
+- the experiment.json document, which is always read, has changed,
+- the manifests or the codebook, if they are local files, have been modified,
+- it was built without validating the experiment, and validation is now strict, or
+- it was written with a different version of the index format.
+
+Manifests and codebooks that are not local files are assumed not to change unless the
+experiment.json document does.
+"""
+import hashlib
+import json
+import os
+import threading
+import urllib.parse
+import urllib.request
+import warnings
+from typing import Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+from slicedimage.io import resolve_path_or_url
+from slicedimage.urlpath import pathjoin
+
+from starfish.codebook.codebook import Codebook
+from starfish.config import StarfishConfig
+from starfish.spacetx_format import validate_sptx
+from .experiment import Experiment, FieldOfView
+from .manifest import FovTileSets
+
+INDEX_FORMAT_VERSION = 1
+"""The version of the format of stored indexes.  Indexes of other versions are rebuilt."""
+
+
+def _fingerprint(url: str) -> Optional[Tuple[int, int]]:
+    """Return the modification time and size of the local file at a url, or None if the url is not
+    that of a local file."""
+    parsed = urllib.parse.urlparse(url)
+    if parsed.scheme != "file":
+        return None
+    stat = os.stat(urllib.request.url2pathname(parsed.path))
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _read_experiment_document(json_url: str, config: StarfishConfig) -> Tuple[bytes, str, str]:
+    """Return the contents of an experiment.json document, its absolute url, and its baseurl."""
+    backend, name, baseurl = resolve_path_or_url(json_url, config.slicedimage)
+    with backend.read_contextmanager(name) as fh:
+        contents = fh.read()
+    return contents, pathjoin(baseurl, name), baseurl
+
+
+class ExperimentIndex:
+    """
+    The index of an experiment, from which single fields of view and the codebook are loaded
+    without reading the rest of the experiment.  Use :py:meth:`load` to retrieve the stored index
+    of an experiment.
+
+    Attributes
+    ----------
+    json_url : str
+        The absolute url of the experiment.json document.
+    fov_names : Sequence[str]
+        The names of the fields of view of the experiment.
+    extras : dict
+        The extras of the experiment.
+    """
+    def __init__(self, document: dict, backend_config: Mapping) -> None:
+        self._document = document
+        self._backend_config = backend_config
+        self._codebook: Optional[Codebook] = None
+        self._codebook_lock = threading.Lock()
+
+    @property
+    def json_url(self) -> str:
+        return self._document["json_url"]
+
+    @property
+    def fov_names(self) -> Sequence[str]:
+        return list(self._document["fovs"].keys())
+
+    @property
+    def extras(self) -> dict:
+        return self._document["extras"]
+
+    @property
+    def codebook(self) -> Codebook:
+        """The codebook of the experiment."""
+        with self._codebook_lock:
+            if self._codebook is None:
+                stored = self._document["codebook"]
+                data = np.array(stored["data"], dtype=stored["dtype"])
+                self._codebook = Codebook._create_codebook(
+                    stored["targets"], n_channel=data.shape[1], n_round=data.shape[2], data=data)
+            return self._codebook
+
+    def fov(self, fov_name: str) -> FieldOfView:
+        """Return a field of view of the experiment.  Its tilesets are parsed when its images are
+        requested."""
+        locations = self._document["fovs"].get(fov_name)
+        if locations is None:
+            raise IndexError(f"No field of view with name \"{fov_name}\"")
+        return FieldOfView(
+            fov_name,
+            image_tilesets=FovTileSets(
+                {
+                    image_type: (relative_path_or_url, baseurl)
+                    for image_type, (relative_path_or_url, baseurl) in locations.items()
+                },
+                self._backend_config,
+            ),
+        )
+
+    @classmethod
+    def build(cls, json_url: str, config: Optional[StarfishConfig]=None) -> "ExperimentIndex":
+        """Build the index of an experiment, without storing it."""
+        config = config or StarfishConfig()
+        contents, absolute_url, baseurl = _read_experiment_document(json_url, config)
+        return cls._build(json_url, contents, absolute_url, baseurl, config)
+
+    @classmethod
+    def load(cls, json_url: str, config: Optional[StarfishConfig]=None) -> "ExperimentIndex":
+        """
+        Return the stored index of an experiment, or if there is none, or it is no longer valid,
+        build the index and store it.  If storing indexes is disabled, the index is built every
+        time.
+
+        Parameters
+        ----------
+        json_url : str
+            file path or web link to an experiment.json file
+        config : Optional[StarfishConfig]
+            The configuration.  If None, it is loaded.
+        """
+        config = config or StarfishConfig()
+        if not config.experiment_index["enabled"]:
+            return cls.build(json_url, config)
+
+        contents, absolute_url, baseurl = _read_experiment_document(json_url, config)
+        path = os.path.join(
+            config.experiment_index["directory"],
+            f"{hashlib.sha256(absolute_url.encode()).hexdigest()}.json")
+        try:
+            with open(path) as fh:
+                document = json.load(fh)
+        except (OSError, ValueError):
+            document = None
+        if document is not None and cls._is_valid(document, absolute_url, contents, config):
+            return cls(document, config.slicedimage)
+
+        index = cls._build(json_url, contents, absolute_url, baseurl, config)
+        try:
+            index._write(path)
+        except OSError as ex:
+            warnings.warn(f"the index of {absolute_url} could not be stored: {ex}")
+        return index
+
+    @classmethod
+    def _build(
+            cls,
+            json_url: str,
+            contents: bytes,
+            absolute_url: str,
+            baseurl: str,
+            config: StarfishConfig,
+    ) -> "ExperimentIndex":
+        if config.strict:
+            valid = validate_sptx.validate(json_url)
+            if not valid:
+                raise Exception("validation failed")
+
+        experiment_document = json.loads(contents.decode("utf-8"))
+        codebook_url = Experiment._codebook_url(experiment_document, baseurl, config.slicedimage)
+        codebook = Codebook.from_json(codebook_url)
+        manifests, fov_names = Experiment._fov_manifests(
+            experiment_document, baseurl, config.slicedimage)
+
+        files = dict()
+        for url in [codebook_url] + [manifest.url for manifest in manifests.values()]:
+            fingerprint = _fingerprint(url)
+            if fingerprint is not None:
+                files[url] = fingerprint
+
+        document = {
+            "format_version": INDEX_FORMAT_VERSION,
+            "json_url": absolute_url,
+            "sha256": hashlib.sha256(contents).hexdigest(),
+            "strict": config.strict,
+            "files": files,
+            "extras": experiment_document["extras"],
+            "codebook": {
+                "targets": [str(target) for target in codebook.target.values],
+                "dtype": codebook.dtype.str,
+                "data": codebook.values.tolist(),
+            },
+            "fovs": {
+                fov_name: FovTileSets.from_manifests(fov_name, manifests).locations
+                for fov_name in fov_names
+            },
+        }
+        index = cls(document, config.slicedimage)
+        index._codebook = codebook
+        return index
+
+    @staticmethod
+    def _is_valid(
+            document: dict,
+            absolute_url: str,
+            contents: bytes,
+            config: StarfishConfig,
+    ) -> bool:
+        if (document.get("format_version") != INDEX_FORMAT_VERSION
+                or document["json_url"] != absolute_url
+                or document["sha256"] != hashlib.sha256(contents).hexdigest()
+                or (config.strict and not document["strict"])):
+            return False
+        for url, fingerprint in document["files"].items():
+            try:
+                if list(_fingerprint(url) or ()) != fingerprint:
+                    return False
+            except OSError:
+                return False
+        return True
+
+    def _write(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # write to a temporary file first so that concurrent readers never see a partial index.
+        temporary_path = f"{path}.{os.getpid()}.{threading.get_ident()}.partial"
+        with open(temporary_path, "w") as fh:
+            json.dump(self._document, fh)
+        os.replace(temporary_path, path)
@@ -0,0 +1,147 @@
+"""
+Lazily parsed field of view manifests.
+
+Each image type of an experiment.json document points at a manifest, a slicedimage Collection that
+lists the tileset document of each field of view.  Parsing the manifest with slicedimage parses
+every tileset document it lists, and looking up the tileset of a field of view scans all of them,
+so opening an experiment with thousands of fields of view takes minutes even when a single field
+of view is wanted.
+
+:py:class:`FovManifest` reads only the manifest document itself, and indexes the tileset
+documents by field of view name.  :py:class:`FovTileSets` parses the tileset document of a field
+of view the first time the tileset is requested.
+"""
+import json
+import threading
+from typing import Iterator, Mapping, MutableMapping, Optional, Tuple
+
+from slicedimage import TileSet
+from slicedimage.io import CollectionKeys, CommonPartitionKeys, Reader, resolve_url
+from slicedimage.urlpath import pathjoin
+
+
+TileSetLocation = Tuple[str, Optional[str]]
+"""The path or url of a tileset document, and the url it is relative to."""
+
+
+class FovManifest:
+    """
+    An index of the tileset documents listed in a field of view manifest, by field of view name.
+
+    Parameters
+    ----------
+    name_or_url : str
+        The path or url of the manifest, relative to baseurl.
+    baseurl : Optional[str]
+        The url the manifest's location is relative to.
+    backend_config : Optional[Mapping]
+        The slicedimage backend configuration.
+
+    Attributes
+    ----------
+    url : str
+        The absolute url of the manifest.
+    extras : Optional[dict]
+        The extras of the manifest.
+    """
+    def __init__(
+            self,
+            name_or_url: str,
+            baseurl: Optional[str],
+            backend_config: Optional[Mapping]=None,
+    ) -> None:
+        backend, name, self._baseurl = resolve_url(name_or_url, baseurl, backend_config)
+        self.url = pathjoin(self._baseurl, name)
+        with backend.read_contextmanager(name) as fh:
+            document = json.load(fh)
+        if CollectionKeys.CONTENTS not in document:
+            raise ValueError(
+                f"{name_or_url} is not a field of view manifest: it does not contain a "
+                f"{CollectionKeys.CONTENTS} field.")
+        self.extras = document.get(CommonPartitionKeys.EXTRAS, None)
+        self._contents: Mapping[str, str] = document[CollectionKeys.CONTENTS]
+
+    def __contains__(self, fov_name: str) -> bool:
+        return fov_name in self._contents
+
+    def __len__(self) -> int:
+        return len(self._contents)
+
+    def fov_names(self) -> Iterator[str]:
+        """Return the names of the fields of view listed in the manifest."""
+        return iter(self._contents.keys())
+
+    def tileset_location(self, fov_name: str) -> Optional[TileSetLocation]:
+        """Return the location of the tileset document of a field of view, or None if the field of
+        view is not listed in the manifest."""
+        relative_path_or_url = self._contents.get(fov_name)
+        if relative_path_or_url is None:
+            return None
+        return relative_path_or_url, self._baseurl
+
+
+def parse_tileset(
+        location: TileSetLocation,
+        backend_config: Optional[Mapping]=None,
+) -> TileSet:
+    """Parse the tileset document at a location."""
+    relative_path_or_url, baseurl = location
+    tileset = Reader.parse_doc(relative_path_or_url, baseurl, backend_config)
+    if not isinstance(tileset, TileSet):
+        raise ValueError(f"{relative_path_or_url} is not a tileset.")
+    tileset._name_or_url = relative_path_or_url
+    return tileset
+
+
+class FovTileSets(Mapping[str, TileSet]):
+    """
+    The tilesets of a single field of view, by image type.  Each tileset is parsed the first time
+    it is requested, and is then kept for later requests.
+
+    Parameters
+    ----------
+    locations : Mapping[str, TileSetLocation]
+        The location of the tileset document of each image type.
+    backend_config : Optional[Mapping]
+        The slicedimage backend configuration.
+    """
+    def __init__(
+            self,
+            locations: Mapping[str, TileSetLocation],
+            backend_config: Optional[Mapping]=None,
+    ) -> None:
+        self.locations = locations
+        self._backend_config = backend_config
+        self._tilesets: MutableMapping[str, TileSet] = dict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_manifests(
+            cls,
+            fov_name: str,
+            manifests: Mapping[str, FovManifest],
+            backend_config: Optional[Mapping]=None,
+    ) -> "FovTileSets":
+        """The tilesets of a field of view, in each of the manifests that list it."""
+        locations: MutableMapping[str, TileSetLocation] = dict()
+        for image_type, manifest in manifests.items():
+            location = manifest.tileset_location(fov_name)
+            if location is not None:
+                locations[image_type] = location
+        return cls(locations, backend_config)
+
+    def __getitem__(self, image_type: str) -> TileSet:
+        location = self.locations[image_type]
+        # prefetching threads may request the same tileset at once.
+        with self._lock:
+            tileset = self._tilesets.get(image_type)
+            if tileset is None:
+                tileset = parse_tileset(location, self._backend_config)
+                self._tilesets[image_type] = tileset
+        return tileset
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.locations)
+
+    def __len__(self) -> int:
+        return len(self.locations)
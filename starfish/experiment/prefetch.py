@@ -0,0 +1,90 @@
+"""
+Iterates over fields of view while the images of the next fields of view are loaded in the
+background.
+
+While the caller processes a field of view, a pool of threads loads the requested image types of
+the following fields of view, so that by the time the caller asks for the images of the next field
+of view with :py:meth:`~starfish.experiment.experiment.FieldOfView.get_image`, they are already in
+memory.  Reading tiles from disk or the network and decoding them mostly releases the GIL, so this
+overlaps I/O with processing.
+"""
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Deque, Iterator, Optional, Sequence, Tuple, TYPE_CHECKING
+
+from .executor import estimate_fov_memory
+
+if TYPE_CHECKING:
+    from .experiment import FieldOfView
+
+
+def prefetch_fovs(
+        fovs: Sequence["FieldOfView"],
+        n_prefetch: int,
+        image_types: Optional[Sequence[str]]=None,
+        memory_cap: Optional[int]=None,
+) -> Iterator["FieldOfView"]:
+    """
+    Yield each field of view in order, while the images of up to the next n_prefetch fields of view
+    are loaded in background threads.
+
+    A prefetched image is returned by the first call to
+    :py:meth:`~starfish.experiment.experiment.FieldOfView.get_image` for that image type and
+    aligned group without cropping.  Prefetched images that are not requested by the time the
+    caller moves on to the next field of view are discarded.
+
+    Parameters
+    ----------
+    fovs : Sequence[FieldOfView]
+        The fields of view to iterate over.
+    n_prefetch : int
+        Maximum number of fields of view ahead of the current one whose images are loaded.
+    image_types : Optional[Sequence[str]]
+        The image types to load.  If None, all the image types of each field of view are loaded.
+    memory_cap : Optional[int]
+        Maximum size, in bytes, of the images that have been prefetched but not yet handed to the
+        caller.  The next field of view is always prefetched if nothing else is, even if its
+        images exceed the cap.  If None, only n_prefetch bounds prefetching.
+    """
+    if n_prefetch < 1:
+        yield from fovs
+        return
+
+    def fov_memory(fov: "FieldOfView") -> int:
+        types = fov.image_types if image_types is None else image_types
+        return estimate_fov_memory(fov, working_set_factor=1, image_types=types)
+
+    prefetched: Deque[Tuple["FieldOfView", int]] = deque()
+    prefetched_memory = 0
+    next_ix = 0
+
+    def prefetch_more(executor: ThreadPoolExecutor) -> None:
+        nonlocal prefetched_memory, next_ix
+        while next_ix < len(fovs) and len(prefetched) < n_prefetch:
+            fov = fovs[next_ix]
+            memory = fov_memory(fov)
+            if (memory_cap is not None
+                    and len(prefetched) > 0
+                    and prefetched_memory + memory > memory_cap):
+                return
+            fov._prefetch(executor, image_types)
+            prefetched.append((fov, memory))
+            prefetched_memory += memory
+            next_ix += 1
+
+    with ThreadPoolExecutor(max_workers=n_prefetch) as executor:
+        try:
+            prefetch_more(executor)
+            while len(prefetched) > 0:
+                fov, memory = prefetched.popleft()
+                prefetched_memory -= memory
+                # start loading the following fields of view while the caller processes this one.
+                prefetch_more(executor)
+                try:
+                    yield fov
+                finally:
+                    fov._discard_prefetched()
+        finally:
+            # the caller stopped iterating, so the images that are not loaded yet are not needed.
+            for fov, _ in prefetched:
+                fov._discard_prefetched()
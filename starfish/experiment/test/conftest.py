@@ -0,0 +1,26 @@
+import pytest
+
+from starfish.experiment.experiment import Experiment
+from starfish.types import Axes
+from .experiment_test_utils import (
+    EXPERIMENT_JSON_NUM_FOVS,
+    EXPERIMENT_NUM_FOVS,
+    write_fov_experiment,
+)
+
+
+@pytest.fixture(scope="module")
+def experiment(tmpdir_factory) -> Experiment:
+    """An experiment of EXPERIMENT_NUM_FOVS FOVs, with two rounds and two channels."""
+    path = str(tmpdir_factory.mktemp("experiment"))
+    experiment_json = write_fov_experiment(
+        path, EXPERIMENT_NUM_FOVS, {Axes.ROUND: 2, Axes.CH: 2, Axes.ZPLANE: 1})
+    return Experiment.from_json(experiment_json)
+
+
+@pytest.fixture
+def experiment_json(tmpdir) -> str:
+    """The path of a freshly written experiment of EXPERIMENT_JSON_NUM_FOVS FOVs, with two rounds
+    and one channel."""
+    return write_fov_experiment(
+        str(tmpdir), EXPERIMENT_JSON_NUM_FOVS, {Axes.ROUND: 2, Axes.CH: 1, Axes.ZPLANE: 1})
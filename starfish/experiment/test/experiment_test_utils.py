@@ -0,0 +1,59 @@
+import os
+from typing import Mapping, Union
+
+import numpy as np
+from slicedimage import ImageFormat
+
+from starfish.experiment.builder import FetchedTile, tile_fetcher_factory, write_experiment_json
+from starfish.types import Axes, Coordinates
+
+SHAPE = {Axes.Y: 32, Axes.X: 48}
+# the number of FOVs of the experiment and experiment_json fixtures in conftest.py
+EXPERIMENT_NUM_FOVS = 5
+EXPERIMENT_JSON_NUM_FOVS = 4
+
+
+class FovTile(FetchedTile):
+    """Tiles whose pixel values depend on their FOV, round, and channel."""
+    def __init__(self, fov: int, round_: int, ch: int, zplane: int) -> None:
+        super().__init__()
+        self.value = fov * 16 + round_ * 4 + ch
+
+    @property
+    def shape(self):
+        return SHAPE
+
+    @property
+    def coordinates(self):
+        return {
+            Coordinates.X: (0.0, 0.0001),
+            Coordinates.Y: (0.0, 0.0001),
+            Coordinates.Z: (0.0, 0.0001),
+        }
+
+    @property
+    def format(self) -> ImageFormat:
+        return ImageFormat.TIFF
+
+    def tile_data(self) -> np.ndarray:
+        return np.full((SHAPE[Axes.Y], SHAPE[Axes.X]), self.value, dtype=np.uint8)
+
+
+def write_fov_experiment(
+        path: str,
+        num_fovs: int,
+        primary_image_dimensions: Mapping[Union[str, Axes], int],
+) -> str:
+    """Write an experiment of FovTiles, with primary images and a "nuclei" auxiliary image of one
+    tile per FOV, and return the path of its json document."""
+    write_experiment_json(
+        path,
+        num_fovs,
+        ImageFormat.TIFF,
+        primary_image_dimensions=primary_image_dimensions,
+        aux_name_to_dimensions={"nuclei": {Axes.ROUND: 1, Axes.CH: 1, Axes.ZPLANE: 1}},
+        primary_tile_fetcher=tile_fetcher_factory(FovTile, True),
+        aux_tile_fetcher={"nuclei": tile_fetcher_factory(FovTile, True)},
+        default_shape=SHAPE,
+    )
+    return os.path.join(path, "experiment.json")
@@ -0,0 +1,109 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from starfish.experiment.executor import estimate_fov_memory, FovExecutor
+from starfish.experiment.experiment import Experiment, FieldOfView
+from starfish.intensity_table.intensity_table import IntensityTable
+from starfish.types import Features
+from starfish.util.synthesize import SyntheticData
+from .experiment_test_utils import EXPERIMENT_NUM_FOVS as NUM_FOVS
+
+
+def fov_pipeline(fov: FieldOfView):
+    """A pipeline that returns one spot per FOV, whose intensity is the sum of the primary image,
+    and a label image.  This is a module-level function so that it can be run in worker
+    processes."""
+    primary = fov.get_image(FieldOfView.PRIMARY_IMAGES)
+    np.random.seed(0)
+    intensities = SyntheticData(n_ch=2, n_round=2, n_codes=1, n_spots=1).intensities()
+    intensities[:] = primary.xarray.values.sum()
+    label_image = np.full(primary.tile_shape, int(fov.name[-1]), dtype=np.int32)
+    return intensities, label_image, fov.name
+
+
+def serial_results(experiment: Experiment):
+    return {fov.name: fov_pipeline(fov) for fov in experiment.fovs()}
+
+
+@pytest.mark.parametrize("processes", [False, True])
+def test_run_pipeline(experiment, processes):
+    """Run a pipeline across the FOVs of an experiment, and verify that the merged results match a
+    serial loop over the FOVs."""
+    expected = serial_results(experiment)
+
+    results = experiment.run_pipeline(
+        fov_pipeline, n_workers=3, processes=processes, keep_results=True)
+
+    assert len(results) == NUM_FOVS
+    for fov_name, (expected_intensities, expected_label_image, _) in expected.items():
+        intensities, label_image, name = results[fov_name]
+        assert name == fov_name
+        assert np.array_equal(intensities.values, expected_intensities.values)
+        assert np.array_equal(results.label_images[fov_name], expected_label_image)
+
+    merged = results.intensity_table()
+    assert isinstance(merged, IntensityTable)
+    assert merged.sizes[Features.AXIS] == NUM_FOVS
+    assert np.array_equal(
+        merged.values,
+        np.concatenate([expected[fov_name][0].values for fov_name in sorted(expected)]))
+
+
+def test_memory_budget(experiment):
+    """Verify that no more FOVs are in flight than fit within the memory budget."""
+    lock = threading.Lock()
+    in_flight = [0]
+    max_in_flight = [0]
+
+    def pipeline(fov: FieldOfView) -> str:
+        with lock:
+            in_flight[0] += 1
+            max_in_flight[0] = max(max_in_flight[0], in_flight[0])
+        time.sleep(0.05)
+        with lock:
+            in_flight[0] -= 1
+        return fov.name
+
+    fov_memory = estimate_fov_memory(experiment.fov())
+    executor = FovExecutor(n_workers=4, memory_budget=2 * fov_memory)
+    results = executor.run(experiment, pipeline, keep_results=True)
+
+    assert sorted(results.results.keys()) == sorted(experiment.keys())
+    assert max_in_flight[0] == 2
+
+
+def test_intensity_tables_are_merged_in_fov_order(experiment):
+    """IntensityTables are merged in the order of the FOVs as they complete, even if later FOVs
+    complete first, and the other results are not kept."""
+    def pipeline(fov: FieldOfView):
+        fov_index = int(fov.name[-1])
+        time.sleep(0.02 * (NUM_FOVS - fov_index))
+        intensities, label_image, _ = fov_pipeline(fov)
+        intensities[:] = fov_index
+        return intensities, label_image, fov.name
+
+    results = experiment.run_pipeline(pipeline, n_workers=NUM_FOVS)
+
+    assert len(results) == NUM_FOVS
+    assert len(results.results) == 0
+    assert sorted(results.label_images.keys()) == sorted(experiment.keys())
+    merged = results.intensity_table()
+    assert np.array_equal(merged.values[:, 0, 0], np.arange(NUM_FOVS))
+
+
+def test_pipeline_error(experiment):
+    """Errors raised by the pipeline are raised by the executor."""
+    def pipeline(fov: FieldOfView):
+        raise RuntimeError(fov.name)
+
+    with pytest.raises(RuntimeError):
+        experiment.run_pipeline(pipeline, n_workers=2)
+
+
+def test_processes_require_json_url(experiment):
+    in_memory_experiment = Experiment(experiment.fovs(), experiment.codebook, experiment.extras)
+    with pytest.raises(ValueError):
+        in_memory_experiment.run_pipeline(fov_pipeline, processes=True)
@@ -0,0 +1,86 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from starfish.codebook.codebook import Codebook
+from starfish.config import environ, StarfishConfig
+from starfish.experiment.experiment import Experiment, FieldOfView
+from starfish.experiment.index import ExperimentIndex
+from starfish.util.indirectfile import GetCodebookFromExperiment, GetImageStackFromExperiment
+
+
+@pytest.fixture
+def index_directory(tmpdir):
+    directory = str(tmpdir.mkdir("index"))
+    with environ(EXPERIMENT_INDEX_DIRECTORY=directory, EXPERIMENT_INDEX_ENABLED="true"):
+        yield directory
+
+
+def test_stored_index(experiment_json, index_directory, monkeypatch):
+    """The index is stored the first time it is loaded, and later loads neither read the manifests
+    nor the codebook."""
+    experiment = Experiment.from_json(experiment_json)
+    index = ExperimentIndex.load(experiment_json)
+    assert len(os.listdir(index_directory)) == 1
+
+    def fail(*args, **kwargs):
+        raise AssertionError("the experiment was parsed")
+
+    monkeypatch.setattr(Experiment, "_fov_manifests", fail)
+    monkeypatch.setattr(Codebook, "from_json", fail)
+    stored = ExperimentIndex.load(experiment_json)
+
+    assert stored.json_url == index.json_url
+    assert sorted(stored.fov_names) == sorted(experiment.keys())
+    assert stored.extras == experiment.extras
+    assert stored.codebook.equals(experiment.codebook)
+
+    fov = stored.fov("fov_001")
+    assert fov.image_types == experiment["fov_001"].image_types
+    for image_type in fov.image_types:
+        assert np.array_equal(
+            fov.get_image(image_type).xarray.values,
+            experiment["fov_001"].get_image(image_type).xarray.values)
+    with pytest.raises(IndexError):
+        stored.fov("fov_999")
+
+
+def test_rebuilt_when_modified(experiment_json, index_directory):
+    """Modifying the experiment.json document or a local manifest invalidates the stored index."""
+    ExperimentIndex.load(experiment_json)
+
+    with open(experiment_json) as fh:
+        document = json.load(fh)
+    document["extras"] = {"modified": True}
+    with open(experiment_json, "w") as fh:
+        json.dump(document, fh)
+    assert ExperimentIndex.load(experiment_json).extras == {"modified": True}
+
+    manifest_path = os.path.join(os.path.dirname(experiment_json), document["images"]["nuclei"])
+    with open(manifest_path) as fh:
+        manifest = json.load(fh)
+    del manifest["contents"]["fov_000"]
+    with open(manifest_path, "w") as fh:
+        json.dump(manifest, fh)
+    stat = os.stat(manifest_path)
+    os.utime(manifest_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+    fov = ExperimentIndex.load(experiment_json).fov("fov_000")
+    assert fov.image_types == {FieldOfView.PRIMARY_IMAGES}
+
+
+def test_disabled(experiment_json, index_directory):
+    with environ(EXPERIMENT_INDEX_ENABLED="false"):
+        assert not StarfishConfig().experiment_index["enabled"]
+        ExperimentIndex.load(experiment_json)
+    assert os.listdir(index_directory) == []
+
+
+def test_indirect_inputs(experiment_json, index_directory):
+    experiment = Experiment.from_json(experiment_json)
+    stack = GetImageStackFromExperiment().load(f"@{experiment_json}[fov_002][nuclei]")
+    assert np.array_equal(
+        stack.xarray.values, experiment["fov_002"].get_image("nuclei").xarray.values)
+    codebook = GetCodebookFromExperiment().load(f"@{experiment_json}")
+    assert codebook.equals(experiment.codebook)
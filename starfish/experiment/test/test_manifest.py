@@ -0,0 +1,54 @@
+
+import numpy as np
+import pytest
+
+from starfish.experiment import manifest
+from starfish.experiment.experiment import Experiment, FieldOfView
+from starfish.imagestack.parser.crop import CropParameters
+from starfish.types import Axes
+from .experiment_test_utils import EXPERIMENT_JSON_NUM_FOVS as NUM_FOVS
+
+
+def test_fov_tilesets_parsed_on_first_access(experiment_json, monkeypatch):
+    """Opening an experiment only reads the manifests.  The tileset and coordinate groups of a FOV
+    are only parsed when its images are requested, and only once."""
+    parsed_docs = []
+    parse_doc = manifest.Reader.parse_doc
+
+    def counting_parse_doc(name_or_url, *args, **kwargs):
+        parsed_docs.append(name_or_url)
+        return parse_doc(name_or_url, *args, **kwargs)
+
+    parsed_groups = []
+    parse_coordinate_groups = CropParameters.parse_coordinate_groups
+
+    def counting_parse_coordinate_groups(tileset):
+        parsed_groups.append(tileset)
+        return parse_coordinate_groups(tileset)
+
+    monkeypatch.setattr(manifest.Reader, "parse_doc", counting_parse_doc)
+    monkeypatch.setattr(
+        CropParameters, "parse_coordinate_groups", counting_parse_coordinate_groups)
+
+    experiment = Experiment.from_json(experiment_json)
+    assert sorted(experiment.keys()) == [f"fov_{ix:03}" for ix in range(NUM_FOVS)]
+    fov = experiment["fov_002"]
+    assert fov.image_types == {FieldOfView.PRIMARY_IMAGES, "nuclei"}
+    assert parsed_docs == []
+    assert parsed_groups == []
+
+    primary = fov.get_image(FieldOfView.PRIMARY_IMAGES)
+    fov.get_image(FieldOfView.PRIMARY_IMAGES)
+    assert len(parsed_docs) == 1
+    assert len(parsed_groups) == 1
+    assert np.all(primary.xarray.sel({Axes.ROUND.value: 1}).values == (2 * 16 + 4) / 255)
+
+    experiment.fov().get_image("nuclei")
+    assert len(parsed_docs) == 2
+
+
+def test_missing_fov(experiment_json):
+    experiment = Experiment.from_json(experiment_json)
+    with pytest.raises(IndexError):
+        experiment["fov_999"]
+    assert experiment.fovs_by_name("fov_999", "fov_001") == [experiment["fov_001"]]
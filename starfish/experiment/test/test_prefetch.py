@@ -0,0 +1,43 @@
+import numpy as np
+
+from starfish.experiment.executor import estimate_fov_memory
+from starfish.experiment.experiment import FieldOfView
+
+
+def test_prefetch_matches_synchronous_load(experiment):
+    """Iterate with prefetching, and verify that the FOVs are yielded in order, that their images
+    were loaded ahead of time, and that they match the images loaded synchronously."""
+    fovs = experiment.fovs()
+    iterated_names = []
+    for fov in experiment.iterate_fovs(prefetch=2, image_types=[FieldOfView.PRIMARY_IMAGES]):
+        iterated_names.append(fov.name)
+        assert set(fov._prefetched.keys()) == {(FieldOfView.PRIMARY_IMAGES, 0)}
+
+        primary = fov.get_image(FieldOfView.PRIMARY_IMAGES)
+        expected = fov._load_image(FieldOfView.PRIMARY_IMAGES)
+        assert np.array_equal(primary.xarray.values, expected.xarray.values)
+        # the prefetched image is only returned once.
+        assert len(fov._prefetched) == 0
+
+    assert iterated_names == [fov.name for fov in fovs]
+    assert all(len(fov._prefetched) == 0 for fov in fovs)
+
+
+def test_prefetch_memory_cap(experiment):
+    """Verify that no more FOVs are prefetched than fit within the memory cap."""
+    fovs = experiment.fovs()
+    memory_cap = estimate_fov_memory(fovs[0], working_set_factor=1)
+    for fov in experiment.iterate_fovs(prefetch=3, memory_cap=memory_cap):
+        n_prefetched = sum(1 for other in fovs if other is not fov and len(other._prefetched) > 0)
+        assert n_prefetched <= 1
+        assert fov.get_image("nuclei").num_rounds == 1
+
+
+def test_prefetch_stop_early(experiment):
+    """Images that are prefetched for FOVs that are never reached are discarded."""
+    fovs = experiment.fovs()
+    iterator = experiment.iterate_fovs(prefetch=2)
+    next(iterator)
+    iterator.close()
+
+    assert all(len(fov._prefetched) == 0 for fov in fovs)
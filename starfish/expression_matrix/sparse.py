@@ -0,0 +1,163 @@
+from collections import OrderedDict
+from typing import Mapping, MutableMapping
+
+import numpy as np
+import pandas as pd
+import scipy.sparse
+
+from starfish.types import Axes, Coordinates, Features
+from starfish.util.try_import import try_import
+from .expression_matrix import ExpressionMatrix
+
+PIXEL_COORDINATES = (Axes.X.value, Axes.Y.value, Axes.ZPLANE.value)
+PHYSICAL_COORDINATES = (Coordinates.X.value, Coordinates.Y.value, Coordinates.Z.value)
+
+
+class SparseExpressionMatrix:
+    """Cell x gene count matrix stored in compressed sparse row (CSR) format
+
+    Most cells express few of the genes measured by an experiment, so only the counts that are not
+    zero are stored.  Each cell is annotated with the center of the bounding box of its spots, in
+    pixel and, if available, physical coordinates.
+
+    Attributes
+    ----------
+    counts : scipy.sparse.csr_matrix
+        (cells, genes) matrix of the number of spots of each gene in each cell
+    cell_metadata : Mapping[str, np.ndarray]
+        the cell_id, area and center coordinates of each cell
+    genes : np.ndarray
+        the gene of each column
+
+    Methods
+    -------
+    from_features(features)
+        count the features of a features dataframe in each cell
+
+    to_dense()
+        creates the equivalent ExpressionMatrix
+
+    save_loom(filename)
+        save the SparseExpressionMatrix to loom for use in R or python
+
+    save_anndata(filename)
+        save the SparseExpressionMatrix to AnnData for use in ``Scanpy``
+    """
+
+    def __init__(
+            self,
+            counts: scipy.sparse.csr_matrix,
+            cell_metadata: Mapping[str, np.ndarray],
+            genes: np.ndarray,
+    ) -> None:
+        self.counts = counts
+        self.cell_metadata = cell_metadata
+        self.genes = genes
+
+    @property
+    def shape(self):
+        return self.counts.shape
+
+    @classmethod
+    def from_features(cls, features: pd.DataFrame) -> "SparseExpressionMatrix":
+        """Count the spots of each gene in each cell
+
+        Cells and targets are encoded as integers, which index the rows and columns of the count
+        matrix, and the coordinates of each cell's spots are reduced over the spots sorted by
+        cell.  Spots without a cell_id are not counted.
+
+        Parameters
+        ----------
+        features : pd.DataFrame
+            features dataframe of a decoded IntensityTable, as returned by
+            IntensityTable.to_features_dataframe(), with cell_id assignments.
+
+        Returns
+        -------
+        SparseExpressionMatrix :
+            cell x gene count matrix
+        """
+        if Features.CELL_ID not in features:
+            raise KeyError("IntensityTable must have 'cell_id' assignments for each cell before "
+                           "this function can be called. See starfish.TargetAssignment.Label.")
+        in_cell = np.flatnonzero(pd.notnull(features[Features.CELL_ID].values))
+        cell_codes, cell_ids = pd.factorize(
+            features[Features.CELL_ID].values[in_cell], sort=True)
+        target_codes, genes = pd.factorize(features[Features.TARGET].values[in_cell], sort=True)
+
+        counted = target_codes >= 0
+        counts = scipy.sparse.csr_matrix(
+            (
+                np.ones(np.count_nonzero(counted), dtype=np.int32),
+                (cell_codes[counted], target_codes[counted]),
+            ),
+            shape=(len(cell_ids), len(genes)),
+        )
+        counts.sum_duplicates()
+
+        # each cell's spots are contiguous once sorted, so the minimum and maximum coordinates of
+        # each cell are reductions over those segments.
+        order = np.argsort(cell_codes, kind="stable")
+        segment_starts = np.searchsorted(cell_codes[order], np.arange(len(cell_ids)))
+        sorted_positions = in_cell[order]
+        center_coordinates = list(PIXEL_COORDINATES)
+        if Coordinates.X.value in features and Coordinates.Y.value in features:
+            center_coordinates.extend(PHYSICAL_COORDINATES)
+        cell_metadata: MutableMapping[str, np.ndarray] = OrderedDict()
+        for name in center_coordinates:
+            if len(cell_ids) == 0:
+                cell_metadata[name] = np.empty(0, dtype=np.float64)
+                continue
+            values = features[name].values[sorted_positions]
+            min_ = np.fmin.reduceat(values, segment_starts)
+            max_ = np.fmax.reduceat(values, segment_starts)
+            cell_metadata[name] = min_ + (max_ - min_) / 2
+        cell_metadata[Features.AREA] = np.full(len(cell_ids), fill_value=np.nan)
+        cell_metadata[Features.CELL_ID] = np.asarray(cell_ids)
+
+        return cls(counts, cell_metadata, np.asarray(genes))
+
+    def to_dense(self) -> ExpressionMatrix:
+        """Return the equivalent ExpressionMatrix, whose counts are stored densely."""
+        coords = {
+            name: (Features.CELLS, values) for name, values in self.cell_metadata.items()}
+        coords[Features.GENES] = self.genes
+        return ExpressionMatrix(
+            data=self.counts.toarray().astype(np.float64),
+            dims=(Features.CELLS, Features.GENES),
+            coords=coords,
+            name='expression_matrix'
+        )
+
+    @try_import({"loompy"})
+    def save_loom(self, filename: str) -> None:
+        """Save a SparseExpressionMatrix as a loom file, without densifying its counts
+
+        Parameters
+        ----------
+        filename : str
+            Name of loom file
+        """
+        import loompy
+
+        loompy.create(
+            filename,
+            self.counts.tocoo(),
+            dict(self.cell_metadata),
+            {Features.GENES: self.genes},
+        )
+
+    @try_import({"anndata"})
+    def save_anndata(self, filename: str) -> None:
+        """Save a SparseExpressionMatrix as an AnnData file, without densifying its counts
+
+        Parameters
+        ----------
+        filename : str
+            Name of AnnData file
+        """
+        import anndata
+
+        adata = anndata.AnnData(
+            self.counts, dict(self.cell_metadata), {Features.GENES: self.genes})
+        adata.write(filename)
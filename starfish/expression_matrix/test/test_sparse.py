@@ -0,0 +1,107 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.sparse
+
+from starfish.expression_matrix.sparse import SparseExpressionMatrix
+from starfish.types import Axes, Coordinates, Features
+
+
+def features_dataframe(n_features: int=200, physical_coords: bool=True) -> pd.DataFrame:
+    np.random.seed(0)
+    features = pd.DataFrame({
+        Features.AXIS: np.arange(n_features),
+        Axes.X.value: np.random.randint(0, 100, n_features),
+        Axes.Y.value: np.random.randint(0, 100, n_features),
+        Axes.ZPLANE.value: np.random.randint(0, 10, n_features),
+        Features.TARGET: np.random.choice(["ACTB", "GAPDH", "MALAT1", "XIST"], n_features),
+        Features.CELL_ID: np.random.choice([3, 7, 11, 12, 20], n_features),
+    })
+    if physical_coords:
+        for pixel_axis, physical_axis in (
+                (Axes.X, Coordinates.X), (Axes.Y, Coordinates.Y), (Axes.ZPLANE, Coordinates.Z)):
+            features[physical_axis.value] = features[pixel_axis.value] * 0.5 + 1
+    return features
+
+
+def groupby_expression_matrix(features: pd.DataFrame):
+    """Count and locate the spots of each cell with pandas groupby operations."""
+    counts = features.groupby([Features.CELL_ID, Features.TARGET]).size().unstack().fillna(0)
+    coordinates = [Axes.X.value, Axes.Y.value, Axes.ZPLANE.value]
+    if Coordinates.X.value in features:
+        coordinates += [Coordinates.X.value, Coordinates.Y.value, Coordinates.Z.value]
+    grouped = features.groupby(Features.CELL_ID)[coordinates]
+    min_, max_ = grouped.min(), grouped.max()
+    return counts, min_ + (max_ - min_) / 2
+
+
+@pytest.mark.parametrize("physical_coords", [True, False])
+def test_from_features_matches_groupby(physical_coords):
+    features = features_dataframe(physical_coords=physical_coords)
+    matrix = SparseExpressionMatrix.from_features(features)
+    counts, centers = groupby_expression_matrix(features)
+
+    assert scipy.sparse.isspmatrix_csr(matrix.counts)
+    assert np.array_equal(matrix.counts.toarray(), counts.values)
+    assert np.array_equal(matrix.genes, counts.columns.values)
+    assert np.array_equal(matrix.cell_metadata[Features.CELL_ID], counts.index.values)
+    assert list(matrix.cell_metadata)[:-2] == list(centers.columns)
+    for name, values in centers.items():
+        assert np.allclose(matrix.cell_metadata[name], values.values)
+
+    dense = matrix.to_dense()
+    assert dense.dims == (Features.CELLS, Features.GENES)
+    assert np.array_equal(dense.values, counts.values)
+    assert np.all(np.isnan(dense[Features.AREA].values))
+
+
+def test_features_without_cells_are_not_counted():
+    features = features_dataframe()
+    features[Features.CELL_ID] = features[Features.CELL_ID].astype(float)
+    features.loc[:49, Features.CELL_ID] = np.nan
+    matrix = SparseExpressionMatrix.from_features(features)
+    counts, _ = groupby_expression_matrix(features)
+
+    assert matrix.counts.sum() == 150
+    assert np.array_equal(matrix.counts.toarray(), counts.values)
+
+
+def test_requires_cell_ids():
+    features = features_dataframe().drop(Features.CELL_ID, axis=1)
+    with pytest.raises(KeyError):
+        SparseExpressionMatrix.from_features(features)
+
+
+def test_save_anndata(tmpdir):
+    anndata = pytest.importorskip("anndata")
+    matrix = SparseExpressionMatrix.from_features(features_dataframe())
+    filename = os.path.join(str(tmpdir), "expression.h5ad")
+    matrix.save_anndata(filename)
+
+    dense_filename = os.path.join(str(tmpdir), "dense_expression.h5ad")
+    matrix.to_dense().save_anndata(dense_filename)
+
+    loaded, dense = anndata.read_h5ad(filename), anndata.read_h5ad(dense_filename)
+    assert scipy.sparse.issparse(loaded.X)
+    assert np.array_equal(loaded.X.toarray(), dense.X)
+    for name in matrix.cell_metadata:
+        np.testing.assert_array_equal(loaded.obs[name].values, dense.obs[name].values)
+    assert np.array_equal(loaded.var[Features.GENES].values, dense.var[Features.GENES].values)
+
+
+def test_save_loom(tmpdir):
+    loompy = pytest.importorskip("loompy")
+    matrix = SparseExpressionMatrix.from_features(features_dataframe())
+    filename = os.path.join(str(tmpdir), "expression.loom")
+    matrix.save_loom(filename)
+
+    dense_filename = os.path.join(str(tmpdir), "dense_expression.loom")
+    matrix.to_dense().save_loom(dense_filename)
+
+    with loompy.connect(filename) as loaded, loompy.connect(dense_filename) as dense:
+        assert np.array_equal(loaded[:, :], dense[:, :])
+        for name in matrix.cell_metadata:
+            np.testing.assert_array_equal(loaded.ra[name], dense.ra[name])
+        assert np.array_equal(loaded.ca[Features.GENES], dense.ca[Features.GENES])
@@ -3,7 +3,6 @@ from typing import Optional, Union
 
 import numpy as np
 import xarray as xr
-from trackpy import bandpass
 
 from starfish.imagestack.imagestack import ImageStack
 from starfish.types import Clip, Number
@@ -82,6 +81,9 @@ class Bandpass(FilterAlgorithmBase):
             bandpassed image
 
         """
+        # trackpy is slow to import, so it is only loaded when the filter is run.
+        from trackpy import bandpass
+
         bandpassed = bandpass(
             image, lshort=lshort, llong=llong, threshold=threshold,
             truncate=truncate
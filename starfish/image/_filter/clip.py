@@ -1,13 +1,14 @@
 from functools import partial
-from typing import Optional, Union
+from typing import Mapping, Optional, Union
 
 import numpy as np
 import xarray as xr
 
 from starfish.imagestack.imagestack import ImageStack
+from starfish.imagestack.parser import TileKey
 from starfish.util import click
 from ._base import FilterAlgorithmBase
-from .util import determine_axes_to_group_by
+from .util import cached_tile_percentiles, determine_axes_to_group_by, tilekey_of_chunk
 
 
 class Clip(FilterAlgorithmBase):
@@ -31,7 +32,13 @@ class Clip(FilterAlgorithmBase):
     _DEFAULT_TESTING_PARAMETERS = {"p_min": 0, "p_max": 100}
 
     @staticmethod
-    def _clip(image: Union[xr.DataArray, np.ndarray], p_min: int, p_max: int) -> np.ndarray:
+    def _clip(
+            image: Union[xr.DataArray, np.ndarray],
+            p_min: int,
+            p_max: int,
+            tile_min_percentiles: Optional[Mapping[TileKey, float]]=None,
+            tile_max_percentiles: Optional[Mapping[TileKey, float]]=None,
+    ) -> np.ndarray:
         """Clip values of img below and above percentiles p_min and p_max
 
         Parameters
@@ -42,6 +49,9 @@ class Clip(FilterAlgorithmBase):
           values below this percentile are set to the value of this percentile
         p_max : int
           values above this percentile are set to the value of this percentile
+        tile_min_percentiles, tile_max_percentiles : Optional[Mapping[TileKey, float]]
+          cached p_min-th and p_max-th percentiles of tiles. If image is a tile found in both
+          mappings, its percentiles are not recomputed.
 
         Notes
         -----
@@ -54,7 +64,13 @@ class Clip(FilterAlgorithmBase):
           Numpy array of same shape as img
 
         """
-        v_min, v_max = np.percentile(image, [p_min, p_max])
+        tilekey = tilekey_of_chunk(image)
+        if (tilekey is not None
+                and tile_min_percentiles is not None and tilekey in tile_min_percentiles
+                and tile_max_percentiles is not None and tilekey in tile_max_percentiles):
+            v_min, v_max = tile_min_percentiles[tilekey], tile_max_percentiles[tilekey]
+        else:
+            v_min, v_max = np.percentile(image, [p_min, p_max])
 
         return image.clip(min=v_min, max=v_max)
 
@@ -87,7 +103,17 @@ class Clip(FilterAlgorithmBase):
 
         """
         group_by = determine_axes_to_group_by(self.is_volume)
-        clip = partial(self._clip, p_min=self.p_min, p_max=self.p_max)
+        tile_min_percentiles = tile_max_percentiles = None
+        if not self.is_volume:
+            tile_min_percentiles = cached_tile_percentiles(stack, self.p_min)
+            tile_max_percentiles = cached_tile_percentiles(stack, self.p_max)
+        clip = partial(
+            self._clip,
+            p_min=self.p_min,
+            p_max=self.p_max,
+            tile_min_percentiles=tile_min_percentiles,
+            tile_max_percentiles=tile_max_percentiles,
+        )
         result = stack.apply(
             clip,
             group_by=group_by, verbose=verbose, in_place=in_place, n_processes=n_processes
@@ -75,12 +75,12 @@ class ElementWiseMultiply(FilterAlgorithmBase):
         if not in_place:
             stack = deepcopy(stack)
 
-        # stack._data contains the xarray
-        stack._data *= mult_array_aligned
-        if self.clip_method == Clip.CLIP:
-            stack._data = preserve_float_range(stack._data, rescale=False)
-        else:
-            stack._data = preserve_float_range(stack._data, rescale=True)
+        # the results are written into the stack's array, which may be shared with worker
+        # processes, so the stack's cached statistics and memoization key must be discarded.
+        data = stack.xarray.values
+        data *= mult_array_aligned
+        data[...] = preserve_float_range(data, rescale=self.clip_method != Clip.CLIP)
+        stack._invalidate_tile_statistics()
         return stack
 
     @staticmethod
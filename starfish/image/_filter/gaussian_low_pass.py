@@ -3,12 +3,13 @@ from typing import Callable, Optional, Tuple, Union
 
 import numpy as np
 import xarray as xr
-from skimage.filters import gaussian
+from skimage import img_as_float
 
 from starfish.imagestack.imagestack import ImageStack
 from starfish.types import Clip, Number
 from starfish.util import click
 from starfish.util.dtype import preserve_float_range
+from starfish.util.gaussian import gaussian_filter
 from ._base import FilterAlgorithmBase
 from .util import (
     determine_axes_to_group_by,
@@ -54,7 +55,9 @@ class GaussianLowPass(FilterAlgorithmBase):
             rescale: bool=False
     ) -> np.ndarray:
         """
-        Apply a Gaussian blur operation over a multi-dimensional image.
+        Apply a Gaussian blur operation over a multi-dimensional image.  Axes with large sigma are
+        filtered in the Fourier domain; see :py:func:`starfish.util.gaussian.gaussian_filter` for
+        how the method is selected and how closely it matches direct convolution.
 
         Parameters
         ----------
@@ -73,9 +76,9 @@ class GaussianLowPass(FilterAlgorithmBase):
 
         """
 
-        filtered = gaussian(
-            image,
-            sigma=sigma, output=None, cval=0, multichannel=False, preserve_range=True, truncate=4.0
+        # float images keep their precision, so float32 tiles are filtered in single precision
+        filtered = gaussian_filter(
+            img_as_float(np.asarray(image)), sigma=sigma, mode="nearest", cval=0, truncate=4.0
         )
 
         filtered = preserve_float_range(filtered, rescale)
@@ -47,15 +47,10 @@ class LinearUnmixing(FilterAlgorithmBase):
 
         """
 
-        x = image.sizes[Axes.X.value]
-        y = image.sizes[Axes.Y.value]
-        c = image.sizes[Axes.CH.value]
-
-        # broadcast each channel coefficient across x and y
-        broadcast_coeff = np.tile(coeff_mat, reps=x * y).reshape(c, y, x, c)
-
-        # multiply the image by each coefficient
-        unmixed_image = np.sum(image.values[..., None] * broadcast_coeff, axis=-1)
+        # contract the channel axis of the image (axis 0) against the second axis of coeff_mat.
+        # this computes B = AX for every pixel at once, and only allocates the unmixed result.
+        coeff_mat = np.asarray(coeff_mat, dtype=image.dtype)
+        unmixed_image = np.tensordot(coeff_mat, image.values, axes=(1, 0))
 
         return unmixed_image
 
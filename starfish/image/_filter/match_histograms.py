@@ -4,12 +4,19 @@ from typing import Optional, Set
 import numpy as np
 import xarray as xr
 
-from starfish.compat import match_histograms
 from starfish.imagestack.imagestack import ImageStack
 from starfish.types import Axes
-from starfish.util import click, enum
+from starfish.util import click
 from ._base import FilterAlgorithmBase
 
+# Number of fixed-width bins over [0, 1] used to summarize each chunk.  This matches the resolution
+# of 16-bit source data, so the reference distribution of data loaded from uint16 tiles is exact.
+N_HISTOGRAM_BINS = 2 ** 16
+
+# Maximum number of quantiles at which the reference distribution is stored.  Chunks with fewer
+# pixels than this use one quantile per pixel.
+MAX_REFERENCE_QUANTILES = 2 ** 16
+
 
 class MatchHistograms(FilterAlgorithmBase):
 
@@ -20,8 +27,13 @@ class MatchHistograms(FilterAlgorithmBase):
 
         Chunks sharing the same values for axes specified by group_by will be quantile
         normalized such that their intensity values are identically distributed. The reference
-        distribution is calculated by sorting the intensities in each chunk and averaging across
-        chunks.
+        distribution is calculated by evaluating the quantiles of the intensities in each chunk
+        and averaging them across chunks.
+
+        The quantiles of each chunk are read from a histogram with 2 ** 16 fixed-width bins over
+        [0, 1], computed in parallel, so memory use does not grow with the size of the ImageStack.
+        Each reference value is within one bin width (1 / 2 ** 16) of the value obtained by
+        sorting the intensities of every chunk and averaging the sorted arrays.
 
         For example, if group_by={Axes.CH, Axes.ROUND} each (z, y, x) volume will be linearized,
         the intensities will be sorted, and averaged across {Axes.CH, Axes.ROUND}, equalizing
@@ -38,20 +50,99 @@ class MatchHistograms(FilterAlgorithmBase):
 
     _DEFAULT_TESTING_PARAMETERS = {"group_by": {Axes.CH, Axes.ROUND}}
 
-    def _compute_reference_distribution(self, data: ImageStack) -> xr.DataArray:
-        """compute the average reference distribution across the ImageStack"""
-        chunk_key = enum.harmonize(data.shape.keys() - self.group_by)
-        sort_key = enum.harmonize(self.group_by)
+    @staticmethod
+    def _quantiles_from_histogram(
+            counts: np.ndarray, bin_edges: np.ndarray, n_quantiles: int
+    ) -> np.ndarray:
+        """
+        Calculate the intensities at n_quantiles evenly spaced quantiles in (0, 1] of the data
+        summarized by a histogram. Intensities are assumed to be uniformly distributed within
+        each bin.
+
+        Parameters
+        ----------
+        counts : np.ndarray
+            number of values in each bin
+        bin_edges : np.ndarray
+            edges of the bins, of size len(counts) + 1
+        n_quantiles : int
+            number of quantiles to evaluate
+
+        Returns
+        -------
+        np.ndarray :
+            the intensity at quantiles (1 / n_quantiles, 2 / n_quantiles, ..., 1)
+        """
+        cumulative_counts = np.cumsum(counts)
+        ranks = np.arange(1, n_quantiles + 1) * (cumulative_counts[-1] / n_quantiles)
+
+        # find the bin that contains each rank, and how far into that bin the rank falls.  Ranks
+        # are > 0, so the bin found always contains at least one value.
+        bins = np.searchsorted(cumulative_counts, ranks, side="left")
+        bins = np.minimum(bins, len(counts) - 1)
+        preceding_counts = np.where(bins > 0, cumulative_counts[bins - 1], 0)
+        fraction = (ranks - preceding_counts) / counts[bins]
+
+        bin_widths = np.diff(bin_edges)
+        return bin_edges[bins] + np.clip(fraction, 0, 1) * bin_widths[bins]
+
+    @staticmethod
+    def _chunk_quantiles(image: xr.DataArray, n_quantiles: int) -> np.ndarray:
+        """summarize a chunk with a fixed-bin histogram and return its quantiles"""
+        counts, bin_edges = np.histogram(image.values, bins=N_HISTOGRAM_BINS, range=(0, 1))
+        return MatchHistograms._quantiles_from_histogram(counts, bin_edges, n_quantiles)
 
-        # stack up the array
-        stacked = data.xarray.stack(chunk_key=chunk_key)
-        stacked = stacked.stack(sort_key=sort_key)
+    def _compute_reference_distribution(
+            self, data: ImageStack, n_processes: Optional[int]=None
+    ) -> np.ndarray:
+        """compute the average reference distribution across the ImageStack
 
-        sorted_stacked = stacked.groupby("sort_key").apply(np.sort)
-        reference = sorted_stacked.mean("sort_key")
-        reference = reference.unstack("chunk_key")
+        Returns
+        -------
+        np.ndarray :
+            the intensities of the reference distribution at evenly spaced quantiles in (0, 1]
+        """
+        chunk_size = int(np.prod([
+            size for axis, size in data.xarray.sizes.items()
+            if axis not in {group_axis.value for group_axis in self.group_by}
+        ]))
+        n_quantiles = min(chunk_size, MAX_REFERENCE_QUANTILES)
+
+        chunk_quantiles = data.transform(
+            self._chunk_quantiles,
+            group_by=self.group_by,
+            n_processes=n_processes,
+            n_quantiles=n_quantiles,
+        )
+
+        reference = np.zeros(n_quantiles, dtype=np.float64)
+        for quantiles, _ in chunk_quantiles:
+            reference += quantiles
+        reference /= len(chunk_quantiles)
         return reference
 
+    @staticmethod
+    def _quantized_levels(image: np.ndarray) -> Optional[np.ndarray]:
+        """
+        If the intensities of image are quantized to the N_HISTOGRAM_BINS evenly spaced levels in
+        [0, 1], as they are for data loaded from 16-bit tiles, return the index of the level of
+        each intensity.  Otherwise, return None.
+
+        Intensities are quantized if every intensity rounded to the same level is identical, so
+        ordering the levels orders the intensities.
+        """
+        if image.size == 0:
+            return None
+        scaled = np.rint(image * (N_HISTOGRAM_BINS - 1))
+        if not (0 <= scaled.min() and scaled.max() <= N_HISTOGRAM_BINS - 1):
+            return None
+        levels = scaled.astype(np.intp)
+        level_values = np.zeros(N_HISTOGRAM_BINS, dtype=image.dtype)
+        level_values[levels] = image
+        if not np.array_equal(level_values[levels], image):
+            return None
+        return levels
+
     @staticmethod
     def _match_histograms(
         image: xr.DataArray, reference: np.ndarray
@@ -59,10 +150,16 @@ class MatchHistograms(FilterAlgorithmBase):
         """
         matches the intensity distribution of image to reference
 
+        The quantile of each intensity is the fraction of intensities that are less than or equal
+        to it.  If the intensities are quantized to 16-bit levels, the quantiles are counted with
+        a histogram of the levels in linear time, and otherwise by sorting the intensities.
+
         Parameters
         ----------
-        image, reference : xr.DataArray
+        image : xr.DataArray
             3-d image data
+        reference : np.ndarray
+            intensities of the reference distribution at evenly spaced quantiles in (0, 1]
 
         Returns
         -------
@@ -70,8 +167,21 @@ class MatchHistograms(FilterAlgorithmBase):
             image, with intensities matched to reference
         """
         image = np.asarray(image)
-        reference = np.asarray(reference)
-        return match_histograms(image, reference=reference)
+        reference_quantiles = np.arange(1, reference.size + 1) / reference.size
+
+        levels = MatchHistograms._quantized_levels(image.ravel())
+        if levels is not None:
+            counts = np.bincount(levels, minlength=N_HISTOGRAM_BINS)
+            level_quantiles = np.cumsum(counts) / image.size
+            matched_levels = np.interp(level_quantiles, reference_quantiles, reference)
+            return matched_levels[levels].reshape(image.shape)
+
+        values, unique_indices, counts = np.unique(
+            image.ravel(), return_inverse=True, return_counts=True)
+        image_quantiles = np.cumsum(counts) / image.size
+
+        matched_values = np.interp(image_quantiles, reference_quantiles, reference)
+        return matched_values[unique_indices].reshape(image.shape)
 
     def run(
             self,
@@ -103,8 +213,8 @@ class MatchHistograms(FilterAlgorithmBase):
         """
         if verbose:
             print("Calculating reference distribution...")
-        reference_image = self._compute_reference_distribution(stack)
-        apply_function = partial(self._match_histograms, reference=reference_image)
+        reference = self._compute_reference_distribution(stack, n_processes=n_processes)
+        apply_function = partial(self._match_histograms, reference=reference)
         result = stack.apply(
             apply_function,
             group_by=self.group_by, verbose=verbose, in_place=in_place, n_processes=n_processes
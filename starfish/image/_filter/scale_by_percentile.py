@@ -1,14 +1,15 @@
 from functools import partial
-from typing import Optional, Union
+from typing import Mapping, Optional, Union
 
 import numpy as np
 import xarray as xr
 
 from starfish.imagestack.imagestack import ImageStack
+from starfish.imagestack.parser import TileKey
 from starfish.types import Clip
 from starfish.util import click
 from ._base import FilterAlgorithmBase
-from .util import determine_axes_to_group_by
+from .util import cached_tile_percentiles, determine_axes_to_group_by, tilekey_of_chunk
 
 
 class ScaleByPercentile(FilterAlgorithmBase):
@@ -42,7 +43,11 @@ class ScaleByPercentile(FilterAlgorithmBase):
     _DEFAULT_TESTING_PARAMETERS = {"p": 0}
 
     @staticmethod
-    def _scale(image: Union[xr.DataArray, np.ndarray], p: int) -> np.ndarray:
+    def _scale(
+            image: Union[xr.DataArray, np.ndarray],
+            p: int,
+            tile_percentiles: Optional[Mapping[TileKey, float]]=None,
+    ) -> np.ndarray:
         """Clip values of img below and above percentiles p_min and p_max
 
         Parameters
@@ -51,6 +56,9 @@ class ScaleByPercentile(FilterAlgorithmBase):
             image to be scaled
         p : int
             each image in the stack is scaled by this percentile. must be in [0, 100]
+        tile_percentiles : Optional[Mapping[TileKey, float]]
+            cached p-th percentiles of tiles. If image is a tile found in this mapping, its
+            percentile is not recomputed.
 
         Notes
         -----
@@ -63,7 +71,12 @@ class ScaleByPercentile(FilterAlgorithmBase):
           Numpy array of same shape as img
 
         """
-        v = np.percentile(image, p)
+        v = None
+        tilekey = tilekey_of_chunk(image)
+        if tile_percentiles is not None and tilekey is not None:
+            v = tile_percentiles.get(tilekey)
+        if v is None:
+            v = np.percentile(image, p)
 
         image = image / v
 
@@ -98,7 +111,10 @@ class ScaleByPercentile(FilterAlgorithmBase):
 
         """
         group_by = determine_axes_to_group_by(self.is_volume)
-        clip = partial(self._scale, p=self.p)
+        tile_percentiles = None
+        if not self.is_volume:
+            tile_percentiles = cached_tile_percentiles(stack, self.p)
+        clip = partial(self._scale, p=self.p, tile_percentiles=tile_percentiles)
         result = stack.apply(
             clip,
             group_by=group_by, verbose=verbose, in_place=in_place, n_processes=n_processes,
@@ -1,4 +1,5 @@
 import numpy as np
+from skimage import img_as_float32
 
 from starfish.image._filter.match_histograms import MatchHistograms
 from starfish.imagestack.imagestack import ImageStack
@@ -30,3 +31,37 @@ def test_match_histograms():
     mh = MatchHistograms({Axes.ROUND})
     results2 = mh.run(stack)
     assert len(np.unique(results2.xarray.sum(("x", "y", "z")))) == 4
+
+
+def test_reference_distribution_matches_sorted_average():
+    """the histogram-based reference should be within one bin width of the average of the sorted
+    intensities of each chunk"""
+    data = np.random.RandomState(0).gamma(2, 0.05, size=(2, 3, 2, 20, 25)).clip(0, 1)
+    stack = ImageStack.from_numpy_array(data.astype(np.float32))
+
+    mh = MatchHistograms({Axes.CH, Axes.ROUND})
+    reference = mh._compute_reference_distribution(stack, n_processes=1)
+
+    chunks = stack.xarray.values.reshape(2 * 3, -1)
+    expected = np.sort(chunks, axis=1).mean(axis=0)
+    assert np.allclose(reference, expected, rtol=0, atol=1 / 2 ** 16)
+
+
+def test_quantized_intensities_match_sorted_quantiles():
+    """intensities loaded from 16-bit data are matched with a histogram of their levels, which
+    gives the same result as sorting them"""
+    levels = np.random.RandomState(0).randint(0, 2 ** 16, size=(3, 20, 25), dtype=np.uint16)
+    image = img_as_float32(levels)
+    reference = np.sort(np.random.RandomState(1).rand(1500))
+
+    assert np.array_equal(MatchHistograms._quantized_levels(image.ravel()), levels.ravel())
+    values, unique_indices, counts = np.unique(
+        image.ravel(), return_inverse=True, return_counts=True)
+    expected = np.interp(
+        np.cumsum(counts) / image.size, np.arange(1, 1501) / 1500, reference)[unique_indices]
+    assert np.array_equal(
+        MatchHistograms._match_histograms(image, reference), expected.reshape(image.shape))
+
+    # intensities that are not quantized are sorted.
+    image[0, 0, :2] = [0.5, np.nextafter(np.float32(0.5), np.float32(1))]
+    assert MatchHistograms._quantized_levels(image.ravel()) is None
@@ -32,3 +32,16 @@ def test_linear_unmixing():
     stack2 = filter_unmix.run(stack, in_place=False, verbose=False, n_processes=1)
 
     assert np.all(ref_result == stack2.xarray.values)
+
+def test_linear_unmixing_matches_matrix_product():
+    """Unmixed channels should equal the product of coeff_mat and the observed channels"""
+    r, c, z, y, x = 2, 3, 2, 5, 4
+    im = np.random.RandomState(0).uniform(0.25, 0.5, size=(r, c, z, y, x)).astype(np.float32)
+    stack = ImageStack.from_numpy_array(im)
+    coeff_mat = np.array([[1, 0, 0], [-0.25, 1, -0.25], [0, 0, 1]])
+
+    filter_unmix = LinearUnmixing(coeff_mat=coeff_mat)
+    unmixed = filter_unmix.run(stack, in_place=False, verbose=False, n_processes=1)
+
+    expected = np.einsum('ij,rjzyx->rizyx', coeff_mat, im).clip(0, 1)
+    assert np.allclose(expected, unmixed.xarray.values, atol=1e-6)
@@ -1,6 +1,7 @@
 import numpy as np
 import pytest
 from skimage.filters import gaussian
+from skimage.morphology import ball, disk, white_tophat
 
 from starfish.image._filter.white_tophat import WhiteTophat
 
@@ -52,3 +53,31 @@ def test_white_tophat(is_volume: bool):
         small_ratio = filtered[80, 80] / small_spot_intensity
 
     assert large_ratio < small_ratio
+
+
+@pytest.mark.parametrize('is_volume', [True, False])
+def test_white_tophat_matches_skimage(is_volume: bool):
+    """the decomposed structuring element should give exactly the same result as skimage"""
+    shape = (12, 40, 40) if is_volume else (60, 60)
+    image = np.random.RandomState(0).rand(*shape).astype(np.float32)
+    selem = ball(5) if is_volume else disk(5)
+
+    filtered = WhiteTophat(masking_radius=5, is_volume=is_volume)._white_tophat(image)
+
+    assert np.array_equal(filtered, white_tophat(image, selem=selem))
+
+
+@pytest.mark.parametrize('is_volume', [True, False])
+def test_approximate_white_tophat(is_volume: bool):
+    """the approximate structuring element is inscribed in the exact one, so filtering smooth spots
+    with it should give nearly the same result"""
+    image = simple_spot_3d()
+    if not is_volume:
+        image = image.max(axis=0)
+
+    exact = WhiteTophat(masking_radius=8, is_volume=is_volume)._white_tophat(image)
+    approximate = WhiteTophat(
+        masking_radius=8, is_volume=is_volume, approximate=True)._white_tophat(image)
+
+    assert approximate.shape == exact.shape
+    assert np.allclose(approximate, exact, atol=np.iinfo(np.uint16).max * 0.01)
@@ -19,3 +19,17 @@ def test_zero_by_channel_magnitude_produces_accurate_results():
     zcm = ZeroByChannelMagnitude(thresh=np.inf, normalize=False)
     filtered = zcm.run(imagestack, in_place=False, n_processes=1)
     assert np.all(filtered.xarray == 0)
+
+
+def test_zero_by_channel_magnitude_normalizes_each_round_and_zplane():
+    data = np.random.RandomState(1).uniform(0, 1, size=(2, 3, 2, 6, 5)).astype(np.float32)
+    imagestack = ImageStack.from_numpy_array(data)
+
+    zcm = ZeroByChannelMagnitude(thresh=0.8, normalize=True)
+    filtered = zcm.run(imagestack, in_place=False, n_processes=2)
+
+    magnitude = np.linalg.norm(data, ord=2, axis=1, keepdims=True)
+    expected = np.where(magnitude >= 0.8, data / magnitude, 0)
+    assert np.allclose(filtered.xarray.values, expected, atol=1e-6)
+    # the source stack should not be modified when in_place is False
+    assert np.array_equal(imagestack.xarray.values, data)
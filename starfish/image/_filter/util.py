@@ -1,8 +1,11 @@
-from typing import Set, Tuple, Union
+from typing import Mapping, Optional, Set, Tuple, Union
 
 import numpy as np
+import xarray as xr
 from skimage.morphology import binary_opening, disk
 
+from starfish.imagestack.imagestack import ImageStack
+from starfish.imagestack.parser import TileKey
 from starfish.types import Axes, Number
 
 
@@ -116,3 +119,45 @@ def determine_axes_to_group_by(is_volume: bool) -> Set[Axes]:
         return {Axes.ROUND, Axes.CH}
     else:
         return {Axes.ROUND, Axes.CH, Axes.ZPLANE}
+
+
+def cached_tile_percentiles(stack: ImageStack, p: Number) -> Mapping[TileKey, float]:
+    """
+    Return the p-th percentile of each tile in stack whose percentile is already cached.  Tiles
+    whose percentile is not cached are omitted.
+
+    Parameters
+    ----------
+    stack : ImageStack
+        ImageStack whose cached tile statistics are read.
+    p : Number
+        Percentile, in [0, 100].
+
+    Returns
+    -------
+    Mapping[TileKey, float] :
+        Mapping from tile to its p-th percentile.
+    """
+    result = dict()
+    for tilekey, statistics in stack._cached_tile_statistics().items():
+        value = statistics.percentile(p)
+        if value is not None:
+            result[tilekey] = value
+    return result
+
+
+def tilekey_of_chunk(image: Union[xr.DataArray, np.ndarray]) -> Optional[TileKey]:
+    """
+    Return the TileKey of a 2-d (y, x) tile passed to a function by ImageStack.apply.  If image is
+    not a labeled 2-d tile, return None.
+    """
+    if not isinstance(image, xr.DataArray):
+        return None
+    labels = []
+    for axis in (Axes.ROUND, Axes.CH, Axes.ZPLANE):
+        coord = image.coords.get(axis.value)
+        if coord is None or coord.ndim != 0:
+            return None
+        labels.append(int(coord))
+    round_, ch, zplane = labels
+    return TileKey(round=round_, ch=ch, zplane=zplane)
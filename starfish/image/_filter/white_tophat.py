@@ -2,11 +2,11 @@ from typing import Optional, Union
 
 import numpy as np
 import xarray as xr
-from skimage.morphology import ball, disk, white_tophat
 
 from starfish.imagestack.imagestack import ImageStack
 from starfish.types import Clip
 from starfish.util import click
+from starfish.util.morphology import white_tophat
 from ._base import FilterAlgorithmBase
 from .util import determine_axes_to_group_by
 
@@ -22,7 +22,8 @@ class WhiteTophat(FilterAlgorithmBase):
     """
 
     def __init__(
-        self, masking_radius: int, is_volume: bool=False, clip_method: Union[str, Clip]=Clip.CLIP
+        self, masking_radius: int, is_volume: bool=False, clip_method: Union[str, Clip]=Clip.CLIP,
+        approximate: bool=False,
     ) -> None:
         """
         Instance of a white top hat morphological masking filter which masks objects larger
@@ -44,19 +45,22 @@ class WhiteTophat(FilterAlgorithmBase):
             Clip.SCALE_BY_CHUNK: data above 1 are scaled by the maximum value, with the maximum
                 value calculated over each slice, where slice shapes are determined by the group_by
                 parameters
+        approximate : bool
+            If True, mask with an inscribed approximation of the disk or ball that is several times
+            faster to apply for large radii.  It contains the disk or ball of radius
+            masking_radius - ceil(masking_radius / 4) * sqrt(ndim - 1).  See
+            :py:mod:`starfish.util.morphology` for details.  If False (default), results are
+            identical to filtering with skimage.morphology.white_tophat.
         """
         self.masking_radius = masking_radius
         self.is_volume = is_volume
         self.clip_method = clip_method
+        self.approximate = approximate
 
     _DEFAULT_TESTING_PARAMETERS = {"masking_radius": 3}
 
     def _white_tophat(self, image: Union[xr.DataArray, np.ndarray]) -> np.ndarray:
-        if self.is_volume:
-            structuring_element = ball(self.masking_radius)
-        else:
-            structuring_element = disk(self.masking_radius)
-        return white_tophat(image, selem=structuring_element)
+        return white_tophat(image, self.masking_radius, approximate=self.approximate)
 
     def run(
             self,
@@ -105,6 +109,10 @@ class WhiteTophat(FilterAlgorithmBase):
         "--clip-method", default=Clip.CLIP, type=Clip,
         help="method to constrain data to [0,1]. options: 'clip', 'scale_by_image', "
              "'scale_by_chunk'")
+    @click.option(
+        "--approximate", is_flag=True,
+        help="mask with a faster, inscribed approximation of the disk or ball")
     @click.pass_context
-    def _cli(ctx, masking_radius, is_volume, clip_method):
-        ctx.obj["component"]._cli_run(ctx, WhiteTophat(masking_radius, is_volume, clip_method))
+    def _cli(ctx, masking_radius, is_volume, clip_method, approximate):
+        ctx.obj["component"]._cli_run(
+            ctx, WhiteTophat(masking_radius, is_volume, clip_method, approximate))
@@ -1,10 +1,9 @@
-from copy import deepcopy
+from functools import partial
 from typing import Optional
 
 import numpy as np
-from tqdm import tqdm
+import xarray as xr
 
-from starfish.config import StarfishConfig
 from starfish.imagestack.imagestack import ImageStack
 from starfish.types import Axes
 from starfish.util import click
@@ -31,6 +30,41 @@ class ZeroByChannelMagnitude(FilterAlgorithmBase):
 
     _DEFAULT_TESTING_PARAMETERS = {"thresh": 0, "normalize": True}
 
+    @staticmethod
+    def _zero_by_channel_magnitude(
+            image: xr.DataArray, thresh: float, normalize: bool
+    ) -> np.ndarray:
+        """Zero pixels whose L2 norm across channels is below thresh, and optionally normalize the
+        remaining pixels to unit L2 norm. The chunk is modified in place.
+
+        Parameters
+        ----------
+        image : xr.DataArray
+            (ch, y, x) chunk of an ImageStack containing every channel of a single round and
+            z-plane.
+        thresh : float
+            pixels that have a L2 norm across channels below this threshold are set to 0
+        normalize : bool
+            if True, scale pixels to have unit L2 norm across channels
+
+        Returns
+        -------
+        np.ndarray :
+            Numpy array of same shape as image
+        """
+        data = image.values
+
+        # sum the squares over the channel axis (0) without materializing the squared image
+        ch_magnitude = np.einsum('cyx,cyx->yx', data, data)
+        np.sqrt(ch_magnitude, out=ch_magnitude)
+        magnitude_mask = ch_magnitude >= thresh
+
+        if normalize:
+            np.divide(data, ch_magnitude, out=data, where=magnitude_mask)
+        np.multiply(data, magnitude_mask, out=data)
+
+        return data
+
     def run(
             self, stack: ImageStack,
             in_place: bool=False,
@@ -49,7 +83,7 @@ class ZeroByChannelMagnitude(FilterAlgorithmBase):
         verbose : bool
             if True, report on the percentage completed during processing (default = False)
         n_processes : Optional[int]: None
-            Not implemented. Number of processes to use when applying filter.
+            Number of parallel processes to devote to calculating the filter
 
         Returns
         -------
@@ -58,38 +92,15 @@ class ZeroByChannelMagnitude(FilterAlgorithmBase):
             original stack.
 
         """
-        # The default is False, so even if code requests True require config to be True as well
-        verbose = verbose and StarfishConfig().verbose
-        channels_per_round = stack._data.groupby(Axes.ROUND.value)
-        channels_per_round = tqdm(channels_per_round) if verbose else channels_per_round
-
-        if not in_place:
-            new_stack = deepcopy(stack)
-            return self.run(new_stack, in_place=True)
-
-        # compute channel magnitude mask
-        for r, dat in channels_per_round:
-            # nervous about how xarray orders dimensions so i put this here explicitly ....
-            dat = dat.transpose(Axes.CH.value,
-                                Axes.ZPLANE.value,
-                                Axes.Y.value,
-                                Axes.X.value
-                                )
-            # ... to account for this line taking the norm across axis 0, or the channel axis
-            ch_magnitude = np.linalg.norm(dat, ord=2, axis=0)
-            magnitude_mask = ch_magnitude >= self.thresh
-
-            # apply mask and optionally, normalize by channel magnitude
-            for c in stack.axis_labels(Axes.CH):
-                ind = {Axes.ROUND.value: r, Axes.CH.value: c}
-                stack._data[ind] = stack._data[ind] * magnitude_mask
-
-                if self.normalize:
-                    stack._data[ind] = np.divide(stack._data[ind],
-                                                 ch_magnitude,
-                                                 where=magnitude_mask
-                                                 )
-        return stack
+        # each chunk must contain every channel so that the magnitude can be computed across them
+        group_by = {Axes.ROUND, Axes.ZPLANE}
+        zero_by_magnitude = partial(
+            self._zero_by_channel_magnitude, thresh=self.thresh, normalize=self.normalize)
+        result = stack.apply(
+            zero_by_magnitude,
+            group_by=group_by, verbose=verbose, in_place=in_place, n_processes=n_processes
+        )
+        return result
 
     @staticmethod
     @click.command("ZeroByChannelMagnitude")
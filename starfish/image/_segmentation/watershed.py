@@ -3,7 +3,6 @@ from typing import Optional, Tuple
 import numpy as np
 import scipy.ndimage.measurements as spm
 from scipy.ndimage import distance_transform_edt
-from showit import image
 from skimage.feature import peak_local_max
 from skimage.morphology import watershed
 
@@ -82,7 +81,10 @@ class Watershed(SegmentationAlgorithmBase):
 
         nuclei_mp = nuclei.max_proj(Axes.ROUND, Axes.CH, Axes.ZPLANE)
         nuclei__mp_numpy = nuclei_mp._squeezed_numpy(Axes.ROUND, Axes.CH, Axes.ZPLANE)
-        self._segmentation_instance = _WatershedSegmenter(nuclei__mp_numpy, stain)
+        # the maximum of the projection was recorded when it was written to the ImageStack
+        nuclei_max = nuclei_mp.tile_statistics({Axes.ROUND: 0, Axes.CH: 0, Axes.ZPLANE: 0}).max
+        self._segmentation_instance = _WatershedSegmenter(
+            nuclei__mp_numpy, stain, nuclei_max=nuclei_max)
         label_image = self._segmentation_instance.segment(
             self.nuclei_threshold, self.input_threshold, size_lim, disk_size_markers,
             disk_size_mask, self.min_distance
@@ -111,7 +113,12 @@ class Watershed(SegmentationAlgorithmBase):
 
 
 class _WatershedSegmenter:
-    def __init__(self, nuclei_img: np.ndarray, stain_img: np.ndarray) -> None:
+    def __init__(
+            self,
+            nuclei_img: np.ndarray,
+            stain_img: np.ndarray,
+            nuclei_max: Optional[Number]=None,
+    ) -> None:
         """Implements watershed segmentation of cells seeded from a nuclei image
 
         Algorithm is seeded by a nuclei image. Binary segmentation mask is computed from a maximum
@@ -123,8 +130,12 @@ class _WatershedSegmenter:
             nuclei image
         stain_img : np.ndarray[np.float32]
             stain image
+        nuclei_max : Optional[Number]
+            maximum of the nuclei image, if already known
         """
-        self.nuclei = nuclei_img / nuclei_img.max()
+        if nuclei_max is None:
+            nuclei_max = nuclei_img.max()
+        self.nuclei = nuclei_img / nuclei_max
         self.stain = stain_img / stain_img.max()
 
         self.nuclei_thresholded: Optional[np.ndarray] = None  # dtype: bool
@@ -354,6 +365,7 @@ class _WatershedSegmenter:
 
     def show(self, figsize=(10, 10)):
         import matplotlib.pyplot as plt
+        from showit import image
         plt.figure(figsize=figsize)
 
         plt.subplot(321)
@@ -0,0 +1,207 @@
+"""
+Writes a slicedimage TileSet with its tiles encoded, checksummed and written concurrently by a pool
+of threads.  The tileset document is generated by slicedimage.io.Writer from the encoded tiles, and
+is then checked against the checksums computed by the threads, so that a change in how
+slicedimage writes tiles cannot go unnoticed.
+
+Encoding (especially compressing) a tile releases the GIL for most of its duration, so threads let
+export keep several cores and the disk busy without copying the tiles to other processes.
+"""
+import hashlib
+import json
+import pathlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from io import BytesIO
+from typing import Callable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+from slicedimage import ImageFormat, Tile, TileSet, Writer
+from slicedimage.io import TileKeys, TileSetKeys
+
+MAX_COMPRESSION_LEVEL = 9
+
+
+def encode_tile(array: np.ndarray, tile_format: ImageFormat, compression_level: int=0) -> bytes:
+    """
+    Encode a 2D tile in a format that slicedimage can read.
+
+    Parameters
+    ----------
+    array : np.ndarray
+        The tile data.
+    tile_format : ImageFormat
+        The format to encode the tile in.
+    compression_level : int
+        If greater than 0, the tile is compressed losslessly (with deflate) at this level, up to
+        :py:data:`MAX_COMPRESSION_LEVEL`.  Only TIFF tiles can be compressed, as slicedimage reads
+        NUMPY tiles with np.load, which cannot read compressed arrays.
+
+    Returns
+    -------
+    bytes :
+        The encoded tile.
+    """
+    if not 0 <= compression_level <= MAX_COMPRESSION_LEVEL:
+        raise ValueError(
+            f"compression_level must be between 0 and {MAX_COMPRESSION_LEVEL}, "
+            f"not {compression_level}")
+    buffer_fh = BytesIO()
+    if compression_level == 0:
+        tile_format.writer_func(buffer_fh, array)
+    elif tile_format == ImageFormat.TIFF:
+        import skimage.io
+
+        skimage.io.imsave(buffer_fh, array, plugin="tifffile", compress=compression_level)
+    else:
+        raise ValueError(f"{tile_format} tiles cannot be compressed")
+    return buffer_fh.getvalue()
+
+
+class _EncodedTile(Tile):
+    """A tile that is encoded, checksummed and written to its file by a worker thread.  When
+    slicedimage.io.Writer writes the tile, it waits for the worker, and copies the encoded bytes to
+    the buffer it hashes rather than encoding them again.  The encoded bytes are released once they
+    are copied, so a tile can only be written once."""
+
+    # in-place experiment construction replaces Tile.sha256 by the checksum of the tile's provider
+    # (see starfish.experiment.builder.inplace), which these tiles do not have.
+    sha256 = None
+
+    def __init__(self, tile: Tile, tile_shape: Mapping[str, int], future: Future) -> None:
+        super().__init__(tile.coordinates, tile.indices, tile_shape=tile_shape, extras=tile.extras)
+        self._future: Optional[Future] = future
+        self._encoded: Optional[bytes] = None
+        self._filename: Optional[str] = None
+        self.checksum: Optional[str] = None
+
+    def wait(self) -> str:
+        """Wait for the worker to write the tile, and return the name of its file."""
+        if self._future is not None:
+            self._encoded, self._filename, self.checksum = self._future.result()
+            self._future = None
+        assert self._filename is not None
+        return self._filename
+
+    def write(self, dst_fh, tile_format):
+        self.wait()
+        if self._encoded is None:
+            raise RuntimeError("the encoded tile was already written")
+        dst_fh.write(self._encoded)
+        # the encoded tile is only needed until slicedimage has hashed it.
+        self._encoded = None
+
+
+class _WrittenTileFile:
+    """Stands in for the file of an _EncodedTile when slicedimage.io.Writer writes the tile, as the
+    file has already been written."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+    def write(self, data: bytes) -> None:
+        pass
+
+
+def _written_tile_opener(path: pathlib.Path, tile: _EncodedTile, ext: str) -> _WrittenTileFile:
+    return _WrittenTileFile(tile.wait())
+
+
+def write_tileset(
+        tileset: TileSet,
+        tile_arrays: Sequence[np.ndarray],
+        path: pathlib.Path,
+        tile_opener: Callable,
+        tile_format: ImageFormat,
+        compression_level: int=0,
+        n_threads: Optional[int]=None,
+        pretty: bool=True,
+) -> None:
+    """
+    Write a tileset document and its tiles.  The tiles are encoded, checksummed and written to
+    their files concurrently, and the document is then generated from the encoded tiles by
+    slicedimage.  A RuntimeError is raised if the document does not list the files and checksums
+    of the tiles that were written.
+
+    Parameters
+    ----------
+    tileset : TileSet
+        The tileset to write.  Its tiles do not need to hold their data.
+    tile_arrays : Sequence[np.ndarray]
+        The data of each of the tileset's tiles, in the same order.
+    path : pathlib.Path
+        The path of the tileset document.
+    tile_opener : Callable
+        Called as tile_opener(path, tile, extension) to open the file for each tile.  This is called
+        from the worker threads.
+    tile_format : ImageFormat
+        The format to write the tiles in.
+    compression_level : int
+        Level of lossless compression of the tiles (see :py:func:`encode_tile`).
+    n_threads : Optional[int]
+        Number of threads that encode and write the tiles.  If None, this is chosen by
+        concurrent.futures.ThreadPoolExecutor.
+    pretty : bool
+        Whether to indent the tileset document.
+    """
+    if compression_level != 0 and tile_format != ImageFormat.TIFF:
+        raise ValueError(f"{tile_format} tiles cannot be compressed")
+
+    def write_tile(tile: Tile, array: np.ndarray) -> Tuple[bytes, str, str]:
+        encoded = encode_tile(array, tile_format, compression_level)
+        with tile_opener(path, tile, tile_format.file_ext) as tile_fh:
+            tile_fh.write(encoded)
+            return encoded, tile_fh.name, hashlib.sha256(encoded).hexdigest()
+
+    encoded_tileset = TileSet(
+        tileset.dimensions,
+        tileset.shape,
+        default_tile_shape=tileset.default_tile_shape,
+        default_tile_format=tileset.default_tile_format,
+        extras=tileset.extras,
+    )
+    encoded_tiles: List[_EncodedTile] = list()
+    with ThreadPoolExecutor(max_workers=n_threads) as executor:
+        for tile, array in zip(tileset.tiles(), tile_arrays):
+            encoded_tile = _EncodedTile(
+                tile,
+                Tile.format_tuple_shape_to_dict_shape(array.shape),
+                executor.submit(write_tile, tile, array),
+            )
+            encoded_tiles.append(encoded_tile)
+            encoded_tileset.add_tile(encoded_tile)
+
+        # slicedimage hashes the tiles in order as the workers finish them, so only the tiles that
+        # have been encoded but not yet hashed are held in memory.
+        Writer.write_to_path(
+            encoded_tileset,
+            path,
+            pretty,
+            tile_opener=_written_tile_opener,
+            tile_format=tile_format,
+        )
+
+    _verify_tileset_document(path, encoded_tiles)
+
+
+def _verify_tileset_document(path: pathlib.Path, encoded_tiles: Sequence[_EncodedTile]) -> None:
+    """Check that the tileset document at path lists the files and checksums of encoded_tiles, as
+    they were written by the worker threads."""
+    with open(str(path)) as fh:
+        tile_docs = json.load(fh)[TileSetKeys.TILES]
+    if len(tile_docs) != len(encoded_tiles):
+        raise RuntimeError(
+            f"{path} lists {len(tile_docs)} tiles, but {len(encoded_tiles)} were written")
+    for tile_doc, encoded_tile in zip(tile_docs, encoded_tiles):
+        filename = str(pathlib.Path(encoded_tile.wait()).relative_to(path.parent))
+        if (tile_doc[TileKeys.FILE], tile_doc[TileKeys.SHA256]) != (
+                filename, encoded_tile.checksum):
+            raise RuntimeError(
+                f"{path} lists tile {tile_doc[TileKeys.FILE]} with checksum "
+                f"{tile_doc[TileKeys.SHA256]}, but {filename} was written with checksum "
+                f"{encoded_tile.checksum}")
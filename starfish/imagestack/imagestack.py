@@ -1,4 +1,5 @@
 import collections
+import os
 import warnings
 from copy import deepcopy
 from functools import partial
@@ -25,14 +26,12 @@ import numpy as np
 import pandas as pd
 import skimage.io
 import xarray as xr
-from scipy.ndimage.filters import gaussian_filter
 from skimage import img_as_float32, img_as_uint
 from slicedimage import (
     ImageFormat,
     Reader,
     Tile,
     TileSet,
-    Writer,
 )
 from slicedimage.io import resolve_path_or_url
 from tqdm import tqdm
@@ -43,6 +42,7 @@ from starfish.experiment.builder import build_image, TileFetcher
 from starfish.experiment.builder.defaultproviders import OnesTile, tile_fetcher_factory
 from starfish.imagestack import indexing_utils, physical_coordinate_calculator
 from starfish.imagestack.parser import TileCollectionData, TileKey
+from starfish.imagestack.parser.chunked import ARRAY_METADATA, ChunkedData, write_chunked_store
 from starfish.imagestack.parser.crop import CropParameters, CroppedTileCollectionData
 from starfish.imagestack.parser.numpy import NumpyData
 from starfish.imagestack.parser.tileset import TileSetData
@@ -55,12 +55,18 @@ from starfish.types import (
     Coordinates,
     LOG,
     Number,
+    PHYSICAL_COORDINATE_DIMENSION,
+    PhysicalCoordinateTypes,
     STARFISH_EXTRAS_KEY
 )
-from starfish.util import logging
+from starfish.util import instrumentation, logging
 from starfish.util.dtype import preserve_float_range
+from starfish.util.gaussian import gaussian_filter
+from starfish.util.versions import get_starfish_version
 from ._mp_dataarray import MPDataArray
+from ._tileset_writer import write_tileset
 from .dataorder import AXES_DATA, N_AXES
+from .tile_statistics import N_HISTOGRAM_BINS, TileStatistics
 
 
 class ImageStack:
@@ -104,20 +110,33 @@ class ImageStack:
         return an ImageStack (coordinates preserved) that is the subset described
         by the indexers. The indexers can slice all 5 dimensions of the image tensor.
     export(filepath, tile_opener=None)
-        save the (potentially modified) image tensor to disk
+        save the (potentially modified) image tensor to disk, as a TileSet or a chunked array
+        store
+    tile_statistics(selector, percentiles=(), histogram=False)
+        return cached statistics (min, max, and optionally histogram and percentiles) of a tile
     """
 
     def __init__(
             self,
             tile_data: TileCollectionData,
     ) -> None:
-        axes_sizes = {
-            Axes.ROUND: len(set(tilekey.round for tilekey in tile_data.keys())),
-            Axes.CH: len(set(tilekey.ch for tilekey in tile_data.keys())),
-            Axes.ZPLANE: len(set(tilekey.z for tilekey in tile_data.keys())),
-        }
+        if isinstance(tile_data, NumpyData):
+            axes_labels: Mapping[Axes, Sequence[int]] = {
+                axis: sorted(set(tile_data.index_labels[axis]))
+                for axis in (Axes.ROUND, Axes.CH, Axes.ZPLANE)
+            }
+        else:
+            tile_keys = tile_data.keys()
+            axes_labels = {
+                axis: sorted(set(tilekey[axis] for tilekey in tile_keys))
+                for axis in (Axes.ROUND, Axes.CH, Axes.ZPLANE)
+            }
+        axes_sizes = {axis: len(labels) for axis, labels in axes_labels.items()}
 
         self._tile_data = tile_data
+        self._tile_statistics: MutableMapping[TileKey, TileStatistics] = dict()
+        # key of the memoized run that produced this stack (see starfish.pipeline.memoization)
+        self._memoization_key: Optional[str] = None
 
         # check for existing log info
         if STARFISH_EXTRAS_KEY in tile_data.extras and LOG in tile_data.extras[STARFISH_EXTRAS_KEY]:
@@ -144,8 +163,7 @@ class ImageStack:
 
             data_shape.append(size_for_axis)
             data_dimensions.append(dim_for_axis.value)
-            data_tick_marks[dim_for_axis.value] = list(
-                sorted(set(tilekey[dim_for_axis] for tilekey in self._tile_data.keys())))
+            data_tick_marks[dim_for_axis.value] = list(axes_labels[dim_for_axis])
 
         data_shape.extend([tile_data.tile_shape[Axes.Y], tile_data.tile_shape[Axes.X]])
         data_dimensions.extend([Axes.Y.value, Axes.X.value])
@@ -159,6 +177,10 @@ class ImageStack:
             coords=data_tick_marks,
         )
 
+        if isinstance(tile_data, NumpyData):
+            self._load_numpy_data(tile_data)
+            return
+
         all_selectors = list(self._iter_axes({Axes.ROUND, Axes.CH, Axes.ZPLANE}))
         first_selector = all_selectors[0]
         tile = tile_data.get_tile(r=first_selector[Axes.ROUND],
@@ -214,19 +236,115 @@ class ImageStack:
         if len(tile_dtype_sizes) != 1:
             warnings.warn("Not all tiles have the same precision data", DataFormatWarning)
 
+    def _load_numpy_data(self, tile_data: NumpyData) -> None:
+        """Fill the stack from a NumpyData without going through its tiles.  The array is copied
+        into the shared buffer once, and the coordinates of all the tiles are read at once.  The
+        result is the same as loading each tile with set_slice."""
+        array = tile_data.data
+        if array.dtype != np.float32:
+            array = img_as_float32(array)
+
+        # put the array in the order of the sorted labels, which is where set_slice places tiles.
+        positions = [
+            np.argsort(tile_data.index_labels[axis], kind="mergesort")
+            for axis in (Axes.ROUND, Axes.CH, Axes.ZPLANE)
+        ]
+        if any(np.any(position != np.arange(len(position))) for position in positions):
+            array = array[np.ix_(*positions)]
+
+        tile_mins, tile_maxs = self._validate_data_dtype_and_range(array)
+        np.copyto(self._data.values, array)
+
+        labels = [list(self.axis_labels(axis)) for axis in (Axes.ROUND, Axes.CH, Axes.ZPLANE)]
+        for (r, ch, z), tile_min in np.ndenumerate(tile_mins):
+            tilekey = TileKey(round=labels[0][r], ch=labels[1][ch], zplane=labels[2][z])
+            self._tile_statistics[tilekey] = TileStatistics(
+                float(tile_min), float(tile_maxs[r, ch, z]))
+
+        # the physical coordinates of each tile, indexed by (r, ch, z) in the same order as array
+        if tile_data.coordinates is None:
+            # fake coordinates!
+            tile_coordinates = {
+                coordinate_type: np.full(tile_mins.shape, value)
+                for coordinate_type, value in (
+                    (PhysicalCoordinateTypes.X_MIN, 0.0), (PhysicalCoordinateTypes.X_MAX, 0.001),
+                    (PhysicalCoordinateTypes.Y_MIN, 0.0), (PhysicalCoordinateTypes.Y_MAX, 0.001),
+                    (PhysicalCoordinateTypes.Z_MIN, 0.0), (PhysicalCoordinateTypes.Z_MAX, 0.001),
+                )
+            }
+        else:
+            tile_labels = {
+                axis.value: axis_labels
+                for axis, axis_labels in zip((Axes.ROUND, Axes.CH, Axes.ZPLANE), labels)
+            }
+            tile_coordinates = {
+                coordinate_type: tile_data.coordinates.loc[tile_labels].sel(
+                    {PHYSICAL_COORDINATE_DIMENSION: coordinate_type.value}
+                ).transpose(Axes.ROUND.value, Axes.CH.value, Axes.ZPLANE.value).values
+                for coordinate_type in PhysicalCoordinateTypes
+            }
+
+        for coordinate, axis, min_type, max_type in (
+                (Coordinates.X, Axes.X,
+                 PhysicalCoordinateTypes.X_MIN, PhysicalCoordinateTypes.X_MAX),
+                (Coordinates.Y, Axes.Y,
+                 PhysicalCoordinateTypes.Y_MIN, PhysicalCoordinateTypes.Y_MAX),
+        ):
+            coordinate_min = tile_coordinates[min_type].flat[0]
+            coordinate_max = tile_coordinates[max_type].flat[0]
+            if (np.any(tile_coordinates[min_type] != coordinate_min)
+                    or np.any(tile_coordinates[max_type] != coordinate_max)):
+                raise ValueError(f"Tiles must be aligned")
+            self._data[coordinate.value] = xr.DataArray(
+                np.linspace(coordinate_min, coordinate_max, self.xarray.sizes[axis.value]),
+                dims=axis.value)
+
+        # like loading the tiles one at a time, the z-coordinate of each z-plane is the midpoint of
+        # the z range of the last tile loaded for it, which is in the last round and channel.
+        z_ranges = zip(tile_coordinates[PhysicalCoordinateTypes.Z_MIN][-1, -1],
+                       tile_coordinates[PhysicalCoordinateTypes.Z_MAX][-1, -1])
+        self._data[Coordinates.Z.value] = xr.DataArray(
+            np.array([
+                physical_coordinate_calculator.get_physical_coordinates_of_z_plane(z_range)
+                for z_range in z_ranges
+            ], dtype=float),
+            dims=Axes.ZPLANE.value)
+
     @staticmethod
-    def _validate_data_dtype_and_range(data: Union[np.ndarray, xr.DataArray]) -> None:
-        """verify that data is of dtype float32 and in range [0, 1]"""
+    def _validate_data_dtype_and_range(
+            data: Union[np.ndarray, xr.DataArray]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """verify that data is of dtype float32 and in range [0, 1]
+
+        Returns
+        -------
+        Tuple[np.ndarray, np.ndarray] :
+            The minimum and maximum of each (y, x) tile in data, which are computed to validate the
+            range of the data and may be reused as tile statistics.
+        """
         if data.dtype != np.float32:
             raise TypeError(
                 f"ImageStack data must be of type float32, not {data.dtype}. Please convert data "
                 f"using skimage.img_as_float32 prior to calling set_slice."
             )
-        if np.min(data) < 0 or np.max(data) > 1:
+        tile_mins = np.min(np.asarray(data), axis=(-2, -1))
+        tile_maxs = np.max(np.asarray(data), axis=(-2, -1))
+        if np.min(tile_mins) < 0 or np.max(tile_maxs) > 1:
             raise ValueError(
                 f"ImageStack data must be of type float32 and in the range [0, 1]. Please convert "
                 f"data using skimage.img_as_float32 prior to calling set_slice."
             )
+        return tile_mins, tile_maxs
+
+    def __deepcopy__(self, memo) -> "ImageStack":
+        """Copy the stack.  The copy is not identified by the memoization key of this stack, as it
+        may be modified independently of it."""
+        copied = self.__class__.__new__(self.__class__)
+        memo[id(self)] = copied
+        for name, value in self.__dict__.items():
+            setattr(copied, name, deepcopy(value, memo))
+        copied._memoization_key = None
+        return copied
 
     def __repr__(self):
         shape = ', '.join(f'{k}: {v}' for k, v in self._data.sizes.items())
@@ -303,11 +421,38 @@ class ImageStack:
             Which aligned tile group to load into the Imagestack, only applies if the
             tileset is unaligned. Default 0 (the first group)
         """
+        if os.path.isfile(os.path.join(url_or_path, ARRAY_METADATA)):
+            return cls.from_chunked_store(url_or_path)
         config = StarfishConfig()
         _, relativeurl, baseurl = resolve_path_or_url(url_or_path,
                                                       backend_config=config.slicedimage)
         return cls.from_url(relativeurl, baseurl, aligned_group)
 
+    @classmethod
+    def from_chunked_store(
+            cls,
+            path: str,
+            crop_parameters: Optional[CropParameters]=None,
+    ) -> "ImageStack":
+        """
+        Load an ImageStack from a chunked array store written by :py:meth:`export`.  If
+        crop_parameters is provided, only the chunks that intersect the crop are read.
+
+        Parameters
+        ----------
+        path : str
+            Directory of the store.
+        crop_parameters : Optional[CropParameters]
+            The rounds, channels, zplanes, and x-y region to load.  If this is not provided, the
+            entire stack is loaded.
+
+        Returns
+        -------
+        ImageStack :
+            An ImageStack representing encapsulating the data from the store.
+        """
+        return cls(ChunkedData.from_path(path, crop_parameters))
+
     @classmethod
     def from_numpy_array(
             cls,
@@ -336,9 +481,8 @@ class ImageStack:
         """
         if len(array.shape) != 5:
             raise ValueError('a 5-d tensor with shape (n_round, n_ch, n_z, y, x) must be provided.')
-        try:
-            cls._validate_data_dtype_and_range(array)
-        except TypeError:
+        # the range of the data is validated when it is copied into the ImageStack
+        if array.dtype != np.float32:
             warnings.warn(f"ImageStack detected as {array.dtype}. Converting to float32...")
             array = img_as_float32(array)
 
@@ -400,6 +544,7 @@ class ImageStack:
         stack = deepcopy(self)
         selector = indexing_utils.convert_to_selector(indexers)
         stack._data._data = indexing_utils.index_keep_dimensions(self.xarray, selector)
+        stack._invalidate_tile_statistics()
         return stack
 
     def get_slice(
@@ -548,7 +693,7 @@ class ImageStack:
             >>> stack.set_slice({Axes.ZPLANE: 5, Axes.CH: slice(2, 4)}, new_data)
         """
 
-        self._validate_data_dtype_and_range(data)
+        tile_mins, tile_maxs = self._validate_data_dtype_and_range(data)
 
         slice_list, expected_axes = self._build_slice_list(selector)
 
@@ -571,12 +716,95 @@ class ImageStack:
 
         if len(move_src) != 0:
             data = np.moveaxis(data, move_src, move_dst)
+            tile_mins = np.moveaxis(tile_mins, move_src, move_dst)
+            tile_maxs = np.moveaxis(tile_maxs, move_src, move_dst)
 
-        if self._data.loc[slice_list].shape != data.shape:
+        destination = self._data.loc[slice_list]
+        if destination.shape != data.shape:
             raise ValueError("source shape {} mismatches destination shape {}".format(
                 data.shape, self._data[slice_list].shape))
 
         self._data.loc[slice_list] = data
+        self._memoization_key = None
+
+        # the minimum and maximum of each tile were computed during validation, so they replace
+        # any cached statistics of the tiles that were just written.
+        fixed_labels = {
+            axis: int(destination.coords[axis.value])
+            for axis in AXES_DATA.keys()
+            if axis not in expected_axes
+        }
+        axes_labels = [destination.coords[axis.value].values for axis in expected_axes]
+        for tile_index in np.ndindex(*tile_mins.shape):
+            labels = dict(fixed_labels)
+            for axis, axis_labels, ix in zip(expected_axes, axes_labels, tile_index):
+                labels[axis] = int(axis_labels[ix])
+            self._tile_statistics[self._tilekey(labels)] = TileStatistics(
+                float(tile_mins[tile_index]), float(tile_maxs[tile_index]))
+
+    @staticmethod
+    def _tilekey(selector: Mapping[Axes, int]) -> TileKey:
+        return TileKey(
+            round=selector[Axes.ROUND], ch=selector[Axes.CH], zplane=selector[Axes.ZPLANE])
+
+    def tile_statistics(
+            self,
+            selector: Mapping[Axes, int],
+            percentiles: Iterable[Number]=(),
+            histogram: bool=False,
+    ) -> TileStatistics:
+        """
+        Return the statistics of a single (y, x) tile.  Statistics are computed lazily and cached
+        until the tile is written by :py:meth:`set_slice` or :py:meth:`apply`.  The minimum and
+        maximum of each tile are recorded whenever a tile is written by set_slice, so they are
+        available without another pass over the data.
+
+        Writes made directly to :py:attr:`xarray` bypass the cache.
+
+        Parameters
+        ----------
+        selector : Mapping[Axes, int]
+            The round, channel, and zplane of the tile.
+        percentiles : Iterable[Number]
+            Percentiles of the tile to compute if they are not already cached.
+        histogram : bool
+            If True, compute the histogram of the tile if it is not already cached.
+
+        Returns
+        -------
+        TileStatistics :
+            The statistics of the tile.
+        """
+        tilekey = self._tilekey(selector)
+        statistics = self._tile_statistics.get(tilekey)
+        missing_percentiles = [
+            p for p in percentiles if statistics is None or statistics.percentile(p) is None]
+        if (statistics is not None
+                and len(missing_percentiles) == 0
+                and (not histogram or statistics.histogram is not None)):
+            return statistics
+
+        tile, _ = self.get_slice(selector)
+        if statistics is None:
+            statistics = TileStatistics.from_tile(tile)
+        if len(missing_percentiles) != 0:
+            for p, value in zip(missing_percentiles, np.percentile(tile, missing_percentiles)):
+                statistics.add_percentile(p, value)
+        if histogram and statistics.histogram is None:
+            statistics.histogram, _ = np.histogram(tile, bins=N_HISTOGRAM_BINS, range=(0, 1))
+
+        self._tile_statistics[tilekey] = statistics
+        return statistics
+
+    def _cached_tile_statistics(self) -> Mapping[TileKey, TileStatistics]:
+        """Return the tile statistics that have already been computed, without computing any."""
+        return dict(self._tile_statistics)
+
+    def _invalidate_tile_statistics(self) -> None:
+        """Discard all cached tile statistics, and the memoization key.  Called whenever the data
+        may have changed."""
+        self._tile_statistics.clear()
+        self._memoization_key = None
 
     @staticmethod
     def _build_slice_list(
@@ -696,17 +924,24 @@ class ImageStack:
         # data are clipped or scaled by chunk using preserve_float_range if clip_method != 2
         bound_func = partial(ImageStack._in_place_apply, func, clip_method=clip_method)
 
+        # every tile is about to be rewritten.
+        self._invalidate_tile_statistics()
+
         # execute the processing workflow
-        self.transform(
+        results = self.transform(
             func=bound_func,
             group_by=group_by,
             verbose=verbose,
             n_processes=n_processes,
             **kwargs)
 
-        # scale based on values of whole image
+        # scale based on values of whole image.  Each worker returns the maximum of its chunk, so
+        # the image does not need to be scanned again.
         if clip_method == Clip.SCALE_BY_IMAGE:
-            self._data = preserve_float_range(self._data, rescale=True)
+            image_max = max(chunk_max for chunk_max, _ in results)
+            if image_max > 1:
+                data = self.xarray.values
+                np.divide(data, image_max, out=data)
 
         return self
 
@@ -714,14 +949,20 @@ class ImageStack:
     def _in_place_apply(
         apply_func: Callable[..., Union[xr.DataArray, np.ndarray]], data: np.ndarray,
         clip_method: Union[str, Clip], **kwargs
-    ) -> None:
+    ) -> Optional[float]:
         result = apply_func(data, **kwargs)
         if clip_method == Clip.CLIP:
             data[:] = preserve_float_range(result, rescale=False)
         elif clip_method == Clip.SCALE_BY_CHUNK:
             data[:] = preserve_float_range(result, rescale=True)
         else:
+            # negative values are clipped here, but values above 1 can only be scaled once the
+            # maximum of the whole image is known, so return the maximum of this chunk.
             data[:] = result
+            values = np.asarray(data)
+            np.maximum(values, 0, out=values)
+            return float(values.max())
+        return None
 
     def transform(
             self,
@@ -767,8 +1008,10 @@ class ImageStack:
         if verbose and StarfishConfig().verbose:
             selectors_and_slice_lists = tqdm(selectors_and_slice_lists)
 
+        # each tile is timed, and the timings are recorded in the profile of the running algorithm
         mp_applyfunc: Callable = partial(
-            self._processing_workflow, partial(func, **kwargs))
+            instrumentation.timed_call,
+            partial(self._processing_workflow, partial(func, **kwargs)))
 
         with Pool(
                 processes=n_processes,
@@ -776,11 +1019,19 @@ class ImageStack:
                 initargs=((self._data._backing_mp_array,
                            self._data._data.shape,
                            self._data._data.dtype),)) as pool:
-            results = pool.imap(mp_applyfunc, selectors_and_slice_lists)
+            timed_results = pool.imap(mp_applyfunc, selectors_and_slice_lists)
 
             # Note: results is [None, ...] if executing an in-place workflow
-            # Note: this return must be inside the context manager or the Pool will deadlock
-            return list(zip(results, selectors))
+            # Note: this must be inside the context manager or the Pool will deadlock
+            results: Tuple[Any, ...]
+            timings: Tuple[instrumentation.TileTiming, ...]
+            if len(selectors) > 0:
+                results, timings = zip(*timed_results)
+            else:
+                results, timings = (), ()
+
+        instrumentation.record_tiles(selectors, timings)
+        return list(zip(results, selectors))
 
     @staticmethod
     def _processing_workflow(
@@ -803,7 +1054,13 @@ class ImageStack:
             data=unshaped_numpy_array.reshape(shape),
             dims=dims,
         )
-        sliced = data_array.sel(selector_and_slice_list[0])
+        selector = selector_and_slice_list[0]
+        sliced = data_array.sel(selector)
+
+        # label the chunk with the round, channel, and zplane it was selected from, so that workers
+        # can look up per-tile data, such as cached tile statistics.
+        sliced = sliced.assign_coords(
+            **{axis.value: label for axis, label in selector.items()})
 
         # pass worker_callable a view into the backing array, which will be overwritten
         return worker_callable(sliced)  # type: ignore
@@ -879,21 +1136,26 @@ class ImageStack:
         """
         return self._log
 
-    def update_log(self, class_instance) -> None:
+    def update_log(self, class_instance, profile: Optional[Mapping[str, Any]]=None) -> None:
         """
         Adds a new entry to the log list.
 
         Parameters
         ----------
         class_instance: The instance of a class being applied to the imagestack
+        profile: Optional[Mapping[str, Any]]
+            Timing and memory usage of the run of class_instance (see
+            :py:mod:`starfish.util.instrumentation`)
         """
         entry = {"method": class_instance.__class__.__name__,
                  "arguments": class_instance.__dict__,
                  "os": logging.get_os_info(),
                  "dependencies": logging.get_core_dependency_info(),
                  "release tag": logging.get_release_tag(),
-                 "starfish version": logging.get_dependency_version('starfish')
+                 "starfish version": get_starfish_version()
                  }
+        if profile is not None:
+            entry[instrumentation.PROFILE] = profile
         self._log.append(entry)
 
     @property
@@ -984,20 +1246,50 @@ class ImageStack:
     def export(self,
                filepath: str,
                tile_opener=None,
-               tile_format: ImageFormat=ImageFormat.NUMPY) -> None:
-        """write the image tensor to disk in spaceTx format
+               tile_format: ImageFormat=ImageFormat.NUMPY,
+               compression_level: int=0,
+               n_threads: Optional[int]=None,
+               chunks: Optional[Sequence[int]]=None) -> None:
+        """write the image tensor to disk in spaceTx format, or as a chunked array store if
+        filepath ends with ".zarr"
 
         Parameters
         ----------
         filepath : str
-            Path + prefix for the images and primary_images.json written by this function
+            Path + prefix for the images and primary_images.json written by this function.  If it
+            ends with ".zarr", the image tensor is instead written to a chunked array store in this
+            directory, in the layout of a zarr array, which can be loaded (or cropped at load time)
+            with :py:meth:`from_chunked_store`.
         tile_opener : TODO ttung: doc me.
         tile_format : ImageFormat
-            Format in which each 2D plane should be written.
+            Format in which each 2D plane should be written.  Not used by chunked array stores.
+        compression_level : int
+            If greater than 0, compress each 2D plane losslessly (with deflate) at this level, up to
+            9.  Only TIFF planes and chunked array stores can be compressed.  Uncompressed chunked
+            array stores are memory-mapped when they are read.
+        n_threads : Optional[int]
+            Number of threads that encode and write the 2D planes (or chunks) concurrently.  If
+            None, this is chosen by concurrent.futures.ThreadPoolExecutor.
+        chunks : Optional[Sequence[int]]
+            The (round, ch, zplane, y, x) shape of each chunk of a chunked array store.  If this is
+            not provided, each chunk is a block of up to 512x512 pixels of a single 2D plane.
 
         """
         # Add log data to extras
         self._tile_data.extras[STARFISH_EXTRAS_KEY] = logging.LogEncoder().encode({LOG: self.log})
+
+        if filepath.endswith(".zarr"):
+            write_chunked_store(
+                filepath,
+                self.xarray,
+                self._tile_data.extras,
+                {tilekey: self._tile_data[tilekey] for tilekey in self._tile_data.keys()},
+                chunks=chunks,
+                compression_level=compression_level,
+                n_threads=n_threads,
+            )
+            return
+
         tileset = TileSet(
             dimensions={
                 Axes.ROUND,
@@ -1014,6 +1306,24 @@ class ImageStack:
             default_tile_shape={Axes.Y: self.tile_shape[0], Axes.X: self.tile_shape[1]},
             extras=self._tile_data.extras,
         )
+
+        # the x and y coordinates are the same for every tile, and the z coordinate only depends on
+        # the zplane, so they are looked up once rather than once per tile.
+        x_coordinates = (float(self.xarray[Coordinates.X.value][0]),
+                         float(self.xarray[Coordinates.X.value][-1]))
+        y_coordinates = (float(self.xarray[Coordinates.Y.value][0]),
+                         float(self.xarray[Coordinates.Y.value][-1]))
+        z_coordinates: Optional[np.ndarray] = None
+        if Coordinates.Z in self.xarray.coords:
+            z_coordinates = self.xarray[Coordinates.Z.value].values
+
+        # tiles are read straight from the array, by the position of their labels on each axis.
+        positions = {
+            axis: {label: ix for ix, label in enumerate(self.axis_labels(axis))}
+            for axis in (Axes.ROUND, Axes.CH, Axes.ZPLANE)
+        }
+        data = self.xarray.values
+        tile_arrays: MutableSequence[np.ndarray] = []
         for tilekey in self._tile_data.keys():
             round_, ch, zplane = tilekey.round, tilekey.ch, tilekey.z
             extras: dict = self._tile_data[tilekey]
@@ -1025,26 +1335,22 @@ class ImageStack:
             }
 
             coordinates: MutableMapping[Coordinates, Union[Tuple[Number, Number], Number]] = dict()
-            x_coordinates = (float(self.xarray[Coordinates.X.value][0]),
-                             float(self.xarray[Coordinates.X.value][-1]))
-            y_coordinates = (float(self.xarray[Coordinates.Y.value][0]),
-                             float(self.xarray[Coordinates.Y.value][-1]))
             coordinates[Coordinates.X] = x_coordinates
             coordinates[Coordinates.Y] = y_coordinates
-            if Coordinates.Z in self.xarray.coords:
+            if z_coordinates is not None:
                 # set the z coord to the calculated value from the associated z plane
-                z_coordinates = float(self.xarray[Coordinates.Z.value][zplane])
-                coordinates[Coordinates.Z] = z_coordinates
+                coordinates[Coordinates.Z] = float(z_coordinates[zplane])
 
-            tile = Tile(
+            tileset.add_tile(Tile(
                 coordinates=coordinates,
                 indices=selector,
                 extras=extras,
-            )
-            tile.numpy_array, _ = self.get_slice(
-                selector={Axes.ROUND: round_, Axes.CH: ch, Axes.ZPLANE: zplane}
-            )
-            tileset.add_tile(tile)
+            ))
+            tile_arrays.append(data[
+                positions[Axes.ROUND][round_],
+                positions[Axes.CH][ch],
+                positions[Axes.ZPLANE][zplane],
+            ])
 
         if tile_opener is None:
             def tile_opener(tileset_path: Path, tile, ext):
@@ -1066,12 +1372,15 @@ class ImageStack:
 
         if not filepath.endswith('.json'):
             filepath += '.json'
-        Writer.write_to_path(
+        write_tileset(
             tileset,
-            filepath,
-            pretty=True,
+            tile_arrays,
+            Path(filepath),
             tile_opener=tile_opener,
-            tile_format=tile_format)
+            tile_format=tile_format,
+            compression_level=compression_level,
+            n_threads=n_threads,
+        )
 
     def max_proj(self, *dims: Axes) -> "ImageStack":
         """return a max projection over one or more axis of the image tensor
@@ -1087,10 +1396,9 @@ class ImageStack:
             max projection
 
         """
-        max_projection = self._data.max([dim.value for dim in dims])
-        max_projection = max_projection.expand_dims(tuple(dim.value for dim in dims))
-        max_projection = max_projection.transpose(*self.xarray.dims)
-        max_proj_stack = self.from_numpy_array(max_projection.values)
+        axes = tuple(self.xarray.dims.index(dim.value) for dim in dims)
+        max_projection = np.max(self.xarray.values, axis=axes, keepdims=True)
+        max_proj_stack = self.from_numpy_array(max_projection)
         return max_proj_stack
 
     def _squeezed_numpy(self, *dims: Axes):
@@ -0,0 +1,224 @@
+"""
+This module reads and writes ImageStacks in a chunked array store (see
+:py:class:`ChunkedArrayStore`).  Unlike a TileSet, where each 2D plane is a file that must be read
+in its entirety, a chunked store can be cropped at load time by reading only the chunks that
+intersect the crop.
+
+The metadata of the ImageStack is stored in the attributes of the array, under the "starfish" key:
+
+- "index_labels": the labels of the round, ch, and zplane axes.
+- "coordinates": the range of the x and y coordinates, and the z coordinate of each zplane.
+- "extras": the extras of the ImageStack, including its log.
+- "tile_extras": the extras of each tile that has any, as [round, ch, zplane, extras].
+
+The names of the axes are also stored under "_ARRAY_DIMENSIONS", as xarray does for zarr arrays.
+"""
+from typing import Collection, Mapping, MutableMapping, Optional, Sequence, Tuple
+
+import numpy as np
+import xarray as xr
+
+from starfish.imagestack.parser import TileCollectionData, TileData, TileKey
+from starfish.imagestack.parser.crop import CropParameters
+from starfish.types import Axes, Coordinates, Number
+from ._store import ARRAY_METADATA, ChunkedArrayStore, MAX_COMPRESSION_LEVEL
+
+STARFISH_ATTRIBUTES = "starfish"
+DEFAULT_TILE_CHUNK_SIZE = 512
+"""The default size of the chunks along the y and x axes."""
+
+_INDEX_AXES = (Axes.ROUND, Axes.CH, Axes.ZPLANE)
+
+
+class ChunkedTileData(TileData):
+    """
+    This is a specialization of :py:class:`starfish.imagestack.parser.TileData` for serving data
+    about a single tile from a chunked array store.  The data is only read when it is requested,
+    and only the region of the tile within the crop is read.
+    """
+    def __init__(
+            self,
+            store: ChunkedArrayStore,
+            position: Tuple[int, int, int],
+            bounds: Tuple[Tuple[int, int], Tuple[int, int]],
+            coordinates: Mapping[Coordinates, Tuple[Number, Number]],
+            selector: Mapping[Axes, int],
+    ) -> None:
+        self._store = store
+        self._position = position
+        self._bounds = bounds
+        self._coordinates = coordinates
+        self._selector = selector
+
+    @property
+    def tile_shape(self) -> Mapping[Axes, int]:
+        (y_start, y_stop), (x_start, x_stop) = self._bounds
+        return {Axes.Y: y_stop - y_start, Axes.X: x_stop - x_start}
+
+    @property
+    def numpy_array(self) -> np.ndarray:
+        selection = tuple(slice(ix, ix + 1) for ix in self._position) + tuple(
+            slice(start, stop) for start, stop in self._bounds)
+        return self._store.read(selection)[0, 0, 0]
+
+    @property
+    def coordinates(self) -> Mapping[Coordinates, Tuple[Number, Number]]:
+        return self._coordinates
+
+    @property
+    def selector(self) -> Mapping[Axes, int]:
+        return self._selector
+
+
+class ChunkedData(TileCollectionData):
+    """
+    This is a specialization of :py:class:`starfish.imagestack.parser.TileCollectionData` for
+    serving tile data from a chunked array store.
+    """
+    def __init__(
+            self,
+            store: ChunkedArrayStore,
+            crop_parameters: Optional[CropParameters]=None,
+    ) -> None:
+        self._store = store
+        self._crop_parameters = crop_parameters or CropParameters()
+
+        attrs = store.attrs[STARFISH_ATTRIBUTES]
+        self._index_labels: Mapping[Axes, Sequence[int]] = {
+            axis: attrs["index_labels"][axis.value] for axis in _INDEX_AXES}
+        self._coordinates = attrs["coordinates"]
+        self._extras: dict = attrs["extras"]
+        self._tile_extras: MutableMapping[Tuple[int, int, int], dict] = {
+            (round_, ch, zplane): extras
+            for round_, ch, zplane, extras in attrs["tile_extras"]
+        }
+
+        height, width = store.shape[-2:]
+        self._full_tile_shape = {Axes.Y: height, Axes.X: width}
+        y_start, y_stop = CropParameters._crop_axis(height, self._crop_parameters._y_slice)
+        x_start, x_stop = CropParameters._crop_axis(width, self._crop_parameters._x_slice)
+        self._bounds = ((y_start, y_stop), (x_start, x_stop))
+
+    @classmethod
+    def from_path(
+            cls, path: str, crop_parameters: Optional[CropParameters]=None) -> "ChunkedData":
+        return cls(ChunkedArrayStore(path), crop_parameters)
+
+    def __getitem__(self, tilekey: TileKey) -> dict:
+        """Returns the extras metadata for a given tile, addressed by its TileKey"""
+        return self._tile_extras.get((tilekey.round, tilekey.ch, tilekey.z), {})
+
+    def keys(self) -> Collection[TileKey]:
+        """Returns a Collection of the TileKey's for all the tiles."""
+        keys = [
+            TileKey(round=round_, ch=ch, zplane=zplane)
+            for round_ in self._index_labels[Axes.ROUND]
+            for ch in self._index_labels[Axes.CH]
+            for zplane in self._index_labels[Axes.ZPLANE]
+        ]
+        return self._crop_parameters.filter_tilekeys(keys)
+
+    @property
+    def tile_shape(self) -> Mapping[Axes, int]:
+        return self._crop_parameters.crop_shape(self._full_tile_shape)
+
+    @property
+    def extras(self) -> dict:
+        """Returns the extras metadata for the TileSet."""
+        return self._extras
+
+    def get_tile_by_key(self, tilekey: TileKey) -> TileData:
+        return self.get_tile(tilekey.round, tilekey.ch, tilekey.z)
+
+    def get_tile(self, r: int, ch: int, z: int) -> TileData:
+        pos_r = self._index_labels[Axes.ROUND].index(r)
+        pos_ch = self._index_labels[Axes.CH].index(ch)
+        pos_z = self._index_labels[Axes.ZPLANE].index(z)
+
+        (xmin, xmax), (ymin, ymax) = (
+            self._coordinates[Coordinates.X.value], self._coordinates[Coordinates.Y.value])
+        coordinates: MutableMapping[Coordinates, Tuple[Number, Number]] = {
+            Coordinates.X: (xmin, xmax),
+            Coordinates.Y: (ymin, ymax),
+        }
+        if Coordinates.Z.value in self._coordinates:
+            # the z coordinate of a zplane is stored as a single value.
+            zplane_coordinate = self._coordinates[Coordinates.Z.value][pos_z]
+            coordinates[Coordinates.Z] = (zplane_coordinate, zplane_coordinate)
+
+        return ChunkedTileData(
+            self._store,
+            (pos_r, pos_ch, pos_z),
+            self._bounds,
+            self._crop_parameters.crop_coordinates(coordinates, self._full_tile_shape),
+            {Axes.ROUND: r, Axes.CH: ch, Axes.ZPLANE: z},
+        )
+
+
+def write_chunked_store(
+        path: str,
+        data: xr.DataArray,
+        extras: dict,
+        tile_extras: Mapping[TileKey, dict],
+        chunks: Optional[Sequence[int]]=None,
+        compression_level: int=1,
+        n_threads: Optional[int]=None,
+) -> ChunkedArrayStore:
+    """
+    Write the data of an ImageStack to a chunked array store.
+
+    Parameters
+    ----------
+    path : str
+        Directory of the store.
+    data : xr.DataArray
+        The (round, ch, zplane, y, x) data of the ImageStack, with its coordinates.
+    extras : dict
+        The extras of the ImageStack.
+    tile_extras : Mapping[TileKey, dict]
+        The extras of each tile.
+    chunks : Optional[Sequence[int]]
+        The (round, ch, zplane, y, x) shape of each chunk.  If this is not provided, each chunk is
+        a block of up to :py:data:`DEFAULT_TILE_CHUNK_SIZE` by :py:data:`DEFAULT_TILE_CHUNK_SIZE`
+        pixels of a single 2D plane.
+    compression_level : int
+        zlib compression level of the chunks, from 0 (uncompressed) to
+        :py:data:`MAX_COMPRESSION_LEVEL`.
+    n_threads : Optional[int]
+        Number of threads that encode and write the chunks concurrently.  If None, this is chosen
+        by concurrent.futures.ThreadPoolExecutor.
+    """
+    if chunks is None:
+        chunks = (1, 1, 1, DEFAULT_TILE_CHUNK_SIZE, DEFAULT_TILE_CHUNK_SIZE)
+
+    coordinates = {
+        Coordinates.X.value: [float(data[Coordinates.X.value][0]),
+                              float(data[Coordinates.X.value][-1])],
+        Coordinates.Y.value: [float(data[Coordinates.Y.value][0]),
+                              float(data[Coordinates.Y.value][-1])],
+    }
+    if Coordinates.Z.value in data.coords:
+        coordinates[Coordinates.Z.value] = [
+            float(value) for value in data[Coordinates.Z.value].values]
+
+    attrs = {
+        "_ARRAY_DIMENSIONS": list(data.dims),
+        STARFISH_ATTRIBUTES: {
+            "index_labels": {
+                axis.value: [int(label) for label in data[axis.value].values]
+                for axis in _INDEX_AXES
+            },
+            "coordinates": coordinates,
+            "extras": extras,
+            "tile_extras": [
+                [tilekey.round, tilekey.ch, tilekey.z, tile_extra]
+                for tilekey, tile_extra in tile_extras.items()
+                if len(tile_extra) != 0
+            ],
+        },
+    }
+
+    store = ChunkedArrayStore.create(
+        path, data.shape, chunks, data.dtype, compression_level=compression_level, attrs=attrs)
+    store.write(data.values, n_threads=n_threads)
+    return store
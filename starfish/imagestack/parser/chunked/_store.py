@@ -0,0 +1,237 @@
+"""
+A chunked, compressed N-dimensional array stored in a local directory.
+
+The layout is that of a zarr (version 2) array in a directory store, so stores written here can be
+opened with ``zarr.open(path)``:
+
+- ``.zarray`` is a json document describing the shape, chunk shape, dtype, and compressor of the
+  array.
+- ``.zattrs`` is a json document of user metadata.
+- Each chunk is stored in a file named by its position in the grid of chunks, e.g. ``0.1.0.2.3``.
+  Chunks at the edges of the array are padded to the full chunk shape.  Chunks are either
+  compressed with zlib, or stored uncompressed, in which case they are memory-mapped when read so
+  that reading part of a chunk only reads the pages it covers.  A missing chunk is filled with the
+  fill value.
+"""
+import itertools
+import json
+import os
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterator, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+ARRAY_METADATA = ".zarray"
+ATTRIBUTES = ".zattrs"
+ZARR_FORMAT = 2
+MAX_COMPRESSION_LEVEL = 9
+
+
+class ChunkedArrayStore:
+    def __init__(self, path: str) -> None:
+        """Open an existing store.  Use :py:meth:`create` to create a new one.
+
+        Parameters
+        ----------
+        path : str
+            Directory of the store.
+        """
+        self.path = path
+        with open(os.path.join(path, ARRAY_METADATA)) as fh:
+            metadata = json.load(fh)
+        if metadata["zarr_format"] != ZARR_FORMAT:
+            raise ValueError(f"unsupported zarr format {metadata['zarr_format']}")
+        if metadata["order"] != "C" or metadata.get("filters") is not None:
+            raise ValueError("only C-ordered arrays without filters are supported")
+        compressor = metadata["compressor"]
+        if compressor is not None and compressor["id"] != "zlib":
+            raise ValueError(f"unsupported compressor {compressor['id']}")
+
+        self.shape: Tuple[int, ...] = tuple(metadata["shape"])
+        self.chunks: Tuple[int, ...] = tuple(metadata["chunks"])
+        self.dtype = np.dtype(metadata["dtype"])
+        self.fill_value = metadata["fill_value"]
+        self.compression_level: int = compressor["level"] if compressor is not None else 0
+
+    @classmethod
+    def create(
+            cls,
+            path: str,
+            shape: Sequence[int],
+            chunks: Sequence[int],
+            dtype,
+            compression_level: int=1,
+            attrs: Optional[Mapping[str, Any]]=None,
+    ) -> "ChunkedArrayStore":
+        """Create an empty store, replacing the metadata of any store already in the directory.
+
+        Parameters
+        ----------
+        path : str
+            Directory of the store.  It is created if it does not exist.
+        shape : Sequence[int]
+            Shape of the array.
+        chunks : Sequence[int]
+            Shape of each chunk.
+        dtype :
+            Type of the array.
+        compression_level : int
+            zlib compression level of the chunks, from 0 (uncompressed, and memory-mapped when read)
+            to 9.
+        attrs : Optional[Mapping[str, Any]]
+            json-serializable metadata stored with the array.
+        """
+        if len(shape) != len(chunks):
+            raise ValueError(f"chunks {chunks} do not match the shape {shape}")
+        if not 0 <= compression_level <= MAX_COMPRESSION_LEVEL:
+            raise ValueError(
+                f"compression_level must be between 0 and {MAX_COMPRESSION_LEVEL}, "
+                f"not {compression_level}")
+
+        os.makedirs(path, exist_ok=True)
+        dtype = np.dtype(dtype)
+        metadata = {
+            "zarr_format": ZARR_FORMAT,
+            "shape": [int(size) for size in shape],
+            "chunks": [max(1, min(int(chunk), int(size))) for chunk, size in zip(chunks, shape)],
+            "dtype": dtype.str,
+            "compressor": (
+                {"id": "zlib", "level": compression_level} if compression_level > 0 else None),
+            "fill_value": 0,
+            "order": "C",
+            "filters": None,
+        }
+        with open(os.path.join(path, ARRAY_METADATA), "w") as fh:
+            json.dump(metadata, fh, indent=4)
+        store = cls(path)
+        store.attrs = dict(attrs or {})
+        return store
+
+    @property
+    def attrs(self) -> Mapping[str, Any]:
+        """The metadata stored with the array."""
+        attrs_path = os.path.join(self.path, ATTRIBUTES)
+        if not os.path.exists(attrs_path):
+            return {}
+        with open(attrs_path) as fh:
+            return json.load(fh)
+
+    @attrs.setter
+    def attrs(self, attrs: Mapping[str, Any]) -> None:
+        with open(os.path.join(self.path, ATTRIBUTES), "w") as fh:
+            json.dump(attrs, fh, indent=4, sort_keys=True)
+
+    @property
+    def chunk_grid(self) -> Tuple[int, ...]:
+        """Number of chunks along each axis."""
+        return tuple(-(-size // chunk) for size, chunk in zip(self.shape, self.chunks))
+
+    def _chunk_path(self, chunk_index: Sequence[int]) -> str:
+        return os.path.join(self.path, ".".join(str(ix) for ix in chunk_index))
+
+    def _chunk_bounds(self, chunk_index: Sequence[int]) -> Tuple[Tuple[int, int], ...]:
+        """The (start, stop) bounds along each axis of the region of the array covered by a chunk,
+        excluding its padding."""
+        return tuple(
+            (ix * chunk, min((ix + 1) * chunk, size))
+            for ix, chunk, size in zip(chunk_index, self.chunks, self.shape))
+
+    def _chunk_region(self, chunk_index: Sequence[int]) -> Tuple[slice, ...]:
+        """The region of the array covered by a chunk, excluding its padding."""
+        return tuple(slice(start, stop) for start, stop in self._chunk_bounds(chunk_index))
+
+    def _read_chunk(self, chunk_index: Sequence[int]) -> np.ndarray:
+        """Read a whole chunk, including its padding.  Uncompressed chunks are memory-mapped."""
+        chunk_path = self._chunk_path(chunk_index)
+        if not os.path.exists(chunk_path):
+            return np.full(self.chunks, self.fill_value, dtype=self.dtype)
+        if self.compression_level == 0:
+            return np.memmap(chunk_path, dtype=self.dtype, mode="r", shape=self.chunks)
+        with open(chunk_path, "rb") as fh:
+            encoded = fh.read()
+        return np.frombuffer(zlib.decompress(encoded), dtype=self.dtype).reshape(self.chunks)
+
+    def _write_chunk(self, chunk_index: Sequence[int], data: np.ndarray) -> None:
+        """Write the part of the array covered by a chunk, padding it to the full chunk shape."""
+        if data.shape != self.chunks:
+            padded = np.full(self.chunks, self.fill_value, dtype=self.dtype)
+            padded[tuple(slice(0, size) for size in data.shape)] = data
+            data = padded
+        encoded = np.ascontiguousarray(data, dtype=self.dtype).tobytes()
+        if self.compression_level > 0:
+            encoded = zlib.compress(encoded, self.compression_level)
+
+        # write to a temporary file first so that readers never see a partial chunk.
+        chunk_path = self._chunk_path(chunk_index)
+        temporary_path = f"{chunk_path}.{os.getpid()}.{id(data)}.partial"
+        with open(temporary_path, "wb") as fh:
+            fh.write(encoded)
+        os.replace(temporary_path, chunk_path)
+
+    def _chunks_in(self, bounds: Sequence[Tuple[int, int]]) -> Iterator[Tuple[int, ...]]:
+        """Indices of the chunks that intersect a region, given by its (start, stop) bounds along
+        each axis."""
+        return itertools.product(*(
+            range(start // chunk, -(-stop // chunk))
+            for (start, stop), chunk in zip(bounds, self.chunks)))
+
+    def _normalize(self, selection: Sequence[slice]) -> Tuple[Tuple[int, int], ...]:
+        """The (start, stop) bounds along each axis of the region selected by selection."""
+        selection = tuple(selection) + (slice(None),) * (len(self.shape) - len(selection))
+        bounds = []
+        for axis_slice, size in zip(selection, self.shape):
+            start, stop, step = axis_slice.indices(size)
+            if step != 1:
+                raise ValueError("only contiguous regions can be read")
+            bounds.append((start, max(start, stop)))
+        return tuple(bounds)
+
+    def read(self, selection: Sequence[slice]=()) -> np.ndarray:
+        """Read a region of the array.  Only the chunks that intersect the region are read.
+
+        Parameters
+        ----------
+        selection : Sequence[slice]
+            A contiguous slice for each of the leading axes of the array.  Axes that are not
+            included are read in their entirety.
+
+        Returns
+        -------
+        np.ndarray :
+            The region of the array.
+        """
+        bounds = self._normalize(selection)
+        result = np.empty([stop - start for start, stop in bounds], dtype=self.dtype)
+        for chunk_index in self._chunks_in(bounds):
+            result_region = []
+            chunk_region = []
+            for (start, stop), (chunk_start, chunk_stop) in zip(
+                    bounds, self._chunk_bounds(chunk_index)):
+                overlap_start, overlap_stop = max(start, chunk_start), min(stop, chunk_stop)
+                result_region.append(slice(overlap_start - start, overlap_stop - start))
+                chunk_region.append(slice(overlap_start - chunk_start, overlap_stop - chunk_start))
+            chunk = self._read_chunk(chunk_index)
+            result[tuple(result_region)] = chunk[tuple(chunk_region)]
+        return result
+
+    def write(self, array: np.ndarray, n_threads: Optional[int]=None) -> None:
+        """Write the entire array, encoding and writing its chunks concurrently.
+
+        Parameters
+        ----------
+        array : np.ndarray
+            Data with the shape of the store.
+        n_threads : Optional[int]
+            Number of threads that encode and write chunks.  If None, this is chosen by
+            concurrent.futures.ThreadPoolExecutor.
+        """
+        if array.shape != self.shape:
+            raise ValueError(f"array of shape {array.shape} does not match the store {self.shape}")
+
+        def write_chunk(chunk_index: Tuple[int, ...]) -> None:
+            self._write_chunk(chunk_index, array[self._chunk_region(chunk_index)])
+
+        with ThreadPoolExecutor(max_workers=n_threads) as executor:
+            # consume the results so that errors are raised.
+            list(executor.map(write_chunk, itertools.product(*map(range, self.chunk_grid))))
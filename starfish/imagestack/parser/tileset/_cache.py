@@ -0,0 +1,185 @@
+"""
+A cache of decoded tiles, shared by every TileSetData in the process.
+
+Reading a tile from a TileSet decodes its file (e.g., a TIFF) every time, so loading the same field
+of view more than once, whether to load another aligned group, a different crop, or to re-run a
+notebook, decodes every tile again.  The slicedimage cache only avoids downloading the encoded
+files again.
+
+Decoded tiles are cached in memory, keyed by the sha256 checksum of their encoded file, and the
+least recently used tiles are evicted once the cache exceeds its size limit.  Optionally, decoded
+tiles are also written to a directory as uncompressed .npy files, which are memory-mapped when
+they are read, so later processes read tiles without decoding them.  The cache is configured
+through :py:class:`starfish.config.StarfishConfig` (["tile_cache"]).
+
+The cache is disabled unless a size limit is configured: cached tiles outlive the ImageStacks that
+loaded them, and every worker process keeps a cache of its own.
+
+Cached arrays are read-only, as they are shared by every ImageStack that loads the tile.
+"""
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, MutableMapping, Optional, Tuple
+
+import numpy as np
+
+from starfish.config import StarfishConfig
+
+
+class DecodedTileCache:
+    """
+    A thread-safe LRU cache of decoded tiles, bounded by the number of bytes of the tiles.
+
+    Parameters
+    ----------
+    size_limit : int
+        Maximum number of bytes of tiles cached in memory.  If 0, tiles are not cached in memory.
+    directory : Optional[str]
+        If provided, decoded tiles are also stored in this directory, and memory-mapped when they
+        are read.
+    disk_size_limit : int
+        Maximum number of bytes of tiles stored in the directory.  The tiles that were least
+        recently used are removed first.
+    """
+    def __init__(
+            self,
+            size_limit: int,
+            directory: Optional[str]=None,
+            disk_size_limit: int=0,
+    ) -> None:
+        self.size_limit = size_limit
+        self.directory = directory
+        self.disk_size_limit = disk_size_limit
+        self._tiles: MutableMapping[str, np.ndarray] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    @property
+    def enabled(self) -> bool:
+        return self.size_limit > 0 or self.directory is not None
+
+    @property
+    def size(self) -> int:
+        """Number of bytes of the tiles cached in memory."""
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._tiles)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._tiles
+
+    def __deepcopy__(self, memo) -> "DecodedTileCache":
+        # the cache is shared, including by copies of the objects that refer to it.
+        return self
+
+    def __reduce__(self):
+        # in other processes, use that process's cache.
+        return get_tile_cache, ()
+
+    def get(self, key: str, load: Callable[[], np.ndarray]) -> np.ndarray:
+        """
+        Return the decoded tile with the given key, calling load to decode it if it is not
+        cached.
+        """
+        with self._lock:
+            array = self._tiles.get(key)
+            if array is not None:
+                self._tiles.move_to_end(key)  # type: ignore
+                return array
+
+        array = self._read(key)
+        if array is None:
+            array = load()
+            array.flags.writeable = False
+            self._write(key, array)
+
+        with self._lock:
+            if key not in self._tiles and 0 < array.nbytes <= self.size_limit:
+                self._tiles[key] = array
+                self._size += array.nbytes
+                while self._size > self.size_limit:
+                    _, evicted = self._tiles.popitem(last=False)  # type: ignore
+                    self._size -= evicted.nbytes
+        return array
+
+    def clear(self) -> None:
+        """Remove all the tiles cached in memory."""
+        with self._lock:
+            self._tiles.clear()
+            self._size = 0
+
+    def _path(self, key: str) -> str:
+        assert self.directory is not None
+        return os.path.join(self.directory, f"{key}.npy")
+
+    def _read(self, key: str) -> Optional[np.ndarray]:
+        if self.directory is None:
+            return None
+        path = self._path(key)
+        try:
+            array = np.load(path, mmap_mode="r")
+        except (OSError, ValueError):
+            # not cached, or removed or being written by another process.
+            return None
+        try:
+            # record the use of this tile, so that it is removed last.
+            os.utime(path)
+        except OSError:
+            pass
+        return array
+
+    def _write(self, key: str, array: np.ndarray) -> None:
+        if self.directory is None or array.nbytes > self.disk_size_limit:
+            return
+        path = self._path(key)
+        # write to a temporary file first so that readers never see a partial tile.
+        temporary_path = f"{path}.{os.getpid()}.{threading.get_ident()}.partial"
+        with open(temporary_path, "wb") as fh:
+            np.save(fh, array)
+        os.replace(temporary_path, path)
+        self._evict_from_disk()
+
+    def _evict_from_disk(self) -> None:
+        """Remove the least recently used tiles from the directory until it fits within the disk
+        size limit."""
+        assert self.directory is not None
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".npy"):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= self.disk_size_limit:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total_size -= size
+
+
+_cache: Optional[Tuple[Tuple, DecodedTileCache]] = None
+_cache_lock = threading.Lock()
+
+
+def get_tile_cache(config: Optional[StarfishConfig]=None) -> DecodedTileCache:
+    """Return the process-wide cache of decoded tiles, configured by StarfishConfig.  If the
+    configuration changes, the cache is replaced."""
+    global _cache
+    settings = (config or StarfishConfig()).tile_cache
+    cache_settings = (
+        settings["size_limit"], settings["directory"], settings["disk_size_limit"])
+    with _cache_lock:
+        if _cache is not None and _cache[0] == cache_settings:
+            return _cache[1]
+        cache = DecodedTileCache(*cache_settings)
+        _cache = (cache_settings, cache)
+        return cache
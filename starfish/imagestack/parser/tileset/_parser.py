@@ -1,7 +1,7 @@
 """
 This module parses and retains the extras metadata attached to TileSet extras.
 """
-from typing import Collection, Mapping, MutableMapping, Tuple
+from typing import Collection, Mapping, MutableMapping, Optional, Tuple
 
 import numpy as np
 from slicedimage import Tile, TileSet
@@ -9,6 +9,7 @@ from slicedimage import Tile, TileSet
 from starfish.imagestack.dataorder import AXES_DATA
 from starfish.imagestack.parser import TileCollectionData, TileData, TileKey
 from starfish.types import Axes, Coordinates, Number
+from ._cache import DecodedTileCache, get_tile_cache
 
 
 class SlicedImageTile(TileData):
@@ -16,7 +17,8 @@ class SlicedImageTile(TileData):
     This wraps a :py:class:`slicedimage.Tile`.  The difference between this and
     :py:class:`slicedimage.Tile` is that this class does cache the image data upon load.  It is
     therefore incumbent on the consumers of these objects to discard them as soon as it is
-    reasonable to do so to free up memory.
+    reasonable to do so to free up memory.  The decoded image data is also shared with other
+    wrappers of the same tile through a :py:class:`DecodedTileCache`, if one is provided.
     """
     def __init__(
             self,
@@ -24,17 +26,31 @@ class SlicedImageTile(TileData):
             r: int,
             ch: int,
             zplane: int,
+            tile_cache: Optional[DecodedTileCache]=None,
     ) -> None:
         self._wrapped_tile = wrapped_tile
         self._r = r
         self._ch = ch
         self._zplane = zplane
+        self._tile_cache = tile_cache
         self._numpy_array: np.ndarray = None
 
     def _load(self):
         if self._numpy_array is not None:
             return
-        self._numpy_array = self._wrapped_tile.numpy_array
+        # tiles are identified in the cache by the checksum of their file.  Tiles that are already
+        # in memory, or that do not have a checksum, are not cached.  In-place experiment
+        # construction replaces Tile.sha256 with a property that only works for tiles it creates
+        # (see starfish.experiment.builder.inplace), hence getattr.
+        checksum = getattr(self._wrapped_tile, "sha256", None)
+        if (self._tile_cache is None
+                or not self._tile_cache.enabled
+                or checksum is None
+                or self._wrapped_tile._numpy_array is not None):
+            self._numpy_array = self._wrapped_tile.numpy_array
+        else:
+            self._numpy_array = self._tile_cache.get(
+                checksum, lambda: self._wrapped_tile.numpy_array)
 
     @property
     def tile_shape(self) -> Mapping[Axes, int]:
@@ -70,6 +86,7 @@ class TileSetData(TileCollectionData):
     """
     def __init__(self, tileset: TileSet) -> None:
         self._tile_shape = tileset.default_tile_shape
+        self._tile_cache = get_tile_cache()
 
         self.tiles: MutableMapping[TileKey, Tile] = dict()
         for tile in tileset.tiles():
@@ -106,12 +123,14 @@ class TileSetData(TileCollectionData):
         return SlicedImageTile(
             self.tiles[tilekey],
             tilekey.round, tilekey.ch, tilekey.z,
+            self._tile_cache,
         )
 
     def get_tile(self, r: int, ch: int, z: int) -> TileData:
         return SlicedImageTile(
             self.tiles[TileKey(round=r, ch=ch, zplane=z)],
             r, ch, z,
+            self._tile_cache,
         )
 
 
@@ -0,0 +1,102 @@
+import io
+import os
+
+import numpy as np
+from slicedimage import ImageFormat
+
+from starfish.config import environ
+from starfish.imagestack.imagestack import ImageStack
+from starfish.imagestack.parser.tileset._cache import DecodedTileCache, get_tile_cache
+
+
+class CountingLoader:
+    def __init__(self, array: np.ndarray) -> None:
+        self.array = array
+        self.calls = 0
+
+    def __call__(self) -> np.ndarray:
+        self.calls += 1
+        return self.array.copy()
+
+
+def test_lru_eviction():
+    """Tiles are evicted in least recently used order once the cache exceeds its size limit."""
+    tile_bytes = np.zeros((10, 10), dtype=np.float32).nbytes
+    cache = DecodedTileCache(size_limit=2 * tile_bytes)
+    loaders = {
+        key: CountingLoader(np.full((10, 10), ix, np.float32))
+        for ix, key in enumerate("abc")
+    }
+
+    first = cache.get("a", loaders["a"])
+    assert not first.flags.writeable
+    assert cache.get("a", loaders["a"]) is first
+    cache.get("b", loaders["b"])
+    cache.get("a", loaders["a"])
+    cache.get("c", loaders["c"])
+
+    assert "a" in cache and "c" in cache and "b" not in cache
+    assert cache.size == 2 * tile_bytes
+    assert loaders["a"].calls == 1
+
+    cache.get("b", loaders["b"])
+    assert loaders["b"].calls == 2
+
+
+def test_disk_cache(tmpdir):
+    """Tiles in the on-disk cache are memory-mapped by other caches instead of being decoded, and
+    the least recently used tiles are removed from disk once it exceeds its size limit."""
+    tile = np.arange(100, dtype=np.uint16).reshape(10, 10)
+    buffer = io.BytesIO()
+    np.save(buffer, tile)
+    tile_file_size = len(buffer.getvalue())
+    directory = str(tmpdir)
+
+    writer = DecodedTileCache(size_limit=0, directory=directory, disk_size_limit=2 * tile_file_size)
+    for ix, key in enumerate("abc"):
+        writer.get(key, CountingLoader(tile + ix))
+        # make the modification times of the tiles distinct.
+        path = os.path.join(directory, f"{key}.npy")
+        os.utime(path, (ix, ix))
+    assert len(writer) == 0
+    assert sorted(os.listdir(directory)) == ["b.npy", "c.npy"]
+
+    reader = DecodedTileCache(size_limit=10 * tile.nbytes, directory=directory)
+    loader = CountingLoader(tile)
+    array = reader.get("c", loader)
+    assert loader.calls == 0
+    assert isinstance(array, np.memmap)
+    assert np.array_equal(array, tile + 2)
+
+
+def test_imagestack_reload_uses_cache(tmpdir):
+    """Load the same TileSet twice, and verify that the second load is served from the cache by
+    removing the tile files before it."""
+    data = np.random.RandomState(0).rand(2, 2, 2, 30, 20).astype(np.float32)
+    path = os.path.join(str(tmpdir), "stack.json")
+    ImageStack.from_numpy_array(data).export(path, tile_format=ImageFormat.TIFF)
+
+    with environ(TILE_CACHE_SIZE_LIMIT="1e7"):
+        get_tile_cache().clear()
+        first = ImageStack.from_path_or_url(path)
+        assert len(get_tile_cache()) == 8
+
+        for filename in os.listdir(str(tmpdir)):
+            if filename.endswith(".tiff"):
+                os.remove(os.path.join(str(tmpdir), filename))
+        second = ImageStack.from_path_or_url(path)
+        get_tile_cache().clear()
+
+    assert np.array_equal(first.xarray.values, data)
+    assert np.array_equal(second.xarray.values, data)
+
+
+def test_imagestack_cache_disabled(tmpdir):
+    data = np.random.RandomState(0).rand(1, 1, 1, 30, 20).astype(np.float32)
+    path = os.path.join(str(tmpdir), "stack.json")
+    ImageStack.from_numpy_array(data).export(path, tile_format=ImageFormat.TIFF)
+
+    with environ(TILE_CACHE_SIZE_LIMIT="0"):
+        stack = ImageStack.from_path_or_url(path)
+        assert len(get_tile_cache()) == 0
+    assert np.array_equal(stack.xarray.values, data)
@@ -1,17 +1,22 @@
+import hashlib
+import json
 from collections import OrderedDict
 
 import numpy as np
 import pytest
 import xarray as xr
-from slicedimage import ImageFormat
+from slicedimage import ImageFormat, Tile
 
+from starfish.experiment.builder.inplace import sha256_get, sha256_set
 from starfish.imagestack.imagestack import ImageStack
+from starfish.imagestack.parser import TileCollectionData
+from starfish.imagestack.parser.numpy import NumpyData
 from starfish.imagestack.physical_coordinate_calculator import get_physical_coordinates_of_z_plane
 from starfish.intensity_table.intensity_table import IntensityTable
 # don't inspect pytest fixtures in pycharm
 # noinspection PyUnresolvedReferences
 from starfish.test import factories
-from starfish.types import Axes, PhysicalCoordinateTypes
+from starfish.types import Axes, PHYSICAL_COORDINATE_DIMENSION, PhysicalCoordinateTypes
 from .dataset_fixtures import (  # noqa: F401
     codebook_intensities_image_for_single_synthetic_spot,
     loaded_codebook,
@@ -313,3 +318,130 @@ def test_imagestack_export(tmpdir, format, count, recwarn):
     assert count == len(files)
     with open(files[0], "rb") as fh:
         format.reader_func(fh)
+
+
+@pytest.mark.parametrize("compression_level,n_threads", ((0, 1), (6, 1), (6, 4)))
+def test_imagestack_export_compressed(tmpdir, compression_level, n_threads, recwarn):
+    """
+    Compressed exports should round-trip exactly, and the tiles in the tileset document should not
+    depend on the number of threads writing them
+    """
+    stack = ImageStack.synthetic_stack(2, 2, 3, 40, 30)
+    stack.xarray.values[0, 1, 2] = 0
+
+    stack_json = tmpdir / "output.json"
+    stack.export(
+        str(stack_json), tile_format=ImageFormat.TIFF, compression_level=compression_level,
+        n_threads=n_threads)
+    loaded_stack = ImageStack.from_path_or_url(str(stack_json))
+    assert np.array_equal(loaded_stack.xarray.values, stack.xarray.values)
+
+    serial_json = tmpdir / "serial.json"
+    stack.export(
+        str(serial_json), tile_format=ImageFormat.TIFF, compression_level=compression_level,
+        n_threads=1)
+    with open(str(stack_json)) as fh, open(str(serial_json)) as serial_fh:
+        tiles = json.load(fh)["tiles"]
+        serial_tiles = json.load(serial_fh)["tiles"]
+    assert [tile["file"].replace("output", "serial") for tile in tiles] == [
+        tile["file"] for tile in serial_tiles]
+    for tile in tiles:
+        assert tile["sha256"] == hashlib.sha256((tmpdir / tile["file"]).read_binary()).hexdigest()
+
+    if compression_level > 0:
+        uncompressed_json = tmpdir / "uncompressed.json"
+        stack.export(str(uncompressed_json), tile_format=ImageFormat.TIFF)
+        compressed_file = tmpdir / tiles[0]["file"]
+        uncompressed_file = tmpdir / tiles[0]["file"].replace("output", "uncompressed")
+        assert compressed_file.size() < uncompressed_file.size()
+
+
+def test_imagestack_export_checksums_in_inplace_mode(tmpdir, monkeypatch):
+    """in-place experiment construction replaces the checksums of tiles by those of their
+    providers, which does not apply to exported tiles"""
+    monkeypatch.setattr(Tile, "sha256", property(sha256_get, sha256_set), raising=False)
+    stack = ImageStack.synthetic_stack(1, 2, 2, 40, 30)
+    stack_json = tmpdir / "output.json"
+    stack.export(str(stack_json), tile_format=ImageFormat.TIFF, n_threads=2)
+
+    with open(str(stack_json)) as fh:
+        tiles = json.load(fh)["tiles"]
+    assert len(tiles) == 4
+    for tile in tiles:
+        assert tile["sha256"] == hashlib.sha256((tmpdir / tile["file"]).read_binary()).hexdigest()
+
+
+def test_imagestack_export_compressed_numpy(tmpdir):
+    """numpy tiles are read with np.load, so they cannot be compressed"""
+    stack = ImageStack.synthetic_stack(1, 1, 1, 40, 30)
+    with pytest.raises(ValueError):
+        stack.export(str(tmpdir / "output.json"), compression_level=6)
+
+
+class _GenericTileData(TileCollectionData):
+    """Serve the tiles of a NumpyData through the generic TileCollectionData interface, so that
+    ImageStack loads them one tile at a time."""
+    def __init__(self, numpy_data: NumpyData) -> None:
+        self.numpy_data = numpy_data
+
+    def __getitem__(self, tilekey):
+        return self.numpy_data[tilekey]
+
+    def keys(self):
+        return self.numpy_data.keys()
+
+    @property
+    def tile_shape(self):
+        return self.numpy_data.tile_shape
+
+    @property
+    def extras(self):
+        return self.numpy_data.extras
+
+    def get_tile_by_key(self, tilekey):
+        return self.numpy_data.get_tile_by_key(tilekey)
+
+    def get_tile(self, r, ch, z):
+        return self.numpy_data.get_tile(r, ch, z)
+
+
+@pytest.mark.parametrize("with_coordinates", [True, False])
+def test_numpy_data_loads_like_tiles(with_coordinates):
+    """copying a whole array into an ImageStack should give the same stack as loading it one tile at
+    a time, including the order of unsorted labels, coordinates, and tile statistics."""
+    array = np.random.RandomState(0).rand(3, 2, 4, 10, 12).astype(np.float32)
+    index_labels = {Axes.ROUND: [2, 0, 1], Axes.CH: [1, 0], Axes.ZPLANE: [0, 3, 1, 2]}
+
+    coordinates = None
+    if with_coordinates:
+        coordinates = xr.DataArray(
+            np.zeros((3, 2, 4, 6)),
+            dims=(
+                Axes.ROUND.value, Axes.CH.value, Axes.ZPLANE.value, PHYSICAL_COORDINATE_DIMENSION),
+            coords={
+                Axes.ROUND.value: index_labels[Axes.ROUND],
+                Axes.CH.value: index_labels[Axes.CH],
+                Axes.ZPLANE.value: index_labels[Axes.ZPLANE],
+                PHYSICAL_COORDINATE_DIMENSION: [
+                    coordinate_type.value for coordinate_type in PhysicalCoordinateTypes],
+            },
+        )
+        for coordinate_type, value in ((PhysicalCoordinateTypes.X_MIN, 1),
+                                       (PhysicalCoordinateTypes.X_MAX, 2),
+                                       (PhysicalCoordinateTypes.Y_MIN, 4),
+                                       (PhysicalCoordinateTypes.Y_MAX, 6)):
+            coordinates.loc[{PHYSICAL_COORDINATE_DIMENSION: coordinate_type.value}] = value
+        z_index = coordinates[Axes.ZPLANE.value]
+        coordinates.loc[{PHYSICAL_COORDINATE_DIMENSION: PhysicalCoordinateTypes.Z_MIN.value}] = \
+            z_index
+        coordinates.loc[{PHYSICAL_COORDINATE_DIMENSION: PhysicalCoordinateTypes.Z_MAX.value}] = \
+            z_index + 0.5
+
+    numpy_data = NumpyData(array, index_labels, coordinates)
+    copied = ImageStack(numpy_data)
+    loaded = ImageStack(_GenericTileData(numpy_data))
+
+    assert copied.xarray.identical(loaded.xarray)
+    for tilekey, statistics in loaded._tile_statistics.items():
+        assert copied._tile_statistics[tilekey].min == statistics.min
+        assert copied._tile_statistics[tilekey].max == statistics.max
@@ -0,0 +1,103 @@
+"""
+These tests center around exporting an ImageStack to a chunked array store and loading it back,
+either entirely or cropped.
+"""
+import json
+import os
+
+import numpy as np
+import pytest
+
+from starfish.image import Filter
+from starfish.imagestack.imagestack import ImageStack
+from starfish.imagestack.parser.chunked import ChunkedArrayStore
+from starfish.imagestack.parser.crop import CropParameters
+from starfish.imagestack.physical_coordinate_calculator import (
+    get_physical_coordinates_of_z_plane,
+    recalculate_physical_coordinate_range
+)
+from starfish.types import Axes
+from .imagestack_test_utils import verify_physical_coordinates
+from .test_imagestack_cropped_load import (
+    HEIGHT,
+    setup_imagestack,
+    WIDTH,
+    X_COORDS,
+    Y_COORDS,
+    Z_COORDS,
+)
+
+
+@pytest.mark.parametrize("compression_level", [0, 1, 9])
+def test_chunked_store_round_trip(tmpdir, compression_level):
+    """Export an ImageStack to a chunked store and verify that the data, coordinates, and log are
+    loaded back."""
+    stack = setup_imagestack(None)
+    stack = Filter.Clip(p_min=0, p_max=100).run(stack, in_place=False)
+    path = os.path.join(str(tmpdir), "stack.zarr")
+    stack.export(path, compression_level=compression_level, chunks=(1, 1, 1, 16, 16))
+
+    loaded = ImageStack.from_path_or_url(path)
+    assert np.array_equal(loaded.xarray.values, stack.xarray.values)
+    for axis in (Axes.ROUND, Axes.CH, Axes.ZPLANE):
+        assert loaded.axis_labels(axis) == stack.axis_labels(axis)
+    verify_physical_coordinates(
+        loaded, X_COORDS, Y_COORDS, get_physical_coordinates_of_z_plane(Z_COORDS))
+    assert [entry["method"] for entry in loaded.log] == ["Clip"]
+
+
+def test_chunked_store_cropped_load(tmpdir):
+    """Load a crop of a chunked store, and verify that only the chunks that intersect the crop are
+    read."""
+    stack = setup_imagestack(None)
+    path = os.path.join(str(tmpdir), "stack.zarr")
+    stack.export(path, chunks=(1, 1, 1, 16, 16))
+
+    # remove a chunk outside of the crop.  It would be read as zeros if it were read at all.
+    os.remove(os.path.join(path, "0.0.0.0.0"))
+
+    x_slice, y_slice = slice(20, 50), slice(16, None)
+    crop_parameters = CropParameters(
+        permitted_rounds=[1, 2], permitted_chs=[3], x_slice=x_slice, y_slice=y_slice)
+    cropped = ImageStack.from_chunked_store(path, crop_parameters)
+
+    assert cropped.axis_labels(Axes.ROUND) == [1, 2]
+    assert cropped.axis_labels(Axes.CH) == [3]
+    assert np.array_equal(
+        cropped.xarray.values,
+        stack.xarray.values[1:3, 3:4, :, y_slice, x_slice])
+    verify_physical_coordinates(
+        cropped,
+        recalculate_physical_coordinate_range(X_COORDS[0], X_COORDS[1], WIDTH, x_slice),
+        recalculate_physical_coordinate_range(Y_COORDS[0], Y_COORDS[1], HEIGHT, y_slice),
+        get_physical_coordinates_of_z_plane(Z_COORDS),
+    )
+
+
+def test_chunked_store_layout(tmpdir):
+    """Verify that the store is laid out as a zarr array, with edge chunks padded to the full
+    chunk shape."""
+    stack = setup_imagestack(None)
+    path = os.path.join(str(tmpdir), "stack.zarr")
+    stack.export(path, compression_level=0, chunks=(1, 2, 2, 32, 32))
+
+    with open(os.path.join(path, ".zarray")) as fh:
+        metadata = json.load(fh)
+    assert metadata["zarr_format"] == 2
+    assert metadata["shape"] == list(stack.raw_shape)
+    assert metadata["chunks"] == [1, 2, 2, 32, 32]
+    assert metadata["dtype"] == "<f4"
+    assert metadata["compressor"] is None
+    with open(os.path.join(path, ".zattrs")) as fh:
+        assert json.load(fh)["_ARRAY_DIMENSIONS"] == ["r", "c", "z", "y", "x"]
+
+    n_round, n_ch, n_z, height, width = stack.raw_shape
+    chunk_files = [name for name in os.listdir(path) if not name.startswith(".")]
+    assert len(chunk_files) == n_round * (n_ch // 2) * (n_z // 2) * 2 * 2
+    for chunk_file in chunk_files:
+        assert os.path.getsize(os.path.join(path, chunk_file)) == 2 * 2 * 32 * 32 * 4
+
+    store = ChunkedArrayStore(path)
+    assert np.array_equal(store.read(), stack.xarray.values)
+    assert np.array_equal(
+        store.read((slice(1, 2), slice(1, 3))), stack.xarray.values[1:2, 1:3])
@@ -0,0 +1,86 @@
+import numpy as np
+import xarray as xr
+
+from starfish.image._filter.element_wise_mult import ElementWiseMultiply
+from starfish.image._filter.scale_by_percentile import ScaleByPercentile
+from starfish.imagestack.imagestack import ImageStack
+from starfish.types import Axes
+
+
+def random_stack():
+    data = np.random.RandomState(0).uniform(0.1, 0.9, size=(2, 3, 4, 20, 10)).astype(np.float32)
+    return data, ImageStack.from_numpy_array(data)
+
+
+def test_min_max_recorded_on_construction():
+    """the minimum and maximum of each tile are known as soon as the stack is loaded"""
+    data, stack = random_stack()
+    assert len(stack._cached_tile_statistics()) == 2 * 3 * 4
+
+    statistics = stack.tile_statistics({Axes.ROUND: 1, Axes.CH: 2, Axes.ZPLANE: 3})
+    assert statistics.min == data[1, 2, 3].min()
+    assert statistics.max == data[1, 2, 3].max()
+    assert statistics.percentile(100) == data[1, 2, 3].max()
+
+
+def test_percentiles_and_histogram_computed_lazily():
+    data, stack = random_stack()
+    selector = {Axes.ROUND: 0, Axes.CH: 1, Axes.ZPLANE: 2}
+
+    statistics = stack.tile_statistics(selector)
+    assert statistics.percentile(50) is None
+    assert statistics.histogram is None
+
+    statistics = stack.tile_statistics(selector, percentiles=[50], histogram=True)
+    assert np.isclose(statistics.percentile(50), np.percentile(data[0, 1, 2], 50))
+    assert statistics.histogram.sum() == data[0, 1, 2].size
+
+
+def test_set_slice_updates_statistics():
+    data, stack = random_stack()
+    stack.tile_statistics({Axes.ROUND: 0, Axes.CH: 0, Axes.ZPLANE: 0}, percentiles=[50])
+
+    new_data = np.full((3, 20, 10), 0.5, dtype=np.float32)
+    new_data[1, 0, 0] = 0.75
+    stack.set_slice({Axes.ROUND: 0, Axes.ZPLANE: 0}, new_data, [Axes.CH])
+
+    statistics = stack.tile_statistics({Axes.ROUND: 0, Axes.CH: 1, Axes.ZPLANE: 0})
+    assert statistics.min == 0.5
+    assert statistics.max == 0.75
+    # the stale percentile of the rewritten tile is discarded
+    assert stack.tile_statistics(
+        {Axes.ROUND: 0, Axes.CH: 0, Axes.ZPLANE: 0}).percentile(50) is None
+
+
+def test_apply_invalidates_statistics():
+    data, stack = random_stack()
+    stack.apply(lambda tile: tile / 2, in_place=True, n_processes=1)
+    assert len(stack._cached_tile_statistics()) == 0
+
+    statistics = stack.tile_statistics({Axes.ROUND: 0, Axes.CH: 0, Axes.ZPLANE: 0})
+    assert np.isclose(statistics.max, data[0, 0, 0].max() / 2)
+
+
+def test_scale_by_percentile_uses_cached_percentiles():
+    data, stack = random_stack()
+    scaled = ScaleByPercentile(p=100).run(stack, n_processes=1)
+    expected = data / data.max(axis=(-2, -1), keepdims=True)
+    assert np.allclose(scaled.xarray.values, expected)
+
+
+def test_element_wise_multiply_invalidates_statistics():
+    """the statistics of the input, which are copied with it, do not describe the multiplied
+    data"""
+    data, stack = random_stack()
+    ScaleByPercentile(p=100).run(stack, n_processes=1)
+    mult_array = xr.DataArray(
+        np.linspace(0.5, 1, 20 * 10).reshape(1, 1, 1, 20, 10),
+        dims=(Axes.ROUND.value, Axes.CH.value, Axes.ZPLANE.value, Axes.Y.value, Axes.X.value))
+
+    multiplied = ElementWiseMultiply(mult_array).run(stack)
+    scaled = ScaleByPercentile(p=100).run(multiplied, n_processes=1)
+
+    expected_data = multiplied.xarray.values.copy()
+    expected = ScaleByPercentile(p=100).run(
+        ImageStack.from_numpy_array(expected_data), n_processes=1)
+    assert np.array_equal(scaled.xarray.values, expected.xarray.values)
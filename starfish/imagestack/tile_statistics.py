@@ -0,0 +1,63 @@
+from typing import Mapping, MutableMapping, Optional
+
+import numpy as np
+
+from starfish.types import Number
+
+N_HISTOGRAM_BINS = 2 ** 16
+"""
+Number of fixed-width bins over [0, 1] used for tile histograms.  This matches the resolution of
+16-bit source data.
+"""
+
+
+class TileStatistics:
+    """
+    Statistics of a single (y, x) tile of an ImageStack.
+
+    The minimum and maximum are always present.  The histogram and percentiles are only present if
+    they have been requested through :py:meth:`ImageStack.tile_statistics`.
+
+    Attributes
+    ----------
+    min : float
+        the smallest value in the tile
+    max : float
+        the largest value in the tile
+    histogram : Optional[np.ndarray]
+        counts of the tile's values in N_HISTOGRAM_BINS equal-width bins over [0, 1], if computed
+    """
+
+    def __init__(
+            self,
+            min_: float,
+            max_: float,
+            histogram: Optional[np.ndarray]=None,
+            percentiles: Optional[Mapping[Number, float]]=None,
+    ) -> None:
+        self.min = min_
+        self.max = max_
+        self.histogram = histogram
+        self._percentiles: MutableMapping[Number, float] = dict(percentiles or {})
+
+    @classmethod
+    def from_tile(cls, tile: np.ndarray) -> "TileStatistics":
+        """Calculate the minimum and maximum of a tile."""
+        return cls(float(np.min(tile)), float(np.max(tile)))
+
+    def percentile(self, p: Number) -> Optional[float]:
+        """Return the p-th percentile of the tile if it is known, otherwise return None.  The 0th
+        and 100th percentiles are always known, as they are the minimum and maximum of the tile.
+        """
+        if p == 0:
+            return self.min
+        if p == 100:
+            return self.max
+        return self._percentiles.get(p)
+
+    def add_percentile(self, p: Number, value: float) -> None:
+        """Record the p-th percentile of the tile."""
+        self._percentiles[p] = value
+
+    def __repr__(self) -> str:
+        return f"<starfish.TileStatistics (min: {self.min}, max: {self.max})>"
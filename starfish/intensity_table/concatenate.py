@@ -1,10 +1,252 @@
-from typing import Iterable
+import os
+import tempfile
+from typing import Any, Iterable, List, MutableMapping, Optional, Sequence
 
-import xarray as xr
+import numpy as np
 
-from starfish.types import Features
+from starfish.types import Axes, Features
 from .intensity_table import IntensityTable
 
+DIMS = (Features.AXIS, Axes.CH.value, Axes.ROUND.value)
+
+
+def _missing_value_dtype(dtype: np.dtype) -> np.dtype:
+    """Return the dtype that can hold the values of dtype, and NaN for missing values."""
+    if dtype.kind in "fc":
+        return dtype
+    if dtype.kind in "OUS":
+        return np.dtype(object)
+    return np.result_type(dtype, np.float32)
+
+
+def _common_dtype(dtype1: np.dtype, dtype2: np.dtype) -> np.dtype:
+    if dtype1 == dtype2:
+        return dtype1
+    if dtype1.kind == dtype2.kind and dtype1.kind in "US":
+        # strings of different lengths are held by the longer of the two, as xr.concat does.
+        return np.promote_types(dtype1, dtype2)
+    if dtype1.kind in "OUS" or dtype2.kind in "OUS":
+        return np.dtype(object)
+    return np.result_type(dtype1, dtype2)
+
+
+def _positions(values: List[Any], new_values: np.ndarray) -> np.ndarray:
+    """Return the position of each of new_values in values, appending the ones that are not in it
+    yet."""
+    positions = []
+    for value in new_values.tolist():
+        try:
+            positions.append(values.index(value))
+        except ValueError:
+            values.append(value)
+            positions.append(len(values) - 1)
+    return np.array(positions, dtype=int)
+
+
+class IntensityTableBuilder:
+    """
+    Concatenates IntensityTables along the features axis, one table at a time.
+
+    The intensities and each coordinate along the features axis are copied into buffers that grow
+    geometrically, so the tables do not need to be kept until all of them are available, and each
+    value is copied once more at most when a buffer grows.  Channels and rounds are aligned by
+    value: the result contains every channel and round of any table, and intensities of channels
+    and rounds missing from a table are NaN.  Coordinates along the features axis are aligned by
+    name, and are NaN for the features of tables that do not have them.
+
+    If the intensities exceed memory_limit bytes, they are moved to a memory-mapped file, and the
+    IntensityTable that is built is backed by that file.
+
+    Parameters
+    ----------
+    memory_limit : Optional[int]
+        Maximum size, in bytes, of the intensities buffered in memory.  If None, they are always
+        kept in memory.
+    spill_directory : Optional[str]
+        Directory of the file that the intensities are moved to once they exceed memory_limit.  If
+        None, the system's temporary directory is used.  The file is removed once it is no longer
+        used, on systems that permit it.
+    initial_capacity : int
+        Number of features the buffers are allocated for initially.
+
+    Examples
+    --------
+    Concatenate the IntensityTables of a pipeline run on each field of view:
+
+        >>> builder = IntensityTableBuilder()
+        >>> for fov in experiment.fovs():
+        >>>     builder.add(pipeline(fov))
+        >>> intensities = builder.build()
+    """
+    def __init__(
+            self,
+            memory_limit: Optional[int]=None,
+            spill_directory: Optional[str]=None,
+            initial_capacity: int=1024,
+    ) -> None:
+        self.memory_limit = memory_limit
+        self.spill_directory = spill_directory
+        self._initial_capacity = max(1, initial_capacity)
+        self._n_features = 0
+        self._capacity = 0
+        self._data: Optional[np.ndarray] = None
+        self._channels: List[Any] = list()
+        self._rounds: List[Any] = list()
+        self._columns: MutableMapping[str, np.ndarray] = dict()
+        self._attrs: Optional[dict] = None
+        self._spilled = False
+
+    def __len__(self) -> int:
+        """Number of features added."""
+        return self._n_features
+
+    @property
+    def spilled(self) -> bool:
+        """Whether the intensities were moved to a memory-mapped file."""
+        return self._spilled
+
+    def add(self, intensity_table: IntensityTable) -> None:
+        """Append the features of an IntensityTable."""
+        if tuple(intensity_table.dims) != DIMS:
+            raise ValueError(
+                f"IntensityTables with dimensions {intensity_table.dims} cannot be concatenated; "
+                f"expected {DIMS}")
+        for name, coordinate in intensity_table.coords.items():
+            if name not in (Axes.CH.value, Axes.ROUND.value) and coordinate.dims != DIMS[:1]:
+                raise ValueError(
+                    f"coordinate {name} with dimensions {coordinate.dims} cannot be concatenated")
+        if self._attrs is None:
+            self._attrs = dict(intensity_table.attrs)
+
+        n_features = intensity_table.sizes[Features.AXIS]
+        start, end = self._n_features, self._n_features + n_features
+
+        n_channels, n_rounds = len(self._channels), len(self._rounds)
+        channel_positions = _positions(
+            self._channels, intensity_table[Axes.CH.value].values)
+        round_positions = _positions(
+            self._rounds, intensity_table[Axes.ROUND.value].values)
+        dtype = intensity_table.dtype if self._data is None else _common_dtype(
+            self._data.dtype, intensity_table.dtype)
+        expanded = (len(self._channels), len(self._rounds)) != (n_channels, n_rounds)
+        covered = (
+            np.array_equal(channel_positions, np.arange(len(self._channels)))
+            and np.array_equal(round_positions, np.arange(len(self._rounds))))
+        if (expanded and start > 0) or not covered:
+            dtype = _missing_value_dtype(dtype)
+        self._reserve(end, dtype)
+        assert self._data is not None
+
+        rows = self._data[start:end]
+        if covered:
+            rows[...] = intensity_table.values
+        else:
+            rows[...] = np.nan
+            rows[:, channel_positions[:, None], round_positions[None, :]] = intensity_table.values
+
+        for name, coordinate in intensity_table.coords.items():
+            if name in (Axes.CH.value, Axes.ROUND.value):
+                continue
+            self._set_column(name, start, end, coordinate.values)
+        for name, column in self._columns.items():
+            if name not in intensity_table.coords:
+                self._fill_column(name, start, end)
+
+        self._n_features = end
+
+    def build(self) -> IntensityTable:
+        """Return the concatenation of the IntensityTables added so far.  Channels and rounds are
+        sorted by value."""
+        if self._data is None:
+            raise ValueError("no IntensityTables were added")
+        trim = self._capacity > self._n_features
+        data = self._data[:self._n_features]
+        channel_order = np.argsort(self._channels, kind="stable")
+        round_order = np.argsort(self._rounds, kind="stable")
+        if not np.array_equal(channel_order, np.arange(len(self._channels))):
+            data = data[:, channel_order]
+            trim = False
+        if not np.array_equal(round_order, np.arange(len(self._rounds))):
+            data = data[:, :, round_order]
+            trim = False
+        # a slice of the buffers would keep their unused capacity alive for as long as the
+        # IntensityTable is, so in-memory intensities are copied.  Spilled intensities remain a
+        # view of the memory-mapped file: its unused capacity was never written, so it occupies
+        # neither memory nor, on file systems that support sparse files, disk space.
+        if trim and not self._spilled:
+            data = data.copy()
+
+        coords = {
+            name: (Features.AXIS, column[:self._n_features].copy())
+            for name, column in self._columns.items()
+        }
+        coords[Axes.CH.value] = np.array(self._channels)[channel_order]
+        coords[Axes.ROUND.value] = np.array(self._rounds)[round_order]
+        return IntensityTable(data=data, coords=coords, dims=DIMS, attrs=self._attrs)
+
+    def _allocate(self, shape: Sequence[int], dtype: np.dtype) -> np.ndarray:
+        nbytes = int(np.prod(shape)) * dtype.itemsize
+        if self.memory_limit is None or nbytes <= self.memory_limit:
+            return np.empty(shape, dtype=dtype)
+        self._spilled = True
+        fd, path = tempfile.mkstemp(suffix=".npy", dir=self.spill_directory)
+        os.close(fd)
+        data = np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=tuple(shape))
+        try:
+            # the mapping remains valid until it is no longer referenced.
+            os.remove(path)
+        except OSError:
+            pass
+        return data
+
+    def _reserve(self, n_features: int, dtype: np.dtype) -> None:
+        """Ensure that the buffers hold at least n_features features, with the intensities stored
+        as dtype in an array that holds every channel and round."""
+        shape = (len(self._channels), len(self._rounds))
+        if (self._data is not None
+                and n_features <= self._capacity
+                and self._data.dtype == dtype
+                and self._data.shape[1:] == shape):
+            return
+        capacity = self._capacity
+        if n_features > capacity:
+            capacity = max(n_features, 2 * capacity, self._initial_capacity)
+        data = self._allocate((capacity,) + shape, dtype)
+        if self._data is not None:
+            old_channels, old_rounds = self._data.shape[1:]
+            used = data[:self._n_features]
+            if (old_channels, old_rounds) != shape:
+                used[...] = np.nan
+            used[:, :old_channels, :old_rounds] = self._data[:self._n_features]
+        self._data = data
+
+        for name, column in self._columns.items():
+            if len(column) < capacity:
+                grown = np.empty(capacity, dtype=column.dtype)
+                grown[:self._n_features] = column[:self._n_features]
+                self._columns[name] = grown
+        self._capacity = capacity
+
+    def _set_column(self, name: str, start: int, end: int, values: np.ndarray) -> None:
+        column = self._columns.get(name)
+        if column is None:
+            dtype = values.dtype if start == 0 else _missing_value_dtype(values.dtype)
+            column = np.empty(self._capacity, dtype=dtype)
+            if start > 0:
+                column[:start] = np.nan
+        elif _common_dtype(column.dtype, values.dtype) != column.dtype:
+            column = column.astype(_common_dtype(column.dtype, values.dtype))
+        column[start:end] = values
+        self._columns[name] = column
+
+    def _fill_column(self, name: str, start: int, end: int) -> None:
+        column = self._columns[name]
+        dtype = _missing_value_dtype(column.dtype)
+        if dtype != column.dtype:
+            column = column.astype(dtype)
+            self._columns[name] = column
+        column[start:end] = np.nan
+
 
 def concatenate(intensity_tables: Iterable[IntensityTable]) -> IntensityTable:
     """Concatenate IntensityTables produced for different fields of view or across imaging rounds
@@ -13,10 +255,14 @@ def concatenate(intensity_tables: Iterable[IntensityTable]) -> IntensityTable:
     densely, even if the underlying data is sparse, since xarray does not yet support sparse array
     structures. This means that spots that are identified in different rounds and channels will
     be identified as separate features, even if they have exactly identical coordinates.
+    :py:class:`~starfish.intensity_table.sparse.SparseIntensityTable` stores such tables sparsely.
 
     To merge spots that share coordinates across rounds and channels into single features amenable
     to decoding, use IntensityTable.combine_first()
 
+    The tables are copied one at a time with an :py:class:`IntensityTableBuilder`, so
+    intensity_tables may be a generator that produces them as they are needed.
+
     Parameters
     ----------
     intensity_tables : Iterable[IntensityTable]
@@ -31,4 +277,7 @@ def concatenate(intensity_tables: Iterable[IntensityTable]) -> IntensityTable:
     Sparse Arrays in xarray: https://github.com/pydata/xarray/issues/1375
     Combine_first: http://xarray.pydata.org/en/stable/combining.html#combine
     """
-    return xr.concat(list(intensity_tables), Features.AXIS)
+    builder = IntensityTableBuilder()
+    for intensity_table in intensity_tables:
+        builder.add(intensity_table)
+    return builder.build()
@@ -7,6 +7,7 @@ import pandas as pd
 import xarray as xr
 
 from starfish.expression_matrix.expression_matrix import ExpressionMatrix
+from starfish.expression_matrix.sparse import SparseExpressionMatrix
 from starfish.types import (
     Axes,
     Coordinates,
@@ -18,10 +19,7 @@ from starfish.types import (
     STARFISH_EXTRAS_KEY
 )
 from starfish.util.dtype import preserve_float_range
-from starfish.util.overlap_utils import (
-    find_overlaps_of_xarrays,
-    OVERLAP_STRATEGY_MAP,
-)
+from starfish.util.overlap_utils import OVERLAP_STRATEGY_MAP
 
 
 class IntensityTable(xr.DataArray):
@@ -411,24 +409,19 @@ class IntensityTable(xr.DataArray):
         """Find the overlapping sections between IntensityTables and process them according
         to the given overlap strategy
         """
-        overlap_pairs = find_overlaps_of_xarrays(intensity_tables)
-        for indices in overlap_pairs:
-            overlap_method = OVERLAP_STRATEGY_MAP[overlap_strategy]
-            idx1, idx2 = indices
-            # modify IntensityTables based on overlap strategy
-            it1, it2 = overlap_method(intensity_tables[idx1], intensity_tables[idx2])
-            # replace IntensityTables in list
-            intensity_tables[idx1] = it1
-            intensity_tables[idx2] = it2
-        return intensity_tables
+        overlap_method = OVERLAP_STRATEGY_MAP[overlap_strategy]
+        return overlap_method(intensity_tables)
 
     @staticmethod
     def concatanate_intensity_tables(intensity_tables: List["IntensityTable"],
                                      overlap_strategy: Optional[OverlapStrategy] = None):
+        # imported here, as the concatenate module depends on this one.
+        from .concatenate import concatenate
+
         if overlap_strategy:
             intensity_tables = IntensityTable.process_overlaps(intensity_tables,
                                                                overlap_strategy)
-        return xr.concat(intensity_tables, dim=Features.AXIS)
+        return concatenate(intensity_tables)
 
     def to_features_dataframe(self) -> pd.DataFrame:
         """Generates a dataframe of the underlying features multi-index.
@@ -464,33 +457,20 @@ class IntensityTable(xr.DataArray):
         ExpressionMatrix :
             cell x gene expression table
         """
-        if Features.CELL_ID not in self.coords:
-            raise KeyError("IntensityTable must have 'cell_id' assignments for each cell before "
-                           "this function can be called. See starfish.TargetAssignment.Label.")
-        grouped = self.to_features_dataframe().groupby([Features.CELL_ID, Features.TARGET])
-        counts = grouped.count().iloc[:, 0].unstack().fillna(0)
-        if self.has_physical_coords:
-            grouped = self.to_features_dataframe().groupby([Features.CELL_ID])[[
-                Axes.X, Axes.Y, Axes.ZPLANE, Coordinates.X, Coordinates.Y, Coordinates.Z]]
-        else:
-            grouped = self.to_features_dataframe().groupby([Features.CELL_ID])[[
-                Axes.X, Axes.Y, Axes.ZPLANE]]
-        min_ = grouped.min()
-        max_ = grouped.max()
-        coordinate_df = min_ + (max_ - min_) / 2
-        metadata = {name: (Features.CELLS, data.values) for name, data in coordinate_df.items()}
-        metadata[Features.AREA] = (Features.CELLS, np.full(counts.shape[0], fill_value=np.nan))
-        # add genes to the metadata
-        metadata.update({Features.GENES: counts.columns.values})
-        metadata.update({Features.CELL_ID: (Features.CELLS, counts.index.values)})
-
-        mat = ExpressionMatrix(
-            data=counts.values,
-            dims=(Features.CELLS, Features.GENES),
-            coords=metadata,
-            name='expression_matrix'
-        )
-        return mat
+        return self.to_sparse_expression_matrix().to_dense()
+
+    def to_sparse_expression_matrix(self) -> SparseExpressionMatrix:
+        """Generates a cell x gene count matrix, stored in compressed sparse row format, where each
+        cell is annotated with spatial metadata
+
+        Requires that spots in the IntensityTable have been assigned to cells.
+
+        Returns
+        -------
+        SparseExpressionMatrix :
+            cell x gene expression table
+        """
+        return SparseExpressionMatrix.from_features(self.to_features_dataframe())
 
     def feature_trace_magnitudes(self) -> np.ndarray:
         """Return the magnitudes of each feature across rounds and channels
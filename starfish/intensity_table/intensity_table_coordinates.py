@@ -3,6 +3,7 @@ import xarray as xr
 
 from starfish.imagestack.imagestack import ImageStack
 from starfish.intensity_table.intensity_table import IntensityTable
+from starfish.intensity_table.sparse import SparseIntensityTable
 from starfish.types import Axes, Coordinates, Features
 
 
@@ -47,3 +48,21 @@ def transfer_physical_coords_from_imagestack_to_intensity_table(image_stack: Ima
             intensity_table[Coordinates.Z.value][ind] = physical_z
             break
     return intensity_table
+
+
+def transfer_physical_coords_from_imagestack_to_sparse_intensity_table(
+        image_stack: ImageStack, intensity_table: SparseIntensityTable
+) -> SparseIntensityTable:
+    """
+    Transfers physical coordinates from an Imagestack's coordinates xarray to a
+    SparseIntensityTable, as transfer_physical_coords_from_imagestack_to_intensity_table does for
+    IntensityTables.  Features without non-zero intensities keep physical coordinates of zero.
+    """
+    has_intensity = intensity_table.features_with_intensity()
+    for pixel_axis, physical_axis in (
+            (Axes.X, Coordinates.X), (Axes.Y, Coordinates.Y), (Axes.ZPLANE, Coordinates.Z)):
+        pixels = intensity_table[pixel_axis.value].values[has_intensity]
+        physical = np.zeros(intensity_table.sizes[Features.AXIS], np.float32)
+        physical[has_intensity] = image_stack.xarray[physical_axis.value].values[pixels]
+        intensity_table[physical_axis.value] = (Features.AXIS, physical)
+    return intensity_table
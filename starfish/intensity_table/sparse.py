@@ -0,0 +1,431 @@
+from typing import Any, Callable, Hashable, Iterable, Mapping, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+from starfish.expression_matrix.expression_matrix import ExpressionMatrix
+from starfish.expression_matrix.sparse import SparseExpressionMatrix
+from starfish.types import Axes, Coordinates, Features, SpotAttributes
+from .concatenate import DIMS
+from .intensity_table import IntensityTable
+
+ENTRIES = "entries"
+ENTRY_FEATURE = "entry_feature"
+ENTRY_CH = "entry_c"
+ENTRY_ROUND = "entry_r"
+ENTRY_INTENSITY = "entry_intensity"
+
+DENSE_BLOCK_SIZE = 65536
+"""Number of features that are converted to a dense IntensityTable at a time when a function
+that requires dense intensities is mapped over a SparseIntensityTable."""
+
+
+def _index_array(values: Any, n: int) -> np.ndarray:
+    """Return values as the smallest signed integer array that holds the indices of n items.
+    Unsigned integers are avoided, as netCDF3 files cannot store them."""
+    for dtype in (np.int8, np.int16, np.int32):
+        if n <= np.iinfo(dtype).max + 1:
+            return np.asarray(values, dtype=dtype)
+    return np.asarray(values, dtype=np.int64)
+
+
+class SparseIntensityTable:
+    """
+    IntensityTable whose intensities are stored sparsely, in coordinate (COO) format
+
+    Only the intensities that are not zero are stored, each as an entry that records the feature,
+    channel and round it belongs to.  This suits non-multiplexed assays, such as smFISH, where each
+    spot is measured in exactly one (channel, round), and an ``(n_feature, n_channel, n_round)``
+    array would mostly hold zeros.  Each entry requires the size of one intensity and of three
+    small integers, so a table of spots measured in a single one of 16 channels uses about a tenth
+    of the memory of the dense IntensityTable.
+
+    The coordinates of the features, channels and rounds are the same as those of the
+    corresponding dense IntensityTable, and can be read and assigned with the ``[]`` operator.
+    Entries are kept sorted by feature.
+
+    Methods
+    -------
+    from_dense(intensity_table)
+        creates a SparseIntensityTable from the non-zero intensities of an IntensityTable
+
+    to_dense()
+        creates the equivalent dense IntensityTable
+
+    isel_features(indexer)
+        selects features by position, e.g., those that pass the decoding thresholds
+
+    map_blocks(func, block_size=DENSE_BLOCK_SIZE)
+        applies a function of dense IntensityTables, such as a decoder, to blocks of features
+
+    save(filename)
+        save the SparseIntensityTable to netCDF
+
+    load(filename)
+        load a SparseIntensityTable from netCDF
+
+    Examples
+    --------
+    Decode a SparseIntensityTable and keep the features that decoded successfully::
+
+        >>> decoded = codebook.decode_per_round_max(sparse_intensities)
+        >>> decoded.isel_features(decoded[Features.PASSES_THRESHOLDS].values)
+    """
+
+    def __init__(self, dataset: xr.Dataset) -> None:
+        self._dataset = dataset
+
+    @classmethod
+    def _create(
+            cls,
+            coords: Mapping,
+            feature_index: Any,
+            channel_index: Any,
+            round_index: Any,
+            intensities: Any,
+            attrs: Optional[Mapping]=None,
+    ) -> "SparseIntensityTable":
+        """Create a SparseIntensityTable from the coordinates of the dense IntensityTable and the
+        position and value of each non-zero intensity."""
+        dataset = xr.Dataset(coords=coords, attrs=attrs)
+        missing = [dim for dim in DIMS if dim not in dataset.sizes]
+        if missing:
+            raise ValueError(f"coordinates of dimensions {missing} are required")
+
+        feature_index = np.asarray(feature_index)
+        order = None
+        if np.any(np.diff(feature_index) < 0):
+            order = np.argsort(feature_index, kind="stable")
+
+        entries = {
+            ENTRY_FEATURE: _index_array(feature_index, dataset.sizes[Features.AXIS]),
+            ENTRY_CH: _index_array(channel_index, dataset.sizes[Axes.CH.value]),
+            ENTRY_ROUND: _index_array(round_index, dataset.sizes[Axes.ROUND.value]),
+            ENTRY_INTENSITY: np.asarray(intensities),
+        }
+        for name, values in entries.items():
+            dataset[name] = (ENTRIES, values if order is None else values[order])
+        return cls(dataset)
+
+    @classmethod
+    def from_spot_intensities(
+            cls,
+            spot_attributes: SpotAttributes,
+            n_ch: int,
+            n_round: int,
+            feature_index: np.ndarray,
+            channel_index: np.ndarray,
+            round_index: np.ndarray,
+            intensities: np.ndarray,
+    ) -> "SparseIntensityTable":
+        """Create a SparseIntensityTable of the spots in spot_attributes
+
+        Parameters
+        ----------
+        spot_attributes : SpotAttributes
+            the coordinates of each feature
+        n_ch : int
+            number of channels measured in the imaging experiment
+        n_round : int
+            number of imaging rounds measured in the imaging experiment
+        feature_index, channel_index, round_index : np.ndarray
+            the feature, channel and round of each intensity
+        intensities : np.ndarray
+            the intensities
+
+        Returns
+        -------
+        SparseIntensityTable :
+            SparseIntensityTable containing the intensities, annotated by spot_attributes
+
+        """
+        if not isinstance(spot_attributes, SpotAttributes):
+            raise TypeError('parameter spot_attributes must be a starfish SpotAttributes object.')
+
+        coords = IntensityTable._build_xarray_coords(
+            spot_attributes, np.arange(n_ch), np.arange(n_round))
+        return cls._create(coords, feature_index, channel_index, round_index, intensities)
+
+    @classmethod
+    def from_dense(cls, intensity_table: IntensityTable) -> "SparseIntensityTable":
+        """Create a SparseIntensityTable that stores the non-zero intensities of an
+        IntensityTable.  NaN intensities are stored too."""
+        if tuple(intensity_table.dims) != DIMS:
+            raise ValueError(
+                f"IntensityTables with dimensions {intensity_table.dims} cannot be stored "
+                f"sparsely; expected {DIMS}")
+        coords = dict()
+        for name, coordinate in intensity_table.coords.items():
+            if not set(coordinate.dims).issubset(DIMS) or len(coordinate.dims) > 1:
+                raise ValueError(
+                    f"coordinate {name} with dimensions {coordinate.dims} cannot be stored "
+                    f"sparsely")
+            coords[name] = (coordinate.dims, coordinate.values)
+
+        values = intensity_table.values
+        feature_index, channel_index, round_index = np.nonzero(values)
+        return cls._create(
+            coords,
+            feature_index,
+            channel_index,
+            round_index,
+            values[feature_index, channel_index, round_index],
+            attrs=intensity_table.attrs,
+        )
+
+    def to_dense(self) -> IntensityTable:
+        """Return the dense IntensityTable, in which intensities that are not stored are zero."""
+        dataset = self._dataset
+        data = np.zeros(self.shape, dtype=dataset[ENTRY_INTENSITY].dtype)
+        data[
+            dataset[ENTRY_FEATURE].values,
+            dataset[ENTRY_CH].values,
+            dataset[ENTRY_ROUND].values,
+        ] = dataset[ENTRY_INTENSITY].values
+        return IntensityTable(
+            data=data,
+            coords={
+                name: (coordinate.dims, coordinate.values)
+                for name, coordinate in dataset.coords.items()
+            },
+            dims=DIMS,
+            attrs=dict(dataset.attrs),
+        )
+
+    @property
+    def dims(self) -> Tuple[str, str, str]:
+        return DIMS
+
+    @property
+    def sizes(self) -> Mapping[str, int]:
+        return {dim: self._dataset.sizes[dim] for dim in DIMS}
+
+    @property
+    def shape(self) -> Tuple[int, int, int]:
+        return tuple(self._dataset.sizes[dim] for dim in DIMS)  # type: ignore
+
+    @property
+    def attrs(self) -> dict:
+        return self._dataset.attrs
+
+    @property
+    def coords(self):
+        return self._dataset.coords
+
+    @property
+    def nnz(self) -> int:
+        """Number of stored intensities."""
+        return self._dataset.sizes[ENTRIES]
+
+    @property
+    def nbytes(self) -> int:
+        """Number of bytes used to store the intensities, which is comparable to the nbytes of the
+        dense IntensityTable."""
+        return sum(
+            self._dataset[name].nbytes
+            for name in (ENTRY_FEATURE, ENTRY_CH, ENTRY_ROUND, ENTRY_INTENSITY))
+
+    @property
+    def has_physical_coords(self):
+        return Coordinates.X in self.coords and Coordinates.Y in self.coords
+
+    def features_with_intensity(self) -> np.ndarray:
+        """Return a boolean mask of the features that have at least one non-zero intensity."""
+        mask = np.zeros(self.sizes[Features.AXIS], dtype=bool)
+        stored = self._dataset[ENTRY_INTENSITY].values != 0
+        mask[self._dataset[ENTRY_FEATURE].values[stored]] = True
+        return mask
+
+    def __getitem__(self, key: Hashable) -> xr.DataArray:
+        """Return a coordinate."""
+        return self._dataset.coords[key]
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        """Assign a coordinate, e.g., ``table[Features.TARGET] = (Features.AXIS, targets)``."""
+        self._dataset.coords[key] = value
+
+    def __repr__(self) -> str:
+        sizes = ", ".join(f"{dim}: {size}" for dim, size in self.sizes.items())
+        return f"<starfish.SparseIntensityTable ({sizes}), {self.nnz} stored intensities>"
+
+    def _select(self, positions: np.ndarray, entries: np.ndarray, feature_index: np.ndarray):
+        dataset = self._dataset.isel({Features.AXIS: positions, ENTRIES: entries})
+        dataset[ENTRY_FEATURE] = (ENTRIES, _index_array(feature_index, len(positions)))
+        return SparseIntensityTable(dataset)
+
+    def _block(self, start: int, stop: int) -> "SparseIntensityTable":
+        """Select the features from start up to stop, using the order of the entries."""
+        entry_features = self._dataset[ENTRY_FEATURE].values
+        entry_start, entry_stop = np.searchsorted(entry_features, [start, stop])
+        return self._select(
+            np.arange(start, stop),
+            np.arange(entry_start, entry_stop),
+            entry_features[entry_start:entry_stop].astype(np.int64) - start,
+        )
+
+    def isel_features(
+            self, indexer: Union[slice, np.ndarray, xr.DataArray]
+    ) -> "SparseIntensityTable":
+        """Select features by position
+
+        Parameters
+        ----------
+        indexer : Union[slice, np.ndarray, xr.DataArray]
+            a slice, a boolean mask of the features to select, such as the passes_thresholds
+            coordinate of a decoded table, or the distinct positions of the features to select.
+
+        Returns
+        -------
+        SparseIntensityTable :
+            table containing the selected features, in the order of indexer
+        """
+        n_features = self.sizes[Features.AXIS]
+        if not isinstance(indexer, slice):
+            indexer = np.asarray(indexer)
+        positions = np.arange(n_features)[indexer]
+        if len(np.unique(positions)) != len(positions):
+            raise ValueError("features cannot be selected more than once")
+
+        new_positions = np.full(n_features, -1, dtype=np.int64)
+        new_positions[positions] = np.arange(len(positions))
+        feature_index = new_positions[self._dataset[ENTRY_FEATURE].values]
+        entries = np.flatnonzero(feature_index >= 0)
+        entries = entries[np.argsort(feature_index[entries], kind="stable")]
+        return self._select(positions, entries, feature_index[entries])
+
+    @classmethod
+    def concatenate(cls, tables: Iterable["SparseIntensityTable"]) -> "SparseIntensityTable":
+        """Concatenate SparseIntensityTables with the same channels, rounds and coordinates along
+        the features axis."""
+        tables = list(tables)
+        if not tables:
+            raise ValueError("no SparseIntensityTables were given")
+        first = tables[0]._dataset
+        feature_coordinates = [
+            name for name, coordinate in first.coords.items()
+            if coordinate.dims == (Features.AXIS,)]
+        for table in tables[1:]:
+            dataset = table._dataset
+            for dim in (Axes.CH.value, Axes.ROUND.value):
+                if not np.array_equal(dataset[dim].values, first[dim].values):
+                    raise ValueError(
+                        f"SparseIntensityTables with different {dim} coordinates cannot be "
+                        f"concatenated")
+            if set(dataset.coords) != set(first.coords):
+                raise ValueError(
+                    "SparseIntensityTables with different coordinates cannot be concatenated")
+
+        coords = {
+            name: (coordinate.dims, coordinate.values)
+            for name, coordinate in first.coords.items()
+            if name not in feature_coordinates
+        }
+        for name in feature_coordinates:
+            coords[name] = (
+                Features.AXIS,
+                np.concatenate([table._dataset[name].values for table in tables]))
+
+        offsets = np.cumsum([0] + [table.sizes[Features.AXIS] for table in tables[:-1]])
+        feature_index = np.concatenate([
+            table._dataset[ENTRY_FEATURE].values.astype(np.int64) + offset
+            for table, offset in zip(tables, offsets)
+        ])
+        channel_index, round_index, intensities = (
+            np.concatenate([table._dataset[name].values for table in tables])
+            for name in (ENTRY_CH, ENTRY_ROUND, ENTRY_INTENSITY)
+        )
+        return cls._create(
+            coords, feature_index, channel_index, round_index, intensities, attrs=first.attrs)
+
+    def map_blocks(
+            self,
+            func: Callable[[IntensityTable], IntensityTable],
+            block_size: int=DENSE_BLOCK_SIZE,
+    ) -> "SparseIntensityTable":
+        """Apply a function of dense IntensityTables to blocks of at most block_size features, and
+        concatenate the sparse results.  At most one block is dense at a time.
+
+        Parameters
+        ----------
+        func : Callable[[IntensityTable], IntensityTable]
+            function that returns an IntensityTable with the features of the IntensityTable it is
+            passed, e.g., a decoder.
+        block_size : int
+            the number of features converted to a dense IntensityTable at a time.
+
+        Returns
+        -------
+        SparseIntensityTable :
+            the concatenated results of func
+        """
+        n_features = self.sizes[Features.AXIS]
+        return self.concatenate(
+            SparseIntensityTable.from_dense(
+                func(self._block(start, min(start + block_size, n_features)).to_dense()))
+            for start in range(0, max(n_features, 1), block_size)
+        )
+
+    def to_features_dataframe(self) -> pd.DataFrame:
+        """Generates a dataframe of the coordinates of the features.
+        This is guaranteed to contain the features x, y, z, and radius.
+
+        Returns
+        -------
+        pd.DataFrame
+
+        """
+        return pd.DataFrame(dict(self._dataset[Features.AXIS].coords))
+
+    def to_expression_matrix(self) -> ExpressionMatrix:
+        """Generates a cell x gene count matrix where each cell is annotated with spatial metadata
+
+        Requires that spots in the SparseIntensityTable have been assigned to cells.
+
+        Returns
+        -------
+        ExpressionMatrix :
+            cell x gene expression table
+        """
+        return self.to_sparse_expression_matrix().to_dense()
+
+    def to_sparse_expression_matrix(self) -> SparseExpressionMatrix:
+        """Generates a cell x gene count matrix, stored in compressed sparse row format, where each
+        cell is annotated with spatial metadata
+
+        Requires that spots in the SparseIntensityTable have been assigned to cells.
+
+        Returns
+        -------
+        SparseExpressionMatrix :
+            cell x gene expression table
+        """
+        return SparseExpressionMatrix.from_features(self.to_features_dataframe())
+
+    def save(self, filename: str) -> None:
+        """Save a SparseIntensityTable as a Netcdf File
+
+        Parameters
+        ----------
+        filename : str
+            Name of Netcdf file
+
+        """
+        self._dataset.to_netcdf(filename)
+
+    @classmethod
+    def load(cls, filename: str) -> "SparseIntensityTable":
+        """load a SparseIntensityTable from Netcdf
+
+        Parameters
+        ----------
+        filename : str
+            File to load
+
+        Returns
+        -------
+        SparseIntensityTable
+
+        """
+        with xr.open_dataset(filename) as loaded:
+            return cls(loaded.load())
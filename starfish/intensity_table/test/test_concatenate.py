@@ -1,7 +1,11 @@
 import numpy as np
+import pandas as pd
+import xarray as xr
 
 from starfish import ImageStack, IntensityTable
-from starfish.intensity_table.concatenate import concatenate
+from starfish.intensity_table.concatenate import concatenate, IntensityTableBuilder
+from starfish.types import Axes, Features
+from starfish.util.synthesize import SyntheticData
 
 
 def test_intensity_table_concatenation():
@@ -47,3 +51,63 @@ def test_intensity_table_concatenation():
     result = concatenate([i1, i4])
 
     assert expected_shape == result.shape
+
+
+def synthetic_tables(n_tables: int, n_spots: int=7):
+    np.random.seed(0)
+    data = SyntheticData(n_ch=2, n_round=3, n_codes=1, n_spots=n_spots)
+    codebook = data.codebook()
+    return [data.intensities(codebook=codebook) for _ in range(n_tables)]
+
+
+def test_builder_matches_xarray_concat():
+    """Add tables to a builder whose buffers start with room for a single feature, so that they
+    grow many times, and verify that the result matches xr.concat."""
+    tables = synthetic_tables(20)
+    # the targets of different tables have different lengths.
+    for ix, table in enumerate(tables):
+        table[Features.TARGET] = (Features.AXIS, np.full(7, "GENE" + "X" * (ix % 3)))
+    builder = IntensityTableBuilder(initial_capacity=1)
+    for table in tables:
+        builder.add(table)
+    assert len(builder) == 20 * 7
+    result = builder.build()
+
+    assert isinstance(result, IntensityTable)
+    expected = xr.concat(tables, Features.AXIS)
+    xr.testing.assert_identical(result, expected)
+    assert result[Features.TARGET].dtype == expected[Features.TARGET].dtype == np.dtype("<U6")
+    # the result does not keep the unused capacity of the buffers alive.
+    assert builder._capacity > len(builder)
+    assert not np.shares_memory(result.values, builder._data)
+
+
+def test_builder_aligns_coordinates_by_name():
+    """Coordinates that only some tables have are NaN for the features of the other tables, and
+    integer coordinates become floats to hold NaN."""
+    table1, table2 = synthetic_tables(2)
+    table1 = table1.drop(Features.TARGET)
+    table2 = table2.drop(Axes.ZPLANE.value)
+    result = concatenate([table1, table2])
+
+    assert result.sizes[Features.AXIS] == 14
+    assert np.all(pd.isnull(result[Features.TARGET].values[:7]))
+    assert np.array_equal(result[Features.TARGET].values[7:], table2[Features.TARGET].values)
+    assert result[Axes.ZPLANE.value].dtype.kind == "f"
+    assert np.array_equal(result[Axes.ZPLANE.value].values[:7], table1[Axes.ZPLANE.value].values)
+    assert np.all(np.isnan(result[Axes.ZPLANE.value].values[7:]))
+
+
+def test_builder_spills_to_disk(tmpdir):
+    tables = synthetic_tables(4)
+    builder = IntensityTableBuilder(memory_limit=0, spill_directory=str(tmpdir))
+    for table in tables:
+        builder.add(table)
+    result = builder.build()
+
+    assert builder.spilled
+    assert isinstance(builder._data, np.memmap)
+    assert np.shares_memory(result.values, builder._data)
+    # the file is removed once it is mapped.
+    assert tmpdir.listdir() == []
+    xr.testing.assert_identical(result, xr.concat(tables, Features.AXIS))
@@ -0,0 +1,184 @@
+import os
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import pytest
+import xarray as xr
+
+from starfish import IntensityTable
+from starfish.codebook.codebook import Codebook
+from starfish.intensity_table import intensity_table_coordinates
+from starfish.intensity_table.sparse import SparseIntensityTable
+from starfish.spots._detector.detect import (
+    concatenate_spot_attributes_to_intensities,
+    concatenate_spot_attributes_to_sparse_intensities,
+)
+from starfish.test import factories
+from starfish.types import Axes, Coordinates, Features, PhysicalCoordinateTypes, SpotAttributes
+from starfish.util.synthesize import SyntheticData
+
+
+def one_hot_intensities(n_spots: int=20):
+    """Intensities of a non-multiplexed assay: each target is measured in a single channel."""
+    np.random.seed(0)
+    codebook = Codebook.synthetic_one_hot_codebook(n_round=1, n_channel=4, n_codes=4)
+    data = SyntheticData(n_ch=4, n_round=1, n_codes=4, n_spots=n_spots)
+    return codebook, data.intensities(codebook=codebook)
+
+
+def spot_attributes_per_channel(n_ch: int, n_spots: int):
+    np.random.seed(0)
+    spot_attributes = []
+    for ch in range(n_ch):
+        data = pd.DataFrame({
+            Axes.ZPLANE.value: np.random.randint(0, 5, n_spots),
+            Axes.Y.value: np.random.randint(0, 50, n_spots),
+            Axes.X.value: np.random.randint(0, 50, n_spots),
+            Features.SPOT_RADIUS: np.full(n_spots, 2.0),
+            Features.SPOT_ID: np.arange(n_spots),
+            Features.INTENSITY: np.random.uniform(0.1, 1, n_spots),
+        })
+        spot_attributes.append((SpotAttributes(data), {Axes.ROUND: 0, Axes.CH: ch}))
+    return spot_attributes
+
+
+def test_dense_round_trip():
+    _, intensities = one_hot_intensities()
+    intensities[0, 1, 0] = np.nan
+    sparse = SparseIntensityTable.from_dense(intensities)
+
+    assert sparse.shape == intensities.shape
+    assert sparse.nnz == np.count_nonzero(intensities.values)
+    xr.testing.assert_identical(sparse.to_dense(), intensities)
+    pd.testing.assert_frame_equal(
+        sparse.to_features_dataframe(), intensities.to_features_dataframe())
+
+
+def filled_intensity_table(spot_attributes) -> IntensityTable:
+    """Concatenate spot attributes by filling an empty IntensityTable one spot at a time."""
+    n_ch = max(inds[Axes.CH] for _, inds in spot_attributes) + 1
+    n_round = max(inds[Axes.ROUND] for _, inds in spot_attributes) + 1
+    all_spots = pd.concat([sa.data for sa, inds in spot_attributes], sort=True)
+    features_coordinates = all_spots.drop([Features.SPOT_ID, Features.INTENSITY], axis=1)
+
+    intensity_table = IntensityTable.empty_intensity_table(
+        SpotAttributes(features_coordinates), n_ch, n_round)
+    i = 0
+    for attrs, inds in spot_attributes:
+        for _, row in attrs.data.iterrows():
+            intensity_table[i, inds[Axes.CH], inds[Axes.ROUND]] = row[Features.INTENSITY]
+            i += 1
+    return intensity_table
+
+
+def test_concatenate_spot_attributes():
+    """The sparse table holds the same intensities as the dense one in an order of magnitude less
+    memory."""
+    spot_attributes = spot_attributes_per_channel(n_ch=16, n_spots=50)
+    sparse = concatenate_spot_attributes_to_sparse_intensities(spot_attributes)
+    dense = concatenate_spot_attributes_to_intensities(spot_attributes)
+    expected = filled_intensity_table(spot_attributes)
+
+    assert sparse.nnz == 16 * 50
+    assert expected.nbytes >= 8 * sparse.nbytes
+    xr.testing.assert_identical(sparse.to_dense(), expected)
+    xr.testing.assert_identical(dense, expected)
+
+
+@pytest.mark.parametrize("decode", ["decode_per_round_max", "metric_decode"])
+def test_decode(decode):
+    codebook, intensities = one_hot_intensities()
+    kwargs = dict(max_distance=0.5, min_intensity=0, norm_order=2) if decode == "metric_decode" \
+        else dict()
+    expected = getattr(codebook, decode)(intensities.copy(), **kwargs)
+    decoded = getattr(codebook, decode)(SparseIntensityTable.from_dense(intensities), **kwargs)
+
+    assert isinstance(decoded, SparseIntensityTable)
+    xr.testing.assert_identical(decoded.to_dense(), expected)
+
+
+def test_map_blocks():
+    """Functions of dense tables are applied to each block of features."""
+    codebook, intensities = one_hot_intensities(n_spots=20)
+    sparse = SparseIntensityTable.from_dense(intensities)
+    block_sizes = []
+
+    def decode(block):
+        block_sizes.append(block.sizes[Features.AXIS])
+        return codebook.decode_per_round_max(block)
+
+    decoded = sparse.map_blocks(decode, block_size=6)
+    assert block_sizes == [6, 6, 6, 2]
+    xr.testing.assert_identical(
+        decoded.to_dense(), codebook.decode_per_round_max(intensities.copy()))
+
+
+def test_select_features_that_pass_thresholds():
+    codebook, intensities = one_hot_intensities()
+    intensities[:5] = 0
+    decoded = codebook.metric_decode(
+        SparseIntensityTable.from_dense(intensities),
+        max_distance=0.5, min_intensity=0.01, norm_order=2)
+    passes_thresholds = decoded[Features.PASSES_THRESHOLDS].values
+    assert not np.all(passes_thresholds)
+
+    dense = decoded.to_dense()
+    xr.testing.assert_identical(
+        decoded.isel_features(passes_thresholds).to_dense(),
+        dense[passes_thresholds])
+
+    reversed_features = decoded.isel_features(np.arange(decoded.sizes[Features.AXIS])[::-1])
+    xr.testing.assert_identical(reversed_features.to_dense(), dense[::-1])
+    with pytest.raises(ValueError):
+        decoded.isel_features([0, 0])
+
+
+def test_save_load(tmpdir):
+    codebook, intensities = one_hot_intensities()
+    decoded = codebook.decode_per_round_max(SparseIntensityTable.from_dense(intensities))
+    filename = os.path.join(str(tmpdir), "intensities.nc")
+    decoded.save(filename)
+    loaded = SparseIntensityTable.load(filename)
+
+    assert loaded.nnz == decoded.nnz
+    dense, loaded_dense = decoded.to_dense(), loaded.to_dense()
+    assert np.array_equal(loaded_dense.values, dense.values)
+    for name in (Features.TARGET, Features.PASSES_THRESHOLDS, Axes.X.value):
+        assert np.array_equal(loaded_dense[name].values, dense[name].values)
+
+
+def test_to_expression_matrix():
+    codebook, intensities = one_hot_intensities()
+    intensities = codebook.decode_per_round_max(intensities)
+    intensities[Features.CELL_ID] = (
+        Features.AXIS, np.arange(intensities.sizes[Features.AXIS]) % 3)
+    sparse = SparseIntensityTable.from_dense(intensities)
+
+    xr.testing.assert_identical(
+        sparse.to_expression_matrix(), intensities.to_expression_matrix())
+
+
+def test_transfer_physical_coords():
+    stack_shape = OrderedDict([(Axes.ROUND, 1), (Axes.CH, 4),
+                               (Axes.ZPLANE, 1), (Axes.Y, 50), (Axes.X, 40)])
+    physical_coords = OrderedDict([(PhysicalCoordinateTypes.X_MIN, 1),
+                                   (PhysicalCoordinateTypes.X_MAX, 2),
+                                   (PhysicalCoordinateTypes.Y_MIN, 4),
+                                   (PhysicalCoordinateTypes.Y_MAX, 6),
+                                   (PhysicalCoordinateTypes.Z_MIN, 1),
+                                   (PhysicalCoordinateTypes.Z_MAX, 3)])
+    stack = factories.imagestack_with_coords_factory(stack_shape, physical_coords)
+    codebook = Codebook.synthetic_one_hot_codebook(n_round=1, n_channel=4, n_codes=4)
+    intensities = IntensityTable.synthetic_intensities(
+        codebook, num_z=1, height=50, width=40, n_spots=10)
+    intensities[2] = 0
+    sparse = SparseIntensityTable.from_dense(intensities)
+
+    expected = intensity_table_coordinates.\
+        transfer_physical_coords_from_imagestack_to_intensity_table(stack, intensities)
+    sparse = intensity_table_coordinates.\
+        transfer_physical_coords_from_imagestack_to_sparse_intensity_table(stack, sparse)
+    for name in (Coordinates.X.value, Coordinates.Y.value, Coordinates.Z.value):
+        assert np.array_equal(sparse[name].values, expected[name].values)
+    assert sparse[Coordinates.X.value].values[2] == 0
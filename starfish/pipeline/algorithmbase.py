@@ -1,12 +1,18 @@
 import inspect
+import itertools
 from abc import ABCMeta, abstractmethod
-from typing import Type
+from typing import Any, Iterable, Tuple, Type
+
+import numpy as np
+import xarray as xr
 
 from starfish.imagestack.imagestack import ImageStack
 from starfish.intensity_table.intensity_table import IntensityTable
 from starfish.types import LOG
 from starfish.types._constants import STARFISH_EXTRAS_KEY
+from starfish.util import instrumentation
 from starfish.util.logging import LogEncoder
+from . import memoization
 from .pipelinecomponent import PipelineComponent
 
 
@@ -39,18 +45,29 @@ class AlgorithmBaseType(ABCMeta):
                     ImageStack -> IntensityTable
                     ImageStack -> [IntensityTable, ConnectedComponentDecodingResult]
             TODO segmentation and decoding
+
+        Each run is also profiled (see :py:mod:`starfish.util.instrumentation`), and the profile is
+        stored with the log entry.  If memoization is enabled, the result is loaded from the cache
+        when possible (see :py:mod:`starfish.pipeline.memoization`).
         """
         def helper(*args, **kwargs):
-            result = func(*args, **kwargs)
+            with instrumentation.profile(args[0].__class__.__name__) as component_profile:
+                result = memoization.call(func, *args, **kwargs)
+            component_profile.allocated_bytes = AlgorithmBaseType._allocated_bytes(
+                result, itertools.chain(args, kwargs.values()))
+            profile = instrumentation.log_entry_profile(component_profile)
             # Scenario 1, Filtering, ApplyTransform
             if isinstance(result, ImageStack):
-                result.update_log(args[0])
+                result.update_log(args[0], profile)
             # Scenario 2, Spot detection
             elif isinstance(result, tuple) or isinstance(result, IntensityTable):
-                if isinstance(args[1], ImageStack):
-                    stack = args[1]
+                # the stack may be passed positionally or, e.g. from a recipe, by keyword
+                stack = next((
+                    arg for arg in itertools.chain(args[1:], kwargs.values())
+                    if isinstance(arg, ImageStack)), None)
+                if stack is not None:
                     # update log with spot detection instance args[0]
-                    stack.update_log(args[0])
+                    stack.update_log(args[0], profile)
                     # get resulting intensity table and set log
                     it = result
                     if isinstance(result, tuple):
@@ -59,6 +76,26 @@ class AlgorithmBaseType(ABCMeta):
             return result
         return helper
 
+    @staticmethod
+    def _allocated_bytes(result: Any, inputs: Iterable[Any]) -> int:
+        """Returns the number of bytes held by the arrays and ImageStacks in the result of a run that
+        are not among its inputs, i.e., the memory allocated for new objects."""
+        input_ids = {id(value) for value in inputs}
+        results: Tuple[Any, ...]
+        if isinstance(result, tuple):
+            results = result
+        else:
+            results = (result,)
+        allocated = 0
+        for value in results:
+            if id(value) in input_ids:
+                continue
+            if isinstance(value, ImageStack):
+                allocated += value.xarray.nbytes
+            elif isinstance(value, (np.ndarray, xr.DataArray)):
+                allocated += value.nbytes
+        return allocated
+
 
 class AlgorithmBase(metaclass=AlgorithmBaseType):
 
@@ -0,0 +1,207 @@
+"""
+Opt-in, on-disk memoization of algorithm runs.
+
+When enabled through :py:class:`starfish.config.StarfishConfig` (["memoization"]["enabled"], or
+STARFISH_MEMOIZATION_ENABLED), the result of each run of an algorithm is stored in a cache
+directory, keyed by a content hash of:
+
+- the version of starfish,
+- the class of the algorithm and its arguments (its ``__dict__``),
+- the inputs to ``run``.  ImageStacks and IntensityTables are hashed by their data, coordinates,
+  and the methods and arguments recorded in their logs.  An ImageStack produced by a memoized run
+  is instead identified by the key of that run, so the inputs of downstream stages are not
+  rehashed.
+
+Re-running a pipeline with different parameters for a downstream stage therefore loads the
+results of the upstream stages from the cache instead of recomputing them.  The cache is bounded
+by ["memoization"]["size_limit"] bytes, and the least recently used results are evicted first.
+
+Runs are not memoized if they modify their input in place, or if any argument cannot be hashed
+reproducibly (e.g., a lambda).  Parameters that only control how a run is executed, such as
+``n_processes`` and ``verbose``, are not part of the key.  Results are stored by pickling, with
+ImageStacks converted to plain arrays first.
+
+Results computed by a modified version of an algorithm are only distinguished from earlier results
+by the version of starfish, so the cache should be cleared (see :py:func:`clear`) when developing
+algorithms.
+"""
+import hashlib
+import inspect
+import warnings
+from enum import Enum
+from typing import Any, Callable, List, Mapping, NamedTuple, Optional
+
+import numpy as np
+import xarray as xr
+from diskcache import Cache
+
+from starfish.config import StarfishConfig
+from starfish.imagestack.imagestack import ImageStack
+from starfish.intensity_table.intensity_table import IntensityTable
+from starfish.types import Axes
+
+EXECUTION_PARAMETERS = frozenset(("in_place", "n_processes", "verbose"))
+"""Parameters of run that do not change its result, and are therefore not part of the key."""
+
+
+class UnhashableValue(Exception):
+    """Raised when a value cannot be hashed reproducibly, so a run cannot be memoized."""
+    pass
+
+
+class _StoredImageStack(NamedTuple):
+    """The picklable form of an ImageStack."""
+    data: xr.DataArray
+    log: List[dict]
+
+
+def _update(hasher, value: Any) -> None:
+    """Add a value to a hash.  Each value is prefixed by its type, so that 1 and "1" differ."""
+    if isinstance(value, ImageStack):
+        hasher.update(b"ImageStack")
+        if value._memoization_key is not None:
+            hasher.update(value._memoization_key.encode())
+        else:
+            _update(hasher, value.xarray)
+            _update(hasher, [(entry["method"], entry["arguments"]) for entry in value.log])
+    elif isinstance(value, xr.DataArray):
+        hasher.update(type(value).__name__.encode())
+        _update(hasher, value.dims)
+        _update(hasher, value.values)
+        _update(hasher, {name: coordinate.values for name, coordinate in value.coords.items()})
+        if isinstance(value, IntensityTable):
+            _update(hasher, [(entry["method"], entry["arguments"]) for entry in value.get_log()])
+    elif isinstance(value, np.ndarray):
+        if value.dtype == object:
+            _update(hasher, value.tolist())
+        else:
+            hasher.update(f"ndarray{value.dtype.str}{value.shape}".encode())
+            hasher.update(np.ascontiguousarray(value).data)
+    elif isinstance(value, Enum):
+        hasher.update(f"{type(value).__qualname__}.{value.name}".encode())
+    elif value is None or isinstance(value, (bool, int, float, complex, str, bytes, np.generic)):
+        hasher.update(f"{type(value).__name__}{value!r}".encode())
+    elif isinstance(value, Mapping):
+        hasher.update(b"Mapping")
+        for item_key, item in sorted(value.items(), key=lambda key_item: repr(key_item[0])):
+            _update(hasher, item_key)
+            _update(hasher, item)
+    elif isinstance(value, (list, tuple)):
+        hasher.update(f"{type(value).__name__}{len(value)}".encode())
+        for item in value:
+            _update(hasher, item)
+    elif isinstance(value, (set, frozenset)):
+        hasher.update(f"set{len(value)}".encode())
+        for item in sorted(value, key=repr):
+            _update(hasher, item)
+    elif isinstance(value, np.ufunc):
+        hasher.update(f"numpy.{value.__name__}".encode())
+    elif inspect.isfunction(value) or inspect.isbuiltin(value) or inspect.isclass(value):
+        name = f"{value.__module__}.{value.__qualname__}"
+        if "<" in name:
+            raise UnhashableValue(f"{name} cannot be identified by its name")
+        hasher.update(name.encode())
+    elif hasattr(value, "__dict__"):
+        _update(hasher, type(value))
+        _update(hasher, vars(value))
+    else:
+        raise UnhashableValue(f"values of type {type(value)} cannot be hashed")
+
+
+def key(algorithm: Any, arguments: Mapping[str, Any]) -> str:
+    """Returns the key of running an algorithm with the given arguments to its run method.  Raises
+    :py:class:`UnhashableValue` if the run cannot be memoized."""
+    import starfish
+
+    hasher = hashlib.sha256()
+    _update(hasher, starfish.__version__)
+    _update(hasher, type(algorithm))
+    _update(hasher, vars(algorithm))
+    _update(hasher, {
+        name: value for name, value in arguments.items() if name not in EXECUTION_PARAMETERS})
+    return hasher.hexdigest()
+
+
+def _store(value: Any) -> Any:
+    if isinstance(value, ImageStack):
+        data = value.xarray.copy(deep=False)
+        data.data = np.array(value.xarray.values)
+        return _StoredImageStack(data, value.log)
+    elif isinstance(value, tuple) and not hasattr(value, "_fields"):
+        return tuple(_store(item) for item in value)
+    return value
+
+
+def _restore(value: Any) -> Any:
+    if isinstance(value, _StoredImageStack):
+        data = value.data
+        stack = ImageStack.from_numpy_array(data.values, index_labels={
+            axis: list(data.coords[axis.value].values)
+            for axis in (Axes.ROUND, Axes.CH, Axes.ZPLANE)
+        })
+        for name, coordinate in data.coords.items():
+            if name not in data.dims:
+                stack._data[name] = coordinate
+        stack._log = value.log
+        return stack
+    elif isinstance(value, tuple) and not hasattr(value, "_fields"):
+        return tuple(_restore(item) for item in value)
+    return value
+
+
+def _open_cache(config: StarfishConfig) -> Cache:
+    return Cache(
+        config.memoization["directory"],
+        size_limit=config.memoization["size_limit"],
+        eviction_policy="least-recently-used",
+    )
+
+
+def call(func: Callable, *args, **kwargs) -> Any:
+    """
+    Call the run method of an algorithm, func(algorithm, *args, **kwargs), returning its result
+    from the cache if it has already been computed.  If memoization is not enabled, or the run
+    cannot be memoized, func is simply called.
+    """
+    config = StarfishConfig()
+    if not config.memoization["enabled"]:
+        return func(*args, **kwargs)
+
+    bound = inspect.signature(func).bind(*args, **kwargs)
+    bound.apply_defaults()
+    arguments = dict(bound.arguments)
+    algorithm = arguments.pop(next(iter(inspect.signature(func).parameters)))
+    if arguments.get("in_place", False):
+        return func(*args, **kwargs)
+    try:
+        memoization_key = key(algorithm, arguments)
+    except UnhashableValue as ex:
+        warnings.warn(f"{type(algorithm).__name__} was not memoized: {ex}")
+        return func(*args, **kwargs)
+
+    with _open_cache(config) as cache:
+        stored = cache.get(memoization_key)
+        if stored is not None:
+            result = _restore(stored)
+        else:
+            result = func(*args, **kwargs)
+            cache.set(memoization_key, _store(result))
+
+    _tag(result, memoization_key)
+    return result
+
+
+def _tag(result: Any, memoization_key: str) -> None:
+    """Identify the ImageStacks in a result by the key of the run that produced them, and their
+    position in the result."""
+    if isinstance(result, ImageStack):
+        result._memoization_key = memoization_key
+    elif isinstance(result, tuple) and not hasattr(result, "_fields"):
+        for ix, value in enumerate(result):
+            _tag(value, f"{memoization_key}/{ix}")
+
+
+def clear(config: Optional[StarfishConfig]=None) -> None:
+    """Remove all the memoized results from the cache directory."""
+    with _open_cache(config or StarfishConfig()) as cache:
+        cache.clear()
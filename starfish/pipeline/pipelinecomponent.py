@@ -23,8 +23,15 @@ class PipelineComponentType(ABCMeta):
         PipelineComponentType._pipeline_component_type_name_to_class_map[
             cls.pipeline_component_type_name()] = cls
 
+    _pipeline_component_packages = ("starfish.image", "starfish.spots")
+    """Packages that define the pipeline components.  These are imported the first time a component
+    is looked up by name, as the library's top-level names are only loaded on demand."""
+
     @staticmethod
     def get_pipeline_component_type_by_name(name: str) -> Type["PipelineComponent"]:
+        if name not in PipelineComponentType._pipeline_component_type_name_to_class_map:
+            for package in PipelineComponentType._pipeline_component_packages:
+                importlib.import_module(package)
         return PipelineComponentType._pipeline_component_type_name_to_class_map[name]
 
 
@@ -0,0 +1,299 @@
+"""
+A recipe chains pipeline components together and runs them in a single process.  Invoking each
+component from the command line reads its inputs from disk and writes its results back out, so a
+recipe with several stages spends most of its time serializing and deserializing the same data.  A
+recipe instead keeps every intermediate result in memory, and only writes the results that are
+explicitly requested.
+
+A recipe is a json document of the following form:
+
+.. code-block:: json
+
+    {
+        "inputs": {
+            "primary": "@experiment.json[fov_001][primary]",
+            "dots": "@experiment.json[fov_001][dots]",
+            "codebook": {"type": "codebook", "path": "@experiment.json"}
+        },
+        "stages": [
+            {
+                "component": "filter",
+                "algorithm": "WhiteTophat",
+                "parameters": {"masking_radius": 15},
+                "inputs": ["primary"],
+                "outputs": ["filtered"]
+            },
+            {
+                "component": "detect_spots",
+                "algorithm": "BlobDetector",
+                "parameters": {"min_sigma": 1, "max_sigma": 10, "num_sigma": 30,
+                               "threshold": 0.01},
+                "inputs": ["filtered", "dots"],
+                "arguments": {"blobs_axes": ["r", "c"]},
+                "outputs": ["spots"]
+            },
+            {
+                "component": "decode",
+                "algorithm": "PerRoundMaxChannelDecoder",
+                "inputs": ["spots", "codebook"],
+                "outputs": ["decoded"]
+            }
+        ],
+        "outputs": {
+            "decoded": "decoded.nc"
+        }
+    }
+
+Each value in ``inputs`` is either a string, which is loaded as an ImageStack, or an object with a
+``type`` (see :py:data:`LOADERS`) and a ``path``.  Stages are run in order.  ``component`` and
+``algorithm`` name a pipeline component and one of its algorithms, and ``parameters`` are passed to
+the algorithm's constructor.  ``inputs`` names the objects passed to the algorithm's run method,
+either positionally (a list) or by keyword (an object mapping parameter names to object names), and
+``arguments`` are additional keyword arguments passed to run as-is.  The results of run are bound
+to the names in ``outputs``; if run returns a tuple, its elements are bound in order.  Finally, each
+object named in the recipe's ``outputs`` is written to the corresponding path (see
+:py:data:`WRITERS`).
+"""
+import json
+from typing import Any, Callable, Mapping, MutableMapping, Optional, Sequence, Tuple, Type, Union
+
+import numpy as np
+from skimage.io import imread, imsave
+
+from starfish.codebook.codebook import Codebook
+from starfish.image._registration.transforms_list import TransformsList
+from starfish.imagestack.imagestack import ImageStack
+from starfish.intensity_table.intensity_table import IntensityTable
+from starfish.util import click, clock
+from starfish.util.click.indirectparams import CodebookParamType, ImageStackParamType
+from .pipelinecomponent import PipelineComponent
+
+
+LOADERS: Mapping[str, Callable[[str], Any]] = {
+    "imagestack": lambda path: ImageStackParamType.convert(path, None, None),
+    "codebook": lambda path: CodebookParamType.convert(path, None, None),
+    "intensity_table": IntensityTable.load,
+    "transforms_list": TransformsList.from_json,
+    "label_image": imread,
+}
+"""Maps the type of a recipe input to the function that loads it from a path or url."""
+
+WRITERS: Sequence[Tuple[Type, Callable[[Any, str], None]]] = (
+    (ImageStack, ImageStack.export),
+    (IntensityTable, IntensityTable.save),
+    (Codebook, Codebook.to_json),
+    (TransformsList, TransformsList.to_json),
+    (np.ndarray, lambda label_image, path: imsave(path, label_image)),
+)
+"""Maps the type of a recipe output to the function that writes it to a path."""
+
+
+class RecipeError(Exception):
+    """Raised when a recipe is malformed or refers to objects that do not exist."""
+    pass
+
+
+class Stage:
+    def __init__(
+            self,
+            component: str,
+            algorithm: str,
+            parameters: Optional[Mapping[str, Any]]=None,
+            inputs: Optional[Union[Sequence[str], Mapping[str, str]]]=None,
+            arguments: Optional[Mapping[str, Any]]=None,
+            outputs: Optional[Sequence[str]]=None,
+    ) -> None:
+        """A single step of a recipe, which runs one algorithm of a pipeline component.
+
+        Parameters
+        ----------
+        component : str
+            Name of the pipeline component, e.g., "filter" or "detect_spots".
+        algorithm : str
+            Name of the algorithm within the pipeline component, e.g., "WhiteTophat".
+        parameters : Optional[Mapping[str, Any]]
+            Keyword arguments passed to the algorithm's constructor.
+        inputs : Optional[Union[Sequence[str], Mapping[str, str]]]
+            Names of the objects passed to the algorithm's run method, either positionally or, if a
+            mapping, as keyword arguments.
+        arguments : Optional[Mapping[str, Any]]
+            Additional keyword arguments passed to the algorithm's run method.
+        outputs : Optional[Sequence[str]]
+            Names to bind the results of the algorithm's run method to.
+        """
+        try:
+            pipeline_component_cls = PipelineComponent.get_pipeline_component_class_by_name(
+                component)
+        except KeyError:
+            raise RecipeError(f"Unknown pipeline component {component}")
+        try:
+            algorithm_cls = pipeline_component_cls._algorithm_to_class_map()[algorithm]
+        except KeyError:
+            raise RecipeError(f"Unknown algorithm {algorithm} for pipeline component {component}")
+
+        self.component = component
+        self.algorithm = algorithm
+        self.instance = algorithm_cls(**(parameters or {}))
+        self.inputs = inputs or []
+        self.arguments = arguments or {}
+        self.outputs = outputs or []
+
+    def run(self, namespace: MutableMapping[str, Any]) -> None:
+        """Run this stage's algorithm on objects from the namespace, and bind the results back into
+        the namespace."""
+        def lookup(name: str) -> Any:
+            try:
+                return namespace[name]
+            except KeyError:
+                raise RecipeError(f"{self} refers to an undefined object {name}")
+
+        if isinstance(self.inputs, Mapping):
+            args: Sequence[Any] = []
+            kwargs = {key: lookup(name) for key, name in self.inputs.items()}
+        else:
+            args = [lookup(name) for name in self.inputs]
+            kwargs = {}
+        kwargs.update(self.arguments)
+
+        results = self.instance.run(*args, **kwargs)
+
+        if not isinstance(results, tuple):
+            results = (results,)
+        if len(self.outputs) > len(results):
+            raise RecipeError(
+                f"{self} produces {len(results)} results, but {len(self.outputs)} outputs are "
+                f"named")
+        for name, result in zip(self.outputs, results):
+            namespace[name] = result
+
+    def __repr__(self) -> str:
+        return f"{self.component} {self.algorithm}"
+
+
+class Recipe:
+    def __init__(
+            self,
+            stages: Sequence[Stage],
+            inputs: Optional[Mapping[str, Union[str, Mapping[str, str]]]]=None,
+            outputs: Optional[Mapping[str, str]]=None,
+    ) -> None:
+        """A sequence of stages run in a single process, without writing intermediate results to
+        disk.
+
+        Parameters
+        ----------
+        stages : Sequence[Stage]
+            The stages to run, in order.
+        inputs : Optional[Mapping[str, Union[str, Mapping[str, str]]]]
+            Maps the name of each input to the path or url it is loaded from.  A string is loaded
+            as an ImageStack; other types are specified as a mapping with "type" and "path" keys.
+        outputs : Optional[Mapping[str, str]]
+            Maps the name of each object that should be written to disk to the path it is written
+            to.
+        """
+        self.stages = stages
+        self.inputs = dict(inputs or {})
+        self.outputs = dict(outputs or {})
+
+    @classmethod
+    def from_json(cls, path: str) -> "Recipe":
+        """Load a recipe from a json file."""
+        with open(path) as fh:
+            return cls.from_dict(json.load(fh))
+
+    @classmethod
+    def from_dict(cls, recipe: Mapping[str, Any]) -> "Recipe":
+        """Build a recipe from its json representation."""
+        try:
+            stages = [Stage(**stage) for stage in recipe["stages"]]
+        except (KeyError, TypeError) as ex:
+            raise RecipeError(f"Malformed recipe: {ex}")
+        return cls(stages, recipe.get("inputs"), recipe.get("outputs"))
+
+    @staticmethod
+    def _load(spec: Union[str, Mapping[str, str]]) -> Any:
+        if isinstance(spec, str):
+            spec = {"type": "imagestack", "path": spec}
+        try:
+            loader = LOADERS[spec["type"]]
+        except KeyError:
+            raise RecipeError(
+                f"Unknown input type {spec.get('type')}; must be one of {sorted(LOADERS.keys())}")
+        return loader(spec["path"])
+
+    @staticmethod
+    def _write(obj: Any, path: str) -> None:
+        for writable_type, writer in WRITERS:
+            if isinstance(obj, writable_type):
+                writer(obj, path)
+                return
+        raise RecipeError(f"Do not know how to write objects of type {type(obj)}")
+
+    def run(self, verbose: bool=False) -> Mapping[str, Any]:
+        """Load the inputs, run each stage in order, and write the requested outputs.
+
+        Parameters
+        ----------
+        verbose : bool
+            If True, report the time spent in each stage.
+
+        Returns
+        -------
+        Mapping[str, Any] :
+            The inputs and the results of every stage, keyed by name.
+        """
+        undefined = set(self.outputs.keys()) - set(self.inputs.keys()).union(
+            *(stage.outputs for stage in self.stages))
+        if len(undefined) > 0:
+            raise RecipeError(f"Recipe outputs {sorted(undefined)} are never produced")
+
+        def report(description: str) -> Callable[[float], None]:
+            def callback(interval: float) -> None:
+                if verbose:
+                    print(description, " ==> {} seconds".format(interval))
+            return callback
+
+        namespace: MutableMapping[str, Any] = dict()
+        for name, spec in self.inputs.items():
+            with clock.timeit(report(f"load {name}")):
+                namespace[name] = self._load(spec)
+
+        for stage in self.stages:
+            with clock.timeit(report(repr(stage))):
+                stage.run(namespace)
+
+        for name, path in self.outputs.items():
+            with clock.timeit(report(f"write {name}")):
+                self._write(namespace[name], path)
+
+        return namespace
+
+
+def _parse_assignments(ctx, param, values: Sequence[str]) -> Mapping[str, str]:
+    assignments = dict()
+    for value in values:
+        name, sep, path = value.partition("=")
+        if sep != "=" or len(name) == 0:
+            raise click.BadParameter(f"{value} is not of the form NAME=PATH")
+        assignments[name] = path
+    return assignments
+
+
+@click.command("recipe")
+@click.argument("recipe", type=click.Path(exists=True))
+@click.option(
+    "--input", "inputs", multiple=True, callback=_parse_assignments, metavar="NAME=PATH",
+    help="load NAME from PATH instead of the path given in the recipe.  Inputs that are not in "
+         "the recipe are loaded as ImageStacks")
+@click.option(
+    "--output", "outputs", multiple=True, callback=_parse_assignments, metavar="NAME=PATH",
+    help="write the object NAME to PATH, in addition to the recipe's outputs")
+def _cli(recipe, inputs, outputs):
+    """run several pipeline components in one process, writing only the requested results"""
+    print("Running recipe...")
+    loaded = Recipe.from_json(recipe)
+    for name, path in inputs.items():
+        spec = loaded.inputs.get(name)
+        loaded.inputs[name] = dict(spec, path=path) if isinstance(spec, Mapping) else path
+    loaded.outputs.update(outputs)
+    loaded.run(verbose=True)
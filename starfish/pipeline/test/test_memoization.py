@@ -0,0 +1,149 @@
+import os
+from copy import deepcopy
+from unittest import mock
+
+import numpy as np
+import pytest
+import xarray as xr
+
+from starfish.config import environ
+from starfish.image._filter.element_wise_mult import ElementWiseMultiply
+from starfish.image._filter.gaussian_low_pass import GaussianLowPass
+from starfish.imagestack.imagestack import ImageStack
+from starfish.pipeline import memoization
+from starfish.spots._detector.blob import BlobDetector
+from starfish.types import Axes
+
+
+def _stack(seed: int=0) -> ImageStack:
+    data = np.random.RandomState(seed).rand(2, 2, 3, 30, 30).astype(np.float32)
+    return ImageStack.from_numpy_array(data)
+
+
+@pytest.fixture
+def memoized(tmpdir):
+    with environ(MEMOIZATION_ENABLED="true", MEMOIZATION_DIRECTORY=str(tmpdir)):
+        yield str(tmpdir)
+
+
+def _count_applies():
+    return mock.patch.object(ImageStack, "apply", autospec=True, side_effect=ImageStack.apply)
+
+
+def _filter_runs(apply) -> int:
+    """Number of filter runs that were computed.  Each run that is not in place calls apply twice:
+    once on its input, and once in place on a copy of it."""
+    return sum(1 for _, kwargs in apply.call_args_list if not kwargs.get("in_place", False))
+
+
+def test_results_are_memoized(memoized):
+    stack = _stack()
+    with _count_applies() as apply:
+        filtered = GaussianLowPass(sigma=1).run(stack)
+        # n_processes does not change the result, so it is not part of the key.
+        memoized_filtered = GaussianLowPass(sigma=1).run(stack, n_processes=2)
+        assert _filter_runs(apply) == 1
+
+        assert np.array_equal(filtered.xarray.values, memoized_filtered.xarray.values)
+        assert filtered.xarray.coords.to_dataset().equals(
+            memoized_filtered.xarray.coords.to_dataset())
+        assert [entry["method"] for entry in memoized_filtered.log] == ["GaussianLowPass"]
+        assert memoized_filtered.log[0]["arguments"] == filtered.log[0]["arguments"]
+
+        # different parameters or different data are computed.
+        GaussianLowPass(sigma=2).run(stack)
+        GaussianLowPass(sigma=1).run(_stack(seed=1))
+        assert _filter_runs(apply) == 3
+
+
+def test_downstream_sweep(memoized):
+    """sweeping the parameters of a downstream stage should not recompute the upstream stage, and
+    the results of the downstream stage should match those computed without memoization"""
+    stack = _stack()
+    with _count_applies() as apply:
+        for threshold in (0.1, 0.2, 0.1):
+            filtered = GaussianLowPass(sigma=1).run(stack)
+            intensities = BlobDetector(
+                min_sigma=1, max_sigma=2, num_sigma=2, threshold=threshold,
+            ).run(filtered, filtered, (Axes.ROUND, Axes.CH))
+        assert _filter_runs(apply) == 1
+
+    with environ(MEMOIZATION_ENABLED="false"):
+        filtered = GaussianLowPass(sigma=1).run(stack)
+        expected = BlobDetector(min_sigma=1, max_sigma=2, num_sigma=2, threshold=0.1).run(
+            filtered, filtered, (Axes.ROUND, Axes.CH))
+    assert np.array_equal(intensities.values, expected.values)
+    assert intensities.get_log()[-1]["method"] == "BlobDetector"
+
+
+def test_writes_invalidate_the_upstream_key(memoized):
+    stack = _stack()
+    filtered = GaussianLowPass(sigma=1).run(stack)
+    assert filtered._memoization_key is not None
+
+    filtered.set_slice({Axes.ROUND: 0, Axes.CH: 0, Axes.ZPLANE: 0}, np.zeros((30, 30), np.float32))
+    assert filtered._memoization_key is None
+    refiltered = GaussianLowPass(sigma=2).run(filtered)
+    assert np.all(refiltered.xarray.values[0, 0, 0] == 0)
+
+
+def test_modified_copies_are_not_identified_by_the_upstream_key(memoized):
+    """a stack modified outside of set_slice and apply, e.g. by ElementWiseMultiply, is not
+    hashed by the key of the run that produced it"""
+    mult_array = xr.DataArray(
+        np.full((1, 1, 1, 1, 1), 0.5),
+        dims=(Axes.ROUND.value, Axes.CH.value, Axes.ZPLANE.value, Axes.Y.value, Axes.X.value))
+    filtered = GaussianLowPass(sigma=1).run(_stack())
+    assert deepcopy(filtered)._memoization_key is None
+
+    GaussianLowPass(sigma=2).run(filtered)
+    ElementWiseMultiply(mult_array).run(filtered, in_place=True)
+    refiltered = GaussianLowPass(sigma=2).run(filtered)
+
+    with environ(MEMOIZATION_ENABLED="false"):
+        expected = GaussianLowPass(sigma=2).run(filtered)
+    assert np.array_equal(refiltered.xarray.values, expected.xarray.values)
+
+
+def test_in_place_and_unhashable_runs_are_not_memoized(memoized):
+    stack = _stack()
+    with _count_applies() as apply:
+        GaussianLowPass(sigma=1).run(stack, in_place=True)
+        GaussianLowPass(sigma=1).run(stack, in_place=True)
+        assert apply.call_count == 2
+
+    filter_ = GaussianLowPass(sigma=1)
+    filter_.unhashable = lambda x: x
+    with pytest.warns(UserWarning, match="not memoized"):
+        filter_.run(stack)
+
+
+def test_size_limit(tmpdir):
+    with environ(
+            MEMOIZATION_ENABLED="true", MEMOIZATION_DIRECTORY=str(tmpdir),
+            MEMOIZATION_SIZE_LIMIT="1e5",
+    ):
+        for sigma in range(1, 8):
+            GaussianLowPass(sigma=sigma).run(_stack())
+
+    size = sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, names in os.walk(str(tmpdir))
+        for name in names
+        if not name.startswith("cache.db")
+    )
+    assert size <= 1e5
+
+
+def test_disabled(tmpdir):
+    with environ(MEMOIZATION_DIRECTORY=str(tmpdir)):
+        filtered = GaussianLowPass(sigma=1).run(_stack())
+        assert filtered._memoization_key is None
+        assert os.listdir(str(tmpdir)) == []
+
+    with environ(MEMOIZATION_ENABLED="true", MEMOIZATION_DIRECTORY=str(tmpdir)):
+        GaussianLowPass(sigma=1).run(_stack())
+        memoization.clear()
+        with _count_applies() as apply:
+            GaussianLowPass(sigma=1).run(_stack())
+            assert _filter_runs(apply) == 1
@@ -0,0 +1,108 @@
+import json
+import os
+
+import numpy as np
+import pytest
+from click.testing import CliRunner
+
+from starfish.image._filter.clip import Clip
+from starfish.intensity_table.intensity_table import IntensityTable
+from starfish.pipeline.recipe import _cli, Recipe, RecipeError
+from starfish.spots._decoder.per_round_max_channel_decoder import PerRoundMaxChannelDecoder
+from starfish.spots._detector.blob import BlobDetector
+from starfish.test.factories import two_spot_one_hot_coded_data_factory
+from starfish.types import Axes, Features
+
+
+def _recipe(tmpdir) -> dict:
+    codebook, stack, _ = two_spot_one_hot_coded_data_factory()
+    stack.export(os.path.join(tmpdir, "stack.json"))
+    codebook.to_json(os.path.join(tmpdir, "codebook.json"))
+
+    return {
+        "inputs": {
+            "primary": os.path.join(tmpdir, "stack.json"),
+            "codebook": {"type": "codebook", "path": os.path.join(tmpdir, "codebook.json")},
+        },
+        "stages": [
+            {
+                "component": "filter",
+                "algorithm": "Clip",
+                "parameters": {"p_min": 0, "p_max": 100},
+                "inputs": ["primary"],
+                "outputs": ["clipped"],
+            },
+            {
+                "component": "detect_spots",
+                "algorithm": "BlobDetector",
+                "parameters": {"min_sigma": 1, "max_sigma": 4, "num_sigma": 5, "threshold": 0},
+                "inputs": {"primary_image": "clipped", "blobs_image": "clipped"},
+                "arguments": {"blobs_axes": ["r", "c"]},
+                "outputs": ["spots"],
+            },
+            {
+                "component": "decode",
+                "algorithm": "PerRoundMaxChannelDecoder",
+                "inputs": ["spots", "codebook"],
+                "outputs": ["decoded"],
+            },
+        ],
+        "outputs": {
+            "decoded": os.path.join(tmpdir, "decoded.nc"),
+        },
+    }
+
+
+def test_recipe_matches_api(tmpdir):
+    """running a recipe should give the same results as calling each algorithm directly, and only
+    write the requested outputs"""
+    recipe = _recipe(str(tmpdir))
+    inputs = set(os.listdir(str(tmpdir)))
+    results = Recipe.from_dict(recipe).run()
+    assert set(os.listdir(str(tmpdir))) - inputs == {"decoded.nc"}
+
+    codebook, stack, _ = two_spot_one_hot_coded_data_factory()
+    clipped = Clip(p_min=0, p_max=100).run(stack)
+    spots = BlobDetector(min_sigma=1, max_sigma=4, num_sigma=5, threshold=0).run(
+        clipped, clipped, (Axes.ROUND, Axes.CH))
+    decoded = PerRoundMaxChannelDecoder().run(spots, codebook)
+
+    assert np.array_equal(results["clipped"].xarray.values, clipped.xarray.values)
+    assert np.array_equal(results["decoded"].values, decoded.values)
+    assert np.array_equal(
+        results["decoded"][Features.TARGET].values, decoded[Features.TARGET].values)
+
+    written = IntensityTable.load(os.path.join(str(tmpdir), "decoded.nc"))
+    assert np.array_equal(written.values, decoded.values)
+
+
+def test_recipe_cli(tmpdir):
+    """intermediate results can be written by naming them on the command line"""
+    recipe_path = os.path.join(str(tmpdir), "recipe.json")
+    with open(recipe_path, "w") as fh:
+        json.dump(_recipe(str(tmpdir)), fh)
+
+    spots_path = os.path.join(str(tmpdir), "spots.nc")
+    result = CliRunner().invoke(_cli, [recipe_path, "--output", f"spots={spots_path}"])
+
+    assert result.exit_code == 0, result.output
+    assert os.path.exists(os.path.join(str(tmpdir), "decoded.nc"))
+    assert len(IntensityTable.load(spots_path)[Features.AXIS]) == 2
+
+
+def test_recipe_errors(tmpdir):
+    recipe = _recipe(str(tmpdir))
+
+    recipe["stages"][0]["algorithm"] = "NotAFilter"
+    with pytest.raises(RecipeError):
+        Recipe.from_dict(recipe)
+    recipe["stages"][0]["algorithm"] = "Clip"
+
+    recipe["stages"][1]["inputs"]["primary_image"] = "undefined"
+    with pytest.raises(RecipeError):
+        Recipe.from_dict(recipe).run()
+    recipe["stages"][1]["inputs"]["primary_image"] = "clipped"
+
+    recipe["outputs"]["undefined"] = "undefined.nc"
+    with pytest.raises(RecipeError):
+        Recipe.from_dict(recipe).run()
@@ -3,14 +3,15 @@ from typing import Optional, Tuple, Union
 import numpy as np
 import pandas as pd
 import xarray as xr
-from skimage.feature import blob_dog, blob_doh, blob_log
+from skimage.feature import blob_doh
 
+from starfish.compat import blob_dog, blob_log
 from starfish.imagestack.imagestack import ImageStack
 from starfish.intensity_table.intensity_table import IntensityTable
 from starfish.types import Axes, Features, Number, SpotAttributes
 from starfish.util import click
 from ._base import SpotFinderAlgorithmBase
-from .detect import detect_spots, measure_spot_intensity
+from .detect import blob_halo, detect_spots, measure_spot_intensity
 
 blob_detectors = {
     'blob_dog': blob_dog,
@@ -30,7 +31,9 @@ class BlobDetector(SpotFinderAlgorithmBase):
             overlap: float = 0.5,
             measurement_type='max',
             is_volume: bool = True,
-            detector_method: str = 'blob_log'
+            detector_method: str = 'blob_log',
+            reference_tile_size: Optional[int] = None,
+            reference_tile_halo: Optional[int] = None,
     ) -> None:
         """Multi-dimensional gaussian spot detector
 
@@ -58,6 +61,15 @@ class BlobDetector(SpotFinderAlgorithmBase):
             name of the function used to calculate the intensity for each identified spot area
         detector_method: str ['blob_dog', 'blob_doh', 'blob_log']
             name of the type of detection method used from skimage.feature, default: blob_log
+        reference_tile_size : Optional[int]
+            If provided, spots in a blobs image are found by searching (y, x) tiles of this size in
+            parallel (default None)
+        reference_tile_halo : Optional[int]
+            Number of pixels by which reference tiles are extended on each side before they are
+            searched.  If None, the halo over which blobs of max_sigma are found and pruned
+            (see starfish.spots._detector.detect.blob_halo), so that the results match searching
+            the whole image, except, rarely, for dense clusters of blobs near the edge of a tile
+            (default None)
 
         Notes
         -----
@@ -78,6 +90,10 @@ class BlobDetector(SpotFinderAlgorithmBase):
         self.overlap = overlap
         self.is_volume = is_volume
         self.measurement_function = self._get_measurement_function(measurement_type)
+        self.reference_tile_size = reference_tile_size
+        if reference_tile_halo is None:
+            reference_tile_halo = blob_halo(max_sigma)
+        self.reference_tile_halo = reference_tile_halo
         try:
             self.detector_method = blob_detectors[detector_method]
         except ValueError:
@@ -157,7 +173,9 @@ class BlobDetector(SpotFinderAlgorithmBase):
             reference_image=blobs_image,
             reference_image_max_projection_axes=blobs_axes,
             measurement_function=self.measurement_function,
-            radius_is_gyration=False)
+            radius_is_gyration=False,
+            reference_tile_size=self.reference_tile_size,
+            reference_tile_halo=self.reference_tile_halo)
 
         return intensity_table
 
@@ -181,9 +199,16 @@ class BlobDetector(SpotFinderAlgorithmBase):
         help="str ['blob_dog', 'blob_doh', 'blob_log'] name of the type of "
              "detection method used from skimage.feature. Default: blob_log"
     )
+    @click.option(
+        "--reference-tile-size", default=None, type=int,
+        help="search the blobs image in parallel, in tiles of this size")
     @click.pass_context
-    def _cli(ctx, min_sigma, max_sigma, num_sigma, threshold, overlap, show, detector_method):
+    def _cli(
+            ctx, min_sigma, max_sigma, num_sigma, threshold, overlap, show, detector_method,
+            reference_tile_size,
+    ):
         instance = BlobDetector(min_sigma, max_sigma, num_sigma, threshold, overlap,
-                                detector_method=detector_method)
+                                detector_method=detector_method,
+                                reference_tile_size=reference_tile_size)
         #  FIXME: measurement_type, is_volume missing as options; show missing as ctor args
         ctx.obj["component"]._cli_run(ctx, instance)
@@ -1,6 +1,6 @@
 from functools import partial
 from itertools import product
-from typing import Callable, Dict, Optional, Sequence, Tuple, Union
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
 
 import numpy as np
 import pandas as pd
@@ -10,6 +10,9 @@ from starfish.imagestack.imagestack import ImageStack
 from starfish.intensity_table.intensity_table import IntensityTable
 from starfish.intensity_table.intensity_table_coordinates import \
     transfer_physical_coords_from_imagestack_to_intensity_table
+from starfish.intensity_table.sparse import SparseIntensityTable
+from starfish.multiprocessing.pool import Pool
+from starfish.multiprocessing.shmem import SharedMemory
 from starfish.types import Axes, Features, Number, SpotAttributes
 
 
@@ -123,12 +126,12 @@ def measure_spot_intensities(
     return intensity_table
 
 
-def concatenate_spot_attributes_to_intensities(
+def concatenate_spot_attributes_to_sparse_intensities(
         spot_attributes: Sequence[Tuple[SpotAttributes, Dict[Axes, int]]]
-) -> IntensityTable:
+) -> SparseIntensityTable:
     """
-    Merge multiple spot attributes frames into a single IntensityTable without merging across
-    channels and imaging rounds
+    Merge multiple spot attributes frames into a single SparseIntensityTable without merging
+    across channels and imaging rounds.  Only the single intensity of each spot is stored.
 
     Parameters
     ----------
@@ -138,8 +141,8 @@ def concatenate_spot_attributes_to_intensities(
 
     Returns
     -------
-    IntensityTable :
-        concatenated input SpotAttributes, converted to an IntensityTable object
+    SparseIntensityTable :
+        concatenated input SpotAttributes, converted to a SparseIntensityTable object
 
     """
     n_ch: int = max(inds[Axes.CH] for _, inds in spot_attributes) + 1
@@ -149,17 +152,139 @@ def concatenate_spot_attributes_to_intensities(
     # this drop call ensures only x, y, z, radius, and quality, are passed to the IntensityTable
     features_coordinates = all_spots.drop(['spot_id', 'intensity'], axis=1)
 
-    intensity_table = IntensityTable.empty_intensity_table(
-        SpotAttributes(features_coordinates), n_ch, n_round,
+    return SparseIntensityTable.from_spot_intensities(
+        SpotAttributes(features_coordinates),
+        n_ch,
+        n_round,
+        feature_index=np.arange(all_spots.shape[0]),
+        channel_index=np.concatenate([
+            np.full(attrs.data.shape[0], inds[Axes.CH]) for attrs, inds in spot_attributes]),
+        round_index=np.concatenate([
+            np.full(attrs.data.shape[0], inds[Axes.ROUND]) for attrs, inds in spot_attributes]),
+        intensities=all_spots['intensity'].values.astype(np.float64),
     )
 
-    i = 0
-    for attrs, inds in spot_attributes:
-        for _, row in attrs.data.iterrows():
-            intensity_table[i, inds[Axes.CH], inds[Axes.ROUND]] = row['intensity']
-            i += 1
 
-    return intensity_table
+def concatenate_spot_attributes_to_intensities(
+        spot_attributes: Sequence[Tuple[SpotAttributes, Dict[Axes, int]]]
+) -> IntensityTable:
+    """
+    Merge multiple spot attributes frames into a single IntensityTable without merging across
+    channels and imaging rounds
+
+    Parameters
+    ----------
+    spot_attributes : Sequence[Tuple[SpotAttributes, Dict[Axes, int]]]
+        A sequence of SpotAttribute objects and the indices (channel, round) that each object is
+        associated with.
+
+    Returns
+    -------
+    IntensityTable :
+        concatenated input SpotAttributes, converted to an IntensityTable object
+
+    """
+    return concatenate_spot_attributes_to_sparse_intensities(spot_attributes).to_dense()
+
+
+def blob_halo(max_sigma: Number) -> int:
+    """Number of pixels over which blob_log and blob_dog look when they find, size and prune a spot
+    of scale at most max_sigma: ceil((4 + 2 * sqrt(3)) * max_sigma) + 1, which covers the extent
+    of the largest gaussian kernel and of pruning a blob by its direct neighbours.
+
+    Reference tiles extended by this halo find the blobs of the whole reference image in most
+    cases, but not always: overlap pruning can cascade through a chain of overlapping blobs that
+    reaches beyond the halo, and the reflected padding at the edge of a halo can create peaks that
+    the whole image does not have.  Both only affect blobs in dense clusters near the edge of a
+    tile's core."""
+    return int(np.ceil((4 + 2 * np.sqrt(3)) * max_sigma)) + 1
+
+
+def _reference_tiles(
+        height: int, width: int, tile_size: int, halo: int
+) -> List[Tuple[slice, slice, slice, slice]]:
+    """Split a (y, x) plane into tiles of at most tile_size pixels on each side.  Each tile is
+    returned as (core y, core x, halo y, halo x) slices, where the core tiles partition the plane,
+    and the halo tiles extend the cores by halo pixels on each side, where the plane allows."""
+    tiles = []
+    for y_start, x_start in product(range(0, height, tile_size), range(0, width, tile_size)):
+        y_stop = min(y_start + tile_size, height)
+        x_stop = min(x_start + tile_size, width)
+        tiles.append((
+            slice(y_start, y_stop),
+            slice(x_start, x_stop),
+            slice(max(y_start - halo, 0), min(y_stop + halo, height)),
+            slice(max(x_start - halo, 0), min(x_stop + halo, width)),
+        ))
+    return tiles
+
+
+def _find_spots_in_reference_tile(
+        spot_finding_method: Callable[..., SpotAttributes],
+        squeezed_axes: Tuple[int, ...],
+        tile: Tuple[slice, slice, slice, slice],
+) -> pd.DataFrame:
+    """Worker for _find_spots_in_reference_tiles: find spots in one halo tile of the reference
+    image held in shared memory, and return those whose centers lie in the tile's core, in the
+    coordinates of the whole image."""
+    backing_mp_array, shape, dtype = SharedMemory.get_payload()
+    image = np.frombuffer(backing_mp_array.get_obj(), dtype=dtype).reshape(shape)
+    image = np.squeeze(image, axis=squeezed_axes)
+
+    core_y, core_x, halo_y, halo_x = tile
+    spots = spot_finding_method(image[..., halo_y, halo_x]).data
+    spots[Axes.Y.value] += halo_y.start
+    spots[Axes.X.value] += halo_x.start
+
+    in_core = (
+        (spots[Axes.Y.value] >= core_y.start) & (spots[Axes.Y.value] < core_y.stop)
+        & (spots[Axes.X.value] >= core_x.start) & (spots[Axes.X.value] < core_x.stop)
+    )
+    return spots[in_core]
+
+
+def _find_spots_in_reference_tiles(
+        reference_image: ImageStack,
+        squeezed_axes: Tuple[Axes, ...],
+        spot_finding_method: Callable[..., SpotAttributes],
+        tile_size: int,
+        halo: int,
+        n_processes: Optional[int]=None,
+) -> SpotAttributes:
+    """Find spots in a projected reference image by searching overlapping (y, x) tiles of it in
+    parallel.
+
+    Each spot is kept only by the tile whose core contains its center, so spots found in the halos
+    of several tiles are not duplicated.  If halo is at least the distance over which
+    spot_finding_method looks for, sizes and prunes spots, spots are found in their core tiles as
+    they are in the whole image, except in dense clusters near the edge of a core (see
+    blob_halo).  Spots are returned in descending (z, y, x) order, which is
+    the order in which BlobDetector and LocalMaxPeakFinder report them.
+    """
+    data = reference_image._data
+    squeezed_axis_positions = tuple(
+        position for position, dim in enumerate(data.dims)
+        if dim in {axis.value for axis in squeezed_axes}
+    )
+    tiles = _reference_tiles(
+        reference_image.shape[Axes.Y], reference_image.shape[Axes.X], tile_size, halo)
+
+    worker = partial(_find_spots_in_reference_tile, spot_finding_method, squeezed_axis_positions)
+    with Pool(
+            processes=n_processes,
+            initializer=SharedMemory.initializer,
+            initargs=((data._backing_mp_array, data._data.shape, data._data.dtype),)) as pool:
+        tile_spots = list(pool.imap(worker, tiles))
+
+    spots = pd.concat(tile_spots, sort=False)
+    if spots.shape[0] == 0:
+        return SpotAttributes.empty(extra_fields=[Features.INTENSITY, Features.SPOT_ID])
+
+    spots = spots.sort_values(
+        [Axes.ZPLANE.value, Axes.Y.value, Axes.X.value], ascending=False, kind="mergesort")
+    spots = spots.reset_index(drop=True)
+    spots[Features.SPOT_ID] = np.arange(spots.shape[0])
+    return SpotAttributes(spots)
 
 
 def detect_spots(data_stack: ImageStack,
@@ -169,7 +294,9 @@ def detect_spots(data_stack: ImageStack,
                  reference_image_max_projection_axes: Optional[Tuple[Axes, ...]] = None,
                  measurement_function: Callable[[Sequence], Number] = np.max,
                  radius_is_gyration: bool = False,
-                 n_processes: Optional[int] = None) -> IntensityTable:
+                 n_processes: Optional[int] = None,
+                 reference_tile_size: Optional[int] = None,
+                 reference_tile_halo: Optional[int] = None) -> IntensityTable:
     """Apply a spot_finding_method to a ImageStack
 
     Parameters
@@ -197,8 +324,23 @@ def detect_spots(data_stack: ImageStack,
         If True, pass 3d volumes (x, y, z) to func, else pass 2d tiles (x, y) to func. (default
         True)
     n_processes : Optional[int]
-        The number of processes to use in stack.transform if reference image is None.
+        The number of processes to use in stack.transform if reference image is None, or to search
+        the tiles of the reference image if reference_tile_size is provided.
         If None, uses the output of os.cpu_count() (default = None).
+    reference_tile_size : Optional[int]
+        If provided, the projected reference image is split into tiles of this size in (y, x),
+        which are searched for spots in parallel.  Otherwise, the whole reference image is searched
+        in this process. (default None)
+    reference_tile_halo : Optional[int]
+        Number of pixels by which each reference tile is extended on each side before it is
+        searched.  Spots are only kept by the tile whose un-extended area contains them, so the
+        results approximate searching the whole reference image if the halo is at least the
+        distance over which spot_finding_method looks when it finds, sizes and prunes a spot; they
+        can differ for dense clusters of spots near the edge of a tile (see blob_halo).
+        spot_finding_methods that derive parameters from the whole image, such as
+        LocalMaxPeakFinder without an explicit threshold, can differ.  If None, the halo is
+        derived from the max_sigma in spot_finding_kwargs with blob_halo, and must be provided
+        if spot_finding_kwargs has no max_sigma. (default None)
 
     Notes
     -----
@@ -222,10 +364,28 @@ def detect_spots(data_stack: ImageStack,
     if reference_image is not None:
         if reference_image_max_projection_axes is None:
             raise ValueError("axes must be provided if reference_image is provided")
+        reference_image_max_projection_axes = tuple(
+            Axes(axis) for axis in reference_image_max_projection_axes)
         max_proj_reference_image = reference_image.max_proj(*reference_image_max_projection_axes)
-        reference_spot_locations = spot_finding_method(
-            max_proj_reference_image._squeezed_numpy(*reference_image_max_projection_axes),
-            **spot_finding_kwargs)
+        if reference_tile_size is not None:
+            if reference_tile_halo is None:
+                if "max_sigma" not in spot_finding_kwargs:
+                    raise ValueError(
+                        "reference_tile_halo must be provided if reference_tile_size is provided "
+                        "and spot_finding_kwargs has no max_sigma")
+                reference_tile_halo = blob_halo(spot_finding_kwargs["max_sigma"])
+            reference_spot_locations = _find_spots_in_reference_tiles(
+                max_proj_reference_image,
+                reference_image_max_projection_axes,
+                partial(spot_finding_method, **spot_finding_kwargs),
+                reference_tile_size,
+                reference_tile_halo,
+                n_processes=n_processes,
+            )
+        else:
+            reference_spot_locations = spot_finding_method(
+                max_proj_reference_image._squeezed_numpy(*reference_image_max_projection_axes),
+                **spot_finding_kwargs)
         intensity_table = measure_spot_intensities(
             data_image=data_stack,
             spot_attributes=reference_spot_locations,
@@ -6,7 +6,6 @@ import xarray as xr
 from scipy.ndimage import label
 from skimage.feature import peak_local_max
 from skimage.measure import regionprops
-from sympy import Line, Point
 from tqdm import tqdm
 
 from starfish.config import StarfishConfig
@@ -142,6 +141,9 @@ class LocalMaxPeakFinder(SpotFinderAlgorithmBase):
         return thresholds, spot_counts
 
     def _select_optimal_threshold(self, thresholds: np.ndarray, spot_counts: List[int]) -> float:
+        # sympy is slow to import, so it is only loaded when a threshold is selected automatically.
+        from sympy import Line, Point
+
         # calculate the gradient of the number of spots
         grad = np.gradient(spot_counts)
         self._grad = grad
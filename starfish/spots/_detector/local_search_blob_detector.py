@@ -7,7 +7,7 @@ See: https://github.com/spacetx/starfish/issues/1005
 """
 
 from collections import defaultdict
-from typing import Dict, List, Mapping, Optional, Sequence, Tuple, Union
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple, Union
 
 import numpy as np
 import pandas as pd
@@ -25,7 +25,7 @@ from starfish.types import Axes, Features, Number, SpotAttributes
 from starfish.util import click
 from ._base import SpotFinderAlgorithmBase
 
-blob_detectors = {
+blob_detectors: Mapping[str, Callable] = {
     'blob_dog': blob_dog,
     'blob_log': blob_log
 }
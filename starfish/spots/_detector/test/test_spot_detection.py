@@ -1,10 +1,11 @@
 import numpy as np
 import pytest
+from scipy.ndimage import gaussian_filter
 
 from starfish.imagestack.imagestack import ImageStack
 from starfish.spots._detector._base import SpotFinderAlgorithmBase
 from starfish.spots._detector.blob import BlobDetector
-from starfish.spots._detector.detect import detect_spots
+from starfish.spots._detector.detect import blob_halo, detect_spots
 from starfish.spots._detector.local_max_peak_finder import LocalMaxPeakFinder
 from starfish.spots._detector.trackpy_local_max_peak_finder import TrackpyLocalMaxPeakFinder
 from starfish.test.factories import (
@@ -168,3 +169,75 @@ def test_spot_finding_no_reference_image(
 
     empty_intensity_table = call_detect_spots(EMPTY_IMAGESTACK)
     assert empty_intensity_table.sizes[Features.AXIS] == 0
+
+
+@pytest.mark.parametrize('spot_detector, radius_is_gyration, tile_halo', [
+    (gaussian_spot_detector, False, gaussian_spot_detector.reference_tile_halo),
+    (local_max_spot_detector, False, 8),
+])
+def test_spot_detection_with_tiled_reference_image(
+        spot_detector: SpotFinderAlgorithmBase,
+        radius_is_gyration: bool,
+        tile_halo: int,
+):
+    """Searching the reference image in tiles with a large enough halo should find the same spots,
+    in the same order, as searching it whole."""
+    random = np.random.RandomState(0)
+    data = np.zeros((2, 2, 3, 90, 100), dtype=np.float32)
+    data[tuple(random.randint(0, size, 40) for size in data.shape)] = 1
+    data = gaussian_filter(data, sigma=(0, 0, 0.5, 1.5, 1.5))
+    stack = ImageStack.from_numpy_array(data / data.max())
+
+    def call_detect_spots(**kwargs):
+        return detect_spots(
+            data_stack=stack,
+            spot_finding_method=spot_detector.image_to_spots,
+            reference_image=stack,
+            reference_image_max_projection_axes=(Axes.ROUND, Axes.CH),
+            measurement_function=np.max,
+            radius_is_gyration=radius_is_gyration,
+            n_processes=2,
+            **kwargs
+        )
+
+    expected = call_detect_spots()
+    tiled = call_detect_spots(reference_tile_size=30, reference_tile_halo=tile_halo)
+
+    assert expected.sizes[Features.AXIS] > 0
+    assert tiled.equals(expected)
+
+
+def test_reference_tile_halo_is_derived_from_max_sigma():
+    """If reference_tile_halo is not provided, it is derived from the max_sigma passed to the
+    spot_finding_method, and a spot_finding_method without a max_sigma requires one."""
+    spot_detector = simple_gaussian_spot_detector()
+    assert spot_detector.reference_tile_halo == blob_halo(spot_detector.max_sigma)
+
+    def find_spots(image, max_sigma):
+        assert max_sigma == spot_detector.max_sigma
+        return spot_detector.image_to_spots(image)
+
+    def call_detect_spots(**kwargs):
+        return detect_spots(
+            data_stack=ONE_HOT_IMAGESTACK,
+            spot_finding_method=find_spots,
+            reference_image=ONE_HOT_IMAGESTACK,
+            reference_image_max_projection_axes=(Axes.ROUND, Axes.CH),
+            n_processes=1,
+            reference_tile_size=50,
+            **kwargs
+        )
+
+    expected = call_detect_spots(
+        spot_finding_kwargs={"max_sigma": 4}, reference_tile_halo=spot_detector.reference_tile_halo)
+    derived = call_detect_spots(spot_finding_kwargs={"max_sigma": 4})
+    assert derived.equals(expected)
+
+    with pytest.raises(ValueError):
+        detect_spots(
+            data_stack=ONE_HOT_IMAGESTACK,
+            spot_finding_method=spot_detector.image_to_spots,
+            reference_image=ONE_HOT_IMAGESTACK,
+            reference_image_max_projection_axes=(Axes.ROUND, Axes.CH),
+            reference_tile_size=50,
+        )
@@ -3,7 +3,6 @@ from typing import Optional, Tuple, Union
 
 import numpy as np
 import xarray as xr
-from trackpy import locate
 
 from starfish.imagestack.imagestack import ImageStack
 from starfish.intensity_table.intensity_table import IntensityTable
@@ -97,6 +96,9 @@ class TrackpyLocalMaxPeakFinder(SpotFinderAlgorithmBase):
             spot attributes table for all detected spots
 
         """
+        # trackpy is slow to import, so it is only loaded when spots are found.
+        from trackpy import locate
+
         data_image = np.asarray(data_image)
         with warnings.catch_warnings():
             warnings.simplefilter('ignore', FutureWarning)  # trackpy numpy indexing warning
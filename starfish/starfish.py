@@ -2,31 +2,33 @@
 import cProfile
 import subprocess
 import sys
+from contextlib import ExitStack
 from pstats import Stats
 
-import pkg_resources
-
-from starfish.experiment.builder.cli import build as build_cli
-from starfish.image import (
-    ApplyTransform,
-    Filter,
-    LearnTransform,
-    Segmentation,
-)
-from starfish.spacetx_format.cli import validate as validate_cli
-from starfish.spots import (
-    Decoder,
-    PixelSpotDecoder,
-    SpotFinder,
-    TargetAssignment,
-)
-from starfish.util import click
+from starfish.util import click, instrumentation
 
 
 PROFILER_KEY = "profiler"
 """This is the dictionary key we use to attach the profiler to pass to the resultcallback."""
 PROFILER_LINES = 15
 """This is the number of profiling rows to dump when --profile is enabled."""
+SUBCOMMANDS = {
+    # Pipelines
+    "learn_transform": "starfish.image:LearnTransform._cli",
+    "apply_transform": "starfish.image:ApplyTransform._cli",
+    "filter": "starfish.image:Filter._cli",
+    "detect_pixels": "starfish.spots:PixelSpotDecoder._cli",
+    "detect_spots": "starfish.spots:SpotFinder._cli",
+    "segment": "starfish.image:Segmentation._cli",
+    "target_assignment": "starfish.spots:TargetAssignment._cli",
+    "decode": "starfish.spots:Decoder._cli",
+    "recipe": "starfish.pipeline.recipe:_cli",
+    # Other
+    "build": "starfish.experiment.builder.cli:build",
+    "validate": "starfish.spacetx_format.cli:validate",
+}
+"""Maps the name of each subcommand to the command that implements it.  Subcommands are only
+imported when they are invoked, so that the library is not loaded by commands that don't use it."""
 
 
 def art_string():
@@ -40,10 +42,13 @@ def art_string():
 
     """
 
-@click.group()
+@click.group(cls=click.LazyGroup, lazy_commands=SUBCOMMANDS)
 @click.option("--profile", is_flag=True)
+@click.option(
+    "--trace", metavar="PATH",
+    help="write the timing and memory usage of each pipeline component to a Chrome trace file")
 @click.pass_context
-def starfish(ctx, profile):
+def starfish(ctx, profile, trace):
     """
     standardized analysis pipeline for image-based transcriptomics
     see: https://spacetx-starfish.readthedocs.io for more information.
@@ -64,6 +69,11 @@ def starfish(ctx, profile):
             stats.sort_stats('tottime').print_stats(PROFILER_LINES)
 
         ctx.call_on_close(print_profile)
+    if trace:
+        # the trace is written once the invoked command has completed, when its context closes.
+        resources = ExitStack()
+        resources.enter_context(instrumentation.tracing(trace))
+        ctx.call_on_close(resources.close)
 
 
 @starfish.command()
@@ -85,23 +95,10 @@ def install_strict_dependencies():
     """
     warning! updates different packages in your local installation
     """
+    import pkg_resources
+
     strict_requirements_file = pkg_resources.resource_filename(
         "starfish", "REQUIREMENTS-STRICT.txt")
     subprocess.check_call([
         sys.executable, "-m", "pip", "install", "-r", strict_requirements_file
     ])
-
-
-# Pipelines
-starfish.add_command(LearnTransform._cli)  # type: ignore
-starfish.add_command(ApplyTransform._cli)  # type: ignore
-starfish.add_command(Filter._cli)  # type: ignore
-starfish.add_command(PixelSpotDecoder._cli)
-starfish.add_command(SpotFinder._cli)  # type: ignore
-starfish.add_command(Segmentation._cli)  # type: ignore
-starfish.add_command(TargetAssignment._cli)  # type: ignore
-starfish.add_command(Decoder._cli)  # type: ignore
-
-# Other
-starfish.add_command(build_cli)  # type: ignore
-starfish.add_command(validate_cli)  # type: ignore
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+import skimage.feature
+from scipy.ndimage import gaussian_filter
+
+from starfish.compat import blob_dog, blob_log
+
+
+def blobs_image(shape):
+    random = np.random.RandomState(0)
+    image = gaussian_filter(random.rand(*shape), 1).astype(np.float32)
+    image[tuple(random.randint(0, size, 40) for size in shape)] += 3
+    return image
+
+
+@pytest.mark.parametrize("shape", [(64, 64), (8, 48, 48)])
+@pytest.mark.parametrize("kwargs", [
+    {"threshold": 0.01},
+    {"threshold": 0.02, "exclude_border": True},
+    {"threshold": None, "num_sigma": 4},
+])
+def test_blob_log_matches_skimage(shape, kwargs):
+    """the streaming scale space should find exactly the blobs that the full cube does"""
+    image = blobs_image(shape)
+    expected = skimage.feature.blob_log(image, **kwargs)
+    assert np.array_equal(blob_log(image, **kwargs), expected)
+
+
+@pytest.mark.parametrize("shape", [(64, 64), (8, 48, 48)])
+@pytest.mark.parametrize("kwargs", [
+    {"threshold": 0.01, "max_sigma": 8},
+    {"threshold": 0.02, "max_sigma": 8, "exclude_border": 2},
+])
+def test_blob_dog_matches_skimage(shape, kwargs):
+    image = blobs_image(shape)
+    expected = skimage.feature.blob_dog(image, **kwargs)
+    assert np.array_equal(blob_dog(image, **kwargs), expected)
+
+
+def test_blob_log_constant_image():
+    assert blob_log(np.zeros((20, 20))).size == 0
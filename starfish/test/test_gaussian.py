@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+from scipy.ndimage import gaussian_filter as scipy_gaussian_filter
+
+from starfish.util.gaussian import FFT_SIGMA_THRESHOLD, gaussian_filter
+
+
+@pytest.mark.parametrize("mode", ["nearest", "constant", "wrap", "reflect", "mirror"])
+def test_large_sigma_matches_scipy(mode):
+    """Axes with sigma above the threshold are filtered in the Fourier domain; the result should
+    be the same convolution that scipy computes directly."""
+    image = np.random.RandomState(0).rand(3, 80, 90).astype(np.float32)
+    sigma = (1, FFT_SIGMA_THRESHOLD, 2 * FFT_SIGMA_THRESHOLD)
+
+    expected = scipy_gaussian_filter(image, sigma, mode=mode, cval=0.25)
+    filtered = gaussian_filter(image, sigma, mode=mode, cval=0.25)
+
+    assert filtered.dtype == np.float32
+    assert np.allclose(filtered, expected, atol=1e-6, rtol=0)
+
+
+def test_small_sigma_is_exact():
+    image = np.random.RandomState(1).rand(40, 50)
+    expected = scipy_gaussian_filter(image, 2, mode="nearest")
+    assert np.array_equal(gaussian_filter(image, 2), expected)
+
+
+def test_integer_image_is_truncated_like_scipy():
+    image = np.random.RandomState(2).randint(0, 5000, size=(2, 60, 60)).astype(np.uint32)
+    sigma = (0, 10, 10)
+
+    filtered = gaussian_filter(image, sigma)
+
+    assert filtered.dtype == np.uint32
+    expected = scipy_gaussian_filter(image, sigma, mode="nearest").astype(np.int64)
+    assert np.abs(filtered.astype(np.int64) - expected).max() <= 1
+
+
+def test_sigma_zero_returns_copy():
+    image = np.random.RandomState(3).rand(10, 10)
+    filtered = gaussian_filter(image, 0)
+    assert np.array_equal(filtered, image)
+    assert filtered is not image
@@ -0,0 +1,104 @@
+import json
+import os
+
+import numpy as np
+import pytest
+from click.testing import CliRunner
+
+from starfish.config import environ
+from starfish.image._filter.gaussian_low_pass import GaussianLowPass
+from starfish.imagestack.imagestack import ImageStack
+from starfish.spots._detector.blob import BlobDetector
+from starfish.starfish import starfish
+from starfish.types import Axes
+from starfish.util import instrumentation
+
+
+def _stack() -> ImageStack:
+    data = np.random.RandomState(0).rand(2, 2, 3, 30, 30).astype(np.float32)
+    return ImageStack.from_numpy_array(data)
+
+
+def test_profile_is_logged():
+    stack = _stack()
+    filtered = GaussianLowPass(sigma=1).run(stack, n_processes=2)
+
+    profile = filtered.log[-1][instrumentation.PROFILE]
+    assert profile["name"] == "GaussianLowPass"
+    assert profile["wall_time"] > 0
+    assert profile["cpu_time"] >= 0
+    assert profile["peak_rss"] > 0
+    assert profile["allocated_bytes"] == stack.xarray.nbytes
+    assert profile["tile_count"] == 12
+    assert set(profile["slowest_tile"]["selector"].keys()) == {"r", "c", "z"}
+    # tile timings are only stored in the log when requested
+    assert "tiles" not in profile
+
+    with environ(PROFILING_TILES="true"):
+        filtered = GaussianLowPass(sigma=1).run(stack, in_place=True)
+    profile = filtered.log[-1][instrumentation.PROFILE]
+    assert len(profile["tiles"]) == 12
+    # in-place runs do not allocate a new stack
+    assert profile["allocated_bytes"] == 0
+
+
+def test_profile_is_logged_for_intensity_tables():
+    stack = _stack()
+    intensities = BlobDetector(min_sigma=1, max_sigma=2, num_sigma=2, threshold=0.5).run(
+        stack, stack, (Axes.ROUND, Axes.CH))
+
+    profile = intensities.get_log()[-1][instrumentation.PROFILE]
+    assert profile["name"] == "BlobDetector"
+    assert profile["allocated_bytes"] == intensities.nbytes
+
+
+def test_tracing_and_export(tmpdir):
+    stack = _stack()
+    with environ(PROFILING_TILES="true"), instrumentation.tracing() as profiles:
+        filtered = GaussianLowPass(sigma=1).run(stack)
+        filtered = GaussianLowPass(sigma=2).run(filtered)
+    assert [profile.name for profile in profiles] == ["GaussianLowPass", "GaussianLowPass"]
+
+    json_path = os.path.join(str(tmpdir), "profile.json")
+    instrumentation.write_json(filtered.log, json_path)
+    with open(json_path) as fh:
+        assert len(json.load(fh)) == 2
+
+    trace_path = os.path.join(str(tmpdir), "trace.json")
+    instrumentation.write_chrome_trace(profiles, trace_path)
+    with open(trace_path) as fh:
+        events = json.load(fh)["traceEvents"]
+    assert [event["cat"] for event in events].count("component") == 2
+    assert [event["cat"] for event in events].count("tile") == 24
+    assert all(event["ph"] == "X" and event["dur"] >= 0 for event in events)
+
+
+def test_trace_cli(tmpdir):
+    stack_path = os.path.join(str(tmpdir), "stack.json")
+    _stack().export(stack_path)
+    trace_path = os.path.join(str(tmpdir), "trace.json")
+
+    result = CliRunner().invoke(starfish, [
+        "--trace", trace_path,
+        "filter", "-i", stack_path, "-o", os.path.join(str(tmpdir), "filtered.json"),
+        "GaussianLowPass", "--sigma", "1",
+    ])
+
+    assert result.exit_code == 0, result.output
+    with open(trace_path) as fh:
+        events = json.load(fh)["traceEvents"]
+    assert [event["name"] for event in events if event["cat"] == "component"] == [
+        "GaussianLowPass"]
+    assert len(events) == 13
+
+
+def test_peak_rss_is_per_run():
+    """A run's peak resident set size does not include the memory used by earlier runs."""
+    if not instrumentation.reset_peak_rss():
+        pytest.skip("the peak resident set size cannot be reset on this platform")
+    with instrumentation.profile("large") as large:
+        data = np.ones(50_000_000, dtype=np.uint8)
+        del data
+    with instrumentation.profile("small") as small:
+        pass
+    assert large.peak_rss - small.peak_rss >= 40_000_000
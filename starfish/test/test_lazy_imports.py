@@ -0,0 +1,60 @@
+import subprocess
+import sys
+
+import pytest
+
+HEAVY_MODULES = ("skimage", "sklearn", "sympy", "trackpy", "xarray", "pandas", "pkg_resources")
+
+
+def _loaded_modules(statement: str):
+    """Run statement in a fresh interpreter and return the heavy modules it loaded."""
+    code = (
+        f"import sys\n"
+        f"{statement}\n"
+        f"print(' '.join(name for name in {HEAVY_MODULES!r} if name in sys.modules))\n"
+    )
+    output = subprocess.check_output([sys.executable, "-c", code])
+    return set(output.decode().split())
+
+
+@pytest.mark.parametrize("statement", [
+    "import starfish",
+    "from starfish.starfish import starfish",
+    "import starfish; starfish.__version__",
+])
+def test_startup_does_not_load_dependencies(statement):
+    assert _loaded_modules(statement) == set()
+
+
+def test_top_level_names_are_loaded_on_demand():
+    assert "xarray" in _loaded_modules("from starfish import ImageStack")
+
+    import starfish
+    from starfish.imagestack.imagestack import ImageStack
+    from starfish.image import Filter
+    assert starfish.ImageStack is ImageStack
+    assert starfish.image.Filter is Filter
+    assert "IntensityTable" in dir(starfish)
+    with pytest.raises(AttributeError):
+        starfish.NotAName
+
+
+def test_cli_loads_subcommands_on_demand():
+    from click.testing import CliRunner
+    from starfish.starfish import starfish
+
+    result = CliRunner().invoke(starfish, ["filter", "--help"])
+    assert result.exit_code == 0, result.output
+    assert "GaussianLowPass" in result.output
+
+
+def test_version_is_read_from_installed_metadata():
+    """The version is read from the installed distribution's metadata, without running git."""
+    import starfish
+    from starfish.util.versions import get_dependency_version, PackageNotFoundError
+
+    try:
+        installed_version = get_dependency_version("starfish")
+    except PackageNotFoundError:
+        pytest.skip("starfish is not installed")
+    assert starfish.__version__ == installed_version
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+from skimage.morphology import ball, disk
+
+from starfish.util.morphology import APPROXIMATION_STEPS, structuring_element_boxes
+
+
+def _union_of_boxes(boxes, radius, ndim):
+    grid = np.abs(np.mgrid[(slice(-radius, radius + 1),) * ndim])
+    return np.any(
+        [np.all(grid <= np.reshape(box, (-1,) + (1,) * ndim), axis=0) for box in boxes], axis=0)
+
+
+@pytest.mark.parametrize("radius", [0, 1, 4, 9])
+@pytest.mark.parametrize("ndim, structuring_element", [(2, disk), (3, ball)])
+def test_boxes_decompose_structuring_element(radius, ndim, structuring_element):
+    boxes = structuring_element_boxes(radius, ndim)
+    assert np.array_equal(
+        _union_of_boxes(boxes, radius, ndim), structuring_element(radius).astype(bool))
+
+
+@pytest.mark.parametrize("radius", [4, 9, 15])
+@pytest.mark.parametrize("ndim, structuring_element", [(2, disk), (3, ball)])
+def test_approximate_boxes_are_bounded(radius, ndim, structuring_element):
+    """the approximation lies within the structuring element and contains the one whose radius is
+    smaller by the documented bound"""
+    approximation = _union_of_boxes(
+        structuring_element_boxes(radius, ndim, approximate=True), radius, ndim)
+
+    spacing = int(np.ceil(radius / APPROXIMATION_STEPS))
+    inner_radius = int(radius - spacing * np.sqrt(ndim - 1))
+    inner = np.pad(structuring_element(inner_radius), radius - inner_radius, "constant")
+
+    assert not np.any(approximation & ~structuring_element(radius).astype(bool))
+    assert np.all(approximation[inner.astype(bool)])
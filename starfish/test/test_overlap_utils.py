@@ -7,9 +7,12 @@ from starfish.types import Coordinates, Features
 from starfish.types._constants import OverlapStrategy
 from starfish.util.overlap_utils import (
     Area,
+    find_overlaps_of_areas,
     find_overlaps_of_xarrays,
     remove_area_of_xarray,
-    sel_area_of_xarray
+    sel_area_of_xarray,
+    take_max,
+    take_max_of_all,
 )
 
 
@@ -151,3 +154,47 @@ def test_take_max():
     # and 10 from i21. It2 wins and the resulting concatenated table should have all the
     # spots from it2 (20) and 6 (one on the border) from it1 (6) for a total of 26 spots
     assert concatenated.sizes[Features.AXIS] == 26
+
+
+def test_find_overlaps_of_areas_matches_all_pairs():
+    """
+    Verify that the sweep finds the same overlapping pairs as testing every pair of randomly placed
+    areas, including areas that only touch, degenerate areas, and empty tables.
+    """
+    rng = np.random.RandomState(0)
+    areas = []
+    for _ in range(200):
+        min_x, min_y = rng.randint(0, 40, size=2)
+        width, height = rng.randint(0, 5, size=2)
+        areas.append(Area(min_x=min_x, max_x=min_x + width, min_y=min_y, max_y=min_y + height))
+    areas[10] = None
+
+    expected = [
+        (idx1, idx2)
+        for idx1, area1 in enumerate(areas)
+        for idx2, area2 in enumerate(areas)
+        if idx1 < idx2 and area1 is not None and area2 is not None
+        and Area._overlap(area1, area2)
+    ]
+    assert list(find_overlaps_of_areas(areas)) == expected
+
+
+def test_take_max_of_all():
+    """
+    Resolve the overlaps of two separate pairs of tables with TAKE_MAX, and verify that each pair is
+    resolved as take_max resolves it on its own.
+    """
+    it0 = create_intensity_table_with_coords(Area(min_x=0, max_x=2, min_y=0, max_y=2), n_spots=10)
+    it1 = create_intensity_table_with_coords(Area(min_x=1, max_x=2, min_y=1, max_y=3), n_spots=20)
+    it2 = create_intensity_table_with_coords(Area(min_x=5, max_x=7, min_y=5, max_y=7), n_spots=10)
+    it3 = create_intensity_table_with_coords(Area(min_x=6, max_x=7, min_y=6, max_y=8), n_spots=5)
+
+    results = take_max_of_all([it0, it1, it2, it3])
+    expected0, expected1 = take_max(it0, it1)
+    expected2, expected3 = take_max(it2, it3)
+    for result, expected in zip(results, [expected0, expected1, expected2, expected3]):
+        assert np.array_equal(result[Coordinates.X.value], expected[Coordinates.X.value])
+        assert np.array_equal(result[Coordinates.Y.value], expected[Coordinates.Y.value])
+        assert np.array_equal(result.values, expected.values)
+    # it1 and it2 keep all of their spots
+    assert results[1] is it1 and results[2] is it2
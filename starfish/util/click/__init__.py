@@ -1,5 +1,9 @@
+import importlib
+from typing import Mapping, Optional
+
 from click import (
     argument,
+    BadParameter,
     Choice,
     command,
     Context,
@@ -28,11 +32,11 @@ class RequiredParentOption(Option):
                 # if asking for help see if we are a subcommand name
                 # but descend as deeply as possible
                 for arg in args:
-                    if arg in ctx.command.commands:
+                    cmd = ctx.command.get_command(ctx, arg)
+                    if cmd is not None:
                         # this matches a sub command name, and --help is
                         # present, let's assume the user wants help for the
                         # subcommand or a subsubcommand
-                        cmd = ctx.command.commands[arg]
                         with Context(cmd) as sub_ctx:
                             # The following may exit
                             if not self.handle_parse_result(sub_ctx, opts, args, depth + 1):
@@ -57,3 +61,33 @@ class RequiredParentOption(Option):
 def option(*args, **kwargs):
     kwargs["cls"] = RequiredParentOption
     return _click_option(*args, **kwargs)
+
+
+class LazyGroup(Group):
+    """
+    A group whose subcommands are only imported when they are invoked (or listed, as by --help).
+    This keeps the modules, and the dependencies, of every other subcommand from being loaded.
+
+    Parameters
+    ----------
+    lazy_commands : Mapping[str, str]
+        Maps the name of each subcommand to the location of its command, in the form
+        "package.module:attribute", where attribute may be a dotted path (e.g.
+        "starfish.image:Filter._cli").
+    """
+
+    def __init__(self, *args, lazy_commands: Optional[Mapping[str, str]]=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_commands = dict(lazy_commands or {})
+
+    def list_commands(self, ctx):
+        return sorted(set(super().list_commands(ctx)).union(self.lazy_commands.keys()))
+
+    def get_command(self, ctx, cmd_name):
+        if cmd_name not in self.commands and cmd_name in self.lazy_commands:
+            module_name, attribute_path = self.lazy_commands[cmd_name].split(":")
+            cmd = importlib.import_module(module_name)
+            for attribute in attribute_path.split("."):
+                cmd = getattr(cmd, attribute)
+            self.add_command(cmd, cmd_name)
+        return super().get_command(ctx, cmd_name)
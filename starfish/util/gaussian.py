@@ -0,0 +1,159 @@
+"""
+Gaussian filtering whose cost does not grow with the width of the kernel.
+
+scipy.ndimage.gaussian_filter convolves each axis with a truncated Gaussian kernel directly, so its
+cost grows linearly with sigma.  For large kernels, :py:func:`gaussian_filter` instead convolves
+each axis by multiplication in the Fourier domain.  The image is padded by the kernel radius using
+the requested boundary mode before it is transformed, and the same truncated and normalized kernel
+is used, so the result is the same convolution that scipy computes.  The two differ only by the
+rounding error of the FFT: less than 1e-6 for float32 data in [0, 1], and less than 1e-12 for
+float64 data in [0, 1].  Integer outputs are truncated after each axis, as scipy does, so they may
+differ by 1 where a value falls within that error of an integer.
+"""
+from typing import Sequence, Union
+
+import numpy as np
+from scipy import fftpack
+from scipy.ndimage import gaussian_filter1d
+
+from starfish.types import Number
+
+FFT_SIGMA_THRESHOLD = 8
+"""
+Smallest sigma, in pixels, for which an axis is filtered in the Fourier domain.  Below this, the
+direct convolution is faster.
+"""
+
+# scipy.ndimage boundary modes and the equivalent numpy.pad modes
+_PAD_MODES = {
+    "nearest": "edge",
+    "constant": "constant",
+    "wrap": "wrap",
+    "reflect": "symmetric",
+    "mirror": "reflect",
+}
+
+
+def gaussian_filter(
+        image: np.ndarray,
+        sigma: Union[Number, Sequence[Number]],
+        mode: str="nearest",
+        cval: Number=0.0,
+        truncate: float=4.0,
+) -> np.ndarray:
+    """
+    Multi-dimensional Gaussian filter with the same semantics as scipy.ndimage.gaussian_filter.
+    Each axis is filtered with a direct convolution if its sigma is smaller than
+    FFT_SIGMA_THRESHOLD, and in the Fourier domain otherwise.
+
+    Parameters
+    ----------
+    image : np.ndarray
+        The input array.
+    sigma : Union[Number, Sequence[Number]]
+        Standard deviation of the Gaussian kernel, either for all axes or for each axis.  Axes
+        whose sigma is 0 are not filtered.
+    mode : str
+        How the image is extended beyond its boundaries: 'nearest', 'constant', 'wrap', 'reflect',
+        or 'mirror' (default 'nearest').
+    cval : Number
+        Value used beyond the boundaries if mode is 'constant' (default 0).
+    truncate : float
+        Truncate the kernel at this many standard deviations (default 4.0).
+
+    Returns
+    -------
+    np.ndarray :
+        Filtered array with the same shape and dtype as image.
+    """
+    image = np.asarray(image)
+    if isinstance(sigma, (int, float)):
+        sigmas: Sequence[Number] = [sigma] * image.ndim
+    else:
+        sigmas = sigma
+    if len(sigmas) != image.ndim:
+        raise ValueError(
+            f"sigma must be a number or have one entry per axis ({image.ndim}), not {len(sigmas)}")
+
+    output = image.copy()
+    for axis, axis_sigma in enumerate(sigmas):
+        if axis_sigma <= 1e-15:
+            continue
+        if _use_fft(output.shape[axis], axis_sigma, mode, truncate):
+            output = _fft_gaussian_filter1d(output, axis_sigma, axis, mode, cval, truncate)
+        else:
+            output = gaussian_filter1d(
+                output, axis_sigma, axis=axis, mode=mode, cval=cval, truncate=truncate)
+    return output
+
+
+def _use_fft(length: int, sigma: Number, mode: str, truncate: float) -> bool:
+    if sigma < FFT_SIGMA_THRESHOLD or mode not in _PAD_MODES:
+        return False
+    # numpy and scipy only agree on how to reflect an image if it is reflected once
+    radius = int(truncate * sigma + 0.5)
+    if mode in ("reflect", "mirror") and radius >= length:
+        return False
+    return True
+
+
+def _fft_gaussian_filter1d(
+        image: np.ndarray, sigma: Number, axis: int, mode: str, cval: Number, truncate: float
+) -> np.ndarray:
+    """Convolve one axis of image with a truncated Gaussian kernel in the Fourier domain."""
+    length = image.shape[axis]
+    radius = int(truncate * sigma + 0.5)
+    fft_length = fftpack.next_fast_len(length + 2 * radius)
+
+    if image.dtype in (np.float32, np.float64):
+        work_dtype = image.dtype
+    else:
+        work_dtype = np.dtype(np.float64)
+
+    pad_width = [(0, 0)] * image.ndim
+    pad_width[axis] = (radius, radius)
+    pad_kwargs = {"constant_values": cval} if mode == "constant" else {}
+    padded = np.pad(image.astype(work_dtype, copy=False), pad_width, _PAD_MODES[mode], **pad_kwargs)
+
+    # the padded image is zero-extended to fft_length, which is at least as long as the padded
+    # image, so the circular convolution does not wrap into the samples that are kept.
+    spectrum = fftpack.rfft(padded, n=fft_length, axis=axis, overwrite_x=True)
+    kernel_shape = [1] * image.ndim
+    kernel_shape[axis] = fft_length
+    spectrum *= _packed_kernel_spectrum(sigma, radius, fft_length, work_dtype).reshape(kernel_shape)
+    filtered = fftpack.irfft(spectrum, axis=axis, overwrite_x=True)
+
+    kept = [slice(None)] * image.ndim
+    kept[axis] = slice(radius, radius + length)
+    filtered = filtered[tuple(kept)]
+
+    if np.issubdtype(image.dtype, np.integer):
+        dtype_info = np.iinfo(image.dtype)
+        filtered = np.clip(filtered, dtype_info.min, dtype_info.max)
+    return filtered.astype(image.dtype)
+
+
+def _packed_kernel_spectrum(
+        sigma: Number, radius: int, fft_length: int, dtype: np.dtype
+) -> np.ndarray:
+    """
+    Return the Fourier transform of the same truncated, normalized Gaussian kernel used by
+    scipy.ndimage.gaussian_filter1d, in the packed layout of scipy.fftpack.rfft.  The kernel is
+    centered on sample 0, so it is symmetric and its transform is real.  Each real coefficient is
+    therefore repeated for the real and imaginary parts of the packed layout.
+    """
+    x = np.arange(-radius, radius + 1)
+    kernel = np.exp(-0.5 / (sigma * sigma) * x ** 2)
+    kernel /= kernel.sum()
+
+    centered_kernel = np.zeros(fft_length)
+    centered_kernel[:radius + 1] = kernel[radius:]
+    if radius > 0:
+        centered_kernel[-radius:] = kernel[:radius]
+    spectrum = np.fft.rfft(centered_kernel).real
+
+    packed = np.empty(fft_length)
+    packed[0] = spectrum[0]
+    packed[1::2] = spectrum[1:1 + len(packed[1::2])]
+    packed[2::2] = spectrum[1:1 + len(packed[2::2])]
+    return packed.astype(dtype)
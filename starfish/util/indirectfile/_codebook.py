@@ -1,5 +1,5 @@
 from starfish.codebook.codebook import Codebook
-from starfish.experiment.experiment import Experiment
+from starfish.experiment.index import ExperimentIndex
 from starfish.util.indirectfile._base import ConversionRecipe
 
 
@@ -9,8 +9,7 @@ class GetCodebookFromExperiment(ConversionRecipe):
 
     def load(self, input_parameter: str) -> Codebook:
         path = input_parameter[1:]
-        experiment = Experiment.from_json(path)
-        return experiment.codebook
+        return ExperimentIndex.load(path).codebook
 
 
 class GetCodebook(ConversionRecipe):
@@ -1,6 +1,6 @@
 import re
 
-from starfish.experiment.experiment import Experiment
+from starfish.experiment.index import ExperimentIndex
 from starfish.imagestack.imagestack import ImageStack
 from starfish.util.indirectfile._base import ConversionRecipe
 
@@ -15,8 +15,8 @@ class GetImageStackFromExperiment(ConversionRecipe[ImageStack]):
     def load(self, input_parameter: str) -> ImageStack:
         mo = CRE.match(input_parameter)
         assert mo is not None
-        experiment = Experiment.from_json(mo.group("path"))
-        fov = experiment[mo.group("fov")]
+        # only the requested field of view is read, through the stored index of the experiment.
+        fov = ExperimentIndex.load(mo.group("path")).fov(mo.group("fov"))
         return fov.get_image(mo.group("image_type"))
 
 
@@ -0,0 +1,288 @@
+"""
+Structured timing and memory instrumentation for pipeline components.
+
+Each run of an algorithm is recorded in a :py:class:`ComponentProfile`, which holds the wall time,
+CPU time, peak resident set size during the run, and number of bytes allocated for the objects the
+run returns.  :py:meth:`ImageStack.transform` adds the timing of every tile processed by its workers
+to the profile of the algorithm that invoked it.  Profiles are attached to the log of the
+ImageStack or IntensityTable that an algorithm produces, and can be written from a log to a json
+file with :py:func:`write_json` or to a Chrome trace-event file, which can be opened in
+chrome://tracing or https://ui.perfetto.dev, with :py:func:`write_chrome_trace`.
+
+Profiles are also collected from every algorithm run while :py:func:`tracing` is active, which is
+how ``starfish --trace PATH`` records a trace for a whole command line invocation.
+"""
+import contextlib
+import json
+import os
+import sys
+import time
+from typing import Any, Callable, Iterator, List, Mapping, MutableSequence, Optional, Sequence
+
+try:
+    import resource
+except ImportError:  # pragma: no cover (windows)
+    resource = None  # type: ignore
+
+from starfish.config import StarfishConfig
+
+PROFILE = "profile"
+"""Key under which a profile is stored in a log entry."""
+
+_RU_MAXRSS_UNITS = 1 if sys.platform == "darwin" else 1024
+"""ru_maxrss is reported in bytes on macOS, and in kilobytes elsewhere."""
+
+
+def peak_rss() -> Optional[int]:
+    """Returns the peak resident set size, in bytes, of this process since it started, or since
+    the last successful call to :py:func:`reset_peak_rss`.  Returns None if this is not supported on
+    this platform."""
+    try:
+        with open("/proc/self/status") as fh:
+            for line in fh:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _RU_MAXRSS_UNITS
+
+
+def reset_peak_rss() -> bool:
+    """Resets the peak resident set size of this process to its current resident set size, so that
+    :py:func:`peak_rss` reports the peak of the code that runs next.  This is only supported on
+    Linux; elsewhere, False is returned, and peak_rss remains the high-water mark of the process."""
+    try:
+        with open("/proc/self/clear_refs", "w") as fh:
+            fh.write("5")
+    except OSError:
+        return False
+    return True
+
+
+class TileTiming:
+    def __init__(self, start: float, duration: float, pid: int, peak_rss: Optional[int]) -> None:
+        """The timing of a single tile (or volume) processed by a worker of ImageStack.transform.
+
+        Parameters
+        ----------
+        start : float
+            Time, in seconds since the epoch, at which the worker started processing the tile.
+        duration : float
+            Time, in seconds, the worker spent processing the tile.
+        pid : int
+            Process id of the worker.
+        peak_rss : Optional[int]
+            Peak resident set size of the worker, in bytes, while processing the tile.
+        """
+        self.start = start
+        self.duration = duration
+        self.pid = pid
+        self.peak_rss = peak_rss
+
+
+def timed_call(func: Callable, *args) -> Any:
+    """Call func with args, returning its result along with a :py:class:`TileTiming`.  This is the
+    function executed by the workers of ImageStack.transform."""
+    reset_peak_rss()
+    start = time.time()
+    start_counter = time.perf_counter()
+    result = func(*args)
+    duration = time.perf_counter() - start_counter
+    return result, TileTiming(start, duration, os.getpid(), peak_rss())
+
+
+class ComponentProfile:
+    def __init__(self, name: str) -> None:
+        """Timing and memory usage of a single run of a pipeline component.
+
+        Parameters
+        ----------
+        name : str
+            Name of the algorithm being run.
+        """
+        self.name = name
+        self.pid = os.getpid()
+        self.start = time.time()
+        self.wall_time = 0.0
+        self.cpu_time = 0.0
+        self.peak_rss: Optional[int] = None
+        self.allocated_bytes = 0
+        self.tiles: MutableSequence[Mapping[str, Any]] = list()
+
+    def add_tiles(
+            self, selectors: Sequence[Mapping[Any, int]], timings: Sequence[TileTiming]
+    ) -> None:
+        """Record the timings of the tiles processed by ImageStack.transform."""
+        for selector, timing in zip(selectors, timings):
+            self.tiles.append({
+                "selector": {str(axis): label for axis, label in selector.items()},
+                "start": timing.start,
+                "duration": timing.duration,
+                "pid": timing.pid,
+                "peak_rss": timing.peak_rss,
+            })
+
+    def to_dict(self, tiles: bool=True) -> Mapping[str, Any]:
+        """Return this profile as a json-serializable dictionary.
+
+        Parameters
+        ----------
+        tiles : bool
+            If True, include the timing of every tile.  Otherwise, only the number of tiles, their
+            total duration, and the slowest tile are reported.
+        """
+        result = {
+            "name": self.name,
+            "pid": self.pid,
+            "start": self.start,
+            "wall_time": self.wall_time,
+            "cpu_time": self.cpu_time,
+            "peak_rss": self.peak_rss,
+            "allocated_bytes": self.allocated_bytes,
+            "tile_count": len(self.tiles),
+            "tile_time": sum(tile["duration"] for tile in self.tiles),
+        }
+        if len(self.tiles) > 0:
+            result["slowest_tile"] = max(self.tiles, key=lambda tile: tile["duration"])
+        if tiles:
+            result["tiles"] = list(self.tiles)
+        return result
+
+
+_active: List[ComponentProfile] = list()
+"""Profiles of the algorithm runs in progress, innermost last."""
+
+_traced: Optional[List[ComponentProfile]] = None
+"""If tracing is active, the profiles of all the algorithm runs completed since it started."""
+
+
+def _update_peak_rss(peak: Optional[int]) -> None:
+    """Raise the peak resident set size of every active profile to at least peak."""
+    if peak is None:
+        return
+    for component_profile in _active:
+        if component_profile.peak_rss is None or component_profile.peak_rss < peak:
+            component_profile.peak_rss = peak
+
+
+@contextlib.contextmanager
+def profile(name: str) -> Iterator[ComponentProfile]:
+    """Record the timing and memory usage of the enclosed block in a :py:class:`ComponentProfile`.
+    Tiles processed by ImageStack.transform within the block are added to the innermost profile.
+
+    The peak resident set size of a profile is the peak of this process during the block, and of
+    the workers while they processed its tiles.  The process' peak is reset when a profile starts,
+    after it is recorded in the enclosing profiles, so that every run reports its own peak.  Where
+    the peak cannot be reset (see :py:func:`reset_peak_rss`), it is the high-water mark of the
+    process at the end of the block.
+    """
+    component_profile = ComponentProfile(name)
+    _update_peak_rss(peak_rss())
+    reset_peak_rss()
+    _active.append(component_profile)
+    start_counter = time.perf_counter()
+    start_cpu = time.process_time()
+    try:
+        yield component_profile
+    finally:
+        component_profile.wall_time = time.perf_counter() - start_counter
+        component_profile.cpu_time = time.process_time() - start_cpu
+        _update_peak_rss(peak_rss())
+        for tile in component_profile.tiles:
+            _update_peak_rss(tile["peak_rss"])
+        _active.remove(component_profile)
+        if _traced is not None:
+            _traced.append(component_profile)
+
+
+def record_tiles(selectors: Sequence[Mapping[Any, int]], timings: Sequence[TileTiming]) -> None:
+    """Add tile timings to the innermost active profile, if there is one."""
+    if len(_active) > 0:
+        _active[-1].add_tiles(selectors, timings)
+
+
+def log_entry_profile(component_profile: ComponentProfile) -> Mapping[str, Any]:
+    """Return the representation of a profile stored in a log entry.  Tile timings are only
+    included if the ["profiling"]["tiles"] key of :py:class:`starfish.config.StarfishConfig` is
+    set, as they can make the log much larger."""
+    return component_profile.to_dict(tiles=StarfishConfig().profile_tiles)
+
+
+@contextlib.contextmanager
+def tracing(path: Optional[str]=None) -> Iterator[List[ComponentProfile]]:
+    """Collect the profiles of all algorithm runs completed within the enclosed block into the
+    yielded list.  If path is provided, they are also written to it as a Chrome trace-event file
+    when the block exits, even if it raised."""
+    global _traced
+    previous = _traced
+    traced: List[ComponentProfile] = list()
+    _traced = traced
+    try:
+        yield traced
+    finally:
+        if previous is not None:
+            previous.extend(traced)
+        _traced = previous
+        if path is not None:
+            write_chrome_trace(traced, path)
+
+
+def _profiles(log_or_profiles: Sequence[Any]) -> List[Mapping[str, Any]]:
+    profiles: List[Mapping[str, Any]] = list()
+    for item in log_or_profiles:
+        if isinstance(item, ComponentProfile):
+            profiles.append(item.to_dict())
+        elif PROFILE in item:
+            profiles.append(item[PROFILE])
+    return profiles
+
+
+def write_json(log_or_profiles: Sequence[Any], path: str) -> None:
+    """Write the profiles found in a log (see ImageStack.log and IntensityTable.get_log), or a
+    sequence of :py:class:`ComponentProfile`, to a json file."""
+    with open(path, "w") as fh:
+        json.dump(_profiles(log_or_profiles), fh, indent=2)
+
+
+def chrome_trace(log_or_profiles: Sequence[Any]) -> Mapping[str, Any]:
+    """Convert the profiles found in a log, or a sequence of :py:class:`ComponentProfile`, into the
+    Chrome trace-event format.  Each algorithm run is an event on the thread of the main process,
+    and each tile is an event on the thread of the worker that processed it."""
+    events: List[Mapping[str, Any]] = list()
+    for component_profile in _profiles(log_or_profiles):
+        pid = component_profile["pid"]
+        events.append({
+            "name": component_profile["name"],
+            "cat": "component",
+            "ph": "X",
+            "ts": component_profile["start"] * 1e6,
+            "dur": component_profile["wall_time"] * 1e6,
+            "pid": pid,
+            "tid": pid,
+            "args": {
+                key: component_profile[key]
+                for key in ("cpu_time", "peak_rss", "allocated_bytes", "tile_count", "tile_time")
+            },
+        })
+        for tile in component_profile.get("tiles", ()):
+            selector = " ".join(f"{axis}={label}" for axis, label in tile["selector"].items())
+            events.append({
+                "name": f"{component_profile['name']} {selector}",
+                "cat": "tile",
+                "ph": "X",
+                "ts": tile["start"] * 1e6,
+                "dur": tile["duration"] * 1e6,
+                "pid": pid,
+                "tid": tile["pid"],
+                "args": {"peak_rss": tile["peak_rss"]},
+            })
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def write_chrome_trace(log_or_profiles: Sequence[Any], path: str) -> None:
+    """Write the profiles found in a log, or a sequence of :py:class:`ComponentProfile`, to a
+    Chrome trace-event file."""
+    with open(path, "w") as fh:
+        json.dump(chrome_trace(log_or_profiles), fh)
@@ -3,10 +3,9 @@ from functools import lru_cache
 from json import JSONEncoder
 from typing import Mapping
 
-import pkg_resources
-
 import starfish
 from starfish.types import CORE_DEPENDENCIES
+from starfish.util.versions import get_dependency_version
 
 
 @lru_cache(maxsize=1)
@@ -18,10 +17,6 @@ def get_core_dependency_info() -> Mapping[str, str]:
     return dependency_info
 
 
-def get_dependency_version(dependency: str) -> str:
-    return pkg_resources.get_distribution(dependency).version
-
-
 @lru_cache(maxsize=1)
 def get_release_tag() -> str:
     if not starfish.__is_release_tag__:
@@ -0,0 +1,137 @@
+"""
+Grey-scale morphology with disk and ball structuring elements whose cost grows with the radius
+rather than with the area or volume of the structuring element.
+
+A digital disk (or ball) is the union of the axis-aligned boxes inscribed in it, one for each
+"step" of its boundary.  Erosion by a union of structuring elements is the minimum of the erosions
+by each of them, and erosion by a box is a sequence of one-dimensional erosions along each axis.
+scipy.ndimage.minimum_filter1d computes those in time independent of the length of the line, so
+eroding by a disk of radius r takes O(r) passes over the image instead of O(r ** 2) comparisons per
+pixel, and eroding by a ball takes O(r ** 2) passes instead of O(r ** 3) comparisons per voxel.
+Dilation is the same with maximum_filter1d.  The decomposition is exact: the results are identical
+to skimage.morphology with skimage.morphology.disk or skimage.morphology.ball.
+
+If approximate is set, only the boxes whose leading half-extents lie on a grid with spacing
+ceil(radius / APPROXIMATION_STEPS) are used.  The structuring element is then contained in the
+exact disk (ball) and contains the disk (ball) of radius radius - spacing * sqrt(ndim - 1).  For a
+ball of radius 15 this uses 15 boxes instead of 93.
+"""
+import itertools
+from math import ceil
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+from scipy.ndimage import maximum_filter1d, minimum_filter1d
+
+APPROXIMATION_STEPS = 4
+"""Number of grid steps along each leading axis of the structuring element in approximate mode."""
+
+Box = Tuple[int, ...]
+
+
+def white_tophat(image: np.ndarray, radius: int, approximate: bool=False) -> np.ndarray:
+    """
+    White top-hat transform of image: the image minus its morphological opening.  2-d images are
+    opened with a disk and 3-d images with a ball.
+
+    Parameters
+    ----------
+    image : np.ndarray
+        2-d or 3-d image data
+    radius : int
+        radius of the disk or ball
+    approximate : bool
+        If True, open with an inscribed approximation of the disk or ball that needs fewer passes
+        over the image (default False).  See the module documentation for its accuracy.
+
+    Returns
+    -------
+    np.ndarray :
+        filtered image of the same shape and dtype as the input image
+    """
+    image = np.asarray(image)
+    boxes = structuring_element_boxes(radius, image.ndim, approximate)
+    eroded = _filter_by_boxes(image, boxes, minimum_filter1d, np.minimum)
+    opened = _filter_by_boxes(eroded, boxes, maximum_filter1d, np.maximum)
+    return image - opened
+
+
+def structuring_element_boxes(radius: int, ndim: int, approximate: bool=False) -> List[Box]:
+    """
+    Decompose the disk (ndim=2) or ball (ndim=3) of the given radius into the axis-aligned boxes
+    whose union it is.  Each box is returned as its half-extent along each axis.  Boxes contained in
+    other boxes are omitted.
+
+    Parameters
+    ----------
+    radius : int
+        radius of the disk or ball
+    ndim : int
+        number of dimensions of the structuring element
+    approximate : bool
+        If True, return only the boxes whose leading half-extents are multiples of
+        ceil(radius / APPROXIMATION_STEPS), or equal to radius (default False).
+
+    Returns
+    -------
+    List[Box] :
+        the half-extents of the boxes
+    """
+    if approximate:
+        spacing = max(1, int(ceil(radius / APPROXIMATION_STEPS)))
+        levels = sorted(set(range(0, radius + 1, spacing)) | {radius})
+    else:
+        levels = list(range(radius + 1))
+
+    candidates = []
+    for leading in itertools.product(levels, repeat=ndim - 1):
+        remainder = radius ** 2 - sum(half_extent ** 2 for half_extent in leading)
+        if remainder >= 0:
+            candidates.append(leading + (_isqrt(remainder),))
+
+    return [
+        box for box in candidates
+        if not any(
+            other != box and all(o >= b for o, b in zip(other, box)) for other in candidates
+        )
+    ]
+
+
+def _isqrt(value: int) -> int:
+    """Return the largest integer whose square is at most value."""
+    root = int(np.sqrt(value))
+    while (root + 1) ** 2 <= value:
+        root += 1
+    while root ** 2 > value:
+        root -= 1
+    return root
+
+
+def _filter_by_boxes(
+        image: np.ndarray,
+        boxes: List[Box],
+        filter1d: Callable,
+        reduce: np.ufunc,
+        axis: int=0,
+) -> np.ndarray:
+    """
+    Apply the flat rank filter filter1d with the union of boxes as its structuring element.  Boxes
+    that share a half-extent along an axis share the pass along that axis.
+    """
+    groups: Dict[int, List[Box]] = {}
+    for box in boxes:
+        groups.setdefault(box[0], []).append(box[1:])
+
+    result = None
+    for half_extent, remaining in groups.items():
+        filtered = image
+        if half_extent > 0:
+            filtered = filter1d(image, 2 * half_extent + 1, axis=axis, mode="reflect")
+        if len(remaining[0]) > 0:
+            filtered = _filter_by_boxes(filtered, remaining, filter1d, reduce, axis + 1)
+
+        if result is None:
+            result = filtered.copy() if filtered is image else filtered
+        else:
+            reduce(result, filtered, out=result)
+    return result
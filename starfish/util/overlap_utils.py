@@ -1,6 +1,6 @@
-import itertools
-from typing import List, Optional, Sequence, Tuple
+from typing import Callable, List, Mapping, MutableSequence, Optional, Sequence, Tuple
 
+import numpy as np
 import xarray as xr
 
 from starfish.types import Coordinates, Features, Number
@@ -24,6 +24,16 @@ class Area:
                 and self.max_x == other.max_x
                 and self.max_y == other.max_y)
 
+    @classmethod
+    def from_xarray(cls, xarray: xr.DataArray) -> Optional["Area"]:
+        """Return the bounding box of the physical coordinates of the features of an xarray, or
+        None if it has no features."""
+        xc = xarray[Coordinates.X.value].values
+        yc = xarray[Coordinates.Y.value].values
+        if xc.size == 0:
+            return None
+        return cls(xc.min(), xc.max(), yc.min(), yc.max())
+
     @staticmethod
     def _overlap(area1: "Area", area2: "Area") -> bool:
         """Return True if two rectangles overlap"""
@@ -47,6 +57,41 @@ class Area:
         return None
 
 
+def find_overlaps_of_areas(areas: Sequence[Optional[Area]]) -> Sequence[Tuple[int, int]]:
+    """
+    Find all the pairs of overlapping areas with a sort-and-sweep over their x extents: the areas
+    are sorted by their minimum x, and each area is only compared with the areas before it whose x
+    extents reach it.
+
+    Parameters
+    ----------
+    areas : Sequence[Optional[Area]]
+        The areas to find overlaps in.  Areas that are None overlap nothing.
+
+    Returns
+    -------
+    List[Tuple[int, int]] :
+        A sorted list of tuples containing the indices of two overlapping areas, the lower index
+        first.
+    """
+    indexed_areas = sorted(
+        ((idx, area) for idx, area in enumerate(areas) if area is not None),
+        key=lambda indexed_area: indexed_area[1].min_x)
+    all_overlaps: List[Tuple[int, int]] = list()
+    # the areas whose x extents reach the current area.
+    active: List[Tuple[int, Area]] = list()
+    for idx, area in indexed_areas:
+        active = [
+            (active_idx, active_area) for active_idx, active_area in active
+            if active_area.max_x >= area.min_x
+        ]
+        for active_idx, active_area in active:
+            if Area._overlap(area, active_area):
+                all_overlaps.append((min(idx, active_idx), max(idx, active_idx)))
+        active.append((idx, area))
+    return sorted(all_overlaps)
+
+
 def find_overlaps_of_xarrays(xarrays: Sequence[xr.DataArray]) -> Sequence[Tuple[int, int]]:
     """
     Find all the overlap areas within a list of xarrays.
@@ -63,22 +108,7 @@ def find_overlaps_of_xarrays(xarrays: Sequence[xr.DataArray]) -> Sequence[Tuple[
         IntensityTables.
 
     """
-    all_overlaps: List[Tuple[int, int]] = list()
-    for idx1, idx2 in itertools.combinations(range(len(xarrays)), 2):
-        xr1 = xarrays[idx1]
-        xr2 = xarrays[idx2]
-        area1 = Area(min(xr1[Coordinates.X.value]).data,
-                     max(xr1[Coordinates.X.value]).data,
-                     min(xr1[Coordinates.Y.value]).data,
-                     max(xr1[Coordinates.Y.value]).data)
-
-        area2 = Area(min(xr2[Coordinates.X.value]).data,
-                     max(xr2[Coordinates.X.value]).data,
-                     min(xr2[Coordinates.Y.value]).data,
-                     max(xr2[Coordinates.Y.value]).data)
-        if Area._overlap(area1, area2):
-            all_overlaps.append((idx1, idx2))
-    return all_overlaps
+    return find_overlaps_of_areas([Area.from_xarray(xarray) for xarray in xarrays])
 
 
 def remove_area_of_xarray(it: xr.DataArray, area: Area) -> xr.DataArray:
@@ -161,9 +191,64 @@ def take_max(it1: xr.DataArray, it2: xr.DataArray):
     return it1, it2
 
 
+def _area_mask(xc: np.ndarray, yc: np.ndarray, area: Area, inclusive: bool) -> np.ndarray:
+    """Return a mask of the features within an area, including those on its boundary if inclusive
+    is True."""
+    if inclusive:
+        return (xc >= area.min_x) & (xc <= area.max_x) & (yc >= area.min_y) & (yc <= area.max_y)
+    return (xc > area.min_x) & (xc < area.max_x) & (yc > area.min_y) & (yc < area.max_y)
+
+
+def take_max_of_all(xarrays: Sequence[xr.DataArray]) -> List[xr.DataArray]:
+    """
+    Resolve the overlaps between all the xarrays with the TAKE_MAX strategy: for each pair of
+    overlapping xarrays, the spots strictly within their intersection are removed from whichever
+    has fewer spots in it, as :py:func:`take_max` does for a single pair.
+
+    The extent of each xarray is computed once, and spot counts are compared on the xarrays as they
+    were passed in, so the result does not depend on the order the pairs are processed in.  The
+    spots removed from each xarray by all of its pairs are then dropped in a single pass.
+
+    Parameters
+    ----------
+    xarrays : Sequence[xr.DataArray]
+        The xarrays whose overlaps are resolved.
+
+    Returns
+    -------
+    List[xr.DataArray] :
+        The xarrays, without the spots removed from their overlaps.
+    """
+    areas = [Area.from_xarray(xarray) for xarray in xarrays]
+    xcs = [xarray[Coordinates.X.value].values for xarray in xarrays]
+    ycs = [xarray[Coordinates.Y.value].values for xarray in xarrays]
+    removed: List[MutableSequence[Area]] = [list() for _ in xarrays]
+    for idx1, idx2 in find_overlaps_of_areas(areas):
+        area1, area2 = areas[idx1], areas[idx2]
+        assert area1 is not None and area2 is not None
+        intersection = Area.find_intersection(area1, area2)
+        assert intersection is not None
+        count1 = np.count_nonzero(_area_mask(xcs[idx1], ycs[idx1], intersection, True))
+        count2 = np.count_nonzero(_area_mask(xcs[idx2], ycs[idx2], intersection, True))
+        # on a tie, the first xarray keeps its spots, as in take_max.
+        removed[idx2 if count1 >= count2 else idx1].append(intersection)
+
+    results: List[xr.DataArray] = list()
+    for xarray, xc, yc, removed_areas in zip(xarrays, xcs, ycs, removed):
+        if len(removed_areas) == 0:
+            results.append(xarray)
+            continue
+        keep = np.ones(xc.shape, dtype=bool)
+        for area in removed_areas:
+            keep &= ~_area_mask(xc, yc, area, False)
+        results.append(xarray.isel({Features.AXIS: np.flatnonzero(keep)}))
+    return results
+
+
 """
-The mapping between OverlapStrategy type and the method to use for each.
+The mapping between OverlapStrategy type and the method to use for each.  Each method takes all
+the xarrays and returns them with their overlaps resolved.
 """
-OVERLAP_STRATEGY_MAP = {
-    OverlapStrategy.TAKE_MAX: take_max
+OVERLAP_STRATEGY_MAP: Mapping[OverlapStrategy, Callable[[Sequence[xr.DataArray]], List]] = {
+    OverlapStrategy.TAKE_MAX: take_max_of_all
 }
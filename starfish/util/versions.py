@@ -0,0 +1,25 @@
+"""
+Versions of starfish and its dependencies, read from the metadata written when the distributions
+were installed.  Unlike pkg_resources, this does not scan every installed distribution, and unlike
+versioneer's get_versions, it does not run git.
+"""
+try:
+    from importlib.metadata import PackageNotFoundError, version
+except ImportError:  # python < 3.8
+    from importlib_metadata import PackageNotFoundError, version  # type: ignore
+
+
+def get_dependency_version(dependency: str) -> str:
+    """Returns the installed version of the distribution named dependency."""
+    return version(dependency)
+
+
+def get_starfish_version() -> str:
+    """Returns the version of starfish recorded when it was installed.  If starfish is imported from
+    a source tree that was never installed, there is no such record, and versioneer computes the
+    version from git."""
+    try:
+        return get_dependency_version("starfish")
+    except PackageNotFoundError:
+        from starfish._version import get_versions
+        return get_versions()["version"]